@@ -0,0 +1,40 @@
+"""Rewrites task data rows of existing process instances as deltas against their parent task's data.
+
+Run with no arguments to go through every process instance or pass process instance ids to limit it.
+Run it while process instances are not being changed, for example during a maintenance window.
+"""
+
+import sys
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.services.json_data_delta_service import JsonDataDeltaService
+
+
+def main(process_instance_ids: list[int]) -> None:
+    app = create_app()
+    with app.app.app_context():
+        if len(process_instance_ids) == 0:
+            process_instance_ids = [r.id for r in db.session.query(ProcessInstanceModel.id).order_by(ProcessInstanceModel.id)]
+
+        totals = {"rows_converted": 0, "bytes_before": 0, "bytes_after": 0}
+        for process_instance_id in process_instance_ids:
+            stats = JsonDataDeltaService.backfill_process_instance(process_instance_id)
+            db.session.commit()
+            for key, value in stats.items():
+                totals[key] += value
+            if stats["rows_converted"] > 0:
+                print(
+                    f"Process instance {process_instance_id}: converted {stats['rows_converted']} rows "
+                    f"from {stats['bytes_before']} to {stats['bytes_after']} bytes"
+                )
+
+        print(
+            f"Converted {totals['rows_converted']} rows in {len(process_instance_ids)} process instances "
+            f"from {totals['bytes_before']} to {totals['bytes_after']} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]])
@@ -4,6 +4,7 @@ from flask import current_app
 from sqlalchemy import update
 
 from spiffworkflow_backend import create_app
+from spiffworkflow_backend.data_migrations.json_column_compression_migrator import JsonColumnCompressionMigrator
 from spiffworkflow_backend.data_migrations.process_instance_file_data_migrator import ProcessInstanceFileDataMigrator
 from spiffworkflow_backend.data_migrations.version_1_3 import VersionOneThree
 from spiffworkflow_backend.data_migrations.version_2 import Version2
@@ -109,6 +110,8 @@ def main() -> None:
             # run_version_2(process_instances)
         if app.app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH"] is not None:
             ProcessInstanceFileDataMigrator.migrate_from_database_to_filesystem()
+        if app.app.config["SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_RUN_DATA_MIGRATION"]:
+            JsonColumnCompressionMigrator.migrate()
 
         end_time = time.time()
         current_app.logger.debug(
@@ -0,0 +1,85 @@
+"""Micro-benchmark of the memory used to upload and download large process instance files.
+
+Standalone script - run with: uv run python bin/file_data_streaming_benchmark.py
+
+For a --size-mb file stored on the file system it measures the peak memory allocated while:
+1. upload - turning the base64 data url a form submits into the stored file, by decoding all of it at once and
+   hashing it like file_data_model_for_value used to, and with ProcessInstanceFileBlobModel.decode_base64_contents
+2. download - reading the stored file, all at once with get_contents like process_data_file_download used to,
+   and a chunk at a time with iter_contents
+
+The data url itself is built before measuring since it arrives with the request either way. Files are written
+to a temporary directory that is deleted afterward.
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.process_instance_file_blob import ProcessInstanceFileBlobModel
+
+
+def measure(operation: Callable[[], Any]) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    operation()
+    seconds = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_app().app
+    with tempfile.TemporaryDirectory() as file_data_dir, app.app_context():
+        app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH"] = file_data_dir
+        value = base64.b64encode(os.urandom(args.size_mb * 1024 * 1024)).decode("ascii")
+        file_blob = ProcessInstanceFileBlobModel()
+
+        def upload_all_at_once() -> None:
+            contents = base64.b64decode(value)
+            file_blob.digest = hashlib.sha256(contents).hexdigest()
+            file_blob.contents = contents
+            file_blob.store_file_on_file_system()
+
+        def upload_in_chunks() -> None:
+            file_blob.contents, file_blob.digest = ProcessInstanceFileBlobModel.decode_base64_contents(value, 0, len(value))
+
+        def download_all_at_once() -> None:
+            file_blob.get_contents()
+
+        def download_in_chunks() -> None:
+            for _chunk in file_blob.iter_contents():
+                pass
+
+        results = [
+            ("upload", "all at once", *measure(upload_all_at_once)),
+            ("upload", "in chunks", *measure(upload_in_chunks)),
+            ("download", "all at once", *measure(download_all_at_once)),
+            ("download", "in chunks", *measure(download_in_chunks)),
+        ]
+
+    print("\n" + "=" * 64)
+    print(f"PROCESS INSTANCE FILE DATA - {args.size_mb} MB file on the file system")
+    print("=" * 64)
+    print(f"{'Operation':<10} {'Mode':<12} {'Seconds':>10} {'Peak MB allocated':>20}")
+    print("-" * 64)
+    for operation, mode, seconds, peak_mb in results:
+        print(f"{operation:<10} {mode:<12} {seconds:>10.3f} {peak_mb:>20.1f}")
+    print("=" * 64)
+    print("\n")
+
+
+if __name__ == "__main__":
+    main()
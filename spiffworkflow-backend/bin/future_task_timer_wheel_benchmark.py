@@ -0,0 +1,87 @@
+"""Micro-benchmark comparing periodic scans of pending future tasks with the timer wheel the scheduler uses.
+
+Standalone script - run with: uv run python bin/future_task_timer_wheel_benchmark.py
+
+It spreads --timers pending timers over --spread-seconds and simulates the scheduler over --simulated-seconds:
+1. scan - every --scan-interval seconds, look at every pending timer and queue the ones due within the lookahead,
+   which is what process_future_tasks asks the database to do
+2. wheel - add every timer to a TimerWheel once and advance it every second
+
+Both run in memory, so this measures the scheduler side of the work rather than the database, but the number of
+rows each approach examines is reported too since that is what the database has to read.
+"""
+
+import argparse
+import random
+import time
+
+from spiffworkflow_backend.background_processing.future_task_timer_wheel import TimerWheel
+
+LOOKAHEAD_IN_SECONDS = 301
+
+
+def pending_timers(timer_count: int, spread_seconds: int, start: int) -> dict[str, int]:
+    randomizer = random.Random(42)  # noqa: S311
+    return {f"future-task-{index}": start + randomizer.randint(0, spread_seconds) for index in range(timer_count)}
+
+
+def run_scan(timers: dict[str, int], start: int, simulated_seconds: int, scan_interval: int) -> dict:
+    queued_to_run_at: dict[str, int] = {}
+    rows_examined = 0
+    fired = 0
+    started_at = time.perf_counter()
+    for current_time in range(start, start + simulated_seconds + 1, scan_interval):
+        horizon = current_time + LOOKAHEAD_IN_SECONDS
+        for guid, run_at_in_seconds in timers.items():
+            rows_examined += 1
+            if run_at_in_seconds < horizon and queued_to_run_at.get(guid) != run_at_in_seconds:
+                queued_to_run_at[guid] = run_at_in_seconds
+                fired += 1
+    return {"mode": "scan", "seconds": time.perf_counter() - started_at, "rows_examined": rows_examined, "fired": fired}
+
+
+def run_wheel(timers: dict[str, int], start: int, simulated_seconds: int) -> dict:
+    started_at = time.perf_counter()
+    wheel = TimerWheel(start)
+    for guid, run_at_in_seconds in timers.items():
+        wheel.add(guid, run_at_in_seconds)
+    fired = 0
+    for current_time in range(start, start + simulated_seconds + 1):
+        fired += len(wheel.advance(current_time))
+    return {"mode": "wheel", "seconds": time.perf_counter() - started_at, "rows_examined": len(timers), "fired": fired}
+
+
+def print_summary(results: list[dict], args: argparse.Namespace) -> None:
+    print("\n" + "=" * 80)
+    print(
+        f"FUTURE TASK SCHEDULING - {args.timers} timers over {args.spread_seconds}s, "
+        f"{args.simulated_seconds}s simulated, scans every {args.scan_interval}s"
+    )
+    print("=" * 80)
+    print(f"{'Mode':<8} {'Seconds':>10} {'Rows examined':>16} {'Fired':>10}")
+    print("-" * 80)
+    for r in results:
+        print(f"{r['mode']:<8} {r['seconds']:>10.3f} {r['rows_examined']:>16} {r['fired']:>10}")
+    print("=" * 80)
+    print("\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timers", type=int, default=500_000)
+    parser.add_argument("--spread-seconds", type=int, default=7 * 24 * 60 * 60, help="pending timers are due within this")
+    parser.add_argument("--simulated-seconds", type=int, default=60 * 60)
+    parser.add_argument("--scan-interval", type=int, default=300, help="like FUTURE_TASK_EXECUTION_INTERVAL_IN_SECONDS")
+    args = parser.parse_args()
+
+    start = round(time.time())
+    timers = pending_timers(args.timers, args.spread_seconds, start)
+    results = [
+        run_scan(timers, start, args.simulated_seconds, args.scan_interval),
+        run_wheel(timers, start, args.simulated_seconds),
+    ]
+    print_summary(results, args)
+
+
+if __name__ == "__main__":
+    main()
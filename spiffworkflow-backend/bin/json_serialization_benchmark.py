@@ -0,0 +1,103 @@
+"""Micro-benchmark comparing the json module with spiffworkflow_backend.utils.fast_json.
+
+Standalone script - run with: uv run python bin/json_serialization_benchmark.py
+
+For task data payloads of different sizes it measures:
+1. dumps - serializing json columns, api responses and json logs
+2. hash - canonical_dumps plus sha256, which is how json_data rows are keyed
+3. loads - reading json columns
+
+fast_json only uses orjson if it is installed, so install it first to compare the two.
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from hashlib import sha256
+from typing import Any
+
+from spiffworkflow_backend.utils import fast_json
+
+
+def task_data_payload(item_count: int) -> dict:
+    return {
+        "counter": 5,
+        "requester": {"username": "perf_test_user", "email": "perf_test_user@example.com", "groups": ["finance"]},
+        "approved": True,
+        "items": [
+            {"id": index, "name": f"payload-item-{index}", "amount": index * 1.25, "tags": ["a", "b"], "note": None}
+            for index in range(item_count)
+        ],
+    }
+
+
+def operations_per_second(operation: Callable[[], Any], min_seconds: float) -> float:
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        operation()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+    return iterations / elapsed
+
+
+def run_benchmark(item_count: int, min_seconds: float) -> list[dict]:
+    data = task_data_payload(item_count)
+    serialized_data = json.dumps(data)
+    results = []
+    operations: list[tuple[str, Callable[[], Any], Callable[[], Any]]] = [
+        ("dumps", lambda: json.dumps(data), lambda: fast_json.dumps(data)),
+        (
+            "hash",
+            lambda: sha256(json.dumps(data, sort_keys=True).encode("utf8")).hexdigest(),
+            lambda: sha256(fast_json.canonical_dumps(data).encode("utf8")).hexdigest(),
+        ),
+        ("loads", lambda: json.loads(serialized_data), lambda: fast_json.loads(serialized_data)),
+    ]
+    for operation_name, json_operation, fast_json_operation in operations:
+        json_rate = operations_per_second(json_operation, min_seconds)
+        fast_json_rate = operations_per_second(fast_json_operation, min_seconds)
+        results.append(
+            {
+                "items": item_count,
+                "bytes": len(serialized_data),
+                "operation": operation_name,
+                "json_rate": json_rate,
+                "fast_json_rate": fast_json_rate,
+            }
+        )
+    return results
+
+
+def print_summary(results: list[dict]) -> None:
+    print("\n" + "=" * 80)
+    print(f"JSON SERIALIZATION - fast_json {'with' if fast_json.orjson_enabled() else 'without'} orjson")
+    print("=" * 80)
+    print(f"{'Items':<8} {'Bytes':>10} {'Operation':<10} {'json ops/s':>14} {'fast_json ops/s':>16} {'Speedup':>10}")
+    print("-" * 80)
+    for r in results:
+        speedup = r["fast_json_rate"] / r["json_rate"]
+        print(
+            f"{r['items']:<8} {r['bytes']:>10} {r['operation']:<10} "
+            f"{r['json_rate']:>14.1f} {r['fast_json_rate']:>16.1f} {speedup:>9.2f}x"
+        )
+    print("=" * 80)
+    print("\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--item-counts", type=int, nargs="+", default=[10, 500, 5000])
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="time to spend on each operation")
+    args = parser.parse_args()
+
+    results = []
+    for item_count in args.item_counts:
+        results.extend(run_benchmark(item_count, args.min_seconds))
+    print_summary(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Measure how much storage deduplicating process instance file data saves when the same attachments are uploaded often.
+
+This runs in process against the configured database and file data storage rather than against a live server, so run
+it with the same environment the backend uses, for example:
+
+    uv run python bin/load_tests/file_data_deduplication.py --process-instances 200 --attachments 3 --distinct-files 10
+
+It creates --process-instances process instances and uploads --attachments files to each one, picked from a pool of
+--distinct-files random files, the way a form submission stores them. It then compares the bytes a row per upload
+used to store with the bytes the deduplicated blobs hold. Finally it deletes the process instances and checks that
+their blobs were garbage collected.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import os
+import random
+import time
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance_file_blob import ProcessInstanceFileBlobModel
+from spiffworkflow_backend.models.process_instance_file_data import ProcessInstanceFileDataModel
+from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
+from spiffworkflow_backend.services.user_service import UserService
+
+BENCHMARK_PROCESS_MODEL_IDENTIFIER = "load-tests/file-data-deduplication"
+
+
+def create_process_instances(count: int) -> list[ProcessInstanceModel]:
+    user = UserModel.query.filter_by(username="perf_test_user").first()
+    if user is None:
+        user = UserService.create_user("perf_test_user", "internal", "perf_test_user")
+    process_instances = [
+        ProcessInstanceModel(
+            status="complete",
+            process_initiator=user,
+            process_model_identifier=BENCHMARK_PROCESS_MODEL_IDENTIFIER,
+            process_model_display_name="File data deduplication",
+        )
+        for _ in range(count)
+    ]
+    db.session.add_all(process_instances)
+    db.session.commit()
+    return process_instances
+
+
+def delete_process_instances() -> None:
+    for process_instance in ProcessInstanceModel.query.filter_by(
+        process_model_identifier=BENCHMARK_PROCESS_MODEL_IDENTIFIER
+    ).all():
+        db.session.delete(process_instance)
+    db.session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--process-instances", type=int, default=200)
+    parser.add_argument("--attachments", type=int, default=3, help="files uploaded to each process instance")
+    parser.add_argument("--distinct-files", type=int, default=10, help="size of the pool the uploaded files are picked from")
+    parser.add_argument("--file-size-kb", type=int, default=256)
+    args = parser.parse_args()
+
+    app = create_app().app
+    with app.app_context():
+        delete_process_instances()
+        rng = random.Random(42)  # noqa: S311
+        file_size = args.file_size_kb * 1024
+        data_urls = [
+            f"data:application/octet-stream;name=file-{index}.bin;base64,{base64.b64encode(os.urandom(file_size)).decode()}"
+            for index in range(args.distinct_files)
+        ]
+        process_instances = create_process_instances(args.process_instances)
+
+        start = time.perf_counter()
+        for process_instance in process_instances:
+            data = {"attachments": [rng.choice(data_urls) for _ in range(args.attachments)]}
+            ProcessInstanceService.save_file_data_and_replace_with_digest_references(data, process_instance.id)
+        upload_seconds = time.perf_counter() - start
+
+        process_instance_ids = [process_instance.id for process_instance in process_instances]
+        file_data_rows = ProcessInstanceFileDataModel.query.filter(
+            ProcessInstanceFileDataModel.process_instance_id.in_(process_instance_ids)  # type: ignore
+        ).all()
+        digests = {file_data.digest for file_data in file_data_rows}
+        file_blobs = ProcessInstanceFileBlobModel.query.filter(ProcessInstanceFileBlobModel.digest.in_(digests)).all()  # type: ignore
+        uploads = args.process_instances * args.attachments
+        bytes_uploaded = uploads * file_size
+        bytes_stored = sum(file_blob.get_contents_size() for file_blob in file_blobs)
+
+        start = time.perf_counter()
+        delete_process_instances()
+        delete_seconds = time.perf_counter() - start
+        remaining_blobs = ProcessInstanceFileBlobModel.query.filter(ProcessInstanceFileBlobModel.digest.in_(digests)).count()  # type: ignore
+        if remaining_blobs != 0:
+            raise RuntimeError(f"{remaining_blobs} blobs were not garbage collected with their process instances")
+
+        storage = "file system" if ProcessInstanceFileBlobModel.contents_are_on_file_system() else "database"
+        print("\n" + "=" * 72)
+        print(
+            f"FILE DATA DEDUPLICATION - {dialect_name()}, contents in the {storage}, {args.process_instances} process instances"
+        )
+        print("=" * 72)
+        print(f"{'Uploads':<36} {uploads:>16}")
+        print(f"{'File data rows':<36} {len(file_data_rows):>16}")
+        print(f"{'Blobs':<36} {len(file_blobs):>16}")
+        print("-" * 72)
+        print(f"{'MB stored with a row per upload':<36} {bytes_uploaded / (1024 * 1024):>16.1f}")
+        print(f"{'MB stored in blobs':<36} {bytes_stored / (1024 * 1024):>16.1f}")
+        print(f"{'Storage saved':<36} {100 * (1 - bytes_stored / bytes_uploaded):>15.1f}%")
+        print("-" * 72)
+        print(f"{'Upload seconds':<36} {upload_seconds:>16.3f}")
+        print(f"{'Delete and garbage collect seconds':<36} {delete_seconds:>16.3f}")
+        print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
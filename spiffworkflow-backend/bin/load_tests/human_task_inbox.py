@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Compare listing a user's open tasks with the aggregating task list queries and with the human_task_inbox table.
+
+This runs in process against the configured database rather than against a live server, so run it with the same
+environment the backend uses, for example:
+
+    uv run python bin/load_tests/human_task_inbox.py --open-tasks 1000000 --my-tasks 1000
+
+It seeds --open-tasks open human tasks, unless --reuse-seed is given and they are already there. Every task is assigned
+to one of --users other users and every third one to a lane group. --my-tasks of them are also assigned to
+perf_test_user. The inbox is then rebuilt from them with HumanTaskInboxService.rebuild, since the seed is written
+without the session listener that maintains it, and the my tasks, tasks for me and my tasks for one process instance
+endpoints are timed for perf_test_user with SPIFFWORKFLOW_BACKEND_USE_HUMAN_TASK_INBOX off and on. Seeding a million
+tasks takes a while, so keep them with --reuse-seed and delete them with --delete-seed when done.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+from flask import Flask
+from flask import g
+from sqlalchemy import delete
+from sqlalchemy import insert
+from sqlalchemy import select
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
+from spiffworkflow_backend.models.human_task import HumanTaskModel
+from spiffworkflow_backend.models.human_task_inbox import HumanTaskInboxModel
+from spiffworkflow_backend.models.human_task_user import HumanTaskUserModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.routes import tasks_controller
+from spiffworkflow_backend.services.human_task_inbox_service import HumanTaskInboxService
+from spiffworkflow_backend.services.user_service import UserService
+
+BENCHMARK_PROCESS_MODEL_IDENTIFIER = "load-tests/human-task-inbox"
+BENCHMARK_GROUP_IDENTIFIER = "load-tests-human-task-inbox"
+BENCHMARK_USERNAME_PREFIX = "inbox_perf_user_"
+TASKS_PER_PROCESS_INSTANCE = 5
+SEED_BATCH_SIZE = 10000
+
+
+def benchmark_process_instance_ids() -> list[int]:
+    return list(
+        db.session.execute(
+            select(ProcessInstanceModel.id)
+            .where(ProcessInstanceModel.process_model_identifier == BENCHMARK_PROCESS_MODEL_IDENTIFIER)
+            .order_by(ProcessInstanceModel.id)
+        ).scalars()
+    )
+
+
+def delete_seed() -> None:
+    process_instance_ids = benchmark_process_instance_ids()
+    for batch_start in range(0, len(process_instance_ids), SEED_BATCH_SIZE):
+        batch = process_instance_ids[batch_start : batch_start + SEED_BATCH_SIZE]
+        human_task_ids = select(HumanTaskModel.id).where(HumanTaskModel.process_instance_id.in_(batch))  # type: ignore
+        db.session.execute(delete(HumanTaskInboxModel).where(HumanTaskInboxModel.process_instance_id.in_(batch)))  # type: ignore
+        db.session.execute(delete(HumanTaskUserModel).where(HumanTaskUserModel.human_task_id.in_(human_task_ids)))  # type: ignore
+        db.session.execute(delete(HumanTaskModel).where(HumanTaskModel.process_instance_id.in_(batch)))  # type: ignore
+        db.session.execute(delete(ProcessInstanceModel).where(ProcessInstanceModel.id.in_(batch)))  # type: ignore
+        db.session.commit()
+
+
+def find_or_create_user(username: str) -> UserModel:
+    user = UserModel.query.filter_by(username=username).first()
+    if user is None:
+        user = UserService.create_user(username, "internal", username)
+    return user  # type: ignore
+
+
+def seed(open_task_count: int, my_task_count: int, other_users: list[UserModel], me: UserModel) -> None:
+    group = UserService.find_or_create_group(BENCHMARK_GROUP_IDENTIFIER)
+    start = time.perf_counter()
+    process_instance_count = -(-open_task_count // TASKS_PER_PROCESS_INSTANCE)
+    for batch_start in range(0, process_instance_count, SEED_BATCH_SIZE):
+        db.session.execute(
+            insert(ProcessInstanceModel),
+            [
+                {
+                    "process_model_identifier": BENCHMARK_PROCESS_MODEL_IDENTIFIER,
+                    "process_model_display_name": "Human task inbox",
+                    # process instances other users started, so the tasks for me list includes them
+                    "process_initiator_id": other_users[index % len(other_users)].id,
+                    "status": "user_input_required",
+                    "summary": f"Request {index}",
+                }
+                for index in range(batch_start, min(batch_start + SEED_BATCH_SIZE, process_instance_count))
+            ],
+        )
+        db.session.commit()
+    process_instance_ids = benchmark_process_instance_ids()
+
+    # spread perf_test_user's tasks evenly over all of them
+    my_task_every = max(1, open_task_count // max(1, my_task_count))
+    now = round(time.time())
+    for batch_start in range(0, open_task_count, SEED_BATCH_SIZE):
+        batch_end = min(batch_start + SEED_BATCH_SIZE, open_task_count)
+        db.session.execute(
+            insert(HumanTaskModel),
+            [
+                {
+                    "process_instance_id": process_instance_ids[index // TASKS_PER_PROCESS_INSTANCE],
+                    "lane_assignment_id": group.id if index % 3 == 0 else None,
+                    "task_id": f"inbox-perf-{index}",
+                    "task_name": "approve",
+                    "task_title": "Approve",
+                    "task_type": "UserTask",
+                    "task_status": "READY",
+                    "process_model_display_name": "Human task inbox",
+                    "bpmn_process_identifier": "human_task_inbox",
+                    "created_at_in_seconds": now,
+                    "updated_at_in_seconds": now,
+                    "completed": False,
+                }
+                for index in range(batch_start, batch_end)
+            ],
+        )
+        human_task_ids = list(
+            db.session.execute(
+                select(HumanTaskModel.id)
+                .where(HumanTaskModel.task_id.in_([f"inbox-perf-{index}" for index in range(batch_start, batch_end)]))  # type: ignore
+                .order_by(HumanTaskModel.id)
+            ).scalars()
+        )
+        assignments = []
+        for index, human_task_id in zip(range(batch_start, batch_end), human_task_ids, strict=True):
+            assignments.append({"human_task_id": human_task_id, "user_id": other_users[index % len(other_users)].id})
+            if index % my_task_every == 0 and index // my_task_every < my_task_count:
+                assignments.append({"human_task_id": human_task_id, "user_id": me.id})
+        db.session.execute(insert(HumanTaskUserModel), assignments)
+        db.session.commit()
+        if batch_end % (SEED_BATCH_SIZE * 10) == 0 or batch_end == open_task_count:
+            print(f"seeded {batch_end} of {open_task_count} open tasks in {time.perf_counter() - start:.0f}s", flush=True)
+
+
+def median_seconds(function: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def task_ids(app: Flask, use_inbox: bool, function: Callable[[], object]) -> list[str]:
+    app.config["SPIFFWORKFLOW_BACKEND_USE_HUMAN_TASK_INBOX"] = use_inbox
+    response = function()
+    return [task["id"] for task in response.get_json()["results"]]  # type: ignore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--open-tasks", type=int, default=1_000_000)
+    parser.add_argument("--my-tasks", type=int, default=1000, help="open tasks also assigned to perf_test_user")
+    parser.add_argument("--users", type=int, default=100, help="other users the open tasks are assigned to")
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5, help="times each list is fetched. the median is reported")
+    parser.add_argument("--reuse-seed", action="store_true", help="keep open tasks seeded by an earlier run with --open-tasks")
+    parser.add_argument("--delete-seed", action="store_true", help="delete the seeded open tasks and exit")
+    args = parser.parse_args()
+
+    app = create_app().app
+    with app.app_context():
+        if args.delete_seed:
+            delete_seed()
+            HumanTaskInboxService.rebuild()
+            return
+
+        me = find_or_create_user("perf_test_user")
+        other_users = [find_or_create_user(f"{BENCHMARK_USERNAME_PREFIX}{index}") for index in range(args.users)]
+        seeded_task_count = (
+            db.session.query(HumanTaskModel)
+            .join(ProcessInstanceModel, ProcessInstanceModel.id == HumanTaskModel.process_instance_id)
+            .filter(ProcessInstanceModel.process_model_identifier == BENCHMARK_PROCESS_MODEL_IDENTIFIER)
+            .count()
+        )
+        if not args.reuse_seed or seeded_task_count != args.open_tasks:
+            delete_seed()
+            seed(args.open_tasks, args.my_tasks, other_users, me)
+
+        start = time.perf_counter()
+        inbox_row_count = HumanTaskInboxService.rebuild()
+        rebuild_seconds = time.perf_counter() - start
+
+        my_process_instance_id = db.session.execute(
+            select(HumanTaskInboxModel.process_instance_id).where(HumanTaskInboxModel.user_id == me.id).limit(1)
+        ).scalar()
+        endpoints: list[tuple[str, Callable[[], object]]] = [
+            ("my tasks", lambda: tasks_controller.task_list_my_tasks(per_page=args.per_page)),
+            ("tasks for me", lambda: tasks_controller.task_list_for_me(per_page=args.per_page)),
+            (
+                "my tasks for one instance",
+                lambda: tasks_controller.task_list_my_tasks(process_instance_id=my_process_instance_id, per_page=args.per_page),
+            ),
+        ]
+
+        rows = []
+        with app.test_request_context():
+            g.user = me
+            for name, function in endpoints:
+                if task_ids(app, False, function) != task_ids(app, True, function):
+                    raise RuntimeError(f"the aggregating query and the inbox listed different tasks for {name}")
+                app.config["SPIFFWORKFLOW_BACKEND_USE_HUMAN_TASK_INBOX"] = False
+                aggregating_seconds = median_seconds(function, args.repeat)
+                app.config["SPIFFWORKFLOW_BACKEND_USE_HUMAN_TASK_INBOX"] = True
+                inbox_seconds = median_seconds(function, args.repeat)
+                rows.append((name, aggregating_seconds, inbox_seconds))
+
+        print("\n" + "=" * 72)
+        print(f"HUMAN TASK INBOX - {dialect_name()}, {args.open_tasks} open tasks, {args.my_tasks} for perf_test_user")
+        print("=" * 72)
+        print(f"{'List':<28} {'Aggregating ms':>16} {'Inbox ms':>12} {'Speedup':>12}")
+        print("-" * 72)
+        for name, aggregating_seconds, inbox_seconds in rows:
+            speedup = aggregating_seconds / inbox_seconds if inbox_seconds else 0
+            print(f"{name:<28} {aggregating_seconds * 1000:>16.1f} {inbox_seconds * 1000:>12.1f} {speedup:>11.1f}x")
+        print("-" * 72)
+        print(f"{'Inbox rows':<48} {inbox_row_count:>12}")
+        print(f"{'Inbox rebuild seconds':<48} {rebuild_seconds:>12.1f}")
+        print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
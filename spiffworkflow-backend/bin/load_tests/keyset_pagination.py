@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Compare offset and cursor (keyset) pagination of a process instance's event log as pages get deeper.
+
+This runs in process against the configured database rather than against a live server, so run it with the same
+environment the backend uses, for example:
+
+    uv run python bin/load_tests/keyset_pagination.py --events 5000000 --per-page 100
+
+It seeds --events process instance events for one process instance, unless --reuse-seed is given and they are already
+there, then fetches pages at increasing depths the way the log list endpoint does: with an offset and an exact count,
+which is how every list endpoint paged before, with an offset and no count, and with a cursor. It also times the exact
+and approximate counts on their own. Seeding 5 million events takes a while, so keep them with --reuse-seed and delete
+them with --delete-seed when done.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from decimal import Decimal
+
+from sqlalchemy import delete
+from sqlalchemy import insert
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance_event import ProcessInstanceEventModel
+from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.services.user_service import UserService
+from spiffworkflow_backend.utils.pagination import SortKey
+from spiffworkflow_backend.utils.pagination import encode_cursor
+from spiffworkflow_backend.utils.pagination import paginate_query
+
+BENCHMARK_PROCESS_MODEL_IDENTIFIER = "load-tests/keyset-pagination"
+SEED_BATCH_SIZE = 10000
+SORT_KEYS = [
+    SortKey(ProcessInstanceEventModel.timestamp, descending=True),  # type: ignore
+    SortKey(ProcessInstanceEventModel.id, descending=True),  # type: ignore
+]
+
+
+def delete_seed() -> None:
+    process_instance_ids = [
+        process_instance.id
+        for process_instance in ProcessInstanceModel.query.filter_by(process_model_identifier=BENCHMARK_PROCESS_MODEL_IDENTIFIER)
+    ]
+    if process_instance_ids:
+        db.session.execute(
+            delete(ProcessInstanceEventModel).where(ProcessInstanceEventModel.process_instance_id.in_(process_instance_ids))  # type: ignore
+        )
+        db.session.execute(delete(ProcessInstanceModel).where(ProcessInstanceModel.id.in_(process_instance_ids)))  # type: ignore
+    db.session.commit()
+
+
+def seed(event_count: int) -> ProcessInstanceModel:
+    user = UserModel.query.filter_by(username="perf_test_user").first()
+    if user is None:
+        user = UserService.create_user("perf_test_user", "internal", "perf_test_user")
+    process_instance = ProcessInstanceModel(
+        status="complete",
+        process_initiator=user,
+        process_model_identifier=BENCHMARK_PROCESS_MODEL_IDENTIFIER,
+        process_model_display_name="Keyset pagination",
+    )
+    db.session.add(process_instance)
+    db.session.commit()
+
+    start = time.perf_counter()
+    base_timestamp = Decimal(round(time.time()) - event_count)
+    for batch_start in range(0, event_count, SEED_BATCH_SIZE):
+        # pairs of events share a timestamp so the id tiebreaker gets exercised
+        db.session.execute(
+            insert(ProcessInstanceEventModel),
+            [
+                {
+                    "process_instance_id": process_instance.id,
+                    "event_type": "task_completed",
+                    "timestamp": base_timestamp + Decimal(index // 2) / 1000,
+                }
+                for index in range(batch_start, min(batch_start + SEED_BATCH_SIZE, event_count))
+            ],
+        )
+        db.session.commit()
+        seeded = min(batch_start + SEED_BATCH_SIZE, event_count)
+        if seeded % (SEED_BATCH_SIZE * 50) == 0 or seeded == event_count:
+            print(f"seeded {seeded} of {event_count} events in {time.perf_counter() - start:.0f}s", flush=True)
+    return process_instance
+
+
+def median_seconds(function: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5_000_000)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3, help="times each page is fetched. the median is reported")
+    parser.add_argument("--reuse-seed", action="store_true", help="keep events seeded by an earlier run with --events")
+    parser.add_argument("--delete-seed", action="store_true", help="delete the seeded events and exit")
+    args = parser.parse_args()
+
+    app = create_app().app
+    with app.app_context():
+        if args.delete_seed:
+            delete_seed()
+            return
+
+        process_instance = ProcessInstanceModel.query.filter_by(
+            process_model_identifier=BENCHMARK_PROCESS_MODEL_IDENTIFIER
+        ).first()
+        if (
+            not args.reuse_seed
+            or process_instance is None
+            or ProcessInstanceEventModel.query.filter_by(process_instance_id=process_instance.id).count() != args.events
+        ):
+            delete_seed()
+            process_instance = seed(args.events)
+
+        event_query = ProcessInstanceEventModel.query.filter_by(process_instance_id=process_instance.id)
+        last_page = max(1, -(-args.events // args.per_page))
+        depths = sorted({page for page in [1, 10, 100, 1000, 10000, 100000] if page < last_page} | {last_page})
+
+        rows = []
+        for page in depths:
+            offset_page = paginate_query(event_query, SORT_KEYS, page=page, per_page=args.per_page, total_count="none")
+            cursor = None
+            if page > 1:
+                row_before_page = (
+                    event_query.order_by(*[clause for sort_key in SORT_KEYS for clause in sort_key.order_by()])
+                    .offset((page - 1) * args.per_page - 1)
+                    .first()
+                )
+                cursor = encode_cursor(SORT_KEYS, row_before_page)
+            cursor_page = paginate_query(event_query, SORT_KEYS, per_page=args.per_page, cursor=cursor, total_count="none")
+            if [event.id for event in cursor_page.items] != [event.id for event in offset_page.items]:
+                raise RuntimeError(f"cursor and offset pagination returned different events for page {page}")
+
+            rows.append(
+                (
+                    page,
+                    median_seconds(
+                        lambda page=page: paginate_query(event_query, SORT_KEYS, page=page, per_page=args.per_page),
+                        args.repeat,
+                    ),
+                    median_seconds(
+                        lambda page=page: paginate_query(
+                            event_query, SORT_KEYS, page=page, per_page=args.per_page, total_count="none"
+                        ),
+                        args.repeat,
+                    ),
+                    median_seconds(
+                        lambda cursor=cursor: paginate_query(
+                            event_query, SORT_KEYS, per_page=args.per_page, cursor=cursor, total_count="none"
+                        ),
+                        args.repeat,
+                    ),
+                )
+            )
+
+        exact_count_seconds = median_seconds(
+            lambda: paginate_query(event_query, SORT_KEYS, per_page=1, total_count="exact"), args.repeat
+        )
+        approximate_count_seconds = median_seconds(
+            lambda: paginate_query(event_query, SORT_KEYS, per_page=1, total_count="approximate"), args.repeat
+        )
+
+        approximate_limit = app.config["SPIFFWORKFLOW_BACKEND_PAGINATION_APPROXIMATE_TOTAL_LIMIT"]
+        print("\n" + "=" * 72)
+        print(f"KEYSET PAGINATION - {dialect_name()}, {args.events} events, {args.per_page} per page")
+        print("=" * 72)
+        print(f"{'Page':>10} {'Offset+count ms':>18} {'Offset ms':>14} {'Cursor ms':>14} {'Speedup':>12}")
+        print("-" * 72)
+        for page, offset_count_seconds, offset_seconds, cursor_seconds in rows:
+            speedup = offset_count_seconds / cursor_seconds if cursor_seconds else 0
+            print(
+                f"{page:>10} {offset_count_seconds * 1000:>18.1f} {offset_seconds * 1000:>14.1f}"
+                f" {cursor_seconds * 1000:>14.1f} {speedup:>11.1f}x"
+            )
+        print("-" * 72)
+        print(f"{'Page of 1 with exact count ms':<48} {exact_count_seconds * 1000:>12.1f}")
+        print(f"{f'Page of 1 with approximate count ms (<= {approximate_limit})':<48} {approximate_count_seconds * 1000:>12.1f}")
+        print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
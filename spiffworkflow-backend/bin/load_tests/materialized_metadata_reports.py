@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Compare process instance reports with metadata columns read from process_instance_metadata and from the materialized rows.
+
+This runs in process against the configured database rather than against a live server, so run it with the same
+environment the backend uses, for example:
+
+    uv run python bin/load_tests/materialized_metadata_reports.py --process-instances 2000000 --metadata-keys 10
+
+It seeds --process-instances process instances with --metadata-keys metadata values each, along with their materialized
+metadata rows, unless --reuse-seed is given and they are already there. It then runs reports with every metadata key
+as a column: without filters, filtered on one key and ordered by one key, with
+SPIFFWORKFLOW_BACKEND_USE_MATERIALIZED_PROCESS_INSTANCE_METADATA off, which joins process_instance_metadata once per
+column, and on. Seeding 2 million process instances takes a while, so keep them with --reuse-seed and delete them with
+--delete-seed when done.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+from sqlalchemy import delete
+from sqlalchemy import insert
+from sqlalchemy import select
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance_materialized_metadata import ProcessInstanceMaterializedMetadataModel
+from spiffworkflow_backend.models.process_instance_metadata import ProcessInstanceMetadataModel
+from spiffworkflow_backend.models.process_instance_report import FilterValue
+from spiffworkflow_backend.models.process_instance_report import ReportMetadata
+from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.services.process_instance_report_service import ProcessInstanceReportService
+from spiffworkflow_backend.services.user_service import UserService
+
+BENCHMARK_PROCESS_MODEL_IDENTIFIER = "load-tests/materialized-metadata-reports"
+SEED_BATCH_SIZE = 5000
+
+
+def metadata_key(index: int) -> str:
+    return f"perf_key_{index}"
+
+
+def metadata_value(process_instance_index: int, key_index: int) -> str:
+    # a few hundred distinct values per key so an equals filter matches a fraction of a percent of the instances
+    return f"value-{(process_instance_index * (key_index + 7)) % 499}"
+
+
+def delete_seed() -> None:
+    while True:
+        process_instance_ids = list(
+            db.session.execute(
+                select(ProcessInstanceModel.id)
+                .where(ProcessInstanceModel.process_model_identifier == BENCHMARK_PROCESS_MODEL_IDENTIFIER)
+                .limit(SEED_BATCH_SIZE)
+            ).scalars()
+        )
+        if not process_instance_ids:
+            break
+        db.session.execute(
+            delete(ProcessInstanceMaterializedMetadataModel).where(
+                ProcessInstanceMaterializedMetadataModel.process_instance_id.in_(process_instance_ids)  # type: ignore
+            )
+        )
+        db.session.execute(
+            delete(ProcessInstanceMetadataModel).where(ProcessInstanceMetadataModel.process_instance_id.in_(process_instance_ids))  # type: ignore
+        )
+        db.session.execute(delete(ProcessInstanceModel).where(ProcessInstanceModel.id.in_(process_instance_ids)))  # type: ignore
+        db.session.commit()
+
+
+def seed(process_instance_count: int, metadata_key_count: int) -> None:
+    user = UserModel.query.filter_by(username="perf_test_user").first()
+    if user is None:
+        user = UserService.create_user("perf_test_user", "internal", "perf_test_user")
+
+    start = time.perf_counter()
+    now = round(time.time())
+    last_process_instance_id = 0
+    for batch_start in range(0, process_instance_count, SEED_BATCH_SIZE):
+        batch_end = min(batch_start + SEED_BATCH_SIZE, process_instance_count)
+        db.session.execute(
+            insert(ProcessInstanceModel),
+            [
+                {
+                    "process_model_identifier": BENCHMARK_PROCESS_MODEL_IDENTIFIER,
+                    "process_model_display_name": "Materialized metadata reports",
+                    "process_initiator_id": user.id,
+                    "status": "complete",
+                    "start_in_seconds": now - process_instance_count + index,
+                    "end_in_seconds": now - process_instance_count + index,
+                }
+                for index in range(batch_start, batch_end)
+            ],
+        )
+        process_instance_ids = list(
+            db.session.execute(
+                select(ProcessInstanceModel.id)
+                .where(
+                    ProcessInstanceModel.process_model_identifier == BENCHMARK_PROCESS_MODEL_IDENTIFIER,
+                    ProcessInstanceModel.id > last_process_instance_id,
+                )
+                .order_by(ProcessInstanceModel.id)
+            ).scalars()
+        )
+        last_process_instance_id = process_instance_ids[-1]
+
+        metadata_rows = []
+        materialized_rows = []
+        for index, process_instance_id in zip(range(batch_start, batch_end), process_instance_ids, strict=True):
+            metadata_values = {
+                metadata_key(key_index): metadata_value(index, key_index) for key_index in range(metadata_key_count)
+            }
+            metadata_rows.extend(
+                {
+                    "process_instance_id": process_instance_id,
+                    "key": key,
+                    "value": value,
+                    "created_at_in_seconds": now,
+                    "updated_at_in_seconds": now,
+                }
+                for key, value in metadata_values.items()
+            )
+            materialized_rows.append({"process_instance_id": process_instance_id, "metadata_values": metadata_values})
+        db.session.execute(insert(ProcessInstanceMetadataModel), metadata_rows)
+        db.session.execute(insert(ProcessInstanceMaterializedMetadataModel), materialized_rows)
+        db.session.commit()
+        if batch_end % (SEED_BATCH_SIZE * 20) == 0 or batch_end == process_instance_count:
+            print(
+                f"seeded {batch_end} of {process_instance_count} process instances in {time.perf_counter() - start:.0f}s",
+                flush=True,
+            )
+
+
+def median_seconds(function: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--process-instances", type=int, default=2_000_000)
+    parser.add_argument("--metadata-keys", type=int, default=10, help="metadata values per process instance and report columns")
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--total-count", choices=["exact", "approximate", "none"], default="exact")
+    parser.add_argument("--repeat", type=int, default=3, help="times each report is run. the median is reported")
+    parser.add_argument(
+        "--reuse-seed", action="store_true", help="keep process instances seeded by an earlier run with --process-instances"
+    )
+    parser.add_argument("--delete-seed", action="store_true", help="delete the seeded process instances and exit")
+    args = parser.parse_args()
+
+    app = create_app().app
+    with app.app_context():
+        if args.delete_seed:
+            delete_seed()
+            return
+
+        seeded_count = ProcessInstanceModel.query.filter_by(process_model_identifier=BENCHMARK_PROCESS_MODEL_IDENTIFIER).count()
+        if not args.reuse_seed or seeded_count != args.process_instances:
+            delete_seed()
+            seed(args.process_instances, args.metadata_keys)
+
+        columns = [{"Header": "ID", "accessor": "id", "filterable": False}] + [
+            {"Header": metadata_key(key_index), "accessor": metadata_key(key_index), "filterable": True}
+            for key_index in range(args.metadata_keys)
+        ]
+        equals_filter: FilterValue = {"field_name": metadata_key(0), "field_value": metadata_value(42, 0), "operator": "equals"}
+        reports: list[tuple[str, list[FilterValue], list[str]]] = [
+            ("no filters", [], ["-id"]),
+            ("equals filter on one key", [equals_filter], ["-id"]),
+            ("ordered by one key", [], [metadata_key(0), "-id"]),
+        ]
+
+        rows = []
+        for name, filters, order_by in reports:
+
+            def run_report(filters: list[FilterValue] = filters, order_by: list[str] = order_by) -> dict:
+                report_metadata: ReportMetadata = {
+                    "columns": columns,  # type: ignore
+                    "filter_by": list(filters),
+                    "order_by": order_by,
+                }
+                return ProcessInstanceReportService.run_process_instance_report(
+                    report_metadata, per_page=args.per_page, total_count=args.total_count
+                )
+
+            timings = []
+            results = []
+            for use_materialized_metadata in [False, True]:
+                app.config["SPIFFWORKFLOW_BACKEND_USE_MATERIALIZED_PROCESS_INSTANCE_METADATA"] = use_materialized_metadata
+                results.append([(result["id"], result[metadata_key(0)]) for result in run_report()["results"]])
+                timings.append(median_seconds(run_report, args.repeat))
+            if results[0] != results[1]:
+                raise RuntimeError(f"the report '{name}' returned different process instances with materialized metadata")
+            rows.append((name, timings[0], timings[1]))
+
+        print("\n" + "=" * 72)
+        print(
+            f"MATERIALIZED METADATA REPORTS - {dialect_name()}, {args.process_instances} process instances,"
+            f" {args.metadata_keys} metadata columns, {args.total_count} total count"
+        )
+        print("=" * 72)
+        print(f"{'Report':<28} {'Joins ms':>14} {'Materialized ms':>16} {'Speedup':>10}")
+        print("-" * 72)
+        for name, join_seconds, materialized_seconds in rows:
+            speedup = join_seconds / materialized_seconds if materialized_seconds else 0
+            print(f"{name:<28} {join_seconds * 1000:>14.1f} {materialized_seconds * 1000:>16.1f} {speedup:>9.1f}x")
+        print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
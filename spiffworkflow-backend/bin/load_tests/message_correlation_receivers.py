@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Measure how long a send message takes to find its receive message when many receive messages wait on the same name.
+
+This runs in process against the configured database rather than against a live server, so run it with the same
+environment the backend uses, for example:
+
+    uv run python bin/load_tests/message_correlation_receivers.py --receivers 10000 --sends 50
+
+It creates --receivers ready receive messages with the same name, each correlated on its own order id, and then
+looks up the receive message for --sends send messages two ways: by evaluating every receive message's correlation
+with MessageInstanceModel.correlates, which is how receive messages were found before, and with
+MessageCorrelationIndexService. The message instances are not tied to process instances and are deleted again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
+from spiffworkflow_backend.models.message_instance import MessageInstanceModel
+from spiffworkflow_backend.models.message_instance import MessageStatuses
+from spiffworkflow_backend.models.message_instance import MessageTypes
+from spiffworkflow_backend.models.message_instance_correlation import MessageInstanceCorrelationRuleModel
+from spiffworkflow_backend.models.message_instance_correlation_key import MessageInstanceCorrelationKeyModel
+from spiffworkflow_backend.services.message_correlation_index_service import MessageCorrelationIndexService
+from spiffworkflow_backend.services.process_instance_script_engine import CustomBpmnScriptEngine
+
+BENCHMARK_MESSAGE_NAME = "load-tests-correlation-receivers"
+
+
+def create_receive_messages(receiver_count: int) -> list[int]:
+    message_instances = []
+    for order_id in range(receiver_count):
+        message_instance = MessageInstanceModel(
+            message_type=MessageTypes.receive.value,
+            name=BENCHMARK_MESSAGE_NAME,
+            correlation_keys={"order": {"order_id": order_id}},
+            status=MessageStatuses.ready.value,
+        )
+        db.session.add(
+            MessageInstanceCorrelationRuleModel(
+                message_instance=message_instance,
+                name="order_id",
+                retrieval_expression="order_id",
+                correlation_key_names=["order"],
+            )
+        )
+        MessageCorrelationIndexService.index_receive_message(message_instance)
+        message_instances.append(message_instance)
+    db.session.add_all(message_instances)
+    db.session.commit()
+    return [message_instance.id for message_instance in message_instances]
+
+
+def delete_message_instances() -> None:
+    message_instance_ids = [
+        message_instance_id
+        for (message_instance_id,) in db.session.query(MessageInstanceModel.id)
+        .filter(MessageInstanceModel.name == BENCHMARK_MESSAGE_NAME)
+        .all()
+    ]
+    for index in range(0, len(message_instance_ids), 1000):
+        batch_ids = message_instance_ids[index : index + 1000]
+        for model in [MessageInstanceCorrelationKeyModel, MessageInstanceCorrelationRuleModel]:
+            db.session.query(model).filter(model.message_instance_id.in_(batch_ids)).delete(  # type: ignore
+                synchronize_session=False
+            )
+        db.session.query(MessageInstanceModel).filter(MessageInstanceModel.id.in_(batch_ids)).delete(  # type: ignore
+            synchronize_session=False
+        )
+    db.session.commit()
+
+
+def find_by_evaluating_every_receiver(message_instance_send: MessageInstanceModel) -> list[MessageInstanceModel]:
+    receive_messages = MessageInstanceModel.query.filter_by(
+        name=message_instance_send.name,
+        status=MessageStatuses.ready.value,
+        message_type=MessageTypes.receive.value,
+    ).all()
+    return [
+        message_instance_receive
+        for message_instance_receive in receive_messages
+        if message_instance_receive.correlates(message_instance_send, CustomBpmnScriptEngine())
+    ]
+
+
+def find_with_index(message_instance_send: MessageInstanceModel) -> list[MessageInstanceModel]:
+    return MessageCorrelationIndexService.correlating_receive_messages(message_instance_send, CustomBpmnScriptEngine())
+
+
+def time_lookups(
+    find: Callable[[MessageInstanceModel], list[MessageInstanceModel]], order_ids: list[int], receive_message_ids: list[int]
+) -> list[float]:
+    durations = []
+    for order_id in order_ids:
+        message_instance_send = MessageInstanceModel(
+            message_type=MessageTypes.send.value,
+            name=BENCHMARK_MESSAGE_NAME,
+            payload={"order_id": order_id},
+            correlation_keys={},
+        )
+        start = time.perf_counter()
+        receive_messages = find(message_instance_send)
+        durations.append(time.perf_counter() - start)
+        if [message_instance.id for message_instance in receive_messages] != [receive_message_ids[order_id]]:
+            raise RuntimeError(f"Found the wrong receive messages for order {order_id}")
+        db.session.expunge_all()
+    return durations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--receivers", type=int, default=10000, help="ready receive messages waiting on the same message name")
+    parser.add_argument("--sends", type=int, default=50, help="send messages to find receive messages for")
+    args = parser.parse_args()
+
+    app = create_app().app
+    with app.app_context():
+        delete_message_instances()
+        receive_message_ids = create_receive_messages(args.receivers)
+        order_ids = random.Random(42).sample(range(args.receivers), min(args.sends, args.receivers))  # noqa: S311
+        results = []
+        try:
+            for mode, find in [("evaluate all", find_by_evaluating_every_receiver), ("index", find_with_index)]:
+                durations = time_lookups(find, order_ids, receive_message_ids)
+                results.append((mode, statistics.mean(durations), max(durations)))
+        finally:
+            delete_message_instances()
+
+        print("\n" + "=" * 72)
+        print(f"MESSAGE CORRELATION - {dialect_name()}, {args.receivers} waiting receive messages, {args.sends} sends")
+        print("=" * 72)
+        print(f"{'Mode':<15} {'Mean ms per send':>18} {'Max ms':>10}")
+        print("-" * 72)
+        for mode, mean, maximum in results:
+            print(f"{mode:<15} {mean * 1000:>18.2f} {maximum * 1000:>10.2f}")
+        print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Measure permission checks for a user in many groups, with and without the in-memory permission index.
+
+This runs in process against the configured database rather than against a live server, so run it with the same
+environment the backend uses, for example:
+
+    uv run python bin/load_tests/permission_checks.py --groups 50 --checks 10000
+
+It creates a user in --groups groups, each allowed to read and start its own process group and denied reading one of
+that group's sub groups, and then checks --checks permissions two ways: with a query per check, which is how
+AuthorizationService.has_permission always worked, and with PermissionIndexService. The user and groups are deleted again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
+from spiffworkflow_backend.models.group import GroupModel
+from spiffworkflow_backend.models.permission_target import PermissionTargetModel
+from spiffworkflow_backend.models.principal import PrincipalModel
+from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.services.authorization_service import AuthorizationService
+from spiffworkflow_backend.services.permission_index_service import PermissionIndexService
+from spiffworkflow_backend.services.user_service import UserService
+
+BENCHMARK_PREFIX = "load-tests-permission-checks"
+
+
+def create_user_in_groups(group_count: int) -> UserModel:
+    user = UserService.create_user(BENCHMARK_PREFIX, "internal", BENCHMARK_PREFIX)
+    for index in range(group_count):
+        group_identifier = f"{BENCHMARK_PREFIX}-{index}"
+        AuthorizationService.add_permission_from_uri_or_macro(group_identifier, "read", f"PG:{group_identifier}")
+        AuthorizationService.add_permission_from_uri_or_macro(group_identifier, "start", f"PG:{group_identifier}")
+        AuthorizationService.add_permission_from_uri_or_macro(group_identifier, "DENY:read", f"PG:{group_identifier}:restricted")
+        UserService.add_user_to_group_by_group_identifier(user, group_identifier)
+    return user
+
+
+def delete_user_and_groups() -> None:
+    groups = GroupModel.query.filter(GroupModel.identifier.startswith(BENCHMARK_PREFIX)).all()  # type: ignore
+    for group in groups:
+        db.session.delete(group)
+    for user in UserModel.query.filter_by(username=BENCHMARK_PREFIX).all():
+        db.session.delete(user)
+    db.session.flush()
+    PermissionTargetModel.query.filter(PermissionTargetModel.uri.contains(BENCHMARK_PREFIX)).delete(  # type: ignore
+        synchronize_session=False
+    )
+    db.session.commit()
+
+
+def permission_checks(group_count: int, check_count: int) -> list[tuple[str, str]]:
+    rng = random.Random(42)  # noqa: S311
+    uris = []
+    for _ in range(check_count):
+        group = f"{BENCHMARK_PREFIX}-{rng.randrange(group_count * 2)}"
+        uri = rng.choice(
+            [
+                f"/process-groups/{group}",
+                f"/process-groups/{group}:sub-group",
+                f"/process-groups/{group}:restricted:sub-group",
+                f"/process-models/{group}:model",
+                f"/process-instances/{group}:model",
+            ]
+        )
+        uris.append((rng.choice(["read", "create"]), f"/v1.0{uri}"))
+    return uris
+
+
+def time_checks(principals: list[PrincipalModel], checks: list[tuple[str, str]]) -> tuple[list[float], list[bool]]:
+    durations = []
+    results = []
+    for permission, target_uri in checks:
+        start = time.perf_counter()
+        results.append(AuthorizationService.has_permission(principals, permission, target_uri))
+        durations.append(time.perf_counter() - start)
+    return durations, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=50, help="groups the user is in, each with its own permissions")
+    parser.add_argument("--checks", type=int, default=10000, help="permission checks to time")
+    args = parser.parse_args()
+
+    app = create_app().app
+    with app.app_context():
+        delete_user_and_groups()
+        user = create_user_in_groups(args.groups)
+        principals = UserService.all_principals_for_user(user)
+        checks = permission_checks(args.groups, args.checks)
+        initial_max_entries = app.config["SPIFFWORKFLOW_BACKEND_PERMISSION_INDEX_CACHE_MAX_ENTRIES"]
+        results = []
+        try:
+            for mode, max_entries in [("query", 0), ("index", max(int(initial_max_entries), 1))]:
+                app.config["SPIFFWORKFLOW_BACKEND_PERMISSION_INDEX_CACHE_MAX_ENTRIES"] = max_entries
+                PermissionIndexService.clear()
+                start = time.perf_counter()
+                durations, answers = time_checks(principals, checks)
+                results.append((mode, time.perf_counter() - start, statistics.mean(durations), max(durations), answers))
+        finally:
+            app.config["SPIFFWORKFLOW_BACKEND_PERMISSION_INDEX_CACHE_MAX_ENTRIES"] = initial_max_entries
+            delete_user_and_groups()
+
+        if results[0][4] != results[1][4]:
+            raise RuntimeError("The permission index answered differently than the permission queries")
+
+        print("\n" + "=" * 72)
+        print(f"PERMISSION CHECKS - {dialect_name()}, user in {args.groups} groups, {args.checks} checks")
+        print("=" * 72)
+        print(f"{'Mode':<10} {'Seconds':>10} {'Checks/s':>12} {'Mean us':>10} {'Max ms':>10}")
+        print("-" * 72)
+        for mode, seconds, mean, maximum, _answers in results:
+            print(f"{mode:<10} {seconds:>10.3f} {args.checks / seconds:>12.1f} {mean * 1_000_000:>10.1f} {maximum * 1000:>10.2f}")
+        print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
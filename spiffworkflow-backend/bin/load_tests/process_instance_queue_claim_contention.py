@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Compare peeking and locking one at a time with claim_many when many workers drain the process instance queue.
+
+This runs in process against the configured database rather than against a live server, so run it with the same
+environment the backend uses, for example:
+
+    uv run python bin/load_tests/process_instance_queue_claim_contention.py --rows 500 --workers 8
+
+It creates its own process instances and queue entries with a queue status that nothing else uses, drains them
+with both strategies and deletes them again. SQLite only allows one writer at a time, so use mysql or postgres to
+see the effect of FOR UPDATE SKIP LOCKED.
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from flask.app import Flask
+from sqlalchemy import event
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueueModel
+from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
+from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceIsAlreadyLockedError
+from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
+from spiffworkflow_backend.services.user_service import UserService
+
+BENCHMARK_PROCESS_MODEL_IDENTIFIER = "load-tests/queue-claim-contention"
+READY_STATUS = "claim_benchmark_ready"
+DONE_STATUS = "claim_benchmark_done"
+
+
+@dataclass
+class WorkerStats:
+    processed: int = 0
+    lock_failures: int = 0
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def before_cursor_execute(self, *_args: Any) -> None:
+        with self.lock:
+            self.count += 1
+
+
+def create_queue_entries(row_count: int) -> list[int]:
+    user = UserModel.query.filter_by(username="perf_test_user").first()
+    if user is None:
+        user = UserService.create_user("perf_test_user", "internal", "perf_test_user")
+    process_instances = [
+        ProcessInstanceModel(
+            status="waiting",
+            process_initiator=user,
+            process_model_identifier=BENCHMARK_PROCESS_MODEL_IDENTIFIER,
+            process_model_display_name="Queue claim contention",
+        )
+        for _ in range(row_count)
+    ]
+    db.session.add_all(process_instances)
+    db.session.commit()
+    for process_instance in process_instances:
+        ProcessInstanceQueueService.enqueue_new_process_instance(process_instance, 0)
+    db.session.commit()
+    return [process_instance.id for process_instance in process_instances]
+
+
+def reset_queue_entries(process_instance_ids: list[int]) -> None:
+    db.session.query(ProcessInstanceQueueModel).filter(
+        ProcessInstanceQueueModel.process_instance_id.in_(process_instance_ids)  # type: ignore
+    ).update(
+        {"status": READY_STATUS, "locked_by": None, "locked_at_in_seconds": None, "updated_at_in_seconds": 0},
+        synchronize_session=False,
+    )
+    db.session.commit()
+
+
+def delete_queue_entries(process_instance_ids: list[int]) -> None:
+    db.session.query(ProcessInstanceQueueModel).filter(
+        ProcessInstanceQueueModel.process_instance_id.in_(process_instance_ids)  # type: ignore
+    ).delete(synchronize_session=False)
+    db.session.query(ProcessInstanceModel).filter(
+        ProcessInstanceModel.id.in_(process_instance_ids)  # type: ignore
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def release(process_instance_id: int, new_status: str | None = None) -> None:
+    queue_entry_id = ProcessInstanceLockService.unlock(process_instance_id)
+    values: dict[str, Any] = {"locked_by": None, "locked_at_in_seconds": None}
+    if new_status is not None:
+        values["status"] = new_status
+    db.session.query(ProcessInstanceQueueModel).filter(ProcessInstanceQueueModel.id == queue_entry_id).update(
+        values, synchronize_session=False
+    )
+    db.session.commit()
+
+
+def finish(process_instance_id: int, work_seconds: float) -> None:
+    """Stand in for running the process instance: wait, then move the entry out of the ready status and unlock it."""
+    time.sleep(work_seconds)
+    release(process_instance_id, new_status=DONE_STATUS)
+
+
+def drain_with_peek(stats: WorkerStats, work_seconds: float) -> None:
+    while True:
+        process_instance_ids = ProcessInstanceQueueService.peek_many(READY_STATUS, round(time.time()))
+        if len(process_instance_ids) == 0:
+            return
+        for process_instance_id in process_instance_ids:
+            try:
+                ProcessInstanceQueueService._dequeue(ProcessInstanceModel(id=process_instance_id))
+            except ProcessInstanceIsAlreadyLockedError:
+                stats.lock_failures += 1
+                continue
+            queue_status = (
+                db.session.query(ProcessInstanceQueueModel.status)
+                .filter(ProcessInstanceQueueModel.process_instance_id == process_instance_id)
+                .scalar()
+            )
+            if queue_status != READY_STATUS:
+                # another worker finished it between our peek and our lock
+                release(process_instance_id)
+                stats.lock_failures += 1
+                continue
+            finish(process_instance_id, work_seconds)
+            stats.processed += 1
+
+
+def drain_with_claim(stats: WorkerStats, work_seconds: float, batch_size: int) -> None:
+    while True:
+        process_instance_ids = ProcessInstanceQueueService.claim_many(READY_STATUS, round(time.time()), limit=batch_size)
+        if len(process_instance_ids) == 0:
+            return
+        for process_instance_id in process_instance_ids:
+            ProcessInstanceLockService.take_claim(process_instance_id)
+            finish(process_instance_id, work_seconds)
+            stats.processed += 1
+
+
+def run_strategy(app: Flask, strategy: str, workers: int, work_seconds: float, batch_size: int) -> dict:
+    worker_stats = [WorkerStats() for _ in range(workers)]
+
+    def worker(stats: WorkerStats) -> None:
+        with app.app_context():
+            ProcessInstanceLockService.set_thread_local_locking_context(f"load-test:{strategy}")
+            if strategy == "peek":
+                drain_with_peek(stats, work_seconds)
+            else:
+                drain_with_claim(stats, work_seconds, batch_size)
+
+    statement_counter = StatementCounter()
+    event.listen(db.engine, "before_cursor_execute", statement_counter.before_cursor_execute)
+    threads = [threading.Thread(target=worker, args=(stats,)) for stats in worker_stats]
+    start = time.time()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", statement_counter.before_cursor_execute)
+    duration = time.time() - start
+
+    processed = sum(stats.processed for stats in worker_stats)
+    return {
+        "strategy": strategy,
+        "processed": processed,
+        "lock_failures": sum(stats.lock_failures for stats in worker_stats),
+        "statements": statement_counter.count,
+        "seconds": duration,
+        "throughput": processed / duration if duration > 0 else 0.0,
+    }
+
+
+def print_summary(results: list[dict], args: argparse.Namespace) -> None:
+    print("\n" + "=" * 88)
+    print(
+        f"QUEUE CLAIM CONTENTION - {dialect_name()}, {args.rows} rows, {args.workers} workers, "
+        f"{args.work_ms}ms of work per row, claim batch size {args.batch_size}"
+    )
+    print("=" * 88)
+    print(f"{'Strategy':<10} {'Processed':>10} {'Lock failures':>14} {'Failure rate':>13} {'Statements':>11} {'Rows/s':>10}")
+    print("-" * 88)
+    for r in results:
+        attempts = r["processed"] + r["lock_failures"]
+        failure_rate = r["lock_failures"] / attempts if attempts else 0.0
+        print(
+            f"{r['strategy']:<10} {r['processed']:>10} {r['lock_failures']:>14} {failure_rate:>12.1%} "
+            f"{r['statements']:>11} {r['throughput']:>10.1f}"
+        )
+    print("=" * 88)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--work-ms", type=int, default=5, help="simulated time spent running each process instance")
+    parser.add_argument("--batch-size", type=int, default=10, help="rows locked by each claim_many call")
+    args = parser.parse_args()
+
+    app = create_app().app
+    with app.app_context():
+        process_instance_ids = create_queue_entries(args.rows)
+        results = []
+        try:
+            for strategy in ["peek", "claim"]:
+                reset_queue_entries(process_instance_ids)
+                results.append(run_strategy(app, strategy, args.workers, args.work_ms / 1000, args.batch_size))
+        finally:
+            delete_queue_entries(process_instance_ids)
+        print_summary(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Measure how long high priority process instances wait in the queue while a large low priority backlog drains.
+
+This runs in process against the configured database rather than against a live server, so run it with the same
+environment the backend uses, for example:
+
+    uv run python bin/load_tests/process_instance_queue_priority_latency.py --backlog 2000 --workers 8
+
+It enqueues a backlog of low priority queue entries, starts workers that drain the queue with claim_many and, while
+they run, enqueues a high priority entry every --high-priority-interval-ms. It does this twice: once with every entry at
+the same priority, which is how the queue behaved before priorities were honored, and once with real priorities. It
+creates its own process instances and queue entries with a queue status that nothing else uses and deletes them again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import threading
+import time
+from typing import Any
+
+from flask.app import Flask
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueueModel
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueuePriority
+from spiffworkflow_backend.models.user import UserModel
+from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
+from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
+from spiffworkflow_backend.services.user_service import UserService
+
+BENCHMARK_PROCESS_MODEL_IDENTIFIER = "load-tests/queue-priority-latency"
+READY_STATUS = "priority_benchmark_ready"
+DONE_STATUS = "priority_benchmark_done"
+
+
+class LatencyRecorder:
+    def __init__(self) -> None:
+        self.enqueued_at: dict[int, float] = {}
+        self.latencies: dict[int, float] = {}
+        self.lock = threading.Lock()
+
+    def enqueued(self, process_instance_id: int) -> None:
+        with self.lock:
+            self.enqueued_at[process_instance_id] = time.time()
+
+    def claimed(self, process_instance_id: int) -> None:
+        with self.lock:
+            if process_instance_id in self.enqueued_at:
+                self.latencies[process_instance_id] = time.time() - self.enqueued_at[process_instance_id]
+
+
+def create_process_instances(row_count: int) -> list[int]:
+    user = UserModel.query.filter_by(username="perf_test_user").first()
+    if user is None:
+        user = UserService.create_user("perf_test_user", "internal", "perf_test_user")
+    process_instances = [
+        ProcessInstanceModel(
+            status="waiting",
+            process_initiator=user,
+            process_model_identifier=BENCHMARK_PROCESS_MODEL_IDENTIFIER,
+            process_model_display_name="Queue priority latency",
+        )
+        for _ in range(row_count)
+    ]
+    db.session.add_all(process_instances)
+    db.session.commit()
+    return [process_instance.id for process_instance in process_instances]
+
+
+def enqueue(process_instance_ids: list[int], priority: int) -> None:
+    current_time = round(time.time())
+    for process_instance_id in process_instance_ids:
+        ProcessInstanceQueueService.enqueue_new_process_instance(
+            ProcessInstanceModel.query.filter_by(id=process_instance_id).first(), current_time, priority=priority
+        )
+    db.session.query(ProcessInstanceQueueModel).filter(
+        ProcessInstanceQueueModel.process_instance_id.in_(process_instance_ids)  # type: ignore
+    ).update({"status": READY_STATUS}, synchronize_session=False)
+    db.session.commit()
+
+
+def delete_queue_entries(process_instance_ids: list[int]) -> None:
+    db.session.query(ProcessInstanceQueueModel).filter(
+        ProcessInstanceQueueModel.process_instance_id.in_(process_instance_ids)  # type: ignore
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def delete_process_instances(process_instance_ids: list[int]) -> None:
+    delete_queue_entries(process_instance_ids)
+    db.session.query(ProcessInstanceModel).filter(
+        ProcessInstanceModel.id.in_(process_instance_ids)  # type: ignore
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def finish(process_instance_id: int, work_seconds: float) -> None:
+    """Stand in for running the process instance: wait, then move the entry out of the ready status and unlock it."""
+    ProcessInstanceLockService.take_claim(process_instance_id)
+    time.sleep(work_seconds)
+    queue_entry_id = ProcessInstanceLockService.unlock(process_instance_id)
+    db.session.query(ProcessInstanceQueueModel).filter(ProcessInstanceQueueModel.id == queue_entry_id).update(
+        {"status": DONE_STATUS, "locked_by": None, "locked_at_in_seconds": None}, synchronize_session=False
+    )
+    db.session.commit()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if len(values) == 0:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def run_scenario(app: Flask, mode: str, backlog_ids: list[int], high_priority_ids: list[int], args: argparse.Namespace) -> dict:
+    high_priority = ProcessInstanceQueuePriority.high.queue_value()
+    low_priority = ProcessInstanceQueuePriority.low.queue_value()
+    if mode == "same priority":
+        high_priority = low_priority = ProcessInstanceQueuePriority.normal.queue_value()
+
+    enqueue(backlog_ids, low_priority)
+    backlog_latencies = LatencyRecorder()
+    for process_instance_id in backlog_ids:
+        backlog_latencies.enqueued(process_instance_id)
+    high_priority_latencies = LatencyRecorder()
+    producer_done = threading.Event()
+
+    def worker() -> None:
+        with app.app_context():
+            ProcessInstanceLockService.set_thread_local_locking_context(f"load-test:{mode}")
+            while True:
+                process_instance_ids = ProcessInstanceQueueService.claim_many(
+                    READY_STATUS, round(time.time()), limit=args.batch_size
+                )
+                if len(process_instance_ids) == 0:
+                    if producer_done.is_set():
+                        return
+                    time.sleep(0.01)
+                    continue
+                for process_instance_id in process_instance_ids:
+                    backlog_latencies.claimed(process_instance_id)
+                    high_priority_latencies.claimed(process_instance_id)
+                    finish(process_instance_id, args.work_ms / 1000)
+
+    def producer() -> None:
+        with app.app_context():
+            for process_instance_id in high_priority_ids:
+                high_priority_latencies.enqueued(process_instance_id)
+                enqueue([process_instance_id], high_priority)
+                time.sleep(args.high_priority_interval_ms / 1000)
+            producer_done.set()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.workers)] + [threading.Thread(target=producer)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.time() - start
+    delete_queue_entries(backlog_ids + high_priority_ids)
+
+    high_latencies = list(high_priority_latencies.latencies.values())
+    low_latencies = list(backlog_latencies.latencies.values())
+    return {
+        "mode": mode,
+        "high_p50": percentile(high_latencies, 0.5),
+        "high_p95": percentile(high_latencies, 0.95),
+        "high_p99": percentile(high_latencies, 0.99),
+        "high_max": max(high_latencies, default=0.0),
+        "low_mean": statistics.mean(low_latencies) if low_latencies else 0.0,
+        "low_max": max(low_latencies, default=0.0),
+        "seconds": duration,
+    }
+
+
+def print_summary(results: list[dict[str, Any]], args: argparse.Namespace) -> None:
+    print("\n" + "=" * 96)
+    print(
+        f"QUEUE PRIORITY LATENCY - {dialect_name()}, {args.backlog} low priority rows, {args.high_priority} high priority "
+        f"rows, {args.workers} workers, {args.work_ms}ms of work per row"
+    )
+    print("=" * 96)
+    print(
+        f"{'Mode':<15} {'High p50 s':>11} {'High p95 s':>11} {'High p99 s':>11} {'High max s':>11} "
+        f"{'Low mean s':>11} {'Low max s':>10} {'Total s':>9}"
+    )
+    print("-" * 96)
+    for r in results:
+        print(
+            f"{r['mode']:<15} {r['high_p50']:>11.3f} {r['high_p95']:>11.3f} {r['high_p99']:>11.3f} {r['high_max']:>11.3f} "
+            f"{r['low_mean']:>11.3f} {r['low_max']:>10.3f} {r['seconds']:>9.2f}"
+        )
+    print("=" * 96)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backlog", type=int, default=2000, help="low priority queue entries enqueued up front")
+    parser.add_argument("--high-priority", type=int, default=100, help="high priority queue entries enqueued while draining")
+    parser.add_argument("--high-priority-interval-ms", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--work-ms", type=int, default=5, help="simulated time spent running each process instance")
+    parser.add_argument("--batch-size", type=int, default=10, help="rows locked by each claim_many call")
+    args = parser.parse_args()
+
+    app = create_app().app
+    with app.app_context():
+        backlog_ids = create_process_instances(args.backlog)
+        high_priority_ids = create_process_instances(args.high_priority)
+        results = []
+        try:
+            for mode in ["same priority", "priority"]:
+                results.append(run_scenario(app, mode, backlog_ids, high_priority_ids, args))
+        finally:
+            delete_process_instances(backlog_ids + high_priority_ids)
+        print_summary(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,27 +7,49 @@ Measures:
 2. update_task_model() - BPMN process updates (includes workflow data serialization)
 3. find_or_create_task_model() - Task model lookup and creation
 4. Other - Unaccounted framework overhead
+
+It also compares the cost of the save pass after engine steps (TaskModelSavingDelegate.add_object_to_db_session)
+with and without SPIFFWORKFLOW_BACKEND_INCREMENTAL_TASK_PERSISTENCE for a parallel multiinstance manual task,
+where completing one instance leaves every other instance READY and unchanged.
+
+It measures hydrating a large instance (get_full_bpmn_process_dict and serializer.from_dict), comparing
+the time and peak memory of the current single pass with the previous approach of deep copying the dict first.
+
+Finally it compares the json_data storage used by a chain of script tasks carrying a large payload with and
+without SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING, and the stored size of the compressible json columns and
+the load time with and without SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES.
 """
 
+import copy
+import json
 import os
 import shutil
 import tempfile
 import time
+import tracemalloc
 from pathlib import Path
 
 from flask import current_app
 from SpiffWorkflow.task import Task as SpiffTask
+from sqlalchemy import type_coerce
 
+from spiffworkflow_backend.models.bpmn_process_definition import BpmnProcessDefinitionModel
 from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.human_task import HumanTaskModel
+from spiffworkflow_backend.models.json_data import JsonDataModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.process_model import ProcessModelInfo
+from spiffworkflow_backend.models.task import TaskModel
 from spiffworkflow_backend.services.bpmn_process_service import BpmnProcessService
+from spiffworkflow_backend.services.json_data_hash_cache_service import JsonDataHashCacheService
+from spiffworkflow_backend.services.process_instance_persistence_service import ProcessInstancePersistenceService
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
 from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
 from spiffworkflow_backend.services.spec_file_service import SpecFileService
 from spiffworkflow_backend.services.task_service import TaskService
 from spiffworkflow_backend.services.user_service import UserService
+from spiffworkflow_backend.services.workflow_execution_service import TaskModelSavingDelegate
 
 
 def load_test_spec(process_model_id: str, source_dir: Path) -> ProcessModelInfo:
@@ -218,6 +240,407 @@ class BottleneckInstrumenter:
         print("\n")
 
 
+class SavePassInstrumenter:
+    """Instrument the save pass that runs after each batch of engine steps."""
+
+    def __init__(self):
+        self.save_time = 0.0
+        self.save_count = 0
+        self.tasks_serialized = 0
+        self.in_save_pass = False
+
+        self.original_add_object_to_db_session = TaskModelSavingDelegate.add_object_to_db_session
+        self.original_update_task_model = TaskService.update_task_model
+
+        self.results: list[dict] = []
+
+    def install(self):
+        instrumenter = self
+
+        def instrumented_add_object_to_db_session(delegate_self, bpmn_process_instance):
+            instrumenter.in_save_pass = True
+            start = time.time()
+            try:
+                return instrumenter.original_add_object_to_db_session(delegate_self, bpmn_process_instance)
+            finally:
+                instrumenter.save_time += time.time() - start
+                instrumenter.save_count += 1
+                instrumenter.in_save_pass = False
+
+        def instrumented_update_task_model(service_self, task_model, spiff_task):
+            if instrumenter.in_save_pass:
+                instrumenter.tasks_serialized += 1
+            return instrumenter.original_update_task_model(service_self, task_model, spiff_task)
+
+        TaskModelSavingDelegate.add_object_to_db_session = instrumented_add_object_to_db_session
+        TaskService.update_task_model = instrumented_update_task_model
+
+    def uninstall(self):
+        TaskModelSavingDelegate.add_object_to_db_session = self.original_add_object_to_db_session
+        TaskService.update_task_model = self.original_update_task_model
+
+    def reset(self):
+        self.save_time = 0.0
+        self.save_count = 0
+        self.tasks_serialized = 0
+
+    def record(self, loop_count: int, incremental: bool, ready_task_count: int):
+        self.results.append(
+            {
+                "loop_count": loop_count,
+                "incremental": incremental,
+                "ready_task_count": ready_task_count,
+                "save_time": self.save_time,
+                "save_count": self.save_count,
+                "tasks_serialized": self.tasks_serialized,
+            }
+        )
+        mode = "incremental" if incremental else "all tasks"
+        print(f"  {loop_count} items ({mode}): {self.save_time:.2f}s in {self.save_count} save passes")
+
+    def print_summary(self):
+        if not self.results:
+            return
+
+        print("\n" + "=" * 90)
+        print("SAVE PASS SUMMARY - add_object_to_db_session after completing one instance at a time")
+        print("=" * 90)
+        print(
+            f"{'Items':<8} {'Mode':<12} {'Ready':>8} {'Passes':>8} {'Serialized':>12} {'Per pass':>10} {'Time':>8} {'ms/pass':>9}"
+        )
+        print("-" * 90)
+        for r in self.results:
+            mode = "incremental" if r["incremental"] else "all tasks"
+            per_pass = r["tasks_serialized"] / r["save_count"] if r["save_count"] > 0 else 0
+            ms_per_pass = r["save_time"] / r["save_count"] * 1000 if r["save_count"] > 0 else 0
+            print(
+                f"{r['loop_count']:<8} {mode:<12} {r['ready_task_count']:>8} {r['save_count']:>8} "
+                f"{r['tasks_serialized']:>12} {per_pass:>10.1f} {r['save_time']:>8.2f} {ms_per_pass:>9.2f}"
+            )
+        print("=" * 90)
+        print("\n")
+
+
+def create_variant_process_model(
+    source_bpmn: Path, temp_dir: str, variant_name: str, replacements: list[tuple[str, str]]
+) -> ProcessModelInfo:
+    with open(source_bpmn) as f:
+        modified_content = f.read()
+
+    for old, new in replacements:
+        modified_content = modified_content.replace(old, new, 1)
+
+    variant_dir = Path(temp_dir) / variant_name
+    variant_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(variant_dir / source_bpmn.name, "w") as f:
+        f.write(modified_content)
+
+    return load_test_spec(process_model_id=f"test_group/{variant_name}", source_dir=variant_dir)
+
+
+def run_incremental_persistence_test(
+    instrumenter: SavePassInstrumenter, loop_count: int, incremental: bool, tasks_to_complete: int = 10
+):
+    """Complete a few instances of a parallel multiinstance manual task, timing the save pass after each one."""
+    test_data_dir = Path(__file__).parent.parent / "tests" / "data" / "multiinstance_manual_task"
+    source_bpmn = test_data_dir / "multiinstance-manual-task.bpmn"
+    temp_dir = tempfile.mkdtemp()
+    current_app.config["SPIFFWORKFLOW_BACKEND_INCREMENTAL_TASK_PERSISTENCE"] = incremental
+
+    try:
+        process_id = f"Process_multiinstance_manual_{loop_count}"
+        process_model = create_variant_process_model(
+            source_bpmn,
+            temp_dir,
+            f"multiinstance_manual_task_{loop_count}",
+            [
+                ("the_input = ['a', 'b', 'c']", f"the_input = ['a'] * {loop_count}"),
+                ('id="Process_multiinstance_manual_task_eayacuw"', f'id="{process_id}"'),
+            ],
+        )
+
+        user = UserService.create_user("perf_test_user", "internal", "perf_test_user")
+        BpmnProcessService.persist_bpmn_process_definition(process_model.id)
+        process_instance = ProcessInstanceModel(
+            status="not_started",
+            process_initiator=user,
+            process_model_identifier=process_model.id,
+            process_model_display_name=process_model.display_name,
+            updated_at_in_seconds=round(time.time()),
+        )
+        db.session.add(process_instance)
+        db.session.commit()
+        ProcessInstanceQueueService.enqueue_new_process_instance(process_instance, round(time.time()))
+        ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+
+        instrumenter.reset()
+        ready_task_count = 0
+        for _ in range(tasks_to_complete):
+            # a fresh runtime per completion, like an api request would use
+            runtime = ProcessInstanceRuntime(process_instance)
+            ready_user_tasks = runtime.get_ready_user_tasks()
+            if len(ready_user_tasks) == 0:
+                break
+            ready_task_count = max(ready_task_count, len(ready_user_tasks))
+            spiff_task = ready_user_tasks[0]
+            human_task = HumanTaskModel.query.filter_by(task_guid=str(spiff_task.id), completed=False).first()
+            runtime.complete_task(spiff_task, user=user, human_task=human_task)
+            runtime.do_engine_steps(save=True, execution_strategy_name="greedy")
+
+        instrumenter.record(loop_count, incremental, ready_task_count)
+
+    finally:
+        if Path(temp_dir).exists():
+            shutil.rmtree(temp_dir)
+
+
+def hydrate(process_instance: ProcessInstanceModel, deepcopy_first: bool) -> None:
+    full_bpmn_process_dict = ProcessInstancePersistenceService.get_full_bpmn_process_dict(
+        bpmn_definition_to_task_definitions_mappings={},
+        task_model_mapping={},
+        bpmn_subprocess_mapping={},
+        spiff_serializer_version=process_instance.spiff_serializer_version,
+        bpmn_process_definition=process_instance.bpmn_process_definition,
+        bpmn_process=process_instance.bpmn_process,
+        bpmn_process_definition_id=process_instance.bpmn_process_definition_id,
+    )
+    if deepcopy_first:
+        full_bpmn_process_dict = copy.deepcopy(full_bpmn_process_dict)
+    BpmnProcessService.serializer.from_dict(full_bpmn_process_dict)
+
+
+def run_hydration_test(loop_count: int, runs: int = 3) -> list[dict]:
+    """Hydrate an instance with loop_count READY multiinstance tasks that each carry distinct task data."""
+    test_data_dir = Path(__file__).parent.parent / "tests" / "data" / "multiinstance_manual_task"
+    source_bpmn = test_data_dir / "multiinstance-manual-task.bpmn"
+    temp_dir = tempfile.mkdtemp()
+    results = []
+
+    try:
+        process_id = f"Process_multiinstance_hydration_{loop_count}"
+        process_model = create_variant_process_model(
+            source_bpmn,
+            temp_dir,
+            f"multiinstance_hydration_{loop_count}",
+            [
+                ("the_input = ['a', 'b', 'c']", f"the_input = ['item-' + str(i) for i in range({loop_count})]"),
+                ('id="Process_multiinstance_manual_task_eayacuw"', f'id="{process_id}"'),
+            ],
+        )
+
+        user = UserService.create_user("perf_test_user", "internal", "perf_test_user")
+        BpmnProcessService.persist_bpmn_process_definition(process_model.id)
+        process_instance = ProcessInstanceModel(
+            status="not_started",
+            process_initiator=user,
+            process_model_identifier=process_model.id,
+            process_model_display_name=process_model.display_name,
+            updated_at_in_seconds=round(time.time()),
+        )
+        db.session.add(process_instance)
+        db.session.commit()
+        ProcessInstanceQueueService.enqueue_new_process_instance(process_instance, round(time.time()))
+        ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+
+        for deepcopy_first in [True, False]:
+            times = []
+            for _ in range(runs):
+                db.session.expire_all()
+                start = time.time()
+                hydrate(process_instance, deepcopy_first)
+                times.append(time.time() - start)
+
+            db.session.expire_all()
+            tracemalloc.start()
+            hydrate(process_instance, deepcopy_first)
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            result = {
+                "loop_count": loop_count,
+                "mode": "deepcopy" if deepcopy_first else "single pass",
+                "best_time": min(times),
+                "peak_mb": peak / 1024 / 1024,
+            }
+            results.append(result)
+            print(f"  {loop_count} items ({result['mode']}): {result['best_time']:.2f}s, peak {result['peak_mb']:.1f} MB")
+
+    finally:
+        if Path(temp_dir).exists():
+            shutil.rmtree(temp_dir)
+
+    return results
+
+
+def print_hydration_summary(results: list[dict]):
+    if not results:
+        return
+
+    print("\n" + "=" * 60)
+    print("HYDRATION SUMMARY - get_full_bpmn_process_dict + serializer.from_dict")
+    print("=" * 60)
+    print(f"{'Items':<8} {'Mode':<12} {'Best time':>10} {'Peak MB':>10}")
+    print("-" * 60)
+    for r in results:
+        print(f"{r['loop_count']:<8} {r['mode']:<12} {r['best_time']:>9.2f}s {r['peak_mb']:>10.1f}")
+    print("=" * 60)
+    print("\n")
+
+
+def stored_json_column_bytes() -> int:
+    """Size of the compressible json columns as stored, without decompressing them."""
+    total_bytes = 0
+    for column in [JsonDataModel.data, TaskModel.properties_json, BpmnProcessDefinitionModel.properties_json]:
+        stored_values = db.session.query(type_coerce(column, db.JSON)).all()
+        total_bytes += sum(len(json.dumps(stored_value)) for (stored_value,) in stored_values)
+    return total_bytes
+
+
+def run_compressed_json_test(payload_size: int, min_bytes: int, runs: int = 3) -> dict:
+    """Run the script task chain with compression off or on and measure the stored size and the load time."""
+    test_data_dir = Path(__file__).parent.parent / "tests" / "data" / "script_task_chain_with_large_data"
+    source_bpmn = test_data_dir / "script_task_chain_with_large_data.bpmn"
+    temp_dir = tempfile.mkdtemp()
+    current_app.config["SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES"] = min_bytes
+
+    try:
+        mode = "compressed" if min_bytes > 0 else "json"
+        process_id = f"Process_script_task_chain_{payload_size}_{mode}"
+        process_model = create_variant_process_model(
+            source_bpmn,
+            temp_dir,
+            f"script_task_chain_{payload_size}_{mode}",
+            [
+                ("range(500)", f"range({payload_size})"),
+                ('id="Process_script_task_chain_with_large_data"', f'id="{process_id}"'),
+            ],
+        )
+
+        user = UserService.create_user("perf_test_user", "internal", "perf_test_user")
+        BpmnProcessService.persist_bpmn_process_definition(process_model.id)
+        process_instance = ProcessInstanceModel(
+            status="not_started",
+            process_initiator=user,
+            process_model_identifier=process_model.id,
+            process_model_display_name=process_model.display_name,
+            updated_at_in_seconds=round(time.time()),
+        )
+        db.session.add(process_instance)
+        db.session.commit()
+        ProcessInstanceQueueService.enqueue_new_process_instance(process_instance, round(time.time()))
+        ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+
+        times = []
+        for _ in range(runs):
+            db.session.expire_all()
+            start = time.time()
+            ProcessInstanceRuntime(process_instance, include_task_data_for_completed_tasks=True)
+            times.append(time.time() - start)
+
+        result = {
+            "payload_size": payload_size,
+            "mode": mode,
+            "bytes": stored_json_column_bytes(),
+            "load_time": min(times),
+        }
+        print(f"  {payload_size} payload items ({mode}): {result['bytes']} bytes stored, loaded in {result['load_time']:.3f}s")
+        return result
+
+    finally:
+        if Path(temp_dir).exists():
+            shutil.rmtree(temp_dir)
+
+
+def print_compressed_json_summary(results: list[dict]):
+    if not results:
+        return
+
+    print("\n" + "=" * 60)
+    print("COMPRESSED JSON SUMMARY - json_data, task and definition columns")
+    print("=" * 60)
+    print(f"{'Items':<8} {'Mode':<12} {'Stored bytes':>16} {'Load (s)':>12}")
+    print("-" * 60)
+    for r in results:
+        print(f"{r['payload_size']:<8} {r['mode']:<12} {r['bytes']:>16} {r['load_time']:>12.3f}")
+    print("=" * 60)
+    print("\n")
+
+
+def run_delta_storage_test(payload_size: int, delta_encoding: bool) -> dict:
+    """Run a chain of script tasks that each change one key of a large payload and measure the json_data rows."""
+    test_data_dir = Path(__file__).parent.parent / "tests" / "data" / "script_task_chain_with_large_data"
+    source_bpmn = test_data_dir / "script_task_chain_with_large_data.bpmn"
+    temp_dir = tempfile.mkdtemp()
+    current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING"] = delta_encoding
+
+    try:
+        mode = "delta" if delta_encoding else "full"
+        process_id = f"Process_script_task_chain_{payload_size}_{mode}"
+        process_model = create_variant_process_model(
+            source_bpmn,
+            temp_dir,
+            f"script_task_chain_{payload_size}_{mode}",
+            [
+                ("range(500)", f"range({payload_size})"),
+                ('id="Process_script_task_chain_with_large_data"', f'id="{process_id}"'),
+            ],
+        )
+
+        user = UserService.create_user("perf_test_user", "internal", "perf_test_user")
+        BpmnProcessService.persist_bpmn_process_definition(process_model.id)
+        process_instance = ProcessInstanceModel(
+            status="not_started",
+            process_initiator=user,
+            process_model_identifier=process_model.id,
+            process_model_display_name=process_model.display_name,
+            updated_at_in_seconds=round(time.time()),
+        )
+        db.session.add(process_instance)
+        db.session.commit()
+        ProcessInstanceQueueService.enqueue_new_process_instance(process_instance, round(time.time()))
+        ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+
+        json_data_rows = db.session.query(JsonDataModel.data, JsonDataModel.delta_base_hash).all()
+        db.session.expire_all()
+        start = time.time()
+        ProcessInstanceRuntime(process_instance, include_task_data_for_completed_tasks=True)
+        hydrate_time = time.time() - start
+
+        result = {
+            "payload_size": payload_size,
+            "mode": mode,
+            "rows": len(json_data_rows),
+            "delta_rows": len([r for r in json_data_rows if r.delta_base_hash is not None]),
+            "bytes": sum(len(json.dumps(r.data)) for r in json_data_rows),
+            "hydrate_time": hydrate_time,
+        }
+        print(f"  {payload_size} payload items ({mode}): {result['bytes']} bytes in {result['rows']} rows")
+        return result
+
+    finally:
+        if Path(temp_dir).exists():
+            shutil.rmtree(temp_dir)
+
+
+def print_delta_storage_summary(results: list[dict]):
+    if not results:
+        return
+
+    print("\n" + "=" * 72)
+    print("JSON DATA STORAGE SUMMARY - script task chain with a large payload")
+    print("=" * 72)
+    print(f"{'Items':<8} {'Mode':<8} {'Rows':>6} {'Deltas':>8} {'Bytes':>14} {'Hydrate (s)':>14}")
+    print("-" * 72)
+    for r in results:
+        print(
+            f"{r['payload_size']:<8} {r['mode']:<8} {r['rows']:>6} {r['delta_rows']:>8} {r['bytes']:>14} "
+            f"{r['hydrate_time']:>14.3f}"
+        )
+    print("=" * 72)
+    print("\n")
+
+
 def run_single_test(instrumenter: BottleneckInstrumenter, loop_count: int):
     """Run a single performance test for the given loop count."""
     test_data_dir = Path(__file__).parent.parent / "tests" / "data" / "multiinstance_with_data"
@@ -285,6 +708,7 @@ def clean_db():
     for table in reversed(meta.sorted_tables):
         db.session.execute(table.delete())
     db.session.commit()
+    JsonDataHashCacheService.clear()
 
     root_path = Path(FileSystemService.root_path())
     if root_path.exists():
@@ -318,6 +742,66 @@ def main():
 
         instrumenter.print_summary()
 
+        original_incremental_setting = current_app.config["SPIFFWORKFLOW_BACKEND_INCREMENTAL_TASK_PERSISTENCE"]
+        save_pass_instrumenter = SavePassInstrumenter()
+        save_pass_instrumenter.install()
+        isolated_spec_root = tempfile.mkdtemp(prefix="spiff-multiinstance-specs-")
+        current_app.config["SPIFFWORKFLOW_BACKEND_BPMN_SPEC_ABSOLUTE_DIR"] = isolated_spec_root
+
+        try:
+            for loop_count in loop_counts:
+                for incremental in [False, True]:
+                    clean_db()
+                    run_incremental_persistence_test(save_pass_instrumenter, loop_count, incremental)
+        finally:
+            save_pass_instrumenter.uninstall()
+            current_app.config["SPIFFWORKFLOW_BACKEND_INCREMENTAL_TASK_PERSISTENCE"] = original_incremental_setting
+            shutil.rmtree(isolated_spec_root, ignore_errors=True)
+
+        save_pass_instrumenter.print_summary()
+
+        isolated_spec_root = tempfile.mkdtemp(prefix="spiff-multiinstance-specs-")
+        current_app.config["SPIFFWORKFLOW_BACKEND_BPMN_SPEC_ABSOLUTE_DIR"] = isolated_spec_root
+        hydration_results = []
+        try:
+            for loop_count in [500, 1000, 2000]:
+                clean_db()
+                hydration_results += run_hydration_test(loop_count)
+        finally:
+            shutil.rmtree(isolated_spec_root, ignore_errors=True)
+
+        print_hydration_summary(hydration_results)
+
+        original_delta_encoding_setting = current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING"]
+        isolated_spec_root = tempfile.mkdtemp(prefix="spiff-multiinstance-specs-")
+        current_app.config["SPIFFWORKFLOW_BACKEND_BPMN_SPEC_ABSOLUTE_DIR"] = isolated_spec_root
+        delta_storage_results = []
+        try:
+            for payload_size in [500, 5000, 50000]:
+                for delta_encoding in [False, True]:
+                    clean_db()
+                    delta_storage_results.append(run_delta_storage_test(payload_size, delta_encoding))
+        finally:
+            current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING"] = original_delta_encoding_setting
+            shutil.rmtree(isolated_spec_root, ignore_errors=True)
+
+        print_delta_storage_summary(delta_storage_results)
+
+        original_compressed_json_setting = current_app.config["SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES"]
+        isolated_spec_root = tempfile.mkdtemp(prefix="spiff-multiinstance-specs-")
+        current_app.config["SPIFFWORKFLOW_BACKEND_BPMN_SPEC_ABSOLUTE_DIR"] = isolated_spec_root
+        compressed_json_results = []
+        try:
+            for payload_size in [500, 5000, 50000]:
+                for min_bytes in [0, 1024]:
+                    clean_db()
+                    compressed_json_results.append(run_compressed_json_test(payload_size, min_bytes))
+        finally:
+            current_app.config["SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES"] = original_compressed_json_setting
+            shutil.rmtree(isolated_spec_root, ignore_errors=True)
+
+        print_compressed_json_summary(compressed_json_results)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,152 @@
+"""Micro-benchmark of evaluating the same expressions over and over with CustomBpmnScriptEngine.
+
+Standalone script - run with: uv run python bin/script_engine_benchmark.py
+
+For --evaluations evaluations of gateway condition, multi-instance and correlation retrieval expressions it measures:
+1. new engine - building a CustomBpmnScriptEngine for every evaluation, which is how message correlation used to work
+2. uncached - a shared engine, but building the script functions and parsing the expression on every evaluation,
+   which is how CustomBpmnScriptEngine.evaluate used to work
+3. cached - CustomBpmnScriptEngine.evaluate with its cached script functions and compiled expressions
+
+It then runs --script-tasks script tasks, the kind of scripts a script-heavy model runs for every task, with
+ScriptCodeCache disabled and enabled and reports the time spent per task.
+
+It needs an app context for the script functions, so run it with the same environment the backend uses.
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+from spiffworkflow_backend import create_app
+from spiffworkflow_backend.models.script_attributes_context import ScriptAttributesContext
+from spiffworkflow_backend.scripts.script import Script
+from spiffworkflow_backend.services.process_instance_script_engine import CustomBpmnScriptEngine
+from spiffworkflow_backend.services.process_instance_script_engine import ScriptCodeCache
+
+EXPRESSIONS = [
+    "amount > 1000 and approver is not None",
+    "len(line_items)",
+    "order['customer']['id']",
+]
+
+SCRIPTS = [
+    "total = sum(item['quantity'] for item in line_items)\nneeds_approval = total > 20 and amount > 1000",
+    "skus = [item['sku'] for item in line_items if item['quantity'] > 2]\nsku_count = len(skus)",
+    "\n".join(
+        [
+            "summary = {}",
+            "for item in line_items:",
+            "    bucket = 'large' if item['quantity'] > 5 else 'small'",
+            "    summary[bucket] = summary.get(bucket, 0) + item['quantity']",
+            "customer_name = order['customer']['name'].upper()",
+        ]
+    ),
+]
+
+
+class BenchmarkTaskSpec:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class BenchmarkTask:
+    """Stands in for a SpiffWorkflow task, since evaluating an expression or running a script only needs a few attributes."""
+
+    def __init__(self, data: dict[str, Any], name: str = "benchmark_task") -> None:
+        self.data = data
+        self.id = name
+        self.task_spec = BenchmarkTaskSpec(name)
+
+
+def task_data() -> dict[str, Any]:
+    return {
+        "amount": 1500,
+        "approver": "perf_test_user",
+        "line_items": [{"sku": f"sku-{index}", "quantity": index} for index in range(10)],
+        "order": {"customer": {"id": 42, "name": "Sartography"}},
+    }
+
+
+def time_evaluations(evaluate: Callable[[str], Any], evaluation_count: int) -> float:
+    start = time.perf_counter()
+    for index in range(evaluation_count):
+        evaluate(EXPRESSIONS[index % len(EXPRESSIONS)])
+    return time.perf_counter() - start
+
+
+def time_script_tasks(script_engine: CustomBpmnScriptEngine, script_task_count: int, max_entries: int) -> float:
+    ScriptCodeCache.max_entries = max_entries
+    ScriptCodeCache.clear()
+    start = time.perf_counter()
+    for index in range(script_task_count):
+        script_engine.execute(BenchmarkTask(task_data()), SCRIPTS[index % len(SCRIPTS)])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--evaluations", type=int, default=100_000)
+    parser.add_argument("--script-tasks", type=int, default=20_000)
+    args = parser.parse_args()
+
+    app = create_app().app
+    with app.app_context():
+        script_engine = CustomBpmnScriptEngine()
+        task = BenchmarkTask(task_data())
+        script_attributes_context = ScriptAttributesContext(
+            task=None,
+            environment_identifier=app.config["ENV_IDENTIFIER"],
+            process_instance_id=None,
+            process_model_identifier=None,
+        )
+
+        def evaluate_with_new_engine(expression: str) -> Any:
+            return CustomBpmnScriptEngine().environment.evaluate(expression, task.data)
+
+        def evaluate_uncached(expression: str) -> Any:
+            methods = Script.generate_augmented_list(script_attributes_context)
+            return eval(expression, {**script_engine.environment.globals, **methods, **task.data})  # noqa: S307
+
+        def evaluate_cached(expression: str) -> Any:
+            return script_engine.evaluate(task, expression)
+
+        results = [
+            ("new engine", time_evaluations(evaluate_with_new_engine, args.evaluations)),
+            ("uncached", time_evaluations(evaluate_uncached, args.evaluations)),
+            ("cached", time_evaluations(evaluate_cached, args.evaluations)),
+        ]
+
+        # building the task data is part of both timings, so the difference is the compilation that was skipped
+        max_entries = ScriptCodeCache.max_entries
+        try:
+            script_results = [
+                ("uncached", time_script_tasks(script_engine, args.script_tasks, 0)),
+                ("cached", time_script_tasks(script_engine, args.script_tasks, max(max_entries, len(SCRIPTS)))),
+            ]
+        finally:
+            ScriptCodeCache.max_entries = max_entries
+
+    print("\n" + "=" * 64)
+    print(f"SCRIPT ENGINE EVALUATIONS - {args.evaluations} evaluations of {len(EXPRESSIONS)} expressions")
+    print("=" * 64)
+    print(f"{'Mode':<12} {'Seconds':>10} {'Evaluations/s':>16} {'Speedup':>10}")
+    print("-" * 64)
+    baseline = results[0][1]
+    for mode, seconds in results:
+        print(f"{mode:<12} {seconds:>10.3f} {args.evaluations / seconds:>16.1f} {baseline / seconds:>9.2f}x")
+    print("=" * 64)
+    print(f"SCRIPT TASKS - {args.script_tasks} script tasks running {len(SCRIPTS)} scripts")
+    print("=" * 64)
+    print(f"{'Mode':<12} {'Seconds':>10} {'Microseconds/task':>20} {'Speedup':>10}")
+    print("-" * 64)
+    baseline = script_results[0][1]
+    for mode, seconds in script_results:
+        print(f"{mode:<12} {seconds:>10.3f} {seconds * 1_000_000 / args.script_tasks:>20.1f} {baseline / seconds:>9.2f}x")
+    print("=" * 64)
+    print("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""empty message
+
+Revision ID: 8f2c6d1b4a7e
+Revises: eae31e58a459
+Create Date: 2026-10-18 19:42:51.208164
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2c6d1b4a7e'
+down_revision = 'eae31e58a459'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 500
+
+human_task = sa.table('human_task', sa.column('id'), sa.column('process_instance_id'), sa.column('lane_assignment_id'), sa.column('completed'))
+human_task_user = sa.table('human_task_user', sa.column('human_task_id'), sa.column('user_id'))
+human_task_group = sa.table('human_task_group', sa.column('human_task_id'), sa.column('group_id'))
+group = sa.table('group', sa.column('id'), sa.column('identifier'))
+user = sa.table('user', sa.column('id'), sa.column('username'))
+process_instance = sa.table(
+    'process_instance',
+    sa.column('id'),
+    sa.column('process_initiator_id'),
+    sa.column('process_model_identifier'),
+    sa.column('status'),
+    sa.column('summary'),
+    sa.column('last_milestone_bpmn_name'),
+)
+human_task_inbox = sa.table(
+    'human_task_inbox',
+    sa.column('human_task_id'),
+    sa.column('user_id'),
+    sa.column('process_instance_id'),
+    sa.column('process_initiator_id'),
+    sa.column('has_group_assignment'),
+    sa.column('process_model_identifier'),
+    sa.column('process_instance_status'),
+    sa.column('process_instance_summary'),
+    sa.column('last_milestone_bpmn_name'),
+    sa.column('process_initiator_username'),
+    sa.column('assigned_user_group_identifier'),
+    sa.column('potential_owner_usernames'),
+)
+
+
+def backfill_human_task_inbox() -> None:
+    # the same rows HumanTaskInboxService builds, for every open human task
+    conn = op.get_bind()
+    open_human_task_ids = [
+        row[0] for row in conn.execute(sa.select(human_task.c.id).where(human_task.c.completed == sa.false()).order_by(human_task.c.id))
+    ]
+    for batch_start in range(0, len(open_human_task_ids), BACKFILL_BATCH_SIZE):
+        batch = open_human_task_ids[batch_start : batch_start + BACKFILL_BATCH_SIZE]
+        human_tasks = conn.execute(
+            sa.select(
+                human_task.c.id,
+                human_task.c.process_instance_id,
+                human_task.c.lane_assignment_id,
+                process_instance.c.process_initiator_id,
+                process_instance.c.process_model_identifier,
+                process_instance.c.status,
+                process_instance.c.summary,
+                process_instance.c.last_milestone_bpmn_name,
+                user.c.username,
+            )
+            .select_from(
+                human_task.join(process_instance, process_instance.c.id == human_task.c.process_instance_id).join(
+                    user, user.c.id == process_instance.c.process_initiator_id
+                )
+            )
+            .where(human_task.c.id.in_(batch))
+        ).all()
+
+        assignees: dict[int, dict[int, str]] = {}
+        for human_task_id, user_id, username in conn.execute(
+            sa.select(human_task_user.c.human_task_id, user.c.id, user.c.username)
+            .select_from(human_task_user.join(user, user.c.id == human_task_user.c.user_id))
+            .where(human_task_user.c.human_task_id.in_(batch))
+        ):
+            assignees.setdefault(human_task_id, {})[user_id] = username
+        group_identifiers_by_id = dict(conn.execute(sa.select(group.c.id, group.c.identifier)).all())
+        lane_owner_group_identifiers: dict[int, list[str]] = {}
+        for human_task_id, group_id in conn.execute(
+            sa.select(human_task_group.c.human_task_id, human_task_group.c.group_id).where(human_task_group.c.human_task_id.in_(batch))
+        ):
+            lane_owner_group_identifiers.setdefault(human_task_id, []).append(group_identifiers_by_id[group_id])
+
+        inbox_rows = []
+        for row in human_tasks:
+            group_identifiers = []
+            if row.lane_assignment_id in group_identifiers_by_id:
+                group_identifiers.append(group_identifiers_by_id[row.lane_assignment_id])
+            group_identifiers.extend(sorted(lane_owner_group_identifiers.get(row.id, [])))
+            users = assignees.get(row.id, {})
+            for user_id in users:
+                inbox_rows.append({
+                    'human_task_id': row.id,
+                    'user_id': user_id,
+                    'process_instance_id': row.process_instance_id,
+                    'process_initiator_id': row.process_initiator_id,
+                    'has_group_assignment': bool(row.lane_assignment_id or row.id in lane_owner_group_identifiers),
+                    'process_model_identifier': row.process_model_identifier,
+                    'process_instance_status': row.status,
+                    'process_instance_summary': row.summary,
+                    'last_milestone_bpmn_name': row.last_milestone_bpmn_name,
+                    'process_initiator_username': row.username,
+                    'assigned_user_group_identifier': ', '.join(dict.fromkeys(group_identifiers)) or None,
+                    'potential_owner_usernames': ','.join(sorted(users.values())) or None,
+                })
+        if inbox_rows:
+            conn.execute(human_task_inbox.insert(), inbox_rows)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('human_task_inbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('human_task_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('process_instance_id', sa.Integer(), nullable=False),
+    sa.Column('process_initiator_id', sa.Integer(), nullable=False),
+    sa.Column('has_group_assignment', sa.Boolean(), nullable=False),
+    sa.Column('process_model_identifier', sa.String(length=255), nullable=False),
+    sa.Column('process_instance_status', sa.String(length=50), nullable=True),
+    sa.Column('process_instance_summary', sa.String(length=255), nullable=True),
+    sa.Column('last_milestone_bpmn_name', sa.String(length=255), nullable=True),
+    sa.Column('process_initiator_username', sa.String(length=255), nullable=True),
+    sa.Column('assigned_user_group_identifier', sa.Text(), nullable=True),
+    sa.Column('potential_owner_usernames', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['human_task_id'], ['human_task.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['process_instance_id'], ['process_instance.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'human_task_id', name='human_task_inbox_user_human_task_unique')
+    )
+    with op.batch_alter_table('human_task_inbox', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_human_task_inbox_human_task_id'), ['human_task_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_human_task_inbox_process_initiator_id'), ['process_initiator_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_human_task_inbox_process_instance_id'), ['process_instance_id'], unique=False)
+
+    backfill_human_task_inbox()
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('human_task_inbox', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_human_task_inbox_process_instance_id'))
+        batch_op.drop_index(batch_op.f('ix_human_task_inbox_process_initiator_id'))
+        batch_op.drop_index(batch_op.f('ix_human_task_inbox_human_task_id'))
+
+    op.drop_table('human_task_inbox')
+    # ### end Alembic commands ###
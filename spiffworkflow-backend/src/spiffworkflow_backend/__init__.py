@@ -24,8 +24,11 @@ from spiffworkflow_backend.routes.authentication_controller import _set_new_acce
 from spiffworkflow_backend.routes.authentication_controller import omni_auth
 from spiffworkflow_backend.routes.openid_blueprint.openid_blueprint import openid_blueprint
 from spiffworkflow_backend.routes.user_blueprint import user_blueprint
+from spiffworkflow_backend.services.authorization_service import AuthorizationService
 from spiffworkflow_backend.services.monitoring_service import configure_sentry
 from spiffworkflow_backend.services.monitoring_service import setup_prometheus_metrics
+from spiffworkflow_backend.services.process_instance_workflow_cache_service import ProcessInstanceWorkflowCacheService
+from spiffworkflow_backend.utils import fast_json
 from spiffworkflow_backend.utils.api_logging import setup_deferred_logging
 from spiffworkflow_backend.utils.api_logging import setup_global_api_logging
 
@@ -35,6 +38,8 @@ from spiffworkflow_backend.utils.api_logging import setup_global_api_logging
 # import pymysql;
 # pymysql.install_as_MySQLdb()
 
+_COMPACT_SEPARATORS = (",", ":")
+
 
 class MyJSONEncoder(DefaultJSONProvider):
     def default(self, obj: Any) -> Any:
@@ -57,6 +62,10 @@ class MyJSONEncoder(DefaultJSONProvider):
         return super().default(obj)
 
     def dumps(self, obj: Any, **kwargs: Any) -> Any:
+        # flask asks for compact separators when building responses, which is what fast_json produces.
+        # anything else, like indent in debug mode, goes through the json module.
+        if kwargs.get("separators", _COMPACT_SEPARATORS) == _COMPACT_SEPARATORS and kwargs.keys() <= {"separators"}:
+            return fast_json.dumps(obj, default=self.default, sort_keys=self.sort_keys)
         kwargs.setdefault("default", self.default)
         return super().dumps(obj, **kwargs)
 
@@ -120,8 +129,12 @@ def create_app(*, background_job_publisher_factory: BackgroundJobPublisherFactor
 
     configure_sentry(app)
 
+    # registered before omni_auth so the permission check for the request starts from a fresh authorization context
+    app.before_request(AuthorizationService.start_request_authorization_context)
     app.before_request(omni_auth)
     app.after_request(_set_new_access_token_in_cookie)
+    app.after_request(AuthorizationService.finish_request_authorization_context)
+    app.teardown_request(ProcessInstanceWorkflowCacheService.check_in_unchanged_pending)
 
     # The default is true, but we want to preserve the order of keys in the json
     # This is particularly helpful for forms that are generated from json schemas.
@@ -1,10 +1,14 @@
+import atexit
 import os
 
 import flask.wrappers
+from apscheduler.events import EVENT_SCHEDULER_SHUTDOWN  # type: ignore
 from apscheduler.schedulers.background import BackgroundScheduler  # type: ignore
 from apscheduler.schedulers.base import BaseScheduler  # type: ignore
 
 from spiffworkflow_backend.background_processing.background_processing_service import BackgroundProcessingService
+from spiffworkflow_backend.background_processing.future_task_timer_wheel import FutureTaskTimerWheel
+from spiffworkflow_backend.background_processing.process_instance_wakeup_dispatcher import start_wakeup_dispatcher_if_appropriate
 
 
 def should_start_apscheduler(app: flask.app.Flask) -> bool:
@@ -32,6 +36,12 @@ def start_apscheduler(app: flask.app.Flask, scheduler_class: BaseScheduler = Bac
         _add_jobs_for_celery_based_configuration(app, scheduler)
     else:
         _add_jobs_for_non_celery_based_configuration(app, scheduler)
+        # runs instances as soon as they become runnable. the polling jobs still catch anything it misses.
+        wakeup_dispatcher = start_wakeup_dispatcher_if_appropriate(app)
+        if wakeup_dispatcher is not None:
+            # stop its threads and hand wakeups back to the sweeps when the scheduler or the process goes away
+            scheduler.add_listener(lambda _event: wakeup_dispatcher.stop(), EVENT_SCHEDULER_SHUTDOWN)
+            atexit.register(wakeup_dispatcher.stop)
 
     _add_jobs_that_should_run_regardless_of_celery_config(app, scheduler)
 
@@ -43,6 +53,17 @@ def _add_jobs_for_celery_based_configuration(app: flask.app.Flask, scheduler: Ba
         "SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_EXECUTION_INTERVAL_IN_SECONDS"
     ]
 
+    if app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_TIMER_WHEEL_ENABLED"]:
+        scheduler.add_job(
+            FutureTaskTimerWheel(app).tick,
+            "interval",
+            id="queue_future_tasks",
+            name="queue future timer tasks from the timer wheel",
+            seconds=app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_TIMER_WHEEL_TICK_IN_SECONDS"],
+            coalesce=True,
+        )
+        return
+
     scheduler.add_job(
         BackgroundProcessingService(app).process_future_tasks,
         "interval",
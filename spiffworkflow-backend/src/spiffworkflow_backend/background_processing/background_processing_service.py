@@ -75,21 +75,46 @@ class BackgroundProcessingService:
     @classmethod
     def do_process_future_tasks(cls, future_task_lookahead_in_seconds: int) -> None:
         future_tasks = cls.imminent_future_tasks(future_task_lookahead_in_seconds)
+        cls.queue_future_tasks(future_tasks)
+
+    @classmethod
+    def queue_future_tasks(cls, future_tasks: list[FutureTaskModel]) -> None:
+        """Queues the process instances for the given future tasks, looking up all of the process instances at once.
+
+        Queued tasks are marked with queued_to_run_at_in_seconds so they are not queued again, and tasks whose process
+        instances are not allowed to run are archived, both with one update each.
+        """
+        if len(future_tasks) == 0:
+            return
+        process_instances_by_task_guid: dict[str, ProcessInstanceModel] = dict(
+            db.session.query(TaskModel.guid, ProcessInstanceModel)  # type: ignore
+            .join(ProcessInstanceModel, TaskModel.process_instance_id == ProcessInstanceModel.id)
+            .filter(TaskModel.guid.in_([future_task.guid for future_task in future_tasks]))  # type: ignore
+            .all()
+        )
+        queued_guids: list[str] = []
+        archived_guids = []
         for future_task in future_tasks:
-            process_instance = (
-                ProcessInstanceModel.query.join(TaskModel, TaskModel.process_instance_id == ProcessInstanceModel.id)
-                .filter(TaskModel.guid == future_task.guid)
-                .first()
-            )
+            process_instance = process_instances_by_task_guid.get(future_task.guid)
             if process_instance and process_instance.allowed_to_run():
-                queue_future_task_if_appropriate(
+                if queue_future_task_if_appropriate(
                     process_instance, eta_in_seconds=future_task.run_at_in_seconds, task_guid=future_task.guid
-                )
+                ):
+                    queued_guids.append(future_task.guid)
             else:
                 # if we are not allowed to run the process instance, we should not keep processing the future task
-                future_task.archived_for_process_instance_status = True
-                db.session.add(future_task)
-                db.session.commit()
+                archived_guids.append(future_task.guid)
+
+        if len(queued_guids) > 0:
+            db.session.query(FutureTaskModel).filter(FutureTaskModel.guid.in_(queued_guids)).update(  # type: ignore
+                {"queued_to_run_at_in_seconds": FutureTaskModel.run_at_in_seconds}, synchronize_session=False
+            )
+        if len(archived_guids) > 0:
+            db.session.query(FutureTaskModel).filter(FutureTaskModel.guid.in_(archived_guids)).update(  # type: ignore
+                {"archived_for_process_instance_status": True, "updated_at_in_seconds": round(time.time())},
+                synchronize_session=False,
+            )
+        db.session.commit()
 
     @classmethod
     def imminent_future_tasks(cls, future_task_lookahead_in_seconds: int) -> list[FutureTaskModel]:
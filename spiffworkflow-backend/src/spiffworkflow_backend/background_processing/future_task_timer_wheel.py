@@ -0,0 +1,227 @@
+import math
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import flask
+from sqlalchemy import or_
+from sqlalchemy.orm import Query
+
+from spiffworkflow_backend.background_processing.background_processing_service import BackgroundProcessingService
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.future_task import FutureTaskModel
+
+# future task rows read or fired per query
+FUTURE_TASK_BATCH_SIZE = 500
+# reread a little of what was already loaded so rows written by workers with slightly different clocks are not missed.
+# rows that were already queued are filtered out, and adding a row that is already in the wheel just replaces it.
+FUTURE_TASK_LOAD_OVERLAP_IN_SECONDS = 60
+FUTURE_TASK_RETRY_DELAY_IN_SECONDS = 60
+
+
+class TimerWheel:
+    """Hierarchical timing wheel that hands back keys once the time they were added with has passed.
+
+    Level 0 has one slot per tick. Each slot in a higher level covers a whole turn of the level below it,
+    and its keys move down a level when that slot comes up, so adding, removing and advancing one tick are
+    constant time no matter how many keys are waiting. Keys further out than the top level can reach wait in
+    an overflow set until it turns over. Adding a key that is already in the wheel moves it to the new time.
+    """
+
+    def __init__(self, start_in_seconds: float, tick_in_seconds: int = 1, slots_per_level: tuple[int, ...] = (64, 64, 64)):
+        self.tick_in_seconds = tick_in_seconds
+        self.slots_per_level = slots_per_level
+        # ticks covered by one slot at each level
+        self._ticks_per_slot = [math.prod(slots_per_level[:level]) for level in range(len(slots_per_level))]
+        self._ticks_per_turn = self._ticks_per_slot[-1] * slots_per_level[-1]
+        self._levels: list[list[set[str]]] = [[set() for _ in range(slot_count)] for slot_count in slots_per_level]
+        self._overflow: set[str] = set()
+        self._due: list[str] = []
+        # the source of truth for when each key fires. slots can hold stale copies of keys that were moved or removed.
+        self._fire_at_tick: dict[str, int] = {}
+        self._current_tick = math.floor(start_in_seconds / tick_in_seconds)
+
+    def __len__(self) -> int:
+        return len(self._fire_at_tick)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fire_at_tick
+
+    def add(self, key: str, fire_at_in_seconds: float) -> None:
+        # round up so nothing ever fires early
+        self._fire_at_tick[key] = math.ceil(fire_at_in_seconds / self.tick_in_seconds)
+        self._place(key)
+
+    def remove(self, key: str) -> None:
+        self._fire_at_tick.pop(key, None)
+
+    def advance(self, now_in_seconds: float) -> list[str]:
+        """Moves the wheel up to now and returns the keys that are due, each once."""
+        target_tick = math.floor(now_in_seconds / self.tick_in_seconds)
+        if target_tick - self._current_tick >= self._ticks_per_turn:
+            # further than a full turn of the wheel, for instance after the process was paused. start over from now.
+            self._current_tick = target_tick
+            for slots in self._levels:
+                for slot in slots:
+                    slot.clear()
+            self._overflow.clear()
+            for key in list(self._fire_at_tick):
+                self._place(key)
+        while self._current_tick < target_tick:
+            self._current_tick += 1
+            if self._current_tick % self._ticks_per_turn == 0:
+                self._replace_keys(self._overflow)
+            for level in range(len(self.slots_per_level) - 1, -1, -1):
+                ticks_per_slot = self._ticks_per_slot[level]
+                if self._current_tick % ticks_per_slot == 0:
+                    slot_index = (self._current_tick // ticks_per_slot) % self.slots_per_level[level]
+                    self._replace_keys(self._levels[level][slot_index])
+
+        due_keys = []
+        for key in self._due:
+            fire_at_tick = self._fire_at_tick.get(key)
+            if fire_at_tick is not None and fire_at_tick <= self._current_tick:
+                del self._fire_at_tick[key]
+                due_keys.append(key)
+        self._due = []
+        return due_keys
+
+    def _replace_keys(self, keys: set[str]) -> None:
+        keys_to_place = list(keys)
+        keys.clear()
+        for key in keys_to_place:
+            if key in self._fire_at_tick:
+                self._place(key)
+
+    def _place(self, key: str) -> None:
+        fire_at_tick = self._fire_at_tick[key]
+        if fire_at_tick <= self._current_tick:
+            self._due.append(key)
+            return
+        for level, slot_count in enumerate(self.slots_per_level):
+            ticks_per_slot = self._ticks_per_slot[level]
+            if fire_at_tick // ticks_per_slot - self._current_tick // ticks_per_slot < slot_count:
+                self._levels[level][(fire_at_tick // ticks_per_slot) % slot_count].add(key)
+                return
+        self._overflow.add(key)
+
+
+class FutureTaskTimerWheel:
+    """Queues future tasks from an in-memory timer wheel in the background scheduler process.
+
+    Instead of scanning future_task every execution interval, this loads the tasks due within the lookahead
+    once at startup and after that only reads the next slice of run_at_in_seconds plus rows that changed since
+    the last load, both of which use an index. Due tasks are queued in batches and marked as queued in bulk.
+    """
+
+    def __init__(self, app: flask.app.Flask):
+        self.app = app
+        self.wheel = TimerWheel(time.time(), tick_in_seconds=1)
+        self.loaded_until_in_seconds: int | None = None
+        self.last_loaded_at_in_seconds: int | None = None
+        self.next_load_at_in_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def tick(self) -> None:
+        """Since this runs in a scheduler, we need to specify the app context as well."""
+        with self.app.app_context(), self._lock:
+            now = time.time()
+            if now >= self.next_load_at_in_seconds:
+                self.load(round(now))
+                self.next_load_at_in_seconds = now + int(
+                    self.app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_TIMER_WHEEL_LOAD_INTERVAL_IN_SECONDS"]
+                )
+            self.fire_due(now)
+
+    def load(self, current_time: int) -> int:
+        """Adds future tasks that are due before the end of the lookahead and returns how many were added."""
+        horizon = current_time + int(
+            self.app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_LOOKAHEAD_IN_SECONDS"]
+        )
+        if self.loaded_until_in_seconds is None or self.last_loaded_at_in_seconds is None:
+            queries = [self._unqueued_future_tasks_query(horizon)]
+        else:
+            queries = [
+                self._unqueued_future_tasks_query(horizon).filter(
+                    FutureTaskModel.run_at_in_seconds >= self.loaded_until_in_seconds - FUTURE_TASK_LOAD_OVERLAP_IN_SECONDS
+                ),
+                self._unqueued_future_tasks_query(horizon).filter(
+                    FutureTaskModel.updated_at_in_seconds >= self.last_loaded_at_in_seconds - FUTURE_TASK_LOAD_OVERLAP_IN_SECONDS
+                ),
+            ]
+        added_count = 0
+        for query in queries:
+            for guid, run_at_in_seconds in self._in_batches(query):
+                self.wheel.add(guid, run_at_in_seconds)
+                added_count += 1
+        self.loaded_until_in_seconds = horizon
+        self.last_loaded_at_in_seconds = current_time
+        return added_count
+
+    def fire_due(self, now: float) -> list[str]:
+        """Queues the future tasks that are due and returns their guids."""
+        due_guids = self.wheel.advance(now)
+        queued_guids: list[str] = []
+        for index in range(0, len(due_guids), FUTURE_TASK_BATCH_SIZE):
+            batch_guids = due_guids[index : index + FUTURE_TASK_BATCH_SIZE]
+            try:
+                future_tasks = FutureTaskModel.query.filter(
+                    *self._unqueued_future_task_filters(),
+                    FutureTaskModel.guid.in_(batch_guids),  # type: ignore
+                ).all()
+                ready_future_tasks = []
+                for future_task in future_tasks:
+                    if future_task.run_at_in_seconds > now:
+                        # moved since it was loaded
+                        self.wheel.add(future_task.guid, future_task.run_at_in_seconds)
+                    else:
+                        ready_future_tasks.append(future_task)
+                BackgroundProcessingService.queue_future_tasks(ready_future_tasks)
+                queued_guids.extend(future_task.guid for future_task in ready_future_tasks)
+            except Exception as exception:
+                # they are no longer in the wheel and a later load will not see them as changed, so put them back
+                db.session.rollback()
+                for guid in batch_guids:
+                    self.wheel.add(guid, now + FUTURE_TASK_RETRY_DELAY_IN_SECONDS)
+                self.app.logger.exception(
+                    f"Error queueing {len(batch_guids)} future tasks. Trying again in {FUTURE_TASK_RETRY_DELAY_IN_SECONDS} "
+                    f"seconds. {exception.__class__.__name__}: {str(exception)}"
+                )
+        return queued_guids
+
+    def _unqueued_future_task_filters(self) -> list[Any]:
+        return [
+            FutureTaskModel.completed == False,  # noqa: E712
+            FutureTaskModel.archived_for_process_instance_status == False,  # noqa: E712
+            or_(
+                FutureTaskModel.queued_to_run_at_in_seconds != FutureTaskModel.run_at_in_seconds,
+                FutureTaskModel.queued_to_run_at_in_seconds == None,  # noqa: E711
+            ),
+        ]
+
+    def _unqueued_future_tasks_query(self, horizon: int) -> Query:
+        return db.session.query(FutureTaskModel.guid, FutureTaskModel.run_at_in_seconds).filter(
+            *self._unqueued_future_task_filters(),
+            FutureTaskModel.run_at_in_seconds < horizon,
+        )
+
+    def _in_batches(self, query: Query) -> Iterator[tuple[str, int]]:
+        """Reads (guid, run_at_in_seconds) rows a batch at a time, ordered by run_at_in_seconds then guid."""
+        last_row: tuple[int, str] | None = None
+        while True:
+            batch_query = query
+            if last_row is not None:
+                batch_query = batch_query.filter(
+                    or_(
+                        FutureTaskModel.run_at_in_seconds > last_row[0],
+                        (FutureTaskModel.run_at_in_seconds == last_row[0]) & (FutureTaskModel.guid > last_row[1]),
+                    )
+                )
+            rows = (
+                batch_query.order_by(FutureTaskModel.run_at_in_seconds, FutureTaskModel.guid).limit(FUTURE_TASK_BATCH_SIZE).all()
+            )
+            yield from ((guid, run_at_in_seconds) for guid, run_at_in_seconds in rows)
+            if len(rows) < FUTURE_TASK_BATCH_SIZE:
+                return
+            last_row = (rows[-1][1], rows[-1][0])
@@ -0,0 +1,149 @@
+import heapq
+import select
+import threading
+import time
+
+import flask
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
+from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
+from spiffworkflow_backend.services.process_instance_wakeup_service import PROCESS_INSTANCE_WAKEUP_CHANNEL
+from spiffworkflow_backend.services.process_instance_wakeup_service import ProcessInstanceWakeup
+from spiffworkflow_backend.services.process_instance_wakeup_service import ProcessInstanceWakeupService
+
+LISTEN_POLL_TIMEOUT_IN_SECONDS = 5
+LISTEN_RECONNECT_DELAY_IN_SECONDS = 5
+
+
+class ProcessInstanceWakeupDispatcher:
+    """Runs process instances in the background scheduler process when wakeups for them come due.
+
+    Wakeups arrive from ProcessInstanceWakeupService in this process and, on postgres, from a connection
+    that LISTENs for them. They are kept in memory ordered by when they are due, so anything that was
+    pending when the process stops is picked up by the polling sweeps instead.
+
+    Each process instance has at most one pending wakeup, the earliest one requested. Running it makes the instance
+    request its later wakeups again. Heap entries that no longer match the pending wakeup of their process instance
+    are skipped when they reach the top rather than removed when they are replaced.
+    """
+
+    def __init__(self, app: flask.app.Flask):
+        self.app = app
+        # (wake_at_in_seconds, process_instance_id)
+        self._due: list[tuple[int, int]] = []
+        self._wake_at_by_process_instance_id: dict[int, int] = {}
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        ProcessInstanceWakeupService.set_local_receiver(self.add_wakeups)
+        self._threads.append(threading.Thread(target=self._dispatch_loop, name="spiff-wakeup-dispatcher", daemon=True))
+        with self.app.app_context():
+            uses_postgres_notify = ProcessInstanceWakeupService.uses_postgres_notify()
+        if uses_postgres_notify:
+            self._threads.append(threading.Thread(target=self._listen_loop, name="spiff-wakeup-listener", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        if self._stopped.is_set():
+            return
+        ProcessInstanceWakeupService.set_local_receiver(None)
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        for thread in self._threads:
+            # the listener notices within one poll
+            thread.join(LISTEN_POLL_TIMEOUT_IN_SECONDS + 1)
+        self._threads = []
+
+    def add_wakeups(self, wakeups: list[ProcessInstanceWakeup]) -> None:
+        with self._condition:
+            added_wakeup = False
+            for process_instance_id, wake_at_in_seconds in wakeups:
+                pending_wake_at_in_seconds = self._wake_at_by_process_instance_id.get(process_instance_id)
+                if pending_wake_at_in_seconds is not None and pending_wake_at_in_seconds <= wake_at_in_seconds:
+                    continue
+                self._wake_at_by_process_instance_id[process_instance_id] = wake_at_in_seconds
+                heapq.heappush(self._due, (wake_at_in_seconds, process_instance_id))
+                added_wakeup = True
+            if added_wakeup:
+                self._condition.notify()
+
+    def pop_due_process_instance_ids(self, current_time: float) -> list[int]:
+        process_instance_ids = []
+        while self._due and self._due[0][0] <= current_time:
+            wake_at_in_seconds, process_instance_id = heapq.heappop(self._due)
+            if self._wake_at_by_process_instance_id.get(process_instance_id) != wake_at_in_seconds:
+                continue
+            del self._wake_at_by_process_instance_id[process_instance_id]
+            process_instance_ids.append(process_instance_id)
+        return sorted(process_instance_ids)
+
+    def pending_wakeup_count(self) -> int:
+        with self._condition:
+            return len(self._wake_at_by_process_instance_id)
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._condition:
+                process_instance_ids = self.pop_due_process_instance_ids(time.time())
+                while len(process_instance_ids) == 0 and not self._stopped.is_set():
+                    timeout = self._due[0][0] - time.time() if self._due else None
+                    self._condition.wait(timeout)
+                    process_instance_ids = self.pop_due_process_instance_ids(time.time())
+            if self._stopped.is_set():
+                return
+            self._run(process_instance_ids)
+
+    def _run(self, process_instance_ids: list[int]) -> None:
+        with self.app.app_context():
+            ProcessInstanceLockService.set_thread_local_locking_context("bg:wakeup")
+            try:
+                ProcessInstanceService.run_woken_process_instances(process_instance_ids)
+            except Exception as exception:
+                db.session.rollback()
+                self.app.logger.exception(
+                    f"Error running woken process instances {process_instance_ids}. "
+                    f"{exception.__class__.__name__}: {str(exception)}"
+                )
+
+    def _listen_loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                with self.app.app_context():
+                    self._listen()
+            except Exception as exception:
+                self.app.logger.exception(
+                    f"Lost the connection listening for process instance wakeups. Reconnecting in "
+                    f"{LISTEN_RECONNECT_DELAY_IN_SECONDS} seconds. {exception.__class__.__name__}: {str(exception)}"
+                )
+                self._stopped.wait(LISTEN_RECONNECT_DELAY_IN_SECONDS)
+
+    def _listen(self) -> None:
+        # this holds one connection from the pool for as long as the scheduler runs
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql(f"LISTEN {PROCESS_INSTANCE_WAKEUP_CHANNEL}")
+            dbapi_connection = connection.connection.dbapi_connection
+            try:
+                while not self._stopped.is_set():
+                    readable, _, _ = select.select([dbapi_connection], [], [], LISTEN_POLL_TIMEOUT_IN_SECONDS)
+                    if not readable:
+                        continue
+                    dbapi_connection.poll()  # type: ignore
+                    while dbapi_connection.notifies:  # type: ignore
+                        notify = dbapi_connection.notifies.pop(0)  # type: ignore
+                        self.add_wakeups(ProcessInstanceWakeupService.wakeups_from_notify_payload(notify.payload))
+            finally:
+                connection.exec_driver_sql("UNLISTEN *")
+
+
+def start_wakeup_dispatcher_if_appropriate(app: flask.app.Flask) -> ProcessInstanceWakeupDispatcher | None:
+    with app.app_context():
+        if not ProcessInstanceWakeupService.is_enabled():
+            return None
+    dispatcher = ProcessInstanceWakeupDispatcher(app)
+    dispatcher.start()
+    return dispatcher
@@ -10,6 +10,7 @@ from werkzeug.utils import ImportStringError
 
 from spiffworkflow_backend.helpers.api_version import V1_API_PATH_PREFIX
 from spiffworkflow_backend.services.logging_service import setup_logger_for_app
+from spiffworkflow_backend.utils import fast_json
 
 HTTP_REQUEST_TIMEOUT_SECONDS = 15
 CONNECTOR_PROXY_COMMAND_TIMEOUT = 45
@@ -106,6 +107,12 @@ def setup_database_configs(app: Flask) -> None:
     app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"] = pool_size
     app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_pre_ping"] = pool_pre_ping
 
+    # serialize json columns with orjson when it is available. hashes of json_data never depend on this.
+    fast_json.set_orjson_enabled(app.config["SPIFFWORKFLOW_BACKEND_USE_ORJSON"])
+    if fast_json.orjson_enabled():
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"]["json_serializer"] = fast_json.dumps
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"]["json_deserializer"] = fast_json.loads
+
 
 def load_config_file(app: Flask, env_config_module: str) -> None:
     try:
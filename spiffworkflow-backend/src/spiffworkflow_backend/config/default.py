@@ -76,6 +76,19 @@ config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_ALLOW_OPTIMISTIC_CHE
 config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_POLLING_INTERVAL_IN_SECONDS", default=10)
 config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_NOT_STARTED_POLLING_INTERVAL_IN_SECONDS", default=30)
 config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_USER_INPUT_REQUIRED_POLLING_INTERVAL_IN_SECONDS", default=120)
+# run up to this many process instances at once in each background scheduler sweep. each worker thread uses its own
+# database connection, so keep SPIFFWORKFLOW_BACKEND_DATABASE_POOL_SIZE large enough. 1 runs them one at a time.
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_WAITING_SWEEP_CONCURRENCY", default=1)
+# how many queue entries each sweep, or each sweep worker, locks at a time with a single claim query
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_CLAIM_BATCH_SIZE", default=10)
+# queue entries with a lower priority number run first. an entry moves up one priority level for every this many
+# seconds it has been waiting to run, so a large backlog of low priority work still gets its turn. 0 turns aging off.
+config_from_env("SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_QUEUE_PRIORITY_AGING_IN_SECONDS", default=300)
+# without celery, wake the background scheduler to run a process instance when it is due, for instance when a timer
+# fires or a delayed start comes up, instead of waiting for the next polling sweep. the polling jobs still run as a
+# safety net. on postgres wakeups are sent with NOTIFY and reach the scheduler from any backend process, which uses one
+# extra database connection to LISTEN. on other databases they only reach a scheduler in the same process.
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_WAKEUPS_ENABLED", default=True)
 
 ### background with celery
 config_from_env("SPIFFWORKFLOW_BACKEND_CELERY_ENABLED", default=False)
@@ -90,6 +103,12 @@ config_from_env("SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_METADATA_BACKFILL_ENABLE
 # give a little overlap to ensure we do not miss items although the query will handle it either way
 config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_LOOKAHEAD_IN_SECONDS", default=301)
 config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_EXECUTION_INTERVAL_IN_SECONDS", default=300)
+# with celery, keep the future tasks that are due within the lookahead in an in-memory timer wheel in the scheduler and
+# queue each one when it comes due, instead of scanning the future_task table every execution interval.
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_TIMER_WHEEL_ENABLED", default=True)
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_TIMER_WHEEL_TICK_IN_SECONDS", default=1)
+# how often to load new and changed future tasks into the timer wheel. keep it well under the lookahead.
+config_from_env("SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_FUTURE_TASK_TIMER_WHEEL_LOAD_INTERVAL_IN_SECONDS", default=60)
 
 ### frontend
 config_from_env("SPIFFWORKFLOW_BACKEND_URL_FOR_FRONTEND", default="http://localhost:7001")
@@ -217,6 +236,11 @@ config_from_env("SPIFFWORKFLOW_BACKEND_PERMISSIONS_FILE_NAME")
 # FIXME: do not default this but we will need to coordinate release of it since it is a breaking change
 config_from_env("SPIFFWORKFLOW_BACKEND_DEFAULT_USER_GROUP", default="everybody")
 config_from_env("SPIFFWORKFLOW_BACKEND_DEFAULT_PUBLIC_USER_GROUP", default="spiff_public")
+# answer permission checks from an in-memory index of the permissions of each set of principals, keeping up to this
+# many per worker. 0 disables it. committing permission changes clears the indexes in the worker that made them,
+# other workers keep using theirs until they are older than the ttl.
+config_from_env("SPIFFWORKFLOW_BACKEND_PERMISSION_INDEX_CACHE_MAX_ENTRIES", default=0)
+config_from_env("SPIFFWORKFLOW_BACKEND_PERMISSION_INDEX_CACHE_TTL_IN_SECONDS", default=60)
 
 ### sentry
 config_from_env("SPIFFWORKFLOW_BACKEND_SENTRY_DSN", default="")
@@ -287,16 +311,53 @@ config_from_env(
 config_from_env("SPIFFWORKFLOW_BACKEND_EVENT_NOTIFIER_PROCESS_MODEL")
 # check all tasks listed as child tasks are saved to the database
 config_from_env("SPIFFWORKFLOW_BACKEND_DEBUG_TASK_CONSISTENCY", default=False)
+# only persist non-completed tasks whose state, data or runtime info changed since they were last saved
+# rather than reserializing every non-completed task after each batch of engine steps.
+config_from_env("SPIFFWORKFLOW_BACKEND_INCREMENTAL_TASK_PERSISTENCE", default=False)
+# keep up to this many deserialized workflows per worker so runtimes for recently saved process instances
+# can skip rehydrating from the database. 0 disables the cache. entries are also bounded by their total task count.
+config_from_env("SPIFFWORKFLOW_BACKEND_HYDRATED_WORKFLOW_CACHE_MAX_ENTRIES", default=0)
+config_from_env("SPIFFWORKFLOW_BACKEND_HYDRATED_WORKFLOW_CACHE_MAX_TASKS", default=50000)
+# when a runtime asks for completed task data, load each completed task's data the first time it is used
+# instead of reading every json_data blob while hydrating the process instance.
+config_from_env("SPIFFWORKFLOW_BACKEND_LAZY_COMPLETED_TASK_DATA", default=False)
+# remember up to this many json_data hashes per worker that are known to be committed so saving a task whose
+# data already exists skips the upsert. 0 disables it. only enable if json_data rows are never deleted.
+config_from_env("SPIFFWORKFLOW_BACKEND_JSON_DATA_HASH_CACHE_MAX_ENTRIES", default=0)
+# store new task data as the top level keys that changed from the data of its parent task when that is smaller.
+# reading data stored this way takes one extra query per level of the chain, which is never deeper than the max depth.
+config_from_env("SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING", default=False)
+config_from_env("SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_MAX_CHAIN_DEPTH", default=10)
+# zlib compress json_data.data, task.properties_json and bpmn_process_definition.properties_json values that
+# serialize to at least this many bytes. 0 disables it. rows are always readable whatever this is set to.
+config_from_env("SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES", default=0)
+# rewrite existing rows of those columns to match SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES when data migrations run
+config_from_env("SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_RUN_DATA_MIGRATION", default=False)
+# use orjson, if it is installed, for json columns, api responses and json logs instead of the json module.
+# task data hashes are computed the same way either way.
+config_from_env("SPIFFWORKFLOW_BACKEND_USE_ORJSON", default=True)
+# list endpoints asked for an approximate total count stop counting rows after this many and report the total as approximate
+config_from_env("SPIFFWORKFLOW_BACKEND_PAGINATION_APPROXIMATE_TOTAL_LIMIT", default=10000)
 
 # When set to False, this will use the initiator for all task assignments.
 # This is useful when using arena with api keys only and doing task assignment in a differnt system.
 config_from_env("SPIFFWORKFLOW_BACKEND_USE_LANES_FOR_TASK_ASSIGNMENT", default=True)
 
+# list a user's tasks from the human_task_inbox read model instead of aggregating over the human task and assignment tables.
+# the read model is kept up to date either way, so this can be turned off to compare or fall back.
+config_from_env("SPIFFWORKFLOW_BACKEND_USE_HUMAN_TASK_INBOX", default=True)
+
+# read process instance metadata for reports from process_instance_materialized_metadata, one row per process instance,
+# instead of joining process_instance_metadata once per metadata column. it is kept up to date either way.
+config_from_env("SPIFFWORKFLOW_BACKEND_USE_MATERIALIZED_PROCESS_INSTANCE_METADATA", default=True)
+
 ### for documentation only
 # we load the CustomBpmnScriptEngine at import time, where we do not have access to current_app,
 # so instead of using config, we use os.environ directly over there.
 # config_from_env("SPIFFWORKFLOW_BACKEND_USE_RESTRICTED_SCRIPT_ENGINE", default=True)
 # config_from_env("SPIFFWORKFLOW_BACKEND_USE_NON_TASK_DATA_BASED_SCRIPT_ENGINE_ENVIRONMENT", default=False)
+# keep up to this many compiled expressions and scripts per worker. 0 disables the cache.
+# config_from_env("SPIFFWORKFLOW_BACKEND_SCRIPT_CODE_CACHE_MAX_ENTRIES", default=4096)
 
 # adds the ProxyFix to Flask on http by processing the 'X-Forwarded-Proto' header
 # to make SpiffWorkflow aware that it should return https for the server urls etc rather than http.
@@ -0,0 +1,68 @@
+from typing import Any
+
+from flask import current_app
+from sqlalchemy import type_coerce
+from sqlalchemy import update
+
+from spiffworkflow_backend.models.bpmn_process_definition import BpmnProcessDefinitionModel
+from spiffworkflow_backend.models.compressed_json import compress_json_value
+from spiffworkflow_backend.models.compressed_json import compressed_json_min_bytes
+from spiffworkflow_backend.models.compressed_json import decompress_json_value
+from spiffworkflow_backend.models.compressed_json import json_envelope_format
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.models.task import TaskModel
+
+
+class JsonColumnCompressionMigrator:
+    """Rewrites the CompressibleJSON columns so existing rows match SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES.
+
+    Large plain rows get compressed and, if compression was turned off, compressed rows get stored plain again.
+    Rows are read and written in batches ordered by primary key and committed after each batch.
+    """
+
+    COLUMNS_TO_MIGRATE: list[tuple[Any, str, str]] = [
+        (JsonDataModel, "hash", "data"),
+        (TaskModel, "id", "properties_json"),
+        (BpmnProcessDefinitionModel, "id", "properties_json"),
+    ]
+
+    @classmethod
+    def migrate(cls, batch_size: int = 500) -> dict[str, int]:
+        rows_rewritten_by_table = {}
+        for model_class, primary_key_name, column_name in cls.COLUMNS_TO_MIGRATE:
+            rows_rewritten_by_table[model_class.__tablename__] = cls.migrate_column(
+                model_class, primary_key_name, column_name, batch_size
+            )
+            current_app.logger.info(
+                f"Rewrote {rows_rewritten_by_table[model_class.__tablename__]} rows of "
+                f"{model_class.__tablename__}.{column_name} for json column compression"
+            )
+        return rows_rewritten_by_table
+
+    @classmethod
+    def migrate_column(cls, model_class: Any, primary_key_name: str, column_name: str, batch_size: int) -> int:
+        min_bytes = compressed_json_min_bytes()
+        primary_key_column = getattr(model_class, primary_key_name)
+        # coerce to plain json so the stored value is returned as is rather than decompressed
+        stored_value_column = type_coerce(getattr(model_class, column_name), db.JSON)
+        rows_rewritten = 0
+        last_primary_key = None
+        while True:
+            query = db.session.query(primary_key_column, stored_value_column.label("stored_value"))
+            if last_primary_key is not None:
+                query = query.filter(primary_key_column > last_primary_key)
+            rows = query.order_by(primary_key_column).limit(batch_size).all()
+            if len(rows) == 0:
+                break
+            last_primary_key = rows[-1][0]
+
+            for primary_key, stored_value in rows:
+                value = decompress_json_value(stored_value)
+                if json_envelope_format(compress_json_value(value, min_bytes)) == json_envelope_format(stored_value):
+                    continue
+                # the column type compresses the value on the way in if it is large enough
+                db.session.execute(update(model_class).where(primary_key_column == primary_key).values({column_name: value}))
+                rows_rewritten += 1
+            db.session.commit()
+        return rows_rewritten
@@ -5,8 +5,10 @@ from hashlib import sha256
 
 from flask import current_app
 from sqlalchemy import or_
+from sqlalchemy import type_coerce
 from sqlalchemy.orm.attributes import flag_modified
 
+from spiffworkflow_backend.models.compressed_json import json_envelope_filter
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.task import Task
 from spiffworkflow_backend.models.task import TaskModel
@@ -217,16 +219,21 @@ class VersionOneThree:
                 db.session.add(task_definition)
 
     def update_tasks_where_last_change_is_null(self) -> None:
+        # coerce the column so sql sees the stored json rather than binding through the compressing column type
         if current_app.config.get("SPIFFWORKFLOW_BACKEND_DATABASE_TYPE") == "postgres":
-            task_models = (
-                db.session.query(TaskModel)
-                .filter(TaskModel.properties_json.op("->>")("last_state_changed") == None)  # type: ignore  # noqa: E711
-                .all()
+            last_change_is_null = (
+                type_coerce(TaskModel.properties_json, db.JSON).op("->>")("last_state_changed") == None  # noqa: E711
             )
         else:
-            task_models = TaskModel.query.filter(
-                TaskModel.properties_json.like('%last_state_change": null%')  # type: ignore
+            last_change_is_null = type_coerce(TaskModel.properties_json, db.Text).like('%last_state_change": null%')
+        # compressed rows only show their envelope to sql so load them too and check them once they are decompressed
+        task_models = [
+            task_model
+            for task_model in TaskModel.query.filter(
+                or_(last_change_is_null, json_envelope_filter(TaskModel.properties_json))
             ).all()
+            if task_model.properties_json.get("last_state_change") is None
+        ]
         for task_model in task_models:
             parent_task_model = task_model.parent_task_model()
 
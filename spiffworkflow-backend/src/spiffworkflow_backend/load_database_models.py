@@ -38,6 +38,9 @@ from spiffworkflow_backend.models.reference_cache import (
 from spiffworkflow_backend.models.message_instance import (
     MessageInstanceModel,
 )  # noqa: F401
+from spiffworkflow_backend.models.message_instance_correlation_key import (
+    MessageInstanceCorrelationKeyModel,
+)  # noqa: F401
 from spiffworkflow_backend.models.message_triggerable_process_model import (
     MessageTriggerableProcessModel,
 )  # noqa: F401
@@ -61,6 +64,9 @@ from spiffworkflow_backend.models.group import GroupModel  # noqa: F401
 from spiffworkflow_backend.models.process_instance_metadata import (
     ProcessInstanceMetadataModel,
 )  # noqa: F401
+from spiffworkflow_backend.models.process_instance_file_blob import (
+    ProcessInstanceFileBlobModel,
+)  # noqa: F401
 from spiffworkflow_backend.models.process_instance_file_data import (
     ProcessInstanceFileDataModel,
 )  # noqa: F401
@@ -122,5 +128,15 @@ from spiffworkflow_backend.models.feature_flag import (
 )  # noqa: F401
 from spiffworkflow_backend.models.process_caller_relationship import ProcessCallerRelationshipModel  # noqa: F401
 from spiffworkflow_backend.models.api_log_model import APILogModel  # noqa: F401
+from spiffworkflow_backend.models.human_task_inbox import HumanTaskInboxModel  # noqa: F401
+from spiffworkflow_backend.models.process_instance_materialized_metadata import (
+    ProcessInstanceMaterializedMetadataModel,
+)  # noqa: F401
+
+# registers the session listeners that keep human_task_inbox and process_instance_materialized_metadata up to date
+# wherever the models are used
+from spiffworkflow_backend.services import human_task_inbox_service  # noqa: F401
+from spiffworkflow_backend.services import process_instance_materialized_metadata_service  # noqa: F401
+from spiffworkflow_backend.services import process_instance_workflow_cache_service  # noqa: F401
 
 add_listeners()
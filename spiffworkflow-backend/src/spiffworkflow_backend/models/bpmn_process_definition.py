@@ -5,6 +5,7 @@ from typing import Any
 
 from sqlalchemy import UniqueConstraint
 
+from spiffworkflow_backend.models.compressed_json import CompressibleJSON
 from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.utils.db_utils import insert_or_ignore_duplicate
@@ -45,7 +46,7 @@ class BpmnProcessDefinitionModel(SpiffworkflowBaseDBModel):
     bpmn_identifier: str = db.Column(db.String(255), nullable=False, index=True)
     bpmn_name: str = db.Column(db.String(255), nullable=True, index=True)
 
-    properties_json: dict = db.Column(db.JSON, nullable=False)
+    properties_json: dict = db.Column(CompressibleJSON, nullable=False)
 
     # TODO: remove these from process_instance
     bpmn_version_control_type: str = db.Column(db.String(50))
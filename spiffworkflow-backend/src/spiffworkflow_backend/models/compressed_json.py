@@ -0,0 +1,99 @@
+import base64
+import zlib
+from typing import Any
+
+from flask import current_app
+from flask import has_app_context
+from sqlalchemy import type_coerce
+from sqlalchemy.engine.interfaces import Dialect
+from sqlalchemy.types import TypeDecorator
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
+from spiffworkflow_backend.utils import fast_json
+
+# compressed values are stored as a json object with only these two keys. the marker names the format.
+# values that are json objects with the marker key themselves are stored in a raw envelope so a json object with
+# the marker key in the column is always an envelope written here and never a value that happens to look like one.
+COMPRESSED_JSON_FORMAT_KEY = "__spiff_compressed_json__"
+COMPRESSED_JSON_PAYLOAD_KEY = "payload"
+COMPRESSED_JSON_FORMAT_ZLIB = "zlib+base64"
+COMPRESSED_JSON_FORMAT_RAW = "raw"
+COMPRESSED_JSON_ZLIB_LEVEL = 6
+
+
+def compressed_json_min_bytes() -> int:
+    if not has_app_context():
+        return 0
+    return int(current_app.config["SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES"])
+
+
+def is_json_envelope(value: Any) -> bool:
+    return (
+        isinstance(value, dict)
+        and len(value) == 2
+        and COMPRESSED_JSON_FORMAT_KEY in value
+        and COMPRESSED_JSON_PAYLOAD_KEY in value
+    )
+
+
+def json_envelope_format(value: Any) -> str | None:
+    return value[COMPRESSED_JSON_FORMAT_KEY] if is_json_envelope(value) else None
+
+
+def is_compressed_json(value: Any) -> bool:
+    return json_envelope_format(value) == COMPRESSED_JSON_FORMAT_ZLIB
+
+
+def compress_json_value(value: Any, min_bytes: int) -> Any:
+    """Returns the value to store. Values that serialize to at least min_bytes are compressed, 0 disables it."""
+    if value is None:
+        return value
+    if min_bytes > 0:
+        serialized_value = fast_json.dumps_bytes(value)
+        if len(serialized_value) >= min_bytes:
+            compressed_value = zlib.compress(serialized_value, COMPRESSED_JSON_ZLIB_LEVEL)
+            return {
+                COMPRESSED_JSON_FORMAT_KEY: COMPRESSED_JSON_FORMAT_ZLIB,
+                COMPRESSED_JSON_PAYLOAD_KEY: base64.b64encode(compressed_value).decode("ascii"),
+            }
+    if isinstance(value, dict) and COMPRESSED_JSON_FORMAT_KEY in value:
+        return {COMPRESSED_JSON_FORMAT_KEY: COMPRESSED_JSON_FORMAT_RAW, COMPRESSED_JSON_PAYLOAD_KEY: value}
+    return value
+
+
+def decompress_json_value(value: Any) -> Any:
+    if not is_json_envelope(value):
+        return value
+    envelope_format = value[COMPRESSED_JSON_FORMAT_KEY]
+    if envelope_format == COMPRESSED_JSON_FORMAT_RAW:
+        return value[COMPRESSED_JSON_PAYLOAD_KEY]
+    if envelope_format != COMPRESSED_JSON_FORMAT_ZLIB:
+        raise ValueError(f"Unknown compressed json format: {envelope_format}")
+    return fast_json.loads(zlib.decompress(base64.b64decode(value[COMPRESSED_JSON_PAYLOAD_KEY])))
+
+
+class CompressibleJSON(TypeDecorator):
+    """A JSON column that stores large values zlib compressed when SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES is set.
+
+    The compressed bytes are wrapped in a small json object with a format marker rather than stored in a binary
+    column, so the column type does not change, rows written before compression was turned on still load and
+    turning it off again only affects new writes. Values come back from the database as plain json either way.
+    Queries that look inside the stored json in sql see the envelope for compressed rows, see json_envelope_filter.
+    """
+
+    impl = db.JSON
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> Any:
+        return compress_json_value(value, compressed_json_min_bytes())
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> Any:
+        return decompress_json_value(value)
+
+
+def json_envelope_filter(column: Any) -> Any:
+    """Matches rows whose stored value is an envelope, so sql json operators on them see the envelope, not the value."""
+    if dialect_name() == "postgresql":
+        return type_coerce(column, db.JSON).op("->>")(COMPRESSED_JSON_FORMAT_KEY).isnot(None)
+    return type_coerce(column, db.Text).like(f'%"{COMPRESSED_JSON_FORMAT_KEY}"%')
@@ -30,7 +30,8 @@ class FutureTaskModel(SpiffworkflowBaseDBModel):
         index=True,
     )
 
-    updated_at_in_seconds: int = db.Column(db.Integer, nullable=False)
+    # indexed so the scheduler's timer wheel can load just the rows that changed since it last looked
+    updated_at_in_seconds: int = db.Column(db.Integer, nullable=False, index=True)
 
     @classmethod
     def insert_or_update(cls, guid: str, run_at_in_seconds: int, queued_to_run_at_in_seconds: int | None = None) -> None:
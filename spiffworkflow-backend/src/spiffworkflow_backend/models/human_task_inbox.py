@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy import ForeignKey
+
+from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.human_task import HumanTaskModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.user import UserModel
+
+
+@dataclass
+class HumanTaskInboxModel(SpiffworkflowBaseDBModel):
+    """One row per open human task and user it is assigned to, with what the task lists show about it precomputed.
+
+    This is a read model. HumanTaskInboxService keeps it up to date as the human task, assignment and process instance
+    rows it is built from change, so listing a user's tasks needs neither the joins nor the aggregates over them.
+    """
+
+    __tablename__ = "human_task_inbox"
+    __table_args__ = (
+        # also serves listing a user's tasks newest first
+        db.UniqueConstraint("user_id", "human_task_id", name="human_task_inbox_user_human_task_unique"),
+    )
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    human_task_id: int = db.Column(ForeignKey(HumanTaskModel.id, ondelete="CASCADE"), nullable=False, index=True)  # type: ignore
+    user_id: int = db.Column(ForeignKey(UserModel.id, ondelete="CASCADE"), nullable=False)  # type: ignore
+    process_instance_id: int = db.Column(
+        ForeignKey(ProcessInstanceModel.id, ondelete="CASCADE"),  # type: ignore
+        nullable=False,
+        index=True,
+    )
+    process_initiator_id: int = db.Column(db.Integer, nullable=False, index=True)
+    # the task is assigned to a lane group or to lane owner groups rather than only to users
+    has_group_assignment: bool = db.Column(db.Boolean, nullable=False, default=False)
+
+    process_model_identifier: str = db.Column(db.String(255), nullable=False)
+    process_instance_status: str | None = db.Column(db.String(50))
+    process_instance_summary: str | None = db.Column(db.String(255))
+    last_milestone_bpmn_name: str | None = db.Column(db.String(255))
+    process_initiator_username: str | None = db.Column(db.String(255))
+    assigned_user_group_identifier: str | None = db.Column(db.Text)
+    potential_owner_usernames: str | None = db.Column(db.Text)
@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import copy
 import json
+from collections.abc import Iterable
 from hashlib import sha256
 from typing import Any
+from typing import NotRequired
 from typing import TypedDict
 
+from prometheus_client import Counter
+
+from spiffworkflow_backend.models.compressed_json import CompressibleJSON
 from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.utils.db_utils import insert_or_ignore_duplicate
+from spiffworkflow_backend.utils.fast_json import canonical_dumps
+
+JSON_DATA_BYTES_HASHED_TOTAL = Counter(
+    "spiff_json_data_bytes_hashed_total",
+    "Bytes of serialized json data hashed to find or create json_data rows.",
+)
 
 
 class JsonDataModelNotFoundError(Exception):
@@ -17,24 +29,9 @@ class JsonDataModelNotFoundError(Exception):
 class JsonDataDict(TypedDict):
     hash: str
     data: dict
-
-
-# delta algorithm <- just to save it for when we want to try to implement it:
-#   a = {"hey": { "hey2": 2, "hey3": 3, "hey6": 7 }, "hey30": 3, "hey40": 4}
-#   b = {"hey": { "hey2": 4, "hey5": 3 }, "hey20": 2, "hey30": 3}
-#   a_keys = set(a.keys())
-#   b_keys = set(b.keys())
-#   removed = a_keys - b_keys
-#   added_keys = b_keys - a_keys
-#   keys_present_in_both = a_keys & b_keys
-#   changed = {}
-#   for key_in_both in keys_present_in_both:
-#       if a[key_in_both] != b[key_in_both]:
-#           changed[key_in_both] = b[key_in_both]
-#   added = {}
-#   for added_key in added_keys:
-#       added[added_key] = b[added_key]
-#   final_tuple = [added, removed, changed]
+    # only set on rows that store data as a delta against another row. see JsonDataModel.delta_from_dicts
+    delta_base_hash: NotRequired[str | None]
+    delta_depth: NotRequired[int]
 
 
 # to find the users of this model run:
@@ -45,10 +42,16 @@ class JsonDataModel(SpiffworkflowBaseDBModel):
 
     # this is a sha256 hash of spec and serializer_version
     hash: str = db.Column(db.String(255), nullable=False, unique=True, primary_key=True)
-    data: dict = db.Column(db.JSON, nullable=False)
+    data: dict = db.Column(CompressibleJSON, nullable=False)
+
+    # when delta_base_hash is set, data holds a delta against the data of that row instead of the full data.
+    # the hash is always the hash of the full data. delta_depth is the number of deltas to apply to get there.
+    delta_base_hash: str | None = db.Column(db.String(255), nullable=True, index=True)
+    delta_depth: int = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     @classmethod
     def find_object_by_hash(cls, hash: str) -> JsonDataModel:
+        """Returns the row as stored. Use find_data_dict_by_hash to get the data since the row may hold a delta."""
         json_data_model: JsonDataModel | None = JsonDataModel.query.filter_by(hash=hash).first()
         if json_data_model is None:
             raise JsonDataModelNotFoundError(f"Could not find a json data model entry with hash: {hash}")
@@ -56,7 +59,106 @@ class JsonDataModel(SpiffworkflowBaseDBModel):
 
     @classmethod
     def find_data_dict_by_hash(cls, hash: str) -> dict:
-        return cls.find_object_by_hash(hash).data
+        data = cls.data_dicts_by_hash([hash]).get(hash)
+        if data is None:
+            raise JsonDataModelNotFoundError(f"Could not find a json data model entry with hash: {hash}")
+        return data
+
+    @classmethod
+    def data_dicts_by_hash(cls, json_data_hashes: Iterable[str]) -> dict[str, dict]:
+        """Returns the full data for each hash that exists, rebuilding rows that are stored as deltas.
+
+        This uses one query for the requested rows plus one for each level of delta bases that were not requested.
+        It queries columns rather than JsonDataModel objects so the data is not also held by the session.
+        Data rebuilt from deltas is deep copied so it does not share values with the data of any other hash.
+        """
+        stored_rows: dict[str, tuple[dict, str | None]] = {}
+        hashes_to_load = set(json_data_hashes)
+        requested_hashes = set(hashes_to_load)
+        while len(hashes_to_load) > 0:
+            json_data_records = (
+                db.session.query(cls.hash, cls.data, cls.delta_base_hash)
+                .filter(cls.hash.in_(hashes_to_load))  # type: ignore
+                .all()
+            )
+            for json_data_record in json_data_records:
+                stored_rows[json_data_record.hash] = (json_data_record.data, json_data_record.delta_base_hash)
+            hashes_to_load = {
+                r.delta_base_hash
+                for r in json_data_records
+                if r.delta_base_hash is not None and r.delta_base_hash not in stored_rows
+            }
+
+        full_data: dict[str, dict] = {}
+        for requested_hash in requested_hashes:
+            # walk down to a row with full data, or one already rebuilt, then apply the deltas on the way back up
+            delta_chain: list[str] = []
+            current_hash: str | None = requested_hash
+            while current_hash is not None and current_hash not in full_data and current_hash in stored_rows:
+                data, delta_base_hash = stored_rows[current_hash]
+                if delta_base_hash is None:
+                    full_data[current_hash] = data
+                    break
+                delta_chain.append(current_hash)
+                current_hash = delta_base_hash
+            if current_hash is None or current_hash not in full_data:
+                continue
+            for delta_hash in reversed(delta_chain):
+                full_data[delta_hash] = cls.apply_delta(full_data[current_hash], stored_rows[delta_hash][0])
+                current_hash = delta_hash
+
+        return {
+            requested_hash: copy.deepcopy(full_data[requested_hash])
+            if stored_rows[requested_hash][1] is not None
+            else full_data[requested_hash]
+            for requested_hash in requested_hashes
+            if requested_hash in full_data
+        }
+
+    @classmethod
+    def delta_from_dicts(cls, base: dict, data: dict) -> dict:
+        """Returns the top level keys added, removed and changed to get from base to data."""
+        added = {}
+        changed = {}
+        for key, value in data.items():
+            if key not in base:
+                added[key] = value
+            elif not cls.json_values_identical(base[key], value):
+                changed[key] = value
+        removed = [key for key in base if key not in data]
+        return {"added": added, "removed": removed, "changed": changed}
+
+    @classmethod
+    def apply_delta(cls, base: dict, delta: dict) -> dict:
+        removed = set(delta["removed"])
+        data = {key: value for key, value in base.items() if key not in removed}
+        data.update(delta["added"])
+        data.update(delta["changed"])
+        return data
+
+    @classmethod
+    def json_values_identical(cls, first: Any, second: Any) -> bool:
+        """True if both values would serialize to exactly the same json.
+
+        This is stricter than == since 1, 1.0 and True are equal in python but not in json.
+        Dicts with keys that are not strings are never considered identical so they always get normalized and hashed.
+        """
+        if type(first) is not type(second):
+            return False
+        if isinstance(first, dict):
+            if len(first) != len(second):
+                return False
+            for key, value in first.items():
+                if type(key) is not str or key not in second:
+                    return False
+                if not cls.json_values_identical(value, second[key]):
+                    return False
+            return True
+        if isinstance(first, list | tuple):
+            if len(first) != len(second):
+                return False
+            return all(cls.json_values_identical(a, b) for a, b in zip(first, second, strict=True))
+        return bool(first == second)
 
     @classmethod
     def insert_or_update_json_data_records(cls, json_data_hash_to_json_data_dict_mapping: dict[str, JsonDataDict]) -> None:
@@ -109,7 +211,9 @@ class JsonDataModel(SpiffworkflowBaseDBModel):
     @classmethod
     def json_data_dict_from_dict(cls, data: dict) -> JsonDataDict:
         normalized_data = cls._normalize_json_object_keys(data)
-        task_data_json = json.dumps(normalized_data, sort_keys=True)
-        task_data_hash: str = sha256(task_data_json.encode("utf8")).hexdigest()
+        task_data_json = canonical_dumps(normalized_data)
+        task_data_json_bytes = task_data_json.encode("utf8")
+        JSON_DATA_BYTES_HASHED_TOTAL.inc(len(task_data_json_bytes))
+        task_data_hash: str = sha256(task_data_json_bytes).hexdigest()
         json_data_dict: JsonDataDict = {"hash": task_data_hash, "data": normalized_data}
         return json_data_dict
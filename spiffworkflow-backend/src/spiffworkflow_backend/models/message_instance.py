@@ -20,6 +20,9 @@ if TYPE_CHECKING:
     from spiffworkflow_backend.models.message_instance_correlation import (  # noqa: F401,I001
         MessageInstanceCorrelationRuleModel,
     )
+    from spiffworkflow_backend.models.message_instance_correlation_key import (  # noqa: F401,I001
+        MessageInstanceCorrelationKeyModel,
+    )
 
 
 class MessageTypes(enum.Enum):
@@ -61,6 +64,9 @@ class MessageInstanceModel(SpiffworkflowBaseDBModel):
     updated_at_in_seconds: int = db.Column(db.Integer)
     created_at_in_seconds: int = db.Column(db.Integer)
     correlation_rules = relationship("MessageInstanceCorrelationRuleModel", back_populates="message_instance", cascade="delete")
+    correlation_key_index = relationship(
+        "MessageInstanceCorrelationKeyModel", back_populates="message_instance", cascade="delete"
+    )
 
     @validates("message_type")
     def validate_message_type(self, key: str, value: Any) -> Any:
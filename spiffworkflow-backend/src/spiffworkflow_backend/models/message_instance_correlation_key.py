@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import relationship
+
+from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.message_instance import MessageInstanceModel
+
+
+@dataclass
+class MessageInstanceCorrelationKeyModel(SpiffworkflowBaseDBModel):
+    """Precomputed correlation values of a ready receive message, so send messages can find it with an index.
+
+    Each row is one way a send message can correlate with the receive message. correlation_value_hash is
+    a hash of the normalized (correlation property name, retrieval expression, expected value) triples of one
+    of its correlation keys, or of all of its correlation_keys when retrieval_expressions is null, since identical
+    correlation_keys always correlate. Rows are removed once the receive message is no longer ready.
+    """
+
+    __tablename__ = "message_instance_correlation_key"
+    __table_args__ = (
+        db.Index("message_instance_correlation_key_name_value_hash", "message_name", "correlation_value_hash"),
+        db.Index("message_instance_correlation_key_name_expressions_hash", "message_name", "retrieval_expressions_hash"),
+    )
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    message_instance_id: int = db.Column(ForeignKey(MessageInstanceModel.id), nullable=False, index=True)  # type: ignore
+    message_name: str = db.Column(db.String(255), nullable=False)
+    correlation_value_hash: str = db.Column(db.String(64), nullable=False)
+    # the correlation property names and retrieval expressions a send message payload has to be evaluated with
+    retrieval_expressions: dict | None = db.Column(db.JSON, nullable=True)
+    retrieval_expressions_hash: str | None = db.Column(db.String(64), nullable=True)
+    created_at_in_seconds: int = db.Column(db.Integer)
+
+    message_instance = relationship("MessageInstanceModel", back_populates="correlation_key_index")
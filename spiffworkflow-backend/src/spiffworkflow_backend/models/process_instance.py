@@ -96,6 +96,8 @@ class ProcessInstanceModel(SpiffworkflowBaseDBModel):
     start_in_seconds: int | None = db.Column(db.Integer, index=True)
     end_in_seconds: int | None = db.Column(db.Integer, index=True)
     task_updated_at_in_seconds: int = db.Column(db.Integer, nullable=True)
+    # bumped whenever the tasks or bpmn processes of the instance are written. see ProcessInstanceWorkflowCacheService.
+    workflow_version: int = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     status: str = db.Column(db.String(50), index=True)
 
     updated_at_in_seconds: int = db.Column(db.Integer)
@@ -0,0 +1,183 @@
+import base64
+import binascii
+import hashlib
+import os
+import tempfile
+from collections.abc import Generator
+from dataclasses import dataclass
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import LONGBLOB
+from sqlalchemy.orm import deferred
+
+from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
+from spiffworkflow_backend.models.db import db
+
+PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM = "contents_in:filesystem"
+PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM_DIR_COUNT = 2
+# how much of a file is read, written or decoded at a time. base64 chunks must be a multiple of 4 characters.
+PROCESS_INSTANCE_DATA_FILE_CHUNK_SIZE_IN_BYTES = 1024 * 1024
+PROCESS_INSTANCE_DATA_FILE_BASE64_CHUNK_SIZE = PROCESS_INSTANCE_DATA_FILE_CHUNK_SIZE_IN_BYTES // 3 * 4
+
+
+@dataclass
+class ProcessInstanceFileBlobModel(SpiffworkflowBaseDBModel):
+    """The contents of uploaded files, stored once per digest no matter how many process instances reference them.
+
+    reference_count is the number of process_instance_file_data rows with this digest. the blob, and its file when
+    contents are on the file system, is deleted when the last of them is.
+    """
+
+    __tablename__ = "process_instance_file_blob"
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    digest: str = db.Column(db.String(64), nullable=False, unique=True)
+    # deferred so downloads can read the contents in chunks instead of loading them all with the rest of the row
+    contents: bytes = deferred(db.Column(db.LargeBinary().with_variant(LONGBLOB, "mysql"), nullable=False))
+    reference_count: int = db.Column(db.Integer, nullable=False, default=0)
+    updated_at_in_seconds: int = db.Column(db.Integer, nullable=False)
+    created_at_in_seconds: int = db.Column(db.Integer, nullable=False)
+
+    def get_contents(self) -> bytes:
+        if self.contents_are_on_file_system():
+            return self.get_contents_on_file_system()
+        return self.contents
+
+    @classmethod
+    def contents_are_on_file_system(cls) -> bool:
+        return current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH"] is not None
+
+    def get_contents_size(self) -> int:
+        if self.contents_are_on_file_system():
+            return os.path.getsize(self.get_full_filepath())
+        contents_size = (
+            db.session.query(func.length(ProcessInstanceFileBlobModel.contents))
+            .filter(ProcessInstanceFileBlobModel.digest == self.digest)
+            .scalar()
+        )
+        return int(contents_size or 0)
+
+    def iter_contents(self, start: int = 0, end: int | None = None) -> Generator[bytes]:
+        """Yields the contents from start up to but not including end in chunks, without loading all of them at once."""
+        if end is None:
+            end = self.get_contents_size()
+
+        if self.contents_are_on_file_system():
+            with open(self.get_full_filepath(), "rb") as f:
+                f.seek(start)
+                remaining = end - start
+                while remaining > 0:
+                    chunk = f.read(min(PROCESS_INSTANCE_DATA_FILE_CHUNK_SIZE_IN_BYTES, remaining))
+                    if not chunk:
+                        return
+                    remaining -= len(chunk)
+                    yield chunk
+            return
+
+        position = start
+        while position < end:
+            length = min(PROCESS_INSTANCE_DATA_FILE_CHUNK_SIZE_IN_BYTES, end - position)
+            # substr is 1 based
+            chunk = (
+                db.session.query(func.substr(ProcessInstanceFileBlobModel.contents, position + 1, length))
+                .filter(ProcessInstanceFileBlobModel.digest == self.digest)
+                .scalar()
+            )
+            if not chunk:
+                return
+            position += len(chunk)
+            yield bytes(chunk)
+
+    @classmethod
+    def decode_base64_contents(cls, value: str, start: int, end: int) -> tuple[bytes, str, str | None]:
+        """Decodes value[start:end] from base64 a chunk at a time, returning the contents, their sha256 digest and a file.
+
+        If the file data filesystem path is set, the contents are written to a temporary file in it as they are decoded,
+        so they are never all in memory. The marker for contents on the file system is returned instead of the contents,
+        along with the path of the temporary file, which store_decoded_file moves into place once the blob is referenced.
+        """
+        try:
+            return cls._decode_base64_contents(value, start, end, PROCESS_INSTANCE_DATA_FILE_BASE64_CHUNK_SIZE)
+        except binascii.Error:
+            # characters outside the base64 alphabet can throw off the chunk boundaries, so decode it in one go like before
+            return cls._decode_base64_contents(value, start, end, max(end - start, 1))
+
+    @classmethod
+    def _decode_base64_contents(cls, value: str, start: int, end: int, chunk_size: int) -> tuple[bytes, str, str | None]:
+        sha256 = hashlib.sha256()
+        decoded_chunks = (
+            base64.b64decode(value[chunk_start : min(chunk_start + chunk_size, end)])
+            for chunk_start in range(start, end, chunk_size)
+        )
+        if not cls.contents_are_on_file_system():
+            contents = []
+            for chunk in decoded_chunks:
+                sha256.update(chunk)
+                contents.append(chunk)
+            return b"".join(contents), sha256.hexdigest(), None
+
+        file_data_dir = current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH"]
+        file_descriptor, decoded_filepath = tempfile.mkstemp(dir=file_data_dir, prefix=".upload-")
+        try:
+            with os.fdopen(file_descriptor, "wb") as f:
+                for chunk in decoded_chunks:
+                    sha256.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            cls.remove_decoded_file(decoded_filepath)
+            raise
+        return PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM.encode(), sha256.hexdigest(), decoded_filepath
+
+    @classmethod
+    def store_decoded_file(cls, decoded_filepath: str, digest: str) -> None:
+        """Moves a file from decode_base64_contents into place, replacing the file for the digest if there is one.
+
+        Files are named after their digest, so one that is already there has the same contents, but it may belong to a
+        blob that lost its last reference and is about to be removed, so it is replaced rather than reused.
+        """
+        filepath = cls.full_filepath_for_digest(digest)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        os.replace(decoded_filepath, filepath)
+
+    @classmethod
+    def remove_decoded_file(cls, decoded_filepath: str) -> None:
+        try:
+            os.remove(decoded_filepath)
+        except FileNotFoundError:
+            pass
+
+    def store_file_on_file_system(self) -> None:
+        filepath = self.get_full_filepath()
+        try:
+            os.makedirs(os.path.dirname(filepath))
+        except FileExistsError:
+            pass
+
+        with open(filepath, "wb") as f:
+            f.write(self.contents)
+        self.contents = PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM.encode()
+
+    def get_contents_on_file_system(self) -> bytes:
+        filepath = self.get_full_filepath()
+        with open(filepath, "rb") as f:
+            return f.read()
+
+    def get_full_filepath(self) -> str:
+        return self.__class__.full_filepath_for_digest(self.digest)
+
+    @classmethod
+    def full_filepath_for_digest(cls, digest: str) -> str:
+        dir_parts = cls.get_hashed_directory_structure(digest)
+        return os.path.join(
+            current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH"], *dir_parts, digest
+        )
+
+    @classmethod
+    def get_hashed_directory_structure(cls, digest: str) -> list[str]:
+        dir_parts = []
+        for ii in range(PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM_DIR_COUNT):
+            start_index = ii * PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM_DIR_COUNT
+            end_index = start_index + PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM_DIR_COUNT
+            dir_parts.append(digest[start_index:end_index])
+        return dir_parts
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy import ForeignKey
+
+from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+
+
+@dataclass
+class ProcessInstanceMaterializedMetadataModel(SpiffworkflowBaseDBModel):
+    """All of a process instance's metadata in one row, keyed by metadata key.
+
+    This is a read model of process_instance_metadata. ProcessInstanceMaterializedMetadataService keeps it up to date,
+    so a report can read any number of metadata columns with a single join instead of one join per column.
+    """
+
+    __tablename__ = "process_instance_materialized_metadata"
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    process_instance_id: int = db.Column(
+        ForeignKey(ProcessInstanceModel.id, ondelete="CASCADE"),  # type: ignore
+        nullable=False,
+        unique=True,
+    )
+    metadata_values: dict = db.Column(db.JSON, nullable=False)
@@ -1,19 +1,56 @@
 from dataclasses import dataclass
 
+from flask import current_app
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy.orm import relationship
 
+from spiffworkflow_backend.helpers.spiff_enum import SpiffEnum
 from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 
 
+class ProcessInstanceQueuePriority(SpiffEnum):
+    high = "high"
+    normal = "normal"
+    low = "low"
+
+    def queue_value(self) -> int:
+        """The number stored in the queue. Lower numbers run first."""
+        return PROCESS_INSTANCE_QUEUE_PRIORITY_VALUES[self.value]
+
+    @classmethod
+    def queue_value_for(cls, priority: str | None) -> int:
+        """Unknown priorities, like a typo in a process model's queue_priority, run at normal priority."""
+        if priority is None:
+            return cls.normal.queue_value()
+        try:
+            return cls(priority).queue_value()
+        except ValueError:
+            current_app.logger.warning(f"Unknown queue priority '{priority}'. Using {cls.normal.value} instead.")
+            return cls.normal.queue_value()
+
+
+# normal is 2 because that is what every queue entry got before priorities could be configured
+PROCESS_INSTANCE_QUEUE_PRIORITY_VALUES = {
+    ProcessInstanceQueuePriority.high.value: 1,
+    ProcessInstanceQueuePriority.normal.value: 2,
+    ProcessInstanceQueuePriority.low.value: 3,
+}
+
+
 @dataclass
 class ProcessInstanceQueueModel(SpiffworkflowBaseDBModel):
     __tablename__ = "process_instance_queue"
+    __table_args__ = (
+        # supports finding runnable entries for a status in priority order
+        Index("process_instance_queue_status_priority_run_at", "status", "locked_by", "priority", "run_at_in_seconds"),
+    )
 
     id: int = db.Column(db.Integer, primary_key=True)
     process_instance_id: int = db.Column(ForeignKey(ProcessInstanceModel.id), unique=True, nullable=False)  # type: ignore
+    # see ProcessInstanceQueuePriority. lower numbers run first.
     priority: int = db.Column(db.Integer)
     locked_by: str | None = db.Column(db.String(80), index=True, nullable=True)
     locked_at_in_seconds: int | None = db.Column(db.Integer, index=True, nullable=True)
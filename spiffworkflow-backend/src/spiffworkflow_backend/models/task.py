@@ -11,6 +11,7 @@ from sqlalchemy import ForeignKey
 from sqlalchemy.orm import relationship
 
 from spiffworkflow_backend.models.bpmn_process import BpmnProcessModel
+from spiffworkflow_backend.models.compressed_json import CompressibleJSON
 from spiffworkflow_backend.models.db import SpiffworkflowBaseDBModel
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.json_data import JsonDataModel
@@ -58,7 +59,7 @@ class TaskModel(SpiffworkflowBaseDBModel):
     task_definition = relationship("TaskDefinitionModel")
 
     state: str = db.Column(db.String(10), nullable=False, index=True)
-    properties_json: dict = db.Column(db.JSON, nullable=False)
+    properties_json: dict = db.Column(CompressibleJSON, nullable=False)
 
     json_data_hash: str = db.Column(db.String(255), nullable=False, index=True)
     python_env_data_hash: str = db.Column(db.String(255), nullable=False, index=True)
@@ -6,7 +6,6 @@ import flask.wrappers
 from flask import jsonify
 from flask import make_response
 from flask.wrappers import Response
-from flask_sqlalchemy.pagination import QueryPagination
 
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.message_instance import MessageInstanceModel
@@ -16,6 +15,14 @@ from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.services.message_service import MessageService
 from spiffworkflow_backend.services.upsearch_service import UpsearchService
 from spiffworkflow_backend.utils.api_logging import log_api_interaction
+from spiffworkflow_backend.utils.pagination import PaginatedResult
+from spiffworkflow_backend.utils.pagination import SortKey
+from spiffworkflow_backend.utils.pagination import paginate_query
+
+MESSAGE_INSTANCE_SORT_KEYS = [
+    SortKey(MessageInstanceModel.created_at_in_seconds, descending=True),  # type: ignore
+    SortKey(MessageInstanceModel.id, descending=True),  # type: ignore
+]
 
 
 def message_model_list_all() -> flask.wrappers.Response:
@@ -40,6 +47,8 @@ def message_instance_list(
     process_instance_id: int | None = None,
     page: int = 1,
     per_page: int = 100,
+    cursor: str | None = None,
+    total_count: str | None = None,
 ) -> flask.wrappers.Response:
     # to make sure the process instance exists
     message_instances_query = MessageInstanceModel.query
@@ -47,17 +56,16 @@ def message_instance_list(
     if process_instance_id:
         message_instances_query = message_instances_query.filter_by(process_instance_id=process_instance_id)
 
-    message_instances = (
-        message_instances_query.order_by(
-            MessageInstanceModel.created_at_in_seconds.desc(),  # type: ignore
-            MessageInstanceModel.id.desc(),  # type: ignore
-        )
-        .outerjoin(ProcessInstanceModel)  # Not all messages were created by a process
-        .add_columns(
+    message_instances = paginate_query(
+        message_instances_query.outerjoin(ProcessInstanceModel).add_columns(  # Not all messages were created by a process
             ProcessInstanceModel.process_model_identifier,
             ProcessInstanceModel.process_model_display_name,
-        )
-        .paginate(page=page, per_page=per_page, error_out=False)
+        ),
+        MESSAGE_INSTANCE_SORT_KEYS,
+        page=page,
+        per_page=per_page,
+        cursor=cursor,
+        total_count=total_count,
     )
     return _create_message_instance_response(message_instances)
 
@@ -67,6 +75,8 @@ def message_instance_search(
     process_instance_id: int | None = None,
     page: int = 1,
     per_page: int = 100,
+    cursor: str | None = None,
+    total_count: str | None = None,
 ) -> flask.wrappers.Response:
     message_instances_query = MessageInstanceModel.query
     if process_instance_id:
@@ -98,17 +108,16 @@ def message_instance_search(
             ProcessInstanceModel.process_model_identifier == process_model_identifier
         )
 
-    message_instances = (
-        message_instances_query.order_by(
-            MessageInstanceModel.created_at_in_seconds.desc(),  # type: ignore
-            MessageInstanceModel.id.desc(),  # type: ignore
-        )
-        .outerjoin(ProcessInstanceModel)  # Not all messages were created by a process
-        .add_columns(
+    message_instances = paginate_query(
+        message_instances_query.outerjoin(ProcessInstanceModel).add_columns(  # Not all messages were created by a process
             ProcessInstanceModel.process_model_identifier,
             ProcessInstanceModel.process_model_display_name,
-        )
-        .paginate(page=page, per_page=per_page, error_out=False)
+        ),
+        MESSAGE_INSTANCE_SORT_KEYS,
+        page=page,
+        per_page=per_page,
+        cursor=cursor,
+        total_count=total_count,
     )
     return _create_message_instance_response(message_instances)
 
@@ -220,13 +229,9 @@ def _get_message_models(messages: list[MessageModel]) -> flask.wrappers.Response
     return make_response(jsonify({"messages": [message_response(m) for m in messages]}), 200)
 
 
-def _create_message_instance_response(message_instances: QueryPagination) -> flask.Response:
+def _create_message_instance_response(message_instances: PaginatedResult) -> flask.Response:
     response_json = {
         "results": message_instances.items,
-        "pagination": {
-            "count": len(message_instances.items),
-            "total": message_instances.total,
-            "pages": message_instances.pages,
-        },
+        "pagination": message_instances.pagination_json(),
     }
     return make_response(jsonify(response_json), 200)
@@ -10,6 +10,8 @@ from flask import current_app
 from flask import g
 from flask import jsonify
 from flask import make_response
+from flask import request
+from flask import stream_with_context
 from flask.wrappers import Response
 from SpiffWorkflow.task import Task as SpiffTask  # type: ignore
 from SpiffWorkflow.util.task import TaskState  # type: ignore
@@ -279,12 +281,26 @@ def process_data_file_download(
         )
     mimetype = file_data.mimetype
     filename = file_data.filename
-    file_contents = file_data.get_contents()
+    contents_size = file_data.get_contents_size()
+    headers = {"Content-disposition": f"attachment; filename={filename}", "Accept-Ranges": "bytes"}
+
+    # stream the contents in chunks so large files are never loaded into memory all at once
+    status_code = 200
+    start, stop = 0, contents_size
+    if request.range is not None and len(request.range.ranges) == 1:
+        byte_range = request.range.range_for_length(contents_size)
+        if byte_range is None:
+            return Response(status=416, headers={**headers, "Content-Range": f"bytes */{contents_size}"})
+        start, stop = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{stop - 1}/{contents_size}"
+    headers["Content-Length"] = str(stop - start)
 
     return Response(
-        file_contents,
+        stream_with_context(file_data.iter_contents(start, stop)),
+        status=status_code,
         mimetype=mimetype,
-        headers={"Content-disposition": f"attachment; filename={filename}"},
+        headers=headers,
     )
 
 
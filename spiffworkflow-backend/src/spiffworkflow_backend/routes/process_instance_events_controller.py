@@ -15,6 +15,8 @@ from spiffworkflow_backend.models.task import TaskModel
 from spiffworkflow_backend.models.task_definition import TaskDefinitionModel
 from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.routes.process_api_blueprint import _find_process_instance_by_id_or_raise
+from spiffworkflow_backend.utils.pagination import SortKey
+from spiffworkflow_backend.utils.pagination import paginate_query
 
 
 def log_list(
@@ -27,6 +29,8 @@ def log_list(
     bpmn_identifier: str | None = None,
     task_type: str | None = None,
     event_type: str | None = None,
+    cursor: str | None = None,
+    total_count: str | None = None,
 ) -> flask.wrappers.Response:
     process_instance = _find_process_instance_by_id_or_raise(process_instance_id)
 
@@ -68,10 +72,8 @@ def log_list(
     if event_type is not None:
         log_query = log_query.filter(ProcessInstanceEventModel.event_type == event_type)
 
-    logs = (
-        log_query.order_by(ProcessInstanceEventModel.timestamp.desc(), ProcessInstanceEventModel.id.desc())  # type: ignore
-        .outerjoin(UserModel, UserModel.id == ProcessInstanceEventModel.user_id)
-        .add_columns(
+    logs = paginate_query(
+        log_query.outerjoin(UserModel, UserModel.id == ProcessInstanceEventModel.user_id).add_columns(
             TaskModel.guid.label("spiff_task_guid"),  # type: ignore
             UserModel.username,
             BpmnProcessDefinitionModel.bpmn_identifier.label("bpmn_process_definition_identifier"),  # type: ignore
@@ -79,17 +81,20 @@ def log_list(
             TaskDefinitionModel.bpmn_identifier.label("task_definition_identifier"),  # type: ignore
             TaskDefinitionModel.bpmn_name.label("task_definition_name"),  # type: ignore
             TaskDefinitionModel.typename.label("bpmn_task_type"),  # type: ignore
-        )
-        .paginate(page=page, per_page=per_page, error_out=False)
+        ),
+        [
+            SortKey(ProcessInstanceEventModel.timestamp, descending=True),  # type: ignore
+            SortKey(ProcessInstanceEventModel.id, descending=True),  # type: ignore
+        ],
+        page=page,
+        per_page=per_page,
+        cursor=cursor,
+        total_count=total_count,
     )
 
     response_json = {
         "results": logs.items,
-        "pagination": {
-            "count": len(logs.items),
-            "total": logs.total,
-            "pages": logs.pages,
-        },
+        "pagination": logs.pagination_json(),
     }
 
     return make_response(jsonify(response_json), 200)
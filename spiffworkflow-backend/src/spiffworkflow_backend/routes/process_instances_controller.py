@@ -63,10 +63,11 @@ from spiffworkflow_backend.utils.api_logging import log_api_interaction
 
 def process_instance_create(
     modified_process_model_identifier: str,
+    priority: str | None = None,
 ) -> flask.wrappers.Response:
     process_model_identifier = ProcessModelInfo.unmodify_process_identifier_from_path_param(modified_process_model_identifier)
 
-    process_instance = _process_instance_create(process_model_identifier)
+    process_instance = _process_instance_create(process_model_identifier, queue_priority=priority)
     return make_response(jsonify(process_instance.serialized()), 201)
 
 
@@ -172,6 +173,8 @@ def process_instance_list_for_me(
     process_model_identifier: str | None = None,
     page: int = 1,
     per_page: int = 100,
+    cursor: str | None = None,
+    total_count: str | None = None,
 ) -> flask.wrappers.Response:
     ProcessInstanceReportService.add_or_update_filter(
         body["report_metadata"]["filter_by"], {"field_name": "with_relation_to_me", "field_value": True}
@@ -181,6 +184,8 @@ def process_instance_list_for_me(
         page=page,
         per_page=per_page,
         body=body,
+        cursor=cursor,
+        total_count=total_count,
     )
 
 
@@ -189,12 +194,16 @@ def process_instance_list(
     process_model_identifier: str | None = None,
     page: int = 1,
     per_page: int = 100,
+    cursor: str | None = None,
+    total_count: str | None = None,
 ) -> flask.wrappers.Response:
     response_json = ProcessInstanceReportService.run_process_instance_report(
         report_metadata=body["report_metadata"],
         page=page,
         per_page=per_page,
         user=g.user,
+        cursor=cursor,
+        total_count=total_count,
     )
 
     json_data_hash = JsonDataModel.create_and_insert_json_data_from_dict(body["report_metadata"])
@@ -795,6 +804,7 @@ def _process_instance_run(
 
 def _process_instance_create(
     process_model_identifier: str,
+    queue_priority: str | None = None,
 ) -> ProcessInstanceModel:
     process_model = _get_process_model_for_instantiation(process_model_identifier)
     if process_model.primary_file_name is None:
@@ -808,6 +818,6 @@ def _process_instance_create(
         )
 
     process_instance = ProcessInstanceService.create_process_instance_from_process_model_identifier(
-        process_model_identifier, g.user
+        process_model_identifier, g.user, queue_priority=queue_priority
     )
     return process_instance
@@ -58,6 +58,7 @@ def process_model_create(
         "metadata_extraction_paths",
         "fault_or_suspend_on_exception",
         "exception_notification_addresses",
+        "queue_priority",
     ]
     body_filtered = {include_item: body[include_item] for include_item in body_include_list if include_item in body}
 
@@ -142,6 +143,7 @@ def process_model_update(
         "metadata_extraction_paths",
         "fault_or_suspend_on_exception",
         "exception_notification_addresses",
+        "queue_priority",
     ]
     body_filtered = {include_item: body[include_item] for include_item in body_include_list if include_item in body}
 
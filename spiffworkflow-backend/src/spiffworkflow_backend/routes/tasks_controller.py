@@ -35,6 +35,7 @@ from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.group import GroupModel
 from spiffworkflow_backend.models.human_task import HumanTaskModel
 from spiffworkflow_backend.models.human_task_group import HumanTaskGroupModel
+from spiffworkflow_backend.models.human_task_inbox import HumanTaskInboxModel
 from spiffworkflow_backend.models.human_task_user import HumanTaskUserAddedBy
 from spiffworkflow_backend.models.human_task_user import HumanTaskUserModel
 from spiffworkflow_backend.models.json_data import JsonDataModel
@@ -70,6 +71,8 @@ from spiffworkflow_backend.services.process_instance_runtime import ProcessInsta
 from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
 from spiffworkflow_backend.services.service_task_service import ServiceTaskService
 from spiffworkflow_backend.services.task_service import TaskService
+from spiffworkflow_backend.utils.pagination import SortKey
+from spiffworkflow_backend.utils.pagination import paginate_query
 
 
 def task_allows_guest(
@@ -88,9 +91,45 @@ def task_list_my_tasks(
     page: int = 1,
     per_page: int = 100,
     sort: str = "-id",
+    cursor: str | None = None,
+    total_count: str | None = None,
 ) -> flask.wrappers.Response:
     principal = _find_principal_or_raise()
 
+    if current_app.config["SPIFFWORKFLOW_BACKEND_USE_HUMAN_TASK_INBOX"]:
+        human_task_inbox_query = _human_task_inbox_query(principal.user_id)
+        if process_instance_id is not None:
+            human_task_inbox_query = human_task_inbox_query.filter(
+                HumanTaskInboxModel.process_instance_id == process_instance_id,
+                HumanTaskInboxModel.process_instance_status != ProcessInstanceStatus.error.value,
+            )
+        human_tasks = paginate_query(
+            human_task_inbox_query.add_columns(
+                HumanTaskModel.task_id.label("id"),  # type: ignore
+                HumanTaskModel.task_name,
+                HumanTaskModel.task_title,
+                HumanTaskModel.process_model_display_name,
+                HumanTaskModel.process_instance_id,
+                HumanTaskModel.created_at_in_seconds,
+                HumanTaskModel.updated_at_in_seconds,
+                HumanTaskModel.json_metadata,
+                HumanTaskInboxModel.process_model_identifier,
+                HumanTaskInboxModel.process_instance_status,
+                HumanTaskInboxModel.process_instance_summary,
+                HumanTaskInboxModel.last_milestone_bpmn_name,
+                HumanTaskInboxModel.process_initiator_username,
+                HumanTaskInboxModel.assigned_user_group_identifier,
+                HumanTaskInboxModel.potential_owner_usernames,
+                HumanTaskInboxModel.human_task_id,
+            ),
+            [SortKey(HumanTaskInboxModel.human_task_id, descending=sort != "id")],  # type: ignore
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            total_count=total_count,
+        )
+        return make_response(jsonify({"results": human_tasks.items, "pagination": human_tasks.pagination_json()}), 200)
+
     process_initiator_user = aliased(UserModel)
     lane_group = aliased(GroupModel)
     human_task_group = aliased(GroupModel)
@@ -98,10 +137,8 @@ def task_list_my_tasks(
     htum_all = aliased(HumanTaskUserModel)
     assigned_user_all = aliased(UserModel)
 
-    human_task_id_order = HumanTaskModel.id.asc() if sort == "id" else HumanTaskModel.id.desc()  # type: ignore
     human_task_query = (
-        HumanTaskModel.query.order_by(human_task_id_order)
-        .group_by(HumanTaskModel.id)
+        HumanTaskModel.query.group_by(HumanTaskModel.id)
         .join(ProcessInstanceModel, ProcessInstanceModel.id == HumanTaskModel.process_instance_id)
         .join(process_initiator_user, process_initiator_user.id == ProcessInstanceModel.process_initiator_id)
         .filter(HumanTaskModel.completed == False)  # noqa: E712
@@ -136,7 +173,7 @@ def task_list_my_tasks(
     # error in postgres:
     #   psycopg2.errors.GroupingError) column \"process_instance.process_model_identifier\" must
     #   appear in the GROUP BY clause or be used in an aggregate function
-    human_tasks = human_task_query.add_columns(
+    human_tasks_query = human_task_query.add_columns(
         HumanTaskModel.task_id.label("id"),  # type: ignore
         HumanTaskModel.task_name,
         HumanTaskModel.task_title,
@@ -152,15 +189,19 @@ def task_list_my_tasks(
         func.max(process_initiator_user.username).label("process_initiator_username"),
         assigned_group_identifiers,
         potential_owner_usernames,
-    ).paginate(page=page, per_page=per_page, error_out=False)
+    )
+    human_tasks = paginate_query(
+        human_tasks_query,
+        [SortKey(HumanTaskModel.id, descending=sort != "id")],  # type: ignore
+        page=page,
+        per_page=per_page,
+        cursor=cursor,
+        total_count=total_count,
+    )
 
     response_json = {
         "results": human_tasks.items,
-        "pagination": {
-            "count": len(human_tasks.items),
-            "total": human_tasks.total,
-            "pages": human_tasks.pages,
-        },
+        "pagination": human_tasks.pagination_json(),
     }
 
     return make_response(jsonify(response_json), 200)
@@ -227,29 +268,41 @@ def task_list_completed(process_instance_id: int, page: int = 1, per_page: int =
     return make_response(jsonify(response_json), 200)
 
 
-def task_list_for_my_open_processes(page: int = 1, per_page: int = 100) -> flask.wrappers.Response:
-    return _get_tasks(page=page, per_page=per_page)
+def task_list_for_my_open_processes(
+    page: int = 1, per_page: int = 100, cursor: str | None = None, total_count: str | None = None
+) -> flask.wrappers.Response:
+    return _get_tasks(page=page, per_page=per_page, cursor=cursor, total_count=total_count)
 
 
 # DEPRECATED: used to drive old homepage
-def task_list_for_me(page: int = 1, per_page: int = 100) -> flask.wrappers.Response:
+def task_list_for_me(
+    page: int = 1, per_page: int = 100, cursor: str | None = None, total_count: str | None = None
+) -> flask.wrappers.Response:
     return _get_tasks(
         processes_started_by_user=False,
         has_lane_assignment_id=False,
         page=page,
         per_page=per_page,
+        cursor=cursor,
+        total_count=total_count,
     )
 
 
 # DEPRECATED: used to drive old homepage
 def task_list_for_my_groups(
-    user_group_identifier: str | None = None, page: int = 1, per_page: int = 100
+    user_group_identifier: str | None = None,
+    page: int = 1,
+    per_page: int = 100,
+    cursor: str | None = None,
+    total_count: str | None = None,
 ) -> flask.wrappers.Response:
     return _get_tasks(
         user_group_identifier=user_group_identifier,
         processes_started_by_user=False,
         page=page,
         per_page=per_page,
+        cursor=cursor,
+        total_count=total_count,
     )
 
 
@@ -704,13 +757,10 @@ def _interstitial_stream(
     if spiff_task is not None and spiff_task.id not in reported_ids:
         task_data = spiff_task.data
         if task_data is None or task_data == {}:
-            json_data = (
-                JsonDataModel.query.join(TaskModel, TaskModel.json_data_hash == JsonDataModel.hash)
-                .filter(TaskModel.guid == str(spiff_task.id))
-                .first()
-            )
-            if json_data is not None:
-                task_data = json_data.data
+            task_model = TaskModel.query.filter_by(guid=str(spiff_task.id)).first()
+            if task_model is not None:
+                json_data_hash = task_model.json_data_hash
+                task_data = JsonDataModel.data_dicts_by_hash([json_data_hash]).get(json_data_hash, task_data)
         task = ProcessInstanceService.spiff_task_to_api_task(runtime, spiff_task)
         try:
             instructions = _render_instructions(spiff_task, task_data=task_data)
@@ -884,9 +934,22 @@ def _get_tasks(
     page: int = 1,
     per_page: int = 100,
     user_group_identifier: str | None = None,
+    cursor: str | None = None,
+    total_count: str | None = None,
 ) -> flask.wrappers.Response:
     user_id = g.user.id
 
+    if not processes_started_by_user and current_app.config["SPIFFWORKFLOW_BACKEND_USE_HUMAN_TASK_INBOX"]:
+        return _get_tasks_from_human_task_inbox(
+            user_id,
+            has_lane_assignment_id=has_lane_assignment_id,
+            page=page,
+            per_page=per_page,
+            user_group_identifier=user_group_identifier,
+            cursor=cursor,
+            total_count=total_count,
+        )
+
     # use distinct to ensure we only get one row per human task otherwise
     # we can get back multiple for the same human task row which throws off
     # pagination later on
@@ -966,7 +1029,7 @@ def _get_tasks(
         user_username_column = func.max(UserModel.username).label("process_initiator_username")
         lane_name_column = func.max(HumanTaskModel.lane_name).label("lane_name")
 
-    human_tasks = (
+    human_tasks = paginate_query(
         human_tasks_query.add_columns(
             process_model_identifier_column,
             process_instance_status_column,
@@ -981,23 +1044,88 @@ def _get_tasks(
             HumanTaskModel.json_metadata,
             lane_name_column,
             potential_owner_usernames_from_group_concat_or_similar,
-        )
-        .order_by(desc(HumanTaskModel.id))  # type: ignore
-        .paginate(page=page, per_page=per_page, error_out=False)
+        ),
+        [SortKey(HumanTaskModel.id, descending=True)],  # type: ignore
+        page=page,
+        per_page=per_page,
+        cursor=cursor,
+        total_count=total_count,
     )
 
     response_json = {
         "results": human_tasks.items,
-        "pagination": {
-            "count": len(human_tasks.items),
-            "total": human_tasks.total,
-            "pages": human_tasks.pages,
-        },
+        "pagination": human_tasks.pagination_json(),
     }
 
     return make_response(jsonify(response_json), 200)
 
 
+def _get_tasks_from_human_task_inbox(
+    user_id: int,
+    has_lane_assignment_id: bool,
+    page: int,
+    per_page: int,
+    user_group_identifier: str | None,
+    cursor: str | None,
+    total_count: str | None,
+) -> flask.wrappers.Response:
+    human_task_inbox_query = _human_task_inbox_query(user_id).filter(
+        HumanTaskInboxModel.process_initiator_id != user_id,
+        HumanTaskInboxModel.process_instance_status != ProcessInstanceStatus.error.value,
+    )
+    if not has_lane_assignment_id:
+        # tasks assigned to users individually
+        human_task_inbox_query = human_task_inbox_query.filter(HumanTaskInboxModel.has_group_assignment == False)  # noqa: E712
+    elif user_group_identifier:
+        human_task_inbox_query = human_task_inbox_query.filter(
+            or_(
+                exists().where(
+                    GroupModel.id == HumanTaskModel.lane_assignment_id,
+                    GroupModel.identifier == user_group_identifier,
+                ),
+                exists().where(
+                    HumanTaskGroupModel.human_task_id == HumanTaskModel.id,
+                    GroupModel.id == HumanTaskGroupModel.group_id,
+                    GroupModel.identifier == user_group_identifier,
+                ),
+            )
+        )
+    else:
+        human_task_inbox_query = human_task_inbox_query.filter(HumanTaskInboxModel.has_group_assignment == True)  # noqa: E712
+
+    human_tasks = paginate_query(
+        human_task_inbox_query.add_columns(
+            HumanTaskInboxModel.process_model_identifier,
+            HumanTaskInboxModel.process_instance_status,
+            HumanTaskInboxModel.process_initiator_username,
+            HumanTaskInboxModel.assigned_user_group_identifier,
+            HumanTaskModel.task_name,
+            HumanTaskModel.task_title,
+            HumanTaskModel.process_model_display_name,
+            HumanTaskModel.process_instance_id,
+            HumanTaskModel.updated_at_in_seconds,
+            HumanTaskModel.created_at_in_seconds,
+            HumanTaskModel.json_metadata,
+            HumanTaskModel.lane_name,
+            HumanTaskInboxModel.potential_owner_usernames,
+            HumanTaskInboxModel.human_task_id,
+        ),
+        [SortKey(HumanTaskInboxModel.human_task_id, descending=True)],  # type: ignore
+        page=page,
+        per_page=per_page,
+        cursor=cursor,
+        total_count=total_count,
+    )
+    return make_response(jsonify({"results": human_tasks.items, "pagination": human_tasks.pagination_json()}), 200)
+
+
+def _human_task_inbox_query(user_id: int) -> Any:
+    """Open human tasks assigned to the user. human_task_inbox has one row per task and user, so nothing needs grouping."""
+    return HumanTaskModel.query.join(HumanTaskInboxModel, HumanTaskInboxModel.human_task_id == HumanTaskModel.id).filter(
+        HumanTaskInboxModel.user_id == user_id
+    )
+
+
 def _get_potential_owner_usernames(assigned_user: AliasedClass) -> Any:
     potential_owner_usernames_from_group_concat_or_similar = func.group_concat(assigned_user.username.distinct()).label(
         "potential_owner_usernames"
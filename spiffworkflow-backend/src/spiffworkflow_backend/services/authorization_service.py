@@ -1,12 +1,17 @@
 import inspect
 import re
+from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
+from typing import TypeVar
 
 import yaml
 from flask import current_app
 from flask import g
+from flask import has_request_context
 from flask import request
+from flask.wrappers import Response
+from prometheus_client import Histogram
 from sqlalchemy import and_
 from sqlalchemy import func
 from sqlalchemy import literal
@@ -36,8 +41,17 @@ from spiffworkflow_backend.models.user import SPIFF_GUEST_USER
 from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.models.user_group_assignment import UserGroupAssignmentModel
 from spiffworkflow_backend.models.user_group_assignment_waiting import UserGroupAssignmentWaitingModel
+from spiffworkflow_backend.services.permission_index_service import PermissionIndexService
 from spiffworkflow_backend.services.user_service import UserService
 
+T = TypeVar("T")
+
+AUTHORIZATION_QUERIES_PER_REQUEST = Histogram(
+    "spiff_authorization_queries_per_request",
+    "Principal and permission lookups against the database made to authorize one API request.",
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+
 
 @dataclass
 class PermissionToAssign:
@@ -98,7 +112,13 @@ class AuthorizationService:
     def has_permission(cls, principals: list[PrincipalModel], permission: str, target_uri: str) -> bool:
         principal_ids = [p.id for p in principals]
         target_uri_normalized = remove_api_prefix(target_uri)
+        if PermissionIndexService.is_enabled():
+            permission_index = PermissionIndexService.index_for_principals(
+                principal_ids, on_build=cls._record_authorization_query
+            )
+            return permission_index.permits(permission, target_uri_normalized)
 
+        cls._record_authorization_query()
         permission_assignments = (
             PermissionAssignmentModel.query.filter(PermissionAssignmentModel.principal_id.in_(principal_ids))
             .filter_by(permission=permission)
@@ -131,19 +151,66 @@ class AuthorizationService:
 
     @classmethod
     def user_has_permission(cls, user: UserModel, permission: str, target_uri: str) -> bool:
-        principals = UserService.all_principals_for_user(user)
+        principals = cls.all_principals_for_user(user)
         return cls.has_permission(principals, permission, target_uri)
 
+    @classmethod
+    def all_principals_for_user(cls, user: UserModel) -> list[PrincipalModel]:
+        def principals() -> list[PrincipalModel]:
+            cls._record_authorization_query()
+            return UserService.all_principals_for_user(user)
+
+        return cls._resolve_once_per_request(user, "principals", principals)
+
     @classmethod
     def all_permission_assignments_for_user(cls, user: UserModel) -> list[PermissionAssignmentModel]:
-        principals = UserService.all_principals_for_user(user)
-        principal_ids = [p.id for p in principals]
-        permission_assignments: list[PermissionAssignmentModel] = (
-            PermissionAssignmentModel.query.filter(PermissionAssignmentModel.principal_id.in_(principal_ids))
-            .options(db.joinedload(PermissionAssignmentModel.permission_target))
-            .all()
-        )
-        return permission_assignments
+        def permission_assignments() -> list[PermissionAssignmentModel]:
+            principal_ids = [p.id for p in cls.all_principals_for_user(user)]
+            cls._record_authorization_query()
+            permission_assignments: list[PermissionAssignmentModel] = (
+                PermissionAssignmentModel.query.filter(PermissionAssignmentModel.principal_id.in_(principal_ids))
+                .options(db.joinedload(PermissionAssignmentModel.permission_target))
+                .all()
+            )
+            return permission_assignments
+
+        # callers only read these, so they can share the same list
+        return cls._resolve_once_per_request(user, "permission_assignments", permission_assignments)
+
+    @classmethod
+    def _resolve_once_per_request(cls, user: UserModel, name: str, resolve: Callable[[], T]) -> T:
+        """Resolves part of a user's authorization context once per API request and permissions generation.
+
+        Committing permission or group membership changes moves to a new generation, so they are picked up
+        within the same request. Outside of requests and while such changes are uncommitted it resolves every time.
+        """
+        if not has_request_context() or user.id is None or PermissionIndexService.has_uncommitted_permission_changes():
+            return resolve()
+
+        authorization_context = g.setdefault("authorization_context", {})
+        key = (name, user.id, PermissionIndexService.generation())
+        if key not in authorization_context:
+            authorization_context[key] = resolve()
+        return authorization_context[key]  # type: ignore
+
+    @classmethod
+    def _record_authorization_query(cls) -> None:
+        if has_request_context():
+            g.authorization_query_count = g.get("authorization_query_count", 0) + 1
+
+    @classmethod
+    def start_request_authorization_context(cls) -> None:
+        """Starts each request without principals or permissions resolved by an earlier request in the same app context."""
+        g.pop("authorization_context", None)
+        g.authorization_query_count = 0
+
+    @classmethod
+    def finish_request_authorization_context(cls, response: Response) -> Response:
+        authorization_query_count = g.pop("authorization_query_count", None)
+        if authorization_query_count is not None:
+            AUTHORIZATION_QUERIES_PER_REQUEST.observe(authorization_query_count)
+        g.pop("authorization_context", None)
+        return response
 
     @classmethod
     def permission_assignments_include(
@@ -194,6 +261,8 @@ class AuthorizationService:
         for group in GroupModel.query.all():
             db.session.delete(group)
         db.session.commit()
+        # bulk deletes do not go through the session so they do not clear permission indexes on commit
+        PermissionIndexService.clear()
 
     # if you have access to PG:hey:%, you should be able to see PG hey, obviously.
     # if you have access to PG:hey:yo:%, you should ALSO be able to see PG hey, because that allows you to navigate to hey:yo.
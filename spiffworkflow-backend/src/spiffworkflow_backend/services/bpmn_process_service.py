@@ -157,7 +157,9 @@ class BpmnProcessService:
         bpmn_process_definition_dict: dict = copy.deepcopy(bpmn_process_definition.properties_json)
         bpmn_process_definition_dict["task_specs"] = {}
         for task_definition in task_definitions:
-            bpmn_process_definition_dict["task_specs"][task_definition.bpmn_identifier] = task_definition.properties_json
+            bpmn_process_definition_dict["task_specs"][task_definition.bpmn_identifier] = copy.deepcopy(
+                task_definition.properties_json
+            )
             cls._update_bpmn_definition_mappings(
                 bpmn_definition_to_task_definitions_mappings,
                 bpmn_process_definition.bpmn_identifier,
@@ -189,7 +191,7 @@ class BpmnProcessService:
                 bpmn_subprocess_definition.bpmn_identifier,
                 bpmn_process_definition=bpmn_subprocess_definition,
             )
-            bpmn_process_definition_dict: dict = bpmn_subprocess_definition.properties_json
+            bpmn_process_definition_dict: dict = copy.deepcopy(bpmn_subprocess_definition.properties_json)
             spiff_bpmn_process_dict["subprocess_specs"][bpmn_subprocess_definition.bpmn_identifier] = bpmn_process_definition_dict
             spiff_bpmn_process_dict["subprocess_specs"][bpmn_subprocess_definition.bpmn_identifier]["task_specs"] = {}
             bpmn_subprocess_definition_bpmn_identifiers[bpmn_subprocess_definition.id] = (
@@ -210,7 +212,7 @@ class BpmnProcessService:
             )
             spiff_bpmn_process_dict["subprocess_specs"][bpmn_subprocess_definition_bpmn_identifier]["task_specs"][
                 task_definition.bpmn_identifier
-            ] = task_definition.properties_json
+            ] = copy.deepcopy(task_definition.properties_json)
 
     @classmethod
     def truncate_string(cls, input_string: str | None, max_length: int) -> str | None:
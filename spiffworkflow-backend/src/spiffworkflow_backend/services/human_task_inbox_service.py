@@ -0,0 +1,195 @@
+from collections.abc import Iterable
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import delete
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.group import GroupModel
+from spiffworkflow_backend.models.human_task import HumanTaskModel
+from spiffworkflow_backend.models.human_task_group import HumanTaskGroupModel
+from spiffworkflow_backend.models.human_task_inbox import HumanTaskInboxModel
+from spiffworkflow_backend.models.human_task_user import HumanTaskUserModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.user import UserModel
+
+# process instance attributes copied to the inbox rows of its human tasks, by the inbox column they are copied to
+INBOX_PROCESS_INSTANCE_ATTRIBUTES = {
+    "process_model_identifier": "process_model_identifier",
+    "status": "process_instance_status",
+    "summary": "process_instance_summary",
+    "last_milestone_bpmn_name": "last_milestone_bpmn_name",
+}
+REFRESH_BATCH_SIZE = 500
+
+
+class HumanTaskInboxService:
+    """Keeps human_task_inbox in step with the human tasks, assignments and process instances it is built from.
+
+    The session listener below refreshes the rows of every human task whose own row or assignments change in a flush,
+    so it covers tasks created and completed in ProcessInstanceRuntime._process_human_tasks as well as users and groups
+    being assigned or unassigned from anywhere else. Changes to the copied process instance attributes are written
+    to the rows of all of that process instance's tasks.
+    """
+
+    @classmethod
+    def refresh_human_tasks(cls, human_task_ids: Iterable[int]) -> None:
+        """Rebuilds the inbox rows of the human tasks. Tasks that are completed or deleted lose theirs."""
+        unique_human_task_ids = sorted(set(human_task_ids))
+        for batch_start in range(0, len(unique_human_task_ids), REFRESH_BATCH_SIZE):
+            batch = unique_human_task_ids[batch_start : batch_start + REFRESH_BATCH_SIZE]
+            db.session.execute(
+                delete(HumanTaskInboxModel)
+                .where(HumanTaskInboxModel.human_task_id.in_(batch))  # type: ignore
+                .execution_options(synchronize_session=False)
+            )
+            inbox_rows = cls.inbox_rows_for_human_tasks(batch)
+            if inbox_rows:
+                db.session.execute(HumanTaskInboxModel.__table__.insert(), inbox_rows)
+
+    @classmethod
+    def update_process_instances(cls, process_instances: Iterable[ProcessInstanceModel]) -> None:
+        for process_instance in process_instances:
+            db.session.execute(
+                update(HumanTaskInboxModel)
+                .where(HumanTaskInboxModel.process_instance_id == process_instance.id)
+                .values(
+                    {
+                        inbox_column: getattr(process_instance, attribute)
+                        for attribute, inbox_column in INBOX_PROCESS_INSTANCE_ATTRIBUTES.items()
+                    }
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    @classmethod
+    def delete_process_instances(cls, process_instance_ids: Iterable[int]) -> None:
+        db.session.execute(
+            delete(HumanTaskInboxModel)
+            .where(HumanTaskInboxModel.process_instance_id.in_(list(process_instance_ids)))  # type: ignore
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """Rebuilds the whole inbox from the open human tasks, for rows written without the session, and returns its size."""
+        db.session.execute(delete(HumanTaskInboxModel).execution_options(synchronize_session=False))
+        open_human_task_ids = (
+            db.session.execute(select(HumanTaskModel.id).where(HumanTaskModel.completed == False))  # noqa: E712
+            .scalars()
+            .all()
+        )
+        cls.refresh_human_tasks(open_human_task_ids)
+        db.session.commit()
+        return int(db.session.query(HumanTaskInboxModel).count())
+
+    @classmethod
+    def inbox_rows_for_human_tasks(cls, human_task_ids: list[int]) -> list[dict[str, Any]]:
+        human_tasks = db.session.execute(
+            select(
+                HumanTaskModel.id,
+                HumanTaskModel.process_instance_id,
+                HumanTaskModel.lane_assignment_id,
+                ProcessInstanceModel.process_initiator_id,
+                ProcessInstanceModel.process_model_identifier,
+                ProcessInstanceModel.status,
+                ProcessInstanceModel.summary,
+                ProcessInstanceModel.last_milestone_bpmn_name,
+                UserModel.username,
+            )
+            .join(ProcessInstanceModel, ProcessInstanceModel.id == HumanTaskModel.process_instance_id)
+            .join(UserModel, UserModel.id == ProcessInstanceModel.process_initiator_id)
+            .where(
+                HumanTaskModel.id.in_(human_task_ids),  # type: ignore
+                HumanTaskModel.completed == False,  # noqa: E712
+            )
+        ).all()
+        if not human_tasks:
+            return []
+        open_human_task_ids = [human_task.id for human_task in human_tasks]
+
+        assignees: dict[int, dict[int, str]] = {}
+        for human_task_id, user_id, username in db.session.execute(
+            select(HumanTaskUserModel.human_task_id, UserModel.id, UserModel.username)
+            .join(UserModel, UserModel.id == HumanTaskUserModel.user_id)
+            .where(HumanTaskUserModel.human_task_id.in_(open_human_task_ids))
+        ):
+            assignees.setdefault(human_task_id, {})[user_id] = username
+
+        lane_group_ids = {human_task.lane_assignment_id for human_task in human_tasks if human_task.lane_assignment_id}
+        lane_group_identifiers: dict[int, str] = {}
+        if lane_group_ids:
+            lane_group_identifiers = dict(
+                db.session.execute(select(GroupModel.id, GroupModel.identifier).where(GroupModel.id.in_(lane_group_ids))).all()  # type: ignore
+            )
+        lane_owner_group_identifiers: dict[int, list[str]] = {}
+        for human_task_id, group_identifier in db.session.execute(
+            select(HumanTaskGroupModel.human_task_id, GroupModel.identifier)
+            .join(GroupModel, GroupModel.id == HumanTaskGroupModel.group_id)
+            .where(HumanTaskGroupModel.human_task_id.in_(open_human_task_ids))
+        ):
+            lane_owner_group_identifiers.setdefault(human_task_id, []).append(group_identifier)
+
+        inbox_rows = []
+        for human_task in human_tasks:
+            group_identifiers = []
+            if human_task.lane_assignment_id in lane_group_identifiers:
+                group_identifiers.append(lane_group_identifiers[human_task.lane_assignment_id])
+            group_identifiers.extend(sorted(lane_owner_group_identifiers.get(human_task.id, [])))
+            users = assignees.get(human_task.id, {})
+            for user_id in users:
+                inbox_rows.append(
+                    {
+                        "human_task_id": human_task.id,
+                        "user_id": user_id,
+                        "process_instance_id": human_task.process_instance_id,
+                        "process_initiator_id": human_task.process_initiator_id,
+                        "has_group_assignment": bool(
+                            human_task.lane_assignment_id or human_task.id in lane_owner_group_identifiers
+                        ),
+                        "process_model_identifier": human_task.process_model_identifier,
+                        "process_instance_status": human_task.status,
+                        "process_instance_summary": human_task.summary,
+                        "last_milestone_bpmn_name": human_task.last_milestone_bpmn_name,
+                        "process_initiator_username": human_task.username,
+                        "assigned_user_group_identifier": ", ".join(dict.fromkeys(group_identifiers)) or None,
+                        "potential_owner_usernames": ",".join(sorted(users.values())) or None,
+                    }
+                )
+        return inbox_rows
+
+
+@listens_for(Session, "after_flush")  # type: ignore
+def refresh_human_task_inbox_after_flush(session: Any, flush_context: Any) -> None:
+    human_task_ids: set[int] = set()
+    updated_process_instances = []
+    deleted_process_instance_ids = set()
+    for instance in chain(session.new, session.deleted):
+        if isinstance(instance, HumanTaskModel):
+            human_task_ids.add(instance.id)
+        elif isinstance(instance, HumanTaskUserModel | HumanTaskGroupModel) and instance.human_task_id is not None:
+            human_task_ids.add(instance.human_task_id)
+    for instance in session.deleted:
+        if isinstance(instance, ProcessInstanceModel):
+            deleted_process_instance_ids.add(instance.id)
+    for instance in session.dirty:
+        if isinstance(instance, HumanTaskModel) and session.is_modified(instance):
+            human_task_ids.add(instance.id)
+        elif isinstance(instance, HumanTaskUserModel | HumanTaskGroupModel) and instance.human_task_id is not None:
+            human_task_ids.add(instance.human_task_id)
+        elif isinstance(instance, ProcessInstanceModel) and any(
+            get_history(instance, attribute).has_changes() for attribute in INBOX_PROCESS_INSTANCE_ATTRIBUTES
+        ):
+            updated_process_instances.append(instance)
+
+    if deleted_process_instance_ids:
+        HumanTaskInboxService.delete_process_instances(deleted_process_instance_ids)
+    if updated_process_instances:
+        HumanTaskInboxService.update_process_instances(updated_process_instances)
+    if human_task_ids:
+        HumanTaskInboxService.refresh_human_tasks(human_task_ids)
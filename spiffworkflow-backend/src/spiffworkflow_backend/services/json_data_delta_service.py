@@ -0,0 +1,176 @@
+import json
+
+from flask import current_app
+from prometheus_client import Counter
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataDict
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.models.task import TaskModel
+
+JSON_DATA_DELTA_ROWS_TOTAL = Counter(
+    "spiff_json_data_delta_rows_total",
+    "json_data rows written while delta encoding is enabled, split by whether they hold a delta or the full data.",
+    ["format"],
+)
+
+
+class JsonDataDeltaService:
+    """Stores task data as a delta against the data of the parent task when that saves space.
+
+    Rows keep the hash of the full data so task models and json_data lookups do not change. Readers go through
+    JsonDataModel.data_dicts_by_hash which rebuilds the data. Chains of deltas are never deeper than
+    SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_MAX_CHAIN_DEPTH.
+    """
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING"])
+
+    @classmethod
+    def max_chain_depth(cls) -> int:
+        return int(current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_MAX_CHAIN_DEPTH"])
+
+    @classmethod
+    def delta_is_smaller(cls, delta: dict, data: dict) -> bool:
+        """A delta is only worth storing if it leaves out at least one top level key of the data."""
+        return len(delta["added"]) + len(delta["changed"]) < len(data)
+
+    @classmethod
+    def delta_encode_json_data_records(
+        cls, json_data_dicts: dict[str, JsonDataDict], delta_bases: dict[str, JsonDataDict]
+    ) -> dict[str, JsonDataDict]:
+        """Returns the rows to insert for json_data_dicts, using a delta for each one with a usable base.
+
+        delta_bases maps the hash of some of the json_data_dicts to the json data dict to use as their base.
+        A base can only be used if it is already in the database or is also being written and its own chain
+        leaves room for one more delta. Rows that are already in the database are left out.
+        """
+        max_chain_depth = cls.max_chain_depth()
+        deltas: dict[str, dict] = {}
+        for json_data_hash, base_json_data_dict in delta_bases.items():
+            if json_data_hash not in json_data_dicts or base_json_data_dict["hash"] == json_data_hash:
+                continue
+            data = json_data_dicts[json_data_hash]["data"]
+            delta = JsonDataModel.delta_from_dicts(base_json_data_dict["data"], data)
+            if cls.delta_is_smaller(delta, data):
+                deltas[json_data_hash] = delta
+
+        existing_depths: dict[str, int] = {}
+        if len(deltas) > 0:
+            hashes_to_check = set(json_data_dicts.keys()) | {delta_bases[h]["hash"] for h in deltas}
+            existing_depths = dict(
+                db.session.query(JsonDataModel.hash, JsonDataModel.delta_depth)
+                .filter(JsonDataModel.hash.in_(hashes_to_check))  # type: ignore
+                .all()
+            )
+
+        depths: dict[str, int] = {}
+        delta_base_hashes: dict[str, str] = {}
+        for json_data_hash in json_data_dicts:
+            # walk down the bases being written until reaching one whose depth is known. a hash seen twice
+            # means the bases form a cycle so the last hash in the walk is stored in full.
+            chain: list[str] = []
+            current_hash = json_data_hash
+            while current_hash in deltas and current_hash not in depths and current_hash not in existing_depths:
+                chain.append(current_hash)
+                current_hash = delta_bases[current_hash]["hash"]
+                if current_hash in chain:
+                    break
+
+            base_depth: int | None = None
+            if current_hash in existing_depths:
+                base_depth = existing_depths[current_hash]
+            elif current_hash in depths:
+                base_depth = depths[current_hash]
+            elif current_hash in json_data_dicts and current_hash not in chain:
+                base_depth = 0
+                depths[current_hash] = 0
+
+            for chain_hash in reversed(chain):
+                base_hash = delta_bases[chain_hash]["hash"]
+                if base_depth is not None and base_depth < max_chain_depth:
+                    depths[chain_hash] = base_depth + 1
+                    delta_base_hashes[chain_hash] = base_hash
+                else:
+                    depths[chain_hash] = 0
+                base_depth = depths[chain_hash]
+
+        json_data_records: dict[str, JsonDataDict] = {}
+        for json_data_hash, json_data_dict in json_data_dicts.items():
+            if json_data_hash in existing_depths:
+                continue
+            delta_base_hash = delta_base_hashes.get(json_data_hash)
+            # every row gets every column so they can be inserted with one statement
+            json_data_records[json_data_hash] = {
+                "hash": json_data_hash,
+                "data": json_data_dict["data"] if delta_base_hash is None else deltas[json_data_hash],
+                "delta_base_hash": delta_base_hash,
+                "delta_depth": 0 if delta_base_hash is None else depths[json_data_hash],
+            }
+            JSON_DATA_DELTA_ROWS_TOTAL.labels(format="full" if delta_base_hash is None else "delta").inc()
+        return json_data_records
+
+    @classmethod
+    def backfill_process_instance(cls, process_instance_id: int) -> dict[str, int]:
+        """Rewrites the full data rows of a process instance's tasks as deltas against their parent task's data.
+
+        Rows that are already deltas or that another row uses as its base are left alone so no existing chain
+        gets deeper. This is meant to run while the process instance is not being changed.
+        """
+        task_rows = (
+            db.session.query(TaskModel.guid, TaskModel.json_data_hash, TaskModel.properties_json)
+            .filter(TaskModel.process_instance_id == process_instance_id)
+            .order_by(TaskModel.id)
+            .all()
+        )
+        json_data_hashes_by_guid = {t.guid: t.json_data_hash for t in task_rows}
+        base_hashes: dict[str, str] = {}
+        for task_row in task_rows:
+            parent_json_data_hash = json_data_hashes_by_guid.get(task_row.properties_json.get("parent"))
+            if parent_json_data_hash is not None and parent_json_data_hash != task_row.json_data_hash:
+                base_hashes.setdefault(task_row.json_data_hash, parent_json_data_hash)
+
+        stats = {"rows_converted": 0, "bytes_before": 0, "bytes_after": 0}
+        if len(base_hashes) == 0:
+            return stats
+
+        all_hashes = set(base_hashes.keys()) | set(base_hashes.values())
+        stored_rows = {
+            r.hash: r
+            for r in db.session.query(
+                JsonDataModel.hash, JsonDataModel.data, JsonDataModel.delta_base_hash, JsonDataModel.delta_depth
+            )
+            .filter(JsonDataModel.hash.in_(all_hashes))  # type: ignore
+            .all()
+        }
+        used_as_base = {
+            r.delta_base_hash
+            for r in db.session.query(JsonDataModel.delta_base_hash)
+            .filter(JsonDataModel.delta_base_hash.in_(base_hashes.keys()))  # type: ignore
+            .distinct()
+            .all()
+        }
+        full_data = JsonDataModel.data_dicts_by_hash(all_hashes)
+        depths = {json_data_hash: stored_row.delta_depth for json_data_hash, stored_row in stored_rows.items()}
+
+        max_chain_depth = cls.max_chain_depth()
+        for json_data_hash, base_hash in base_hashes.items():
+            stored_row = stored_rows.get(json_data_hash)
+            if stored_row is None or stored_row.delta_base_hash is not None or json_data_hash in used_as_base:
+                continue
+            if base_hash not in full_data or depths[base_hash] >= max_chain_depth:
+                continue
+            delta = JsonDataModel.delta_from_dicts(full_data[base_hash], full_data[json_data_hash])
+            if not cls.delta_is_smaller(delta, full_data[json_data_hash]):
+                continue
+
+            depths[json_data_hash] = depths[base_hash] + 1
+            used_as_base.add(base_hash)
+            db.session.query(JsonDataModel).filter(JsonDataModel.hash == json_data_hash).update(
+                {"data": delta, "delta_base_hash": base_hash, "delta_depth": depths[json_data_hash]}
+            )
+            stats["rows_converted"] += 1
+            stats["bytes_before"] += len(json.dumps(stored_row.data))
+            stats["bytes_after"] += len(json.dumps(delta))
+        return stats
@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from flask import current_app
+from prometheus_client import Counter
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataDict
+from spiffworkflow_backend.models.json_data import JsonDataModel
+
+JSON_DATA_HASH_CACHE_ROWS_TOTAL = Counter(
+    "spiff_json_data_hash_cache_rows_total",
+    "json_data rows queued for upsert, split by whether they were written or skipped because the hash is known to exist.",
+    ["result"],
+)
+
+# hashes upserted or read in the current transaction. they only become known hashes once the transaction commits.
+PENDING_HASHES_SESSION_INFO_KEY = "json_data_hashes_pending_commit"
+
+
+class JsonDataHashCacheService:
+    """Per-worker LRU of json_data hashes that are known to be committed to the database.
+
+    Rows in json_data are content addressed and never updated, so a hash that was committed once
+    does not need to be upserted again. Hashes written or read in a transaction are only added when it commits.
+    Anything that deletes json_data rows must call clear.
+    """
+
+    _hashes: OrderedDict[str, None] = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def max_entries(cls) -> int:
+        return int(current_app.config["SPIFFWORKFLOW_BACKEND_JSON_DATA_HASH_CACHE_MAX_ENTRIES"])
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls.max_entries() > 0
+
+    @classmethod
+    def insert_or_update_json_data_records(cls, json_data_hash_to_json_data_dict_mapping: dict[str, JsonDataDict]) -> None:
+        """Upserts the given records except those whose hash is known to already be in the database."""
+        if not cls.is_enabled():
+            JsonDataModel.insert_or_update_json_data_records(json_data_hash_to_json_data_dict_mapping)
+            return
+
+        records_to_write: dict[str, JsonDataDict] = {}
+        with cls._lock:
+            for json_data_hash, json_data_dict in json_data_hash_to_json_data_dict_mapping.items():
+                if json_data_hash in cls._hashes:
+                    cls._hashes.move_to_end(json_data_hash)
+                else:
+                    records_to_write[json_data_hash] = json_data_dict
+
+        skipped_count = len(json_data_hash_to_json_data_dict_mapping) - len(records_to_write)
+        if skipped_count > 0:
+            JSON_DATA_HASH_CACHE_ROWS_TOTAL.labels(result="skipped").inc(skipped_count)
+        if len(records_to_write) > 0:
+            JSON_DATA_HASH_CACHE_ROWS_TOTAL.labels(result="written").inc(len(records_to_write))
+            JsonDataModel.insert_or_update_json_data_records(records_to_write)
+            cls.record_hashes_on_commit(records_to_write.keys())
+
+    @classmethod
+    def record_hashes_on_commit(cls, json_data_hashes: Iterable[str]) -> None:
+        """Adds hashes written or read in the current transaction once it commits.
+
+        Hashes that were read are deferred too since the row could have been inserted earlier in the same transaction.
+        """
+        if not cls.is_enabled():
+            return
+        pending_hashes = db.session.info.setdefault(PENDING_HASHES_SESSION_INFO_KEY, set())
+        pending_hashes.update(json_data_hashes)
+
+    @classmethod
+    def record_persisted_hashes(cls, json_data_hashes: Iterable[str]) -> None:
+        if not cls.is_enabled():
+            return
+        max_entries = cls.max_entries()
+        with cls._lock:
+            for json_data_hash in json_data_hashes:
+                cls._hashes[json_data_hash] = None
+                cls._hashes.move_to_end(json_data_hash)
+            while len(cls._hashes) > max_entries:
+                cls._hashes.popitem(last=False)
+
+    @classmethod
+    def has_hash(cls, json_data_hash: str) -> bool:
+        with cls._lock:
+            return json_data_hash in cls._hashes
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._hashes.clear()
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        with cls._lock:
+            return {"entries": len(cls._hashes)}
+
+
+@listens_for(Session, "after_commit")  # type: ignore
+def record_json_data_hashes_after_commit(session: Any) -> None:
+    pending_hashes = session.info.pop(PENDING_HASHES_SESSION_INFO_KEY, None)
+    if pending_hashes:
+        JsonDataHashCacheService.record_persisted_hashes(pending_hashes)
+
+
+@listens_for(Session, "after_rollback")  # type: ignore
+def discard_json_data_hashes_after_rollback(session: Any) -> None:
+    session.info.pop(PENDING_HASHES_SESSION_INFO_KEY, None)
@@ -0,0 +1,179 @@
+import copy
+from collections.abc import Iterator
+from typing import Any
+
+from prometheus_client import Counter
+from SpiffWorkflow.bpmn.workflow import BpmnWorkflow  # type: ignore
+
+from spiffworkflow_backend.models.json_data import JsonDataModel
+
+LAZY_TASK_DATA_MATERIALIZED_TOTAL = Counter(
+    "spiff_lazy_task_data_materialized_total",
+    "Completed task data blobs loaded on demand after a process instance was hydrated.",
+)
+
+
+class LazyTaskDataLoader:
+    """Loads json data blobs for LazyTaskData as they are touched and counts how many were loaded.
+
+    One loader is created for each hydrated process instance so materialized_count is per runtime.
+    """
+
+    def __init__(self) -> None:
+        self.materialized_count = 0
+        self.unmaterialized: list[LazyTaskData] = []
+
+    def load(self, json_data_hash: str) -> dict:
+        data = JsonDataModel.data_dicts_by_hash([json_data_hash]).get(json_data_hash, {})
+        self.materialized_count += 1
+        LAZY_TASK_DATA_MATERIALIZED_TOTAL.inc()
+        return data
+
+    def materialize_all(self) -> None:
+        """Loads every remaining blob with one query. Use this before walking the data of every task."""
+        pending = [task_data for task_data in self.unmaterialized if not task_data.materialized]
+        self.unmaterialized = []
+        if len(pending) == 0:
+            return
+
+        json_data_hashes = {task_data.json_data_hash for task_data in pending}
+        json_data_mappings = JsonDataModel.data_dicts_by_hash(json_data_hashes)
+        for task_data in pending:
+            # each task gets its own copy since tasks with the same data share a hash
+            task_data.materialize_with(copy.deepcopy(json_data_mappings.get(task_data.json_data_hash, {})))
+        self.materialized_count += len(pending)
+        LAZY_TASK_DATA_MATERIALIZED_TOTAL.inc(len(pending))
+
+    def attach(self, bpmn_process_instance: BpmnWorkflow, lazy_task_data_hashes: dict[str, str]) -> None:
+        if len(lazy_task_data_hashes) == 0:
+            return
+        for spiff_task in bpmn_process_instance.get_tasks():
+            json_data_hash = lazy_task_data_hashes.get(str(spiff_task.id))
+            if json_data_hash is not None:
+                task_data = LazyTaskData(json_data_hash, self)
+                spiff_task.data = task_data
+                self.unmaterialized.append(task_data)
+
+
+class LazyTaskData(dict):
+    """Task data that is only read from the json_data table the first time anything looks at it.
+
+    Every dict method loads the data first so SpiffWorkflow and the api see a normal dict.
+    """
+
+    def __init__(self, json_data_hash: str, loader: LazyTaskDataLoader) -> None:
+        super().__init__()
+        self.json_data_hash = json_data_hash
+        self.materialized = False
+        self._loader = loader
+
+    def materialize_with(self, data: dict) -> None:
+        if not self.materialized:
+            self.materialized = True
+            dict.update(self, data)
+
+    def _materialize(self) -> None:
+        if not self.materialized:
+            self.materialize_with(self._loader.load(self.json_data_hash))
+
+    def __getitem__(self, key: Any) -> Any:
+        self._materialize()
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._materialize()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        self._materialize()
+        dict.__delitem__(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        self._materialize()
+        return dict.__contains__(self, key)
+
+    def __iter__(self) -> Iterator[Any]:
+        self._materialize()
+        return dict.__iter__(self)
+
+    def __reversed__(self) -> Iterator[Any]:
+        self._materialize()
+        return dict.__reversed__(self)
+
+    def __len__(self) -> int:
+        self._materialize()
+        return dict.__len__(self)
+
+    def __eq__(self, other: object) -> bool:
+        self._materialize()
+        if isinstance(other, LazyTaskData):
+            other._materialize()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        self._materialize()
+        return dict.__repr__(self)
+
+    def __or__(self, other: Any) -> dict:
+        return dict(self.items()) | other
+
+    def __ror__(self, other: Any) -> dict:
+        return other | dict(self.items())  # type: ignore
+
+    def __ior__(self, other: Any) -> "LazyTaskData":
+        self.update(other)
+        return self
+
+    def __copy__(self) -> dict:
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict) -> dict:
+        return copy.deepcopy(dict(self.items()), memo)
+
+    def __reduce__(self) -> Any:
+        return (dict, (dict(self.items()),))
+
+    def keys(self) -> Any:
+        self._materialize()
+        return dict.keys(self)
+
+    def values(self) -> Any:
+        self._materialize()
+        return dict.values(self)
+
+    def items(self) -> Any:
+        self._materialize()
+        return dict.items(self)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        self._materialize()
+        return dict.get(self, key, default)
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        self._materialize()
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key: Any, *args: Any) -> Any:
+        self._materialize()
+        return dict.pop(self, key, *args)
+
+    def popitem(self) -> tuple[Any, Any]:
+        self._materialize()
+        return dict.popitem(self)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self._materialize()
+        dict.update(self, *args, **kwargs)
+
+    def clear(self) -> None:
+        self.materialized = True
+        dict.clear(self)
+
+    def copy(self) -> dict:
+        self._materialize()
+        return dict(dict.items(self))
@@ -1,4 +1,3 @@
-import json
 import logging
 import os
 import re
@@ -15,6 +14,8 @@ from uuid import uuid4
 from flask import g
 from flask.app import Flask
 
+from spiffworkflow_backend.utils import fast_json
+
 SPIFF_LOG_HANDLER_SKIP_RECORD_ATTR = "spiff_log_handler_skip_record"
 EVENT_STREAM_PAUSE_FILE = "/tmp/spiff-event-stream-paused"  # noqa: S108 - container-local operator control marker
 EVENT_STREAM_RETRY_INTERVAL_SECONDS = 1.0
@@ -66,7 +67,7 @@ class SpiffLogHandler(SocketHandler):
             self.socket_warning_interval_seconds = 60
 
     def format(self, record: Any) -> str:
-        return json.dumps(
+        return fast_json.dumps(
             {
                 "version": "1.0",
                 "type": record.name,
@@ -359,7 +360,7 @@ class JsonFormatter(logging.Formatter):
         if record.__dict__.get("extras"):
             message_dict = {**record.__dict__["extras"], **message_dict}
 
-        return json.dumps(message_dict, default=str)
+        return fast_json.dumps(message_dict, default=str)
 
 
 def setup_logger_for_app(app: Flask, primary_logger: Any, force_run_with_celery: bool = False) -> None:
@@ -0,0 +1,272 @@
+import time
+from hashlib import sha256
+from typing import Any
+
+from flask import current_app
+from SpiffWorkflow.bpmn.script_engine import PythonScriptEngine  # type: ignore
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.message_instance import MessageInstanceModel
+from spiffworkflow_backend.models.message_instance import MessageStatuses
+from spiffworkflow_backend.models.message_instance import MessageTypes
+from spiffworkflow_backend.models.message_instance_correlation_key import MessageInstanceCorrelationKeyModel
+from spiffworkflow_backend.utils import fast_json
+
+# keeps IN clauses under the bind parameter limits of every supported database
+IN_CLAUSE_BATCH_SIZE = 500
+
+
+class MessageCorrelationIndexService:
+    """Finds the ready receive messages a send message correlates with without evaluating every one of them.
+
+    When a receive message is queued, the values each of its correlation keys expects are stored as hashes.
+    A send message evaluates each distinct set of retrieval expressions that receive messages with its name
+    use against its payload once, and looks up receive messages with the resulting hashes. Receive messages
+    without rows, like ones queued before the index existed, are still checked with MessageInstanceModel.correlates.
+    """
+
+    @classmethod
+    def index_receive_message(cls, message_instance: MessageInstanceModel) -> None:
+        """Adds the correlation rows for a new receive message to the session. Its correlation rules must already be set."""
+        if not isinstance(message_instance.correlation_keys, dict):
+            # leave it to correlates, which handles whatever this is
+            return
+        current_time = round(time.time())
+        rows = [
+            MessageInstanceCorrelationKeyModel(
+                message_instance=message_instance,
+                message_name=message_instance.name,
+                correlation_value_hash=cls._hash({"correlation_keys": cls._normalized(message_instance.correlation_keys)}),
+                created_at_in_seconds=current_time,
+            )
+        ]
+        correlation_value_hashes = set()
+        for expected_values in message_instance.correlation_keys.values():
+            retrieval_expressions = {}
+            values = {}
+            for correlation_rule in message_instance.correlation_rules:
+                expected_value = expected_values.get(correlation_rule.name)
+                if expected_value is None:  # this key is not required for this instance to match.
+                    continue
+                retrieval_expressions[correlation_rule.name] = correlation_rule.retrieval_expression
+                values[correlation_rule.name] = expected_value
+            correlation_value_hash = cls._correlation_value_hash(retrieval_expressions, values)
+            if correlation_value_hash in correlation_value_hashes:
+                continue
+            correlation_value_hashes.add(correlation_value_hash)
+            rows.append(
+                MessageInstanceCorrelationKeyModel(
+                    message_instance=message_instance,
+                    message_name=message_instance.name,
+                    correlation_value_hash=correlation_value_hash,
+                    retrieval_expressions=retrieval_expressions,
+                    retrieval_expressions_hash=cls._hash(retrieval_expressions),
+                    created_at_in_seconds=current_time,
+                )
+            )
+        if message_instance.correlation_keys == {}:
+            # there is nothing to match on so it accepts any message with its name
+            rows.append(
+                MessageInstanceCorrelationKeyModel(
+                    message_instance=message_instance,
+                    message_name=message_instance.name,
+                    correlation_value_hash=cls._correlation_value_hash({}, {}),
+                    retrieval_expressions={},
+                    retrieval_expressions_hash=cls._hash({}),
+                    created_at_in_seconds=current_time,
+                )
+            )
+        db.session.add_all(rows)
+
+    @classmethod
+    def remove_receive_message(cls, message_instance_id: int) -> None:
+        db.session.query(MessageInstanceCorrelationKeyModel).filter(
+            MessageInstanceCorrelationKeyModel.message_instance_id == message_instance_id
+        ).delete(synchronize_session=False)
+
+    @classmethod
+    def correlating_receive_messages(
+        cls,
+        message_instance_send: MessageInstanceModel,
+        expression_engine: PythonScriptEngine,
+        receiving_process_instance_id: int | None = None,
+    ) -> list[MessageInstanceModel]:
+        """Returns the ready receive messages that correlate with the send message, oldest first."""
+        return cls.correlating_receive_messages_for_send_messages(
+            [message_instance_send], expression_engine, receiving_process_instance_id=receiving_process_instance_id
+        )[0]
+
+    @classmethod
+    def correlating_receive_messages_for_send_messages(
+        cls,
+        message_instances_send: list[MessageInstanceModel],
+        expression_engine: PythonScriptEngine,
+        receiving_process_instance_id: int | None = None,
+    ) -> list[list[MessageInstanceModel]]:
+        """Returns the ready receive messages that correlate with each of the send messages, oldest first.
+
+        The send messages must all have the same name. Receive messages are looked up once for all of them.
+        """
+        message_name = message_instances_send[0].name
+        retrieval_expressions_list = cls._retrieval_expressions_for_message_name(message_name)
+        correlation_value_hashes_list = [
+            cls._send_message_correlation_value_hashes(message_instance_send, retrieval_expressions_list, expression_engine)
+            for message_instance_send in message_instances_send
+        ]
+
+        receive_message_ids_by_correlation_value_hash: dict[str, set[int]] = {}
+        all_correlation_value_hashes = sorted(set().union(*correlation_value_hashes_list))
+        for index in range(0, len(all_correlation_value_hashes), IN_CLAUSE_BATCH_SIZE):
+            rows = (
+                db.session.query(
+                    MessageInstanceCorrelationKeyModel.correlation_value_hash,
+                    MessageInstanceCorrelationKeyModel.message_instance_id,
+                )
+                .filter(
+                    MessageInstanceCorrelationKeyModel.message_name == message_name,
+                    MessageInstanceCorrelationKeyModel.correlation_value_hash.in_(  # type: ignore
+                        all_correlation_value_hashes[index : index + IN_CLAUSE_BATCH_SIZE]
+                    ),
+                )
+                .all()
+            )
+            for correlation_value_hash, message_instance_id in rows:
+                receive_message_ids_by_correlation_value_hash.setdefault(correlation_value_hash, set()).add(message_instance_id)
+
+        indexed_receive_message_ids = sorted(set().union(*receive_message_ids_by_correlation_value_hash.values()))
+        indexed_receive_messages_by_id: dict[int, MessageInstanceModel] = {}
+        for index in range(0, len(indexed_receive_message_ids), IN_CLAUSE_BATCH_SIZE):
+            indexed_receive_messages = (
+                cls._ready_receive_messages_query(message_name, receiving_process_instance_id)
+                .filter(
+                    MessageInstanceModel.id.in_(indexed_receive_message_ids[index : index + IN_CLAUSE_BATCH_SIZE])  # type: ignore
+                )
+                .all()
+            )
+            for message_instance_receive in indexed_receive_messages:
+                indexed_receive_messages_by_id[message_instance_receive.id] = message_instance_receive
+        unindexed_receive_messages = (
+            cls._ready_receive_messages_query(message_name, receiving_process_instance_id)
+            .filter(
+                ~db.session.query(MessageInstanceCorrelationKeyModel)
+                .filter(MessageInstanceCorrelationKeyModel.message_instance_id == MessageInstanceModel.id)
+                .exists()
+            )
+            .all()
+        )
+
+        correlating_receive_messages_list = []
+        for message_instance_send, correlation_value_hashes in zip(
+            message_instances_send, correlation_value_hashes_list, strict=True
+        ):
+            receive_message_ids: set[int] = set()
+            for correlation_value_hash in correlation_value_hashes:
+                receive_message_ids.update(receive_message_ids_by_correlation_value_hash.get(correlation_value_hash, set()))
+            message_instances = [
+                indexed_receive_messages_by_id[message_instance_id]
+                for message_instance_id in receive_message_ids
+                if message_instance_id in indexed_receive_messages_by_id
+            ] + [
+                message_instance_receive
+                for message_instance_receive in unindexed_receive_messages
+                if message_instance_receive.correlates(message_instance_send, expression_engine)
+            ]
+            correlating_receive_messages_list.append(sorted(message_instances, key=lambda message_instance: message_instance.id))
+        return correlating_receive_messages_list
+
+    @classmethod
+    def _retrieval_expressions_for_message_name(cls, message_name: str) -> list[dict[str, str]]:
+        # receive messages for the same message almost always share their retrieval expressions, so this is usually one row
+        first_row_ids = (
+            db.session.query(func.min(MessageInstanceCorrelationKeyModel.id))
+            .filter(
+                MessageInstanceCorrelationKeyModel.message_name == message_name,
+                MessageInstanceCorrelationKeyModel.retrieval_expressions_hash != None,  # noqa: E711
+            )
+            .group_by(MessageInstanceCorrelationKeyModel.retrieval_expressions_hash)
+            .all()
+        )
+        retrieval_expressions_rows = (
+            db.session.query(MessageInstanceCorrelationKeyModel.retrieval_expressions)
+            .filter(MessageInstanceCorrelationKeyModel.id.in_([row_id for (row_id,) in first_row_ids]))  # type: ignore
+            .all()
+        )
+        return [retrieval_expressions for (retrieval_expressions,) in retrieval_expressions_rows]
+
+    @classmethod
+    def _send_message_correlation_value_hashes(
+        cls,
+        message_instance_send: MessageInstanceModel,
+        retrieval_expressions_list: list[dict[str, str]],
+        expression_engine: PythonScriptEngine,
+    ) -> set[str]:
+        correlation_value_hashes = set()
+        if isinstance(message_instance_send.correlation_keys, dict):
+            correlation_value_hashes.add(cls._hash({"correlation_keys": cls._normalized(message_instance_send.correlation_keys)}))
+        for retrieval_expressions in retrieval_expressions_list:
+            values = {}
+            try:
+                for name, retrieval_expression in retrieval_expressions.items():
+                    values[name] = expression_engine.environment.evaluate(retrieval_expression, message_instance_send.payload)
+            except Exception as e:
+                # the failure of a payload evaluation may not mean that matches for these
+                # message instances can't happen with other messages.  So don't error up.
+                current_app.logger.warning(
+                    "Error evaluating correlation key when comparing send and receive messages. "
+                    + f"Message name: '{message_instance_send.name}'. Send message id: '{message_instance_send.id}'. "
+                    + f"Expressions {retrieval_expressions} failed with the error: "
+                    + str(e)
+                )
+                continue
+            correlation_value_hashes.add(cls._correlation_value_hash(retrieval_expressions, values))
+        return correlation_value_hashes
+
+    @classmethod
+    def _ready_receive_messages_query(cls, message_name: str, receiving_process_instance_id: int | None) -> Any:
+        query = MessageInstanceModel.query.options(selectinload(MessageInstanceModel.correlation_rules)).filter_by(
+            name=message_name,
+            status=MessageStatuses.ready.value,
+            message_type=MessageTypes.receive.value,
+        )
+        if receiving_process_instance_id is not None:
+            query = query.filter_by(process_instance_id=receiving_process_instance_id)
+        return query
+
+    @classmethod
+    def _correlation_value_hash(cls, retrieval_expressions: dict[str, str], values: dict[str, Any]) -> str:
+        return cls._hash(
+            {
+                "properties": [
+                    [name, retrieval_expressions[name], cls._normalized(values[name])] for name in sorted(retrieval_expressions)
+                ]
+            }
+        )
+
+    @classmethod
+    def _normalized(cls, value: Any) -> Any:
+        """Makes values hash the same exactly when they compare equal in python.
+
+        A hit in the index is not checked again with correlates, so 1, 1.0 and True have to hash the same while 1 and "1",
+        or a dict and a list of its items, must not. Containers are tagged with their type and dict keys keep theirs.
+        """
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if value is None or isinstance(value, int | float | str):
+            return value
+        if isinstance(value, dict):
+            items = [[cls._normalized(key), cls._normalized(item)] for key, item in value.items()]
+            return ["dict", sorted(items, key=lambda normalized_item: fast_json.canonical_dumps(normalized_item[0]))]
+        if isinstance(value, list):
+            return ["list", [cls._normalized(item) for item in value]]
+        if isinstance(value, tuple):
+            return ["tuple", [cls._normalized(item) for item in value]]
+        return ["object", type(value).__qualname__, str(value)]
+
+    @classmethod
+    def _hash(cls, value: Any) -> str:
+        # canonical_dumps writes the same bytes whether or not orjson is installed
+        return sha256(fast_json.canonical_dumps(value).encode("utf8")).hexdigest()
@@ -4,6 +4,7 @@ from dataclasses import dataclass
 
 from flask import current_app
 from prometheus_client import Counter
+from prometheus_client import Gauge
 from prometheus_client import Histogram
 
 from spiffworkflow_backend.services.operation_instrumentation_service import OperationInstrumentation
@@ -28,6 +29,23 @@ MESSAGE_SEND_PHASE_DURATION_SECONDS = Histogram(
     buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
 )
 
+MESSAGE_CORRELATION_BATCH_MESSAGES_TOTAL = Counter(
+    "spiff_message_correlation_batch_messages_total",
+    "Ready send messages handled by the background correlation pass, by how they were handled.",
+    ["result"],
+)
+
+MESSAGE_CORRELATION_BATCH_DURATION_SECONDS = Histogram(
+    "spiff_message_correlation_batch_duration_seconds",
+    "Time spent in background correlation passes that had ready send messages.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+MESSAGE_CORRELATION_BATCH_MESSAGES_PER_SECOND = Gauge(
+    "spiff_message_correlation_batch_messages_per_second",
+    "Send messages correlated per second by the last background correlation pass that had ready send messages.",
+)
+
 
 def _execution_mode_label(execution_mode: str | None) -> str:
     return execution_mode or "default"
@@ -14,7 +14,6 @@ from SpiffWorkflow.bpmn.specs.event_definitions.message import CorrelationProper
 from SpiffWorkflow.bpmn.specs.mixins import StartEventMixin  # type: ignore
 from SpiffWorkflow.exceptions import SpiffWorkflowException  # type: ignore
 from SpiffWorkflow.spiff.specs.event_definitions import MessageEventDefinition  # type: ignore
-from sqlalchemy.orm import selectinload
 
 from spiffworkflow_backend.background_processing.celery_tasks.process_instance_task_producer import (
     queue_message_start_process_instance,
@@ -34,6 +33,10 @@ from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.services.bpmn_process_service import BpmnProcessService
 from spiffworkflow_backend.services.error_handling_service import ErrorHandlingService
+from spiffworkflow_backend.services.message_correlation_index_service import MessageCorrelationIndexService
+from spiffworkflow_backend.services.message_instrumentation_service import MESSAGE_CORRELATION_BATCH_DURATION_SECONDS
+from spiffworkflow_backend.services.message_instrumentation_service import MESSAGE_CORRELATION_BATCH_MESSAGES_PER_SECOND
+from spiffworkflow_backend.services.message_instrumentation_service import MESSAGE_CORRELATION_BATCH_MESSAGES_TOTAL
 from spiffworkflow_backend.services.message_instrumentation_service import MessageSendInstrumentation
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceIsAlreadyLockedError
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
@@ -50,6 +53,8 @@ class MessageServiceError(Exception):
 
 class MessageService:
     MAX_TIME_TO_LIVE_SECONDS = 300
+    # only used to evaluate correlation retrieval expressions, which does not keep any state in the engine
+    _correlation_script_engine = CustomBpmnScriptEngine()
 
     @classmethod
     def current_time_in_seconds(cls) -> int:
@@ -152,17 +157,23 @@ class MessageService:
         runtime_receive: ProcessInstanceRuntime | None = None,
         claim_message_instance: bool = True,
         instrumentation: MessageSendInstrumentation | None = None,
+        expire_ready_messages: bool = True,
+        try_existing_receivers: bool = True,
     ) -> MessageInstanceModel | None:
         """Connects the given send message to a 'receive' message if possible.
 
         :param message_instance_send:
+        :param expire_ready_messages: False if the caller already expired ready send messages.
+        :param try_existing_receivers: False if the caller already knows no ready receive message correlates with it.
         :return: the message instance that received this message.
         """
-        if instrumentation is not None:
-            with instrumentation.phase("correlate_expire_ready_send_messages"):
+        if expire_ready_messages:
+            with (
+                instrumentation.phase("correlate_expire_ready_send_messages")
+                if instrumentation is not None
+                else contextlib.nullcontext()
+            ):
                 cls.expire_ready_send_messages()
-        else:
-            cls.expire_ready_send_messages()
 
         if claim_message_instance:
             with instrumentation.phase("claim_send_message") if instrumentation is not None else contextlib.nullcontext():
@@ -190,18 +201,21 @@ class MessageService:
         # Let the methods handle the exceptions to ensure the proper variables are set so we do not lose errors
 
         # First, try to find an existing process instance waiting for this message
-        with instrumentation.phase("correlate_existing_receiver") if instrumentation is not None else contextlib.nullcontext():
-            message_instance_receive = cls._try_correlate_with_existing_receiver(
-                message_instance_send,
-                execution_mode,
-                receiving_process_instance_id=receiving_process_instance_id,
-                runtime_receive=runtime_receive,
-                instrumentation=instrumentation,
-            )
-        if message_instance_receive is not None:
-            if instrumentation is not None:
-                instrumentation.set_correlation_result("existing_receive")
-            return message_instance_receive
+        if try_existing_receivers:
+            with (
+                instrumentation.phase("correlate_existing_receiver") if instrumentation is not None else contextlib.nullcontext()
+            ):
+                message_instance_receive = cls._try_correlate_with_existing_receiver(
+                    message_instance_send,
+                    execution_mode,
+                    receiving_process_instance_id=receiving_process_instance_id,
+                    runtime_receive=runtime_receive,
+                    instrumentation=instrumentation,
+                )
+            if message_instance_receive is not None:
+                if instrumentation is not None:
+                    instrumentation.set_correlation_result("existing_receive")
+                return message_instance_receive
 
         # No existing receiver found, try to start a new process
         with instrumentation.phase("correlate_message_start") if instrumentation is not None else contextlib.nullcontext():
@@ -264,27 +278,17 @@ class MessageService:
         instrumentation: MessageSendInstrumentation | None = None,
     ) -> MessageInstanceModel | None:
         """Try to find and correlate with an existing process instance waiting for this message."""
-        available_receive_messages_query = MessageInstanceModel.query.options(
-            selectinload(MessageInstanceModel.correlation_rules)
-        ).filter_by(
-            name=message_instance_send.name,
-            status=MessageStatuses.ready.value,
-            message_type=MessageTypes.receive.value,
+        available_receive_messages = MessageCorrelationIndexService.correlating_receive_messages(
+            message_instance_send,
+            cls._correlation_script_engine,
+            receiving_process_instance_id=receiving_process_instance_id,
         )
-        if receiving_process_instance_id is not None:
-            available_receive_messages_query = available_receive_messages_query.filter_by(
-                process_instance_id=receiving_process_instance_id
-            )
-        available_receive_messages: list[MessageInstanceModel] = available_receive_messages_query.all()
 
         receiving_process_instance: ProcessInstanceModel | None = None
         message_instance_receive: MessageInstanceModel | None = None
 
         try:
             for message_instance_receive in available_receive_messages:
-                if not message_instance_receive.correlates(message_instance_send, CustomBpmnScriptEngine()):
-                    continue
-
                 receiving_process_instance = cls.get_process_instance_for_message_instance(message_instance_receive)
 
                 try:
@@ -365,6 +369,9 @@ class MessageService:
                 synchronize_session=False,
             )
         )
+        if rows_updated > 0 and from_status == MessageStatuses.ready.value and message_instance.is_receive():
+            # only ready receive messages are correlated with
+            MessageCorrelationIndexService.remove_receive_message(message_instance.id)
         db.session.commit()
         if rows_updated == 0:
             db.session.expire(message_instance)
@@ -626,19 +633,172 @@ class MessageService:
         cls,
         execution_mode: str | None = None,
     ) -> None:
-        """Look at ALL the Send and Receive Messages and attempt to find correlations."""
-        cls.expire_ready_send_messages()
-        message_instances_send: list[MessageInstanceModel] = MessageInstanceModel.query.filter_by(
-            message_type=MessageTypes.send.value,
-            status=MessageStatuses.ready.value,
-        ).all()
+        """Look at ALL the Send and Receive Messages and attempt to find correlations.
 
+        Ready send messages are handled a message name at a time. The receive messages they correlate with are
+        looked up once per name and the matches are delivered grouped by receiving process instance, so each
+        receiving process instance is only loaded once per pass. Send messages that could not be delivered that way,
+        including ones that start new process instances, go through correlate_send_message one at a time.
+        """
+        start_time = time.time()
+        cls.expire_ready_send_messages()
+        message_instances_send: list[MessageInstanceModel] = (
+            MessageInstanceModel.query.filter_by(
+                message_type=MessageTypes.send.value,
+                status=MessageStatuses.ready.value,
+            )
+            .order_by(MessageInstanceModel.id)
+            .all()
+        )
+        message_instances_send_by_name: dict[str, list[MessageInstanceModel]] = {}
         for message_instance_send in message_instances_send:
+            message_instances_send_by_name.setdefault(message_instance_send.name, []).append(message_instance_send)
+
+        correlated_count = 0
+        for message_instances_send_with_name in message_instances_send_by_name.values():
+            correlated_count += cls._correlate_send_messages_with_same_name(message_instances_send_with_name, execution_mode)
+
+        if message_instances_send:
+            duration = time.time() - start_time
+            MESSAGE_CORRELATION_BATCH_DURATION_SECONDS.observe(duration)
+            MESSAGE_CORRELATION_BATCH_MESSAGES_PER_SECOND.set(correlated_count / duration if duration > 0 else correlated_count)
+            current_app.logger.info(
+                f"Correlated {correlated_count} of {len(message_instances_send)} ready send messages with "
+                f"{len(message_instances_send_by_name)} names in {duration:.3f} seconds."
+            )
+
+    @classmethod
+    def _correlate_send_messages_with_same_name(
+        cls, message_instances_send: list[MessageInstanceModel], execution_mode: str | None
+    ) -> int:
+        """Correlates ready send messages that share a name and returns how many were delivered."""
+        correlating_receive_messages_list = MessageCorrelationIndexService.correlating_receive_messages_for_send_messages(
+            message_instances_send, cls._correlation_script_engine
+        )
+        matched_receive_message_ids: set[int] = set()
+        message_pairs_by_process_instance_id: dict[int, list[tuple[MessageInstanceModel, MessageInstanceModel]]] = {}
+        message_instances_send_without_receivers = []
+        for message_instance_send, correlating_receive_messages in zip(
+            message_instances_send, correlating_receive_messages_list, strict=True
+        ):
+            message_instance_receive = next(
+                (
+                    message_instance_receive
+                    for message_instance_receive in correlating_receive_messages
+                    if message_instance_receive.id not in matched_receive_message_ids
+                ),
+                None,
+            )
+            if message_instance_receive is None:
+                message_instances_send_without_receivers.append(message_instance_send)
+                continue
+            matched_receive_message_ids.add(message_instance_receive.id)
+            message_pairs_by_process_instance_id.setdefault(message_instance_receive.process_instance_id, []).append(
+                (message_instance_send, message_instance_receive)
+            )
+
+        correlated_count = 0
+        message_instances_send_to_retry = []
+        for message_pairs in message_pairs_by_process_instance_id.values():
+            delivered_count, undelivered_message_instances_send = cls._deliver_send_messages_to_receiving_process_instance(
+                message_pairs, execution_mode
+            )
+            correlated_count += delivered_count
+            message_instances_send_to_retry.extend(undelivered_message_instances_send)
+        MESSAGE_CORRELATION_BATCH_MESSAGES_TOTAL.labels(result="existing_receive").inc(correlated_count)
+
+        message_instance_send_ids_to_retry = {
+            message_instance_send.id for message_instance_send in message_instances_send_to_retry
+        }
+        for message_instance_send in sorted(
+            message_instances_send_to_retry + message_instances_send_without_receivers,
+            key=lambda message_instance: message_instance.id,
+        ):
             current_app.logger.info(
                 f"Runtime waiting send messages: Processing message id {message_instance_send.id}. "
                 f"Name: '{message_instance_send.name}'"
             )
-            cls.correlate_send_message(message_instance_send, execution_mode=execution_mode)
+            message_instance_receive = cls.correlate_send_message(
+                message_instance_send,
+                execution_mode=execution_mode,
+                expire_ready_messages=False,
+                try_existing_receivers=message_instance_send.id in message_instance_send_ids_to_retry,
+            )
+            result = "one_at_a_time" if message_instance_receive is not None else "not_correlated"
+            MESSAGE_CORRELATION_BATCH_MESSAGES_TOTAL.labels(result=result).inc()
+            if message_instance_receive is not None:
+                correlated_count += 1
+        return correlated_count
+
+    @classmethod
+    def _deliver_send_messages_to_receiving_process_instance(
+        cls,
+        message_pairs: list[tuple[MessageInstanceModel, MessageInstanceModel]],
+        execution_mode: str | None,
+    ) -> tuple[int, list[MessageInstanceModel]]:
+        """Delivers (send, receive) message pairs whose receive messages belong to the same process instance.
+
+        Returns how many were delivered and the send messages that are still ready because their receive message or
+        the process instance could not take them.
+        """
+        message_instance_send, message_instance_receive = message_pairs[0]
+        receiving_process_instance: ProcessInstanceModel | None = None
+        delivered_count = 0
+        undelivered_message_instances_send: list[MessageInstanceModel] = []
+        try:
+            receiving_process_instance = cls.get_process_instance_for_message_instance(message_instance_receive)
+            with ProcessInstanceQueueService.dequeued(receiving_process_instance, max_attempts=1):
+                runtime_receive: ProcessInstanceRuntime | None = None
+                for message_instance_send, message_instance_receive in message_pairs:
+                    if not receiving_process_instance.can_receive_message():
+                        undelivered_message_instances_send.append(message_instance_send)
+                        continue
+                    if not cls._claim_ready_message_instance(message_instance_send):
+                        # something else is already handling it
+                        continue
+                    if (
+                        message_instance_send.expires_at_in_seconds is not None
+                        and message_instance_send.expires_at_in_seconds <= cls.current_time_in_seconds()
+                    ):
+                        cls._transition_message_instance_status(
+                            message_instance_send, MessageStatuses.running.value, MessageStatuses.cancelled.value
+                        )
+                        continue
+                    if not cls._claim_ready_message_instance(message_instance_receive):
+                        cls._transition_message_instance_status(
+                            message_instance_send, MessageStatuses.running.value, MessageStatuses.ready.value
+                        )
+                        undelivered_message_instances_send.append(message_instance_send)
+                        continue
+
+                    if runtime_receive is None:
+                        runtime_receive = ProcessInstanceRuntime(receiving_process_instance)
+                    cls.process_message_receive(
+                        receiving_process_instance,
+                        message_instance_receive,
+                        message_instance_send,
+                        execution_mode=execution_mode,
+                        runtime_receive=runtime_receive,
+                    )
+                    cls._mark_messages_completed(message_instance_send, message_instance_receive)
+                    runtime_receive.save()
+                    delivered_count += 1
+
+                if delivered_count > 0 and should_queue_process_instance(execution_mode=execution_mode):
+                    queue_process_instance_if_appropriate(receiving_process_instance, execution_mode=execution_mode)
+        except ProcessInstanceIsAlreadyLockedError:
+            # Someone else has this locked, so try these one at a time in case there is another match
+            return (0, [message_instance_send for message_instance_send, _ in message_pairs])
+        except Exception as exception:
+            cls._handle_correlation_failure(
+                exception,
+                message_instance_send,
+                message_instance_receive,
+                receiving_process_instance,
+            )
+            raise
+
+        return (delivered_count, undelivered_message_instances_send)
 
     @classmethod
     def start_process_with_message(
@@ -861,7 +1021,7 @@ class MessageService:
         )
         with instrumentation.phase("calculate_message_correlations") if instrumentation is not None else contextlib.nullcontext():
             correlations = bpmn_message.calculate_correlations(
-                CustomBpmnScriptEngine(), bpmn_message.correlation_properties, message_instance_send.payload
+                MessageService._correlation_script_engine, bpmn_message.correlation_properties, message_instance_send.payload
             )
         bpmn_event = BpmnEvent(
             event_definition=bpmn_message,
@@ -2,6 +2,7 @@ import time
 from typing import Any
 
 from flask import current_app
+from sqlalchemy import Row
 from sqlalchemy import desc
 
 from spiffworkflow_backend.models.db import db
@@ -31,13 +32,13 @@ class MetadataBackfillService:
         return [path for path in new_paths if path["key"] in new_metadata_keys]
 
     @classmethod
-    def get_process_instances(
-        cls, process_model_identifier: str, batch_size: int | None = None, offset: int = 0
-    ) -> list[ProcessInstanceModel]:
+    def get_process_instances(cls, process_model_identifier: str, batch_size: int | None = None, offset: int = 0) -> list[Row]:
+        """Returns rows with only the id of each process instance since that is all the backfill needs."""
         size = cls.PROCESS_INSTANCE_BATCH_SIZE if batch_size is None else batch_size
 
-        instances: list[ProcessInstanceModel] = (
+        instances: list[Row] = (
             ProcessInstanceModel.query.filter_by(process_model_identifier=process_model_identifier)
+            .with_entities(ProcessInstanceModel.id)
             .order_by(ProcessInstanceModel.id)
             .limit(size)
             .offset(offset)
@@ -65,19 +66,20 @@ class MetadataBackfillService:
 
     @classmethod
     def add_metadata_to_instance(cls, process_instance_id: int, metadata: dict[str, Any]) -> None:
+        existing_keys = {
+            row.key
+            for row in ProcessInstanceMetadataModel.query.filter_by(process_instance_id=process_instance_id)
+            .with_entities(ProcessInstanceMetadataModel.key)
+            .all()
+        }
         for key, value in metadata.items():
-            if value is not None:
-                existing_metadata = ProcessInstanceMetadataModel.query.filter_by(
-                    process_instance_id=process_instance_id, key=key
-                ).first()
-
-                if existing_metadata is None:
-                    new_metadata = ProcessInstanceMetadataModel(
-                        process_instance_id=process_instance_id,
-                        key=key,
-                        value=cls.truncate_string(str(value), 255),
-                    )
-                    db.session.add(new_metadata)
+            if value is not None and key not in existing_keys:
+                new_metadata = ProcessInstanceMetadataModel(
+                    process_instance_id=process_instance_id,
+                    key=key,
+                    value=cls.truncate_string(str(value), 255),
+                )
+                db.session.add(new_metadata)
 
     @staticmethod
     def truncate_string(value: str, max_length: int) -> str:
@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Iterable
+from itertools import chain
+from typing import Any
+
+from flask import current_app
+from prometheus_client import Counter
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.group import GroupModel
+from spiffworkflow_backend.models.permission_assignment import PermissionAssignmentModel
+from spiffworkflow_backend.models.permission_target import PermissionTargetModel
+from spiffworkflow_backend.models.principal import PrincipalModel
+from spiffworkflow_backend.models.user_group_assignment import UserGroupAssignmentModel
+
+PERMISSION_INDEX_CACHE_TOTAL = Counter(
+    "spiff_permission_index_cache_total",
+    "Lookups of permission indexes in the per-worker cache, by whether the index had to be built.",
+    ["result"],
+)
+
+# set when a flush changes rows that permission indexes are built from. it is left alone on rollback since a
+# savepoint rollback can keep earlier changes, and a leftover flag only means the next commit clears indexes too.
+PERMISSIONS_CHANGED_SESSION_INFO_KEY = "permission_index_permissions_changed"
+MODELS_THAT_CHANGE_PERMISSIONS = (
+    PermissionAssignmentModel,
+    PermissionTargetModel,
+    PrincipalModel,
+    GroupModel,
+    UserGroupAssignmentModel,
+)
+
+# trie nodes are dicts keyed by single characters, so the empty string can hold the grant types of targets ending there
+GRANT_TYPES_KEY = ""
+
+
+class PermissionIndex:
+    """Answers permission checks for a set of principals in memory from their permission assignments.
+
+    Targets are matched like AuthorizationService.target_uri_matches_actual_uri matches them. Targets ending in %
+    go in a prefix trie per permission and the rest in a dict, so a check only walks the characters of the uri.
+    """
+
+    def __init__(self, permission_assignments: Iterable[PermissionAssignmentModel]) -> None:
+        self._exact_grant_types: dict[str, dict[str, set[str]]] = {}
+        self._prefix_tries: dict[str, dict[str, Any]] = {}
+        for permission_assignment in permission_assignments:
+            self.add(
+                permission_assignment.permission, permission_assignment.permission_target.uri, permission_assignment.grant_type
+            )
+
+    def add(self, permission: str, target_uri: str, grant_type: str) -> None:
+        exact_grant_types = self._exact_grant_types.setdefault(permission, {})
+        if not target_uri.endswith("%"):
+            exact_grant_types.setdefault(target_uri, set()).add(grant_type)
+            return
+
+        target_uri_without_wildcard = target_uri.removesuffix("%")
+        # /process-groups/hey:% also covers /process-groups/hey itself
+        target_uri_without_wildcard_and_without_delimiters = target_uri_without_wildcard.removesuffix(":").removesuffix("/")
+        exact_grant_types.setdefault(target_uri_without_wildcard_and_without_delimiters, set()).add(grant_type)
+
+        node = self._prefix_tries.setdefault(permission, {})
+        for character in target_uri_without_wildcard:
+            node = node.setdefault(character, {})
+        node.setdefault(GRANT_TYPES_KEY, set()).add(grant_type)
+
+    def grant_types(self, permission: str, uri: str) -> set[str]:
+        """Returns the grant types of every target the uri matches for the permission."""
+        grant_types = set(self._exact_grant_types.get(permission, {}).get(uri, ()))
+        node = self._prefix_tries.get(permission)
+        if node is not None:
+            grant_types.update(node.get(GRANT_TYPES_KEY, ()))
+            for character in uri:
+                node = node.get(character)
+                if node is None:
+                    break
+                grant_types.update(node.get(GRANT_TYPES_KEY, ()))
+        return grant_types
+
+    def permits(self, permission: str, uri: str) -> bool:
+        grant_types = self.grant_types(permission, uri)
+        if len(grant_types) == 0:
+            return False
+
+        unknown_grant_types = grant_types - {"permit", "deny"}
+        if unknown_grant_types:
+            raise Exception(f"Unknown grant type: {sorted(unknown_grant_types)[0]}")
+        return "deny" not in grant_types
+
+
+class PermissionIndexService:
+    """Per-worker LRU of PermissionIndex objects keyed by the principals they were built for.
+
+    A user's principals are their own plus one per group, so joining or leaving a group uses a different index.
+    Committing changes to permission assignments, targets, principals, groups or group membership clears every index
+    in this worker and moves it to a new permissions generation.
+    Other workers only pick those changes up once their indexes are older than the ttl.
+    """
+
+    _indexes: OrderedDict[tuple[int, ...], tuple[float, PermissionIndex]] = OrderedDict()
+    _lock = threading.Lock()
+    # bumped by clear so anything resolved from rows read before the clear is not reused after it
+    _generation = 0
+
+    @classmethod
+    def max_entries(cls) -> int:
+        return int(current_app.config["SPIFFWORKFLOW_BACKEND_PERMISSION_INDEX_CACHE_MAX_ENTRIES"])
+
+    @classmethod
+    def ttl_in_seconds(cls) -> int:
+        return int(current_app.config["SPIFFWORKFLOW_BACKEND_PERMISSION_INDEX_CACHE_TTL_IN_SECONDS"])
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls.max_entries() > 0
+
+    @classmethod
+    def index_for_principals(cls, principal_ids: Iterable[int], on_build: Callable[[], None] | None = None) -> PermissionIndex:
+        key = tuple(sorted(set(principal_ids)))
+        now = time.time()
+        with cls._lock:
+            cached = cls._indexes.get(key)
+            if cached is not None and now - cached[0] < cls.ttl_in_seconds():
+                cls._indexes.move_to_end(key)
+                PERMISSION_INDEX_CACHE_TOTAL.labels(result="hit").inc()
+                return cached[1]
+            generation = cls._generation
+
+        PERMISSION_INDEX_CACHE_TOTAL.labels(result="miss").inc()
+        if on_build is not None:
+            on_build()
+        permission_assignments = (
+            PermissionAssignmentModel.query.filter(PermissionAssignmentModel.principal_id.in_(key))  # type: ignore
+            .options(db.joinedload(PermissionAssignmentModel.permission_target))
+            .all()
+        )
+        permission_index = PermissionIndex(permission_assignments)
+
+        # an index built from permission changes that are not committed yet is only good for this session
+        if cls.has_uncommitted_permission_changes():
+            return permission_index
+
+        max_entries = cls.max_entries()
+        with cls._lock:
+            if generation == cls._generation:
+                cls._indexes[key] = (now, permission_index)
+                cls._indexes.move_to_end(key)
+                while len(cls._indexes) > max_entries:
+                    cls._indexes.popitem(last=False)
+        return permission_index
+
+    @classmethod
+    def generation(cls) -> int:
+        with cls._lock:
+            return cls._generation
+
+    @classmethod
+    def has_uncommitted_permission_changes(cls) -> bool:
+        return bool(db.session.info.get(PERMISSIONS_CHANGED_SESSION_INFO_KEY))
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._indexes.clear()
+            cls._generation += 1
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        with cls._lock:
+            return {"entries": len(cls._indexes)}
+
+
+@listens_for(Session, "after_flush")  # type: ignore
+def note_permission_changes_after_flush(session: Any, flush_context: Any) -> None:
+    if any(
+        isinstance(instance, MODELS_THAT_CHANGE_PERMISSIONS) for instance in chain(session.new, session.dirty, session.deleted)
+    ):
+        session.info[PERMISSIONS_CHANGED_SESSION_INFO_KEY] = True
+
+
+@listens_for(Session, "after_commit")  # type: ignore
+def clear_permission_indexes_after_commit(session: Any) -> None:
+    if session.info.pop(PERMISSIONS_CHANGED_SESSION_INFO_KEY, False):
+        PermissionIndexService.clear()
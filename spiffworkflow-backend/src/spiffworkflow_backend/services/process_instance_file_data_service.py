@@ -0,0 +1,177 @@
+import os
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from prometheus_client import Counter
+from sqlalchemy import delete
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance_file_blob import ProcessInstanceFileBlobModel
+from spiffworkflow_backend.models.process_instance_file_data import ProcessInstanceFileDataModel
+from spiffworkflow_backend.utils.db_utils import insert_or_ignore_duplicate
+
+PROCESS_INSTANCE_FILE_BLOBS_TOTAL = Counter(
+    "spiff_process_instance_file_blobs_total",
+    "Process instance file blobs stored, reused by an upload with the same digest, or deleted once nothing referenced them.",
+    ["operation"],
+)
+
+# digests of blobs deleted in the current transaction. their files are only removed once it commits.
+UNREFERENCED_BLOBS_SESSION_INFO_KEY = "process_instance_file_blobs_unreferenced"
+
+
+class ProcessInstanceFileDataService:
+    """Stores uploaded file contents once per digest and counts the process instances that reference them.
+
+    A process instance has one process_instance_file_data row per digest it references, however many times the file
+    was uploaded to it. Each row holds one reference to its blob, and blobs are deleted with their last reference.
+    """
+
+    @classmethod
+    def reference_blob(cls, digest: str, contents: bytes, decoded_filepath: str | None = None) -> None:
+        """Adds a reference to the blob with the digest, storing the contents only if there is no such blob yet.
+
+        When contents are on the file system, decoded_filepath is the file decode_base64_contents wrote them to. It is
+        only moved into place once the reference is taken, which holds the blob row until this transaction ends, so a
+        transaction releasing the last reference cannot delete the blob in between. If one deleted it just before,
+        this stores a new blob and rewrites the file, and remove_blob_files leaves the file alone once it sees the new blob.
+        """
+        try:
+            cls._reference_blob(digest, contents)
+            if decoded_filepath is not None:
+                ProcessInstanceFileBlobModel.store_decoded_file(decoded_filepath, digest)
+        finally:
+            if decoded_filepath is not None:
+                ProcessInstanceFileBlobModel.remove_decoded_file(decoded_filepath)
+
+    @classmethod
+    def add_file_data(cls, file_data: ProcessInstanceFileDataModel) -> ProcessInstanceFileDataModel:
+        """Adds the file data to the session unless its process instance already references the digest.
+
+        The blob must have been referenced with reference_blob already. If the file data is a duplicate, that
+        reference is released again and the existing file data is returned.
+        """
+        existing_file_data = ProcessInstanceFileDataModel.query.filter_by(
+            process_instance_id=file_data.process_instance_id, digest=file_data.digest
+        ).first()
+        if existing_file_data is not None:
+            cls.release_blob_references({file_data.digest: 1})
+            return existing_file_data  # type: ignore
+
+        db.session.add(file_data)
+        return file_data
+
+    @classmethod
+    def release_blob_references(cls, references: Mapping[str, int]) -> list[str]:
+        """Releases the given number of references per digest and deletes the blobs that have none left.
+
+        Returns the digests of the deleted blobs. Their files are removed once the transaction commits.
+        """
+        now_in_seconds = round(time.time())
+        for digest, count in references.items():
+            cls._increment_reference_count(digest, -count, now_in_seconds)
+
+        unreferenced_digests = list(
+            db.session.execute(
+                select(ProcessInstanceFileBlobModel.digest).where(
+                    ProcessInstanceFileBlobModel.digest.in_(references.keys()),  # type: ignore
+                    ProcessInstanceFileBlobModel.reference_count <= 0,
+                )
+            ).scalars()
+        )
+        if unreferenced_digests:
+            db.session.execute(
+                delete(ProcessInstanceFileBlobModel)
+                .where(ProcessInstanceFileBlobModel.digest.in_(unreferenced_digests))  # type: ignore
+                .execution_options(synchronize_session=False)
+            )
+            db.session.info.setdefault(UNREFERENCED_BLOBS_SESSION_INFO_KEY, set()).update(unreferenced_digests)
+            PROCESS_INSTANCE_FILE_BLOBS_TOTAL.labels(operation="deleted").inc(len(unreferenced_digests))
+        return unreferenced_digests
+
+    @classmethod
+    def remove_blob_files(cls, digests: set[str]) -> None:
+        if not ProcessInstanceFileBlobModel.contents_are_on_file_system():
+            return
+        # an upload may have stored the same contents again since the blobs were deleted, and its file is the same one.
+        # this runs after the commit, when the session cannot be used, so look with a connection of its own.
+        with db.engine.connect() as connection:
+            referenced_digests = set(
+                connection.execute(
+                    select(ProcessInstanceFileBlobModel.digest).where(
+                        ProcessInstanceFileBlobModel.digest.in_(sorted(digests))  # type: ignore
+                    )
+                ).scalars()
+            )
+        for digest in digests - referenced_digests:
+            try:
+                os.remove(ProcessInstanceFileBlobModel.full_filepath_for_digest(digest))
+            except FileNotFoundError:
+                pass
+
+    @classmethod
+    def _reference_blob(cls, digest: str, contents: bytes) -> None:
+        now_in_seconds = round(time.time())
+        if cls._increment_reference_count(digest, 1, now_in_seconds):
+            PROCESS_INSTANCE_FILE_BLOBS_TOTAL.labels(operation="reused").inc()
+            return
+
+        result = insert_or_ignore_duplicate(
+            ProcessInstanceFileBlobModel,
+            {
+                "digest": digest,
+                "contents": contents,
+                "reference_count": 1,
+                "updated_at_in_seconds": now_in_seconds,
+                "created_at_in_seconds": now_in_seconds,
+            },
+            postgres_conflict_index_elements=["digest"],
+        )
+        if result is not None and result.rowcount > 0:
+            PROCESS_INSTANCE_FILE_BLOBS_TOTAL.labels(operation="stored").inc()
+            return
+
+        # another upload stored the same contents after we looked for them
+        cls._increment_reference_count(digest, 1, now_in_seconds)
+        PROCESS_INSTANCE_FILE_BLOBS_TOTAL.labels(operation="reused").inc()
+
+    @classmethod
+    def _increment_reference_count(cls, digest: str, increment: int, now_in_seconds: int) -> bool:
+        result = db.session.execute(
+            update(ProcessInstanceFileBlobModel)
+            .where(ProcessInstanceFileBlobModel.digest == digest)
+            .values(
+                reference_count=ProcessInstanceFileBlobModel.reference_count + increment,
+                updated_at_in_seconds=now_in_seconds,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+
+@listens_for(Session, "after_flush")  # type: ignore
+def release_file_blobs_after_flush(session: Any, flush_context: Any) -> None:
+    # this also sees file data deleted through the process instance relationship cascade
+    references: dict[str, int] = {}
+    for instance in session.deleted:
+        if isinstance(instance, ProcessInstanceFileDataModel):
+            references[instance.digest] = references.get(instance.digest, 0) + 1
+    if references:
+        ProcessInstanceFileDataService.release_blob_references(references)
+
+
+@listens_for(Session, "after_commit")  # type: ignore
+def remove_unreferenced_blob_files_after_commit(session: Any) -> None:
+    unreferenced_digests = session.info.pop(UNREFERENCED_BLOBS_SESSION_INFO_KEY, None)
+    if unreferenced_digests:
+        ProcessInstanceFileDataService.remove_blob_files(unreferenced_digests)
+
+
+@listens_for(Session, "after_rollback")  # type: ignore
+def keep_blob_files_after_rollback(session: Any) -> None:
+    session.info.pop(UNREFERENCED_BLOBS_SESSION_INFO_KEY, None)
@@ -41,6 +41,8 @@ class ProcessInstanceLockService:
             "uuid": current_app.config["PROCESS_UUID"],
             "thread_id": threading.get_ident(),
             "locks": {},
+            # locks taken by ProcessInstanceQueueService.claim_many that nothing has started working on yet
+            "claims": set(),
         }
 
     @classmethod
@@ -60,6 +62,21 @@ class ProcessInstanceLockService:
         ctx = cls.get_thread_local_locking_context()
         ctx["locks"][process_instance_id] = queue_entry.id
 
+    @classmethod
+    def claim(cls, process_instance_id: int, queue_entry_id: int) -> None:
+        ctx = cls.get_thread_local_locking_context()
+        ctx["locks"][process_instance_id] = queue_entry_id
+        ctx["claims"].add(process_instance_id)
+
+    @classmethod
+    def take_claim(cls, process_instance_id: int) -> bool:
+        """Returns True if the lock was claimed ahead of time and hands it to the caller, who must release it."""
+        ctx = cls.get_thread_local_locking_context()
+        if process_instance_id in ctx["claims"]:
+            ctx["claims"].remove(process_instance_id)
+            return True
+        return False
+
     @classmethod
     def unlock(cls, process_instance_id: int) -> int:
         queue_model_id = cls.try_unlock(process_instance_id)
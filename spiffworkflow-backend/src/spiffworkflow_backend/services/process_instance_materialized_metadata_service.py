@@ -0,0 +1,76 @@
+from collections.abc import Iterable
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import delete
+from sqlalchemy import select
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance_materialized_metadata import ProcessInstanceMaterializedMetadataModel
+from spiffworkflow_backend.models.process_instance_metadata import ProcessInstanceMetadataModel
+
+REFRESH_BATCH_SIZE = 500
+
+
+class ProcessInstanceMaterializedMetadataService:
+    """Keeps process_instance_materialized_metadata in step with process_instance_metadata.
+
+    The session listener below refreshes the row of every process instance whose metadata is added, changed or deleted
+    in a flush, which covers ProcessInstanceRuntime.store_metadata and MetadataBackfillService alike.
+    """
+
+    @classmethod
+    def refresh_process_instances(cls, process_instance_ids: Iterable[int]) -> None:
+        """Rebuilds the rows of the process instances from their metadata. Instances without metadata have no row."""
+        unique_process_instance_ids = sorted(set(process_instance_ids))
+        for batch_start in range(0, len(unique_process_instance_ids), REFRESH_BATCH_SIZE):
+            batch = unique_process_instance_ids[batch_start : batch_start + REFRESH_BATCH_SIZE]
+            db.session.execute(
+                delete(ProcessInstanceMaterializedMetadataModel)
+                .where(ProcessInstanceMaterializedMetadataModel.process_instance_id.in_(batch))  # type: ignore
+                .execution_options(synchronize_session=False)
+            )
+            metadata_values_by_process_instance: dict[int, dict[str, str]] = {}
+            for process_instance_id, key, value in db.session.execute(
+                select(
+                    ProcessInstanceMetadataModel.process_instance_id,
+                    ProcessInstanceMetadataModel.key,
+                    ProcessInstanceMetadataModel.value,
+                ).where(ProcessInstanceMetadataModel.process_instance_id.in_(batch))  # type: ignore
+            ):
+                metadata_values_by_process_instance.setdefault(process_instance_id, {})[key] = value
+            if metadata_values_by_process_instance:
+                db.session.execute(
+                    ProcessInstanceMaterializedMetadataModel.__table__.insert(),
+                    [
+                        {"process_instance_id": process_instance_id, "metadata_values": metadata_values}
+                        for process_instance_id, metadata_values in metadata_values_by_process_instance.items()
+                    ],
+                )
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """Rebuilds every row, for metadata written without the session, and returns how many there are."""
+        db.session.execute(delete(ProcessInstanceMaterializedMetadataModel).execution_options(synchronize_session=False))
+        process_instance_ids = (
+            db.session.execute(select(ProcessInstanceMetadataModel.process_instance_id).distinct()).scalars().all()
+        )
+        cls.refresh_process_instances(process_instance_ids)
+        db.session.commit()
+        return int(db.session.query(ProcessInstanceMaterializedMetadataModel).count())
+
+
+@listens_for(Session, "after_flush")  # type: ignore
+def refresh_process_instance_materialized_metadata_after_flush(session: Any, flush_context: Any) -> None:
+    process_instance_ids: set[int] = set()
+    for instance in chain(session.new, session.deleted):
+        if isinstance(instance, ProcessInstanceMetadataModel) and instance.process_instance_id is not None:
+            process_instance_ids.add(instance.process_instance_id)
+    for instance in session.dirty:
+        if isinstance(instance, ProcessInstanceMetadataModel) and session.is_modified(instance):
+            process_instance_ids.add(instance.process_instance_id)
+
+    if process_instance_ids:
+        ProcessInstanceMaterializedMetadataService.refresh_process_instances(process_instance_ids)
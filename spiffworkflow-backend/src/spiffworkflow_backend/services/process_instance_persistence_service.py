@@ -4,6 +4,7 @@ from flask import current_app
 from SpiffWorkflow.bpmn.script_engine import PythonScriptEngine  # type: ignore
 from SpiffWorkflow.bpmn.workflow import BpmnWorkflow  # type: ignore
 from SpiffWorkflow.util.task import TaskState  # type: ignore
+from sqlalchemy import or_
 
 from spiffworkflow_backend.models.bpmn_process import BpmnProcessModel
 from spiffworkflow_backend.models.bpmn_process_definition import BpmnProcessDefinitionModel
@@ -12,7 +13,9 @@ from spiffworkflow_backend.models.json_data import JsonDataModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.task import TaskModel
 from spiffworkflow_backend.services.bpmn_process_service import BpmnProcessService
+from spiffworkflow_backend.services.json_data_hash_cache_service import JsonDataHashCacheService
 from spiffworkflow_backend.services.process_instance_script_engine import CustomBpmnScriptEngine
+from spiffworkflow_backend.services.process_instance_workflow_cache_service import ProcessInstanceWorkflowCacheService
 from spiffworkflow_backend.services.task_service import StartAndEndTimes
 from spiffworkflow_backend.services.task_service import TaskService
 
@@ -95,6 +98,45 @@ class ProcessInstancePersistenceService:
         bpmn_subprocess_mapping = {b.guid: b for b in bpmn_process_models}
         return (task_model_mapping, bpmn_subprocess_mapping)
 
+    @classmethod
+    def get_cached_bpmn_process_instance(
+        cls,
+        process_instance_model: ProcessInstanceModel,
+        bpmn_definition_to_task_definitions_mappings: dict,
+        task_model_mapping: dict[str, TaskModel],
+        bpmn_subprocess_mapping: dict[str, BpmnProcessModel],
+    ) -> BpmnWorkflow | None:
+        """Checks out the hydrated workflow for the process instance and loads the db mappings a runtime needs.
+
+        The task models are loaded without their json data since that is only needed to deserialize the workflow.
+        """
+        if not ProcessInstanceWorkflowCacheService.has_entry(process_instance_model.id):
+            ProcessInstanceWorkflowCacheService.record_miss()
+            return None
+        bpmn_process = process_instance_model.bpmn_process
+        bpmn_process_definition = process_instance_model.bpmn_process_definition
+        if bpmn_process is None or bpmn_process_definition is None:
+            return None
+
+        bpmn_process_instance = ProcessInstanceWorkflowCacheService.check_out(process_instance_model)
+        if bpmn_process_instance is None:
+            return None
+
+        task_models = TaskModel.query.filter_by(process_instance_id=process_instance_model.id).all()
+        bpmn_processes = BpmnProcessModel.query.filter(
+            or_(BpmnProcessModel.id == bpmn_process.id, BpmnProcessModel.top_level_process_id == bpmn_process.id)
+        ).all()
+
+        BpmnProcessService.get_definition_dict_for_bpmn_process_definition(
+            bpmn_process_definition, bpmn_definition_to_task_definitions_mappings
+        )
+        BpmnProcessService.set_definition_dict_for_bpmn_subprocess_definitions(
+            bpmn_process_definition, {"subprocess_specs": {}}, bpmn_definition_to_task_definitions_mappings
+        )
+        task_model_mapping.update({t.guid: t for t in task_models})
+        bpmn_subprocess_mapping.update({b.guid: b for b in bpmn_processes if b.guid is not None})
+        return bpmn_process_instance
+
     @classmethod
     def get_bpmn_process_instance_from_process_model(cls, process_model_identifier: str) -> BpmnWorkflow:
         (bpmn_process_spec, subprocesses) = BpmnProcessService.get_process_model_and_subprocesses(
@@ -117,10 +159,9 @@ class ProcessInstancePersistenceService:
         task_model_mapping: dict[str, TaskModel],
         get_tasks: bool = False,
         include_task_data_for_completed_tasks: bool = False,
+        lazy_task_data_hashes: dict[str, str] | None = None,
     ) -> dict:
-        json_data = JsonDataModel.query.filter_by(hash=bpmn_process.json_data_hash).first()
-        bpmn_process_dict = {"data": json_data.data, "tasks": {}}
-        bpmn_process_dict.update(bpmn_process.properties_json)
+        bpmn_process_dict = cls.get_bpmn_process_dicts([bpmn_process])[bpmn_process.id]
         if get_tasks:
             tasks = TaskModel.query.filter_by(bpmn_process_id=bpmn_process.id).all()
             cls.get_tasks_dict(
@@ -128,9 +169,36 @@ class ProcessInstancePersistenceService:
                 bpmn_process_dict,
                 include_task_data_for_completed_tasks=include_task_data_for_completed_tasks,
                 task_model_mapping=task_model_mapping,
+                lazy_task_data_hashes=lazy_task_data_hashes,
             )
         return bpmn_process_dict
 
+    @classmethod
+    def get_bpmn_process_dicts(cls, bpmn_processes: list[BpmnProcessModel]) -> dict[int, dict]:
+        """Builds the dict for each bpmn process, without tasks, keyed by bpmn process id.
+
+        The data for all of them is loaded with one query.
+        """
+        json_data_mappings = cls.get_json_data_by_hash({b.json_data_hash for b in bpmn_processes})
+        json_data_hashes_used = set()
+        bpmn_process_dicts = {}
+        for bpmn_process in bpmn_processes:
+            data = json_data_mappings[bpmn_process.json_data_hash]
+            # processes with the same data share a hash so give every process after the first its own copy
+            if bpmn_process.json_data_hash in json_data_hashes_used:
+                data = copy.deepcopy(data)
+            json_data_hashes_used.add(bpmn_process.json_data_hash)
+            bpmn_process_dict = {"data": data, "tasks": {}}
+            bpmn_process_dict.update(copy.deepcopy(bpmn_process.properties_json))
+            bpmn_process_dicts[bpmn_process.id] = bpmn_process_dict
+        return bpmn_process_dicts
+
+    @classmethod
+    def get_json_data_by_hash(cls, json_data_hashes: set[str]) -> dict[str, dict]:
+        json_data_mappings = JsonDataModel.data_dicts_by_hash(json_data_hashes)
+        JsonDataHashCacheService.record_hashes_on_commit(json_data_mappings.keys())
+        return json_data_mappings
+
     @classmethod
     def get_tasks_dict(
         cls,
@@ -139,10 +207,18 @@ class ProcessInstancePersistenceService:
         task_model_mapping: dict[str, TaskModel],
         bpmn_subprocess_id_to_guid_mappings: dict | None = None,
         include_task_data_for_completed_tasks: bool = False,
+        lazy_task_data_hashes: dict[str, str] | None = None,
     ) -> None:
+        """Adds the tasks to spiff_bpmn_process_dict.
+
+        If lazy_task_data_hashes is given along with include_task_data_for_completed_tasks then completed task data
+        is not loaded. Instead the json data hash of each of those tasks is added to lazy_task_data_hashes
+        so the data can be loaded when it is used. See LazyTaskDataLoader.
+        """
         json_data_hashes = set()
         states_to_exclude_from_rehydration: list[str] = []
-        if not include_task_data_for_completed_tasks:
+        load_completed_task_data_lazily = include_task_data_for_completed_tasks and lazy_task_data_hashes is not None
+        if not include_task_data_for_completed_tasks or load_completed_task_data_lazily:
             # load CANCELLED task data for Gateways since they are marked as CANCELLED
             # and we need the task data from their parents
             states_to_exclude_from_rehydration = ["COMPLETED", "ERROR"]
@@ -171,22 +247,32 @@ class ProcessInstancePersistenceService:
                 json_data_hashes.add(task.json_data_hash)
                 task_guids_to_add.add(task.guid)
 
-        json_data_records = JsonDataModel.query.filter(JsonDataModel.hash.in_(json_data_hashes)).all()  # type: ignore
-        json_data_mappings = {}
-        for json_data_record in json_data_records:
-            json_data_mappings[json_data_record.hash] = json_data_record.data
+        json_data_mappings = cls.get_json_data_by_hash(json_data_hashes)
         for task in tasks:
             tasks_dict = spiff_bpmn_process_dict["tasks"]
             if bpmn_subprocess_id_to_guid_mappings:
                 bpmn_subprocess_guid = bpmn_subprocess_id_to_guid_mappings[task.bpmn_process_id]
                 tasks_dict = spiff_bpmn_process_dict["subprocesses"][bpmn_subprocess_guid]["tasks"]
-            tasks_dict[task.guid] = task.properties_json
             task_data = {}
             if task.guid in task_guids_to_add:
                 task_data = json_data_mappings[task.json_data_hash]
-            tasks_dict[task.guid]["data"] = task_data
+            elif load_completed_task_data_lazily and lazy_task_data_hashes is not None:
+                lazy_task_data_hashes[task.guid] = task.json_data_hash
+            tasks_dict[task.guid] = cls.task_dict_for_serializer(task.properties_json, task_data)
             task_model_mapping[task.guid] = task
 
+    @classmethod
+    def task_dict_for_serializer(cls, properties_json: dict, task_data: dict) -> dict:
+        """Copies the containers in properties_json since the serializer consumes the dict while the TaskModel keeps it.
+
+        These are small. task_data is not copied since it came from a column query and nothing else references it.
+        """
+        task_dict = {
+            key: copy.deepcopy(value) if isinstance(value, dict | list) else value for key, value in properties_json.items()
+        }
+        task_dict["data"] = task_data
+        return task_dict
+
     @classmethod
     def get_full_bpmn_process_dict(
         cls,
@@ -199,7 +285,13 @@ class ProcessInstancePersistenceService:
         bpmn_process_definition_id: int | None = None,
         include_task_data_for_completed_tasks: bool = False,
         include_completed_subprocesses: bool = False,
+        lazy_task_data_hashes: dict[str, str] | None = None,
     ) -> dict:
+        """Builds the dict that BpmnProcessService.serializer.from_dict expects.
+
+        Nothing in the returned dict is shared with the models loaded from the database so it can be handed
+        to the serializer directly. The serializer consumes it so do not use it after deserializing.
+        """
         if bpmn_process_definition_id is None:
             return {}
 
@@ -227,6 +319,7 @@ class ProcessInstancePersistenceService:
                     get_tasks=True,
                     include_task_data_for_completed_tasks=include_task_data_for_completed_tasks,
                     task_model_mapping=task_model_mapping,
+                    lazy_task_data_hashes=lazy_task_data_hashes,
                 )
                 spiff_bpmn_process_dict.update(single_bpmn_process_dict)
 
@@ -238,26 +331,44 @@ class ProcessInstancePersistenceService:
                         TaskModel.state.not_in(["COMPLETED", "ERROR", "CANCELLED"])  # type: ignore
                     )
                 bpmn_subprocesses = bpmn_subprocesses_query.all()
-                bpmn_subprocess_id_to_guid_mappings = {}
+
+                # subprocess definitions were all loaded with the subprocess specs above so look them up by id
+                # rather than lazy loading bpmn_process_definition for each subprocess.
+                subprocess_identifiers_by_definition_id = {
+                    definitions["bpmn_process_definition"].id: bpmn_identifier
+                    for bpmn_identifier, definitions in bpmn_definition_to_task_definitions_mappings.items()
+                    if "bpmn_process_definition" in definitions
+                }
+                bpmn_subprocesses_to_load = []
                 for bpmn_subprocess in bpmn_subprocesses:
-                    subprocess_identifier = bpmn_subprocess.bpmn_process_definition.bpmn_identifier
+                    subprocess_identifier = (
+                        subprocess_identifiers_by_definition_id.get(bpmn_subprocess.bpmn_process_definition_id)
+                        or bpmn_subprocess.bpmn_process_definition.bpmn_identifier
+                    )
                     if subprocess_identifier not in spiff_bpmn_process_dict["subprocess_specs"]:
                         current_app.logger.info(f"Deferring subprocess spec: '{subprocess_identifier}'")
                         continue
+                    bpmn_subprocesses_to_load.append(bpmn_subprocess)
+
+                bpmn_subprocess_id_to_guid_mappings = {}
+                bpmn_subprocess_dicts = cls.get_bpmn_process_dicts(bpmn_subprocesses_to_load)
+                for bpmn_subprocess in bpmn_subprocesses_to_load:
                     bpmn_subprocess_id_to_guid_mappings[bpmn_subprocess.id] = bpmn_subprocess.guid
-                    single_bpmn_process_dict = cls.get_bpmn_process_dict(bpmn_subprocess, task_model_mapping=task_model_mapping)
-                    spiff_bpmn_process_dict["subprocesses"][bpmn_subprocess.guid] = single_bpmn_process_dict
+                    spiff_bpmn_process_dict["subprocesses"][bpmn_subprocess.guid] = bpmn_subprocess_dicts[bpmn_subprocess.id]
                     bpmn_subprocess_mapping[bpmn_subprocess.guid] = bpmn_subprocess
 
-                tasks = TaskModel.query.filter(
-                    TaskModel.bpmn_process_id.in_(bpmn_subprocess_id_to_guid_mappings.keys())  # type: ignore
-                ).all()
+                tasks = []
+                if len(bpmn_subprocess_id_to_guid_mappings) > 0:
+                    tasks = TaskModel.query.filter(
+                        TaskModel.bpmn_process_id.in_(bpmn_subprocess_id_to_guid_mappings.keys())  # type: ignore
+                    ).all()
                 cls.get_tasks_dict(
                     tasks,
                     spiff_bpmn_process_dict,
                     bpmn_subprocess_id_to_guid_mappings=bpmn_subprocess_id_to_guid_mappings,
                     include_task_data_for_completed_tasks=include_task_data_for_completed_tasks,
                     task_model_mapping=task_model_mapping,
+                    lazy_task_data_hashes=lazy_task_data_hashes,
                 )
 
         return spiff_bpmn_process_dict
@@ -1,18 +1,35 @@
 import contextlib
 import time
 from collections.abc import Generator
+from typing import Any
+
+from flask import current_app
+from prometheus_client import Histogram
+from sqlalchemy import or_
 
 from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
 from spiffworkflow_backend.models.process_instance import ProcessInstanceCannotBeRunError
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.process_instance_event import ProcessInstanceEventType
+from spiffworkflow_backend.models.process_instance_queue import PROCESS_INSTANCE_QUEUE_PRIORITY_VALUES
 from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueueModel
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueuePriority
 from spiffworkflow_backend.services.error_handling_service import ErrorHandlingService
 from spiffworkflow_backend.services.process_instance_event_service import ProcessInstanceEventService
 from spiffworkflow_backend.services.process_instance_lock_service import ExpectedLockNotFoundError
 from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
+from spiffworkflow_backend.services.process_instance_wakeup_service import ProcessInstanceWakeupService
+from spiffworkflow_backend.services.process_instance_workflow_cache_service import ProcessInstanceWorkflowCacheService
 from spiffworkflow_backend.services.workflow_execution_service import WorkflowExecutionServiceError
 
+PROCESS_INSTANCE_QUEUE_WAIT_SECONDS = Histogram(
+    "spiff_process_instance_queue_wait_seconds",
+    "Seconds from when a queue entry was enqueued, or became due if later, until the background runtime claimed it to run.",
+    ["status", "trigger"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+
 
 class ProcessInstanceIsNotEnqueuedError(Exception):
     pass
@@ -42,16 +59,29 @@ class ProcessInstanceQueueService:
     def _configure_and_save_queue_entry(
         cls, process_instance: ProcessInstanceModel, queue_entry: ProcessInstanceQueueModel
     ) -> None:
-        queue_entry.priority = 2
+        if queue_entry.priority is None:
+            queue_entry.priority = ProcessInstanceQueuePriority.normal.queue_value()
         queue_entry.status = process_instance.status
         queue_entry.locked_by = None
         queue_entry.locked_at_in_seconds = None
 
         db.session.add(queue_entry)
+        # nothing else is going to run an instance that is enqueued to run later, so wake the background runtime then
+        if queue_entry.run_at_in_seconds > round(time.time()) and ProcessInstanceWakeupService.is_enabled():
+            if process_instance.id is None:
+                db.session.flush()
+            ProcessInstanceWakeupService.request_wakeup(process_instance.id, queue_entry.run_at_in_seconds)
 
     @classmethod
-    def enqueue_new_process_instance(cls, process_instance: ProcessInstanceModel, run_at_in_seconds: int) -> None:
-        queue_entry = ProcessInstanceQueueModel(process_instance=process_instance, run_at_in_seconds=run_at_in_seconds)
+    def enqueue_new_process_instance(
+        cls,
+        process_instance: ProcessInstanceModel,
+        run_at_in_seconds: int,
+        priority: int = ProcessInstanceQueuePriority.normal.queue_value(),
+    ) -> None:
+        queue_entry = ProcessInstanceQueueModel(
+            process_instance=process_instance, run_at_in_seconds=run_at_in_seconds, priority=priority
+        )
         cls._configure_and_save_queue_entry(process_instance, queue_entry)
 
     @classmethod
@@ -137,14 +167,19 @@ class ProcessInstanceQueueService:
         # service entry paths and then we can lock from those same or closer locations when necessary.
         # See: https://github.com/sartography/spiff-arena/pull/2165
         if needs_dequeue:
-            reentering_lock = ProcessInstanceLockService.has_lock(process_instance.id)
+            # a lock taken by claim_many is already held but nobody is working under it yet,
+            # so this call takes it over and releases it at the end like any top level call.
+            claimed = ProcessInstanceLockService.take_claim(process_instance.id)
+            reentering_lock = not claimed and ProcessInstanceLockService.has_lock(process_instance.id)
 
-            if not reentering_lock:
+            if not reentering_lock and not claimed:
                 # this can blow up with ProcessInstanceIsNotEnqueuedError or ProcessInstanceIsAlreadyLockedError
                 # that's fine, let it bubble up. and in that case, there's no need to _enqueue / unlock
                 cls._dequeue_with_retries(process_instance, max_attempts=max_attempts)
+            completed_without_error = False
             try:
                 yield
+                completed_without_error = True
             except ProcessInstanceCannotBeRunError as ex:
                 if not ignore_cannot_be_run_error:
                     raise ex
@@ -164,7 +199,15 @@ class ProcessInstanceQueueService:
                 raise ex
             finally:
                 if not reentering_lock:
-                    cls._enqueue(process_instance)
+                    try:
+                        # hand the workflow saved while we held the lock to the hydrated workflow cache
+                        # before anyone else can lock and change the process instance.
+                        if completed_without_error:
+                            ProcessInstanceWorkflowCacheService.check_in_pending(process_instance)
+                        else:
+                            ProcessInstanceWorkflowCacheService.discard_pending(process_instance.id)
+                    finally:
+                        cls._enqueue(process_instance)
         else:
             yield
 
@@ -176,17 +219,173 @@ class ProcessInstanceQueueService:
         run_at_in_seconds_threshold: int,
         min_age_in_seconds: int = 0,
     ) -> list[ProcessInstanceQueueModel]:
-        return (
-            db.session.query(ProcessInstanceQueueModel)
-            .filter(
+        current_time = round(time.time())
+        query = db.session.query(ProcessInstanceQueueModel).filter(
+            ProcessInstanceQueueModel.status == status_value,
+            ProcessInstanceQueueModel.updated_at_in_seconds <= current_time - min_age_in_seconds,
+            # At least a minute old.
+            ProcessInstanceQueueModel.locked_by == locked_by,
+            ProcessInstanceQueueModel.run_at_in_seconds <= run_at_in_seconds_threshold,
+        )
+        return cls._runnable_entries(query, current_time)
+
+    @classmethod
+    def _runnable_entries(cls, query: Any, current_time: int, limit: int | None = None) -> list[Any]:
+        """Returns the first limit queue entries of the query by priority, then by how long they have been due to run.
+
+        An entry moves up one priority level for every SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_QUEUE_PRIORITY_AGING_IN_SECONDS
+        it has been waiting past its run_at_in_seconds, so a steady stream of high priority instances cannot keep low
+        priority ones from ever running. That depends on the current time so the database cannot order by it from an
+        index. Instead each priority is read in run_at_in_seconds order, which the process_instance_queue_status_priority_run_at
+        index serves, and the priorities are merged here. Within a priority aging keeps that order, so the first limit
+        entries overall are among the first limit entries of their priority. The query has to select the priority.
+        """
+        priority_values = sorted(set(PROCESS_INSTANCE_QUEUE_PRIORITY_VALUES.values()))
+        priority_queries = [query.filter(ProcessInstanceQueueModel.priority == value) for value in priority_values]
+        priority_queries.append(
+            query.filter(
+                or_(
+                    ProcessInstanceQueueModel.priority.is_(None),  # type: ignore
+                    ProcessInstanceQueueModel.priority.notin_(priority_values),  # type: ignore
+                )
+            )
+        )
+        entries = []
+        for priority_query in priority_queries:
+            ordered_query = priority_query.order_by(ProcessInstanceQueueModel.run_at_in_seconds, ProcessInstanceQueueModel.id)
+            entries.extend((ordered_query if limit is None else ordered_query.limit(limit)).all())
+
+        aging_in_seconds = int(current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_QUEUE_PRIORITY_AGING_IN_SECONDS"])
+        normal_priority = ProcessInstanceQueuePriority.normal.queue_value()
+
+        def aged_priority(entry: Any) -> tuple[int, int, int]:
+            priority = normal_priority if entry.priority is None else entry.priority
+            if aging_in_seconds > 0:
+                priority -= (current_time - entry.run_at_in_seconds) // aging_in_seconds
+            return (priority, entry.run_at_in_seconds, entry.id)
+
+        entries.sort(key=aged_priority)
+        return entries if limit is None else entries[:limit]
+
+    @classmethod
+    def claim_many(
+        cls,
+        status_value: str,
+        run_at_in_seconds_threshold: int,
+        min_age_in_seconds: int = 0,
+        limit: int = 10,
+    ) -> list[int]:
+        """Locks up to limit runnable queue entries for the current locking context and returns their process instance ids.
+
+        Each returned process instance must either be run with dequeued, which releases the lock when it is done,
+        or be given back with release_claim. On postgres and mysql the candidate rows are selected with
+        FOR UPDATE SKIP LOCKED, so concurrent claimers get different rows without waiting on or failing against
+        each other. sqlite has no row locks and only allows one writer at a time, so there the update only takes
+        rows that are still unlocked and the rows we actually got are read back afterwards.
+        """
+        current_time = round(time.time())
+        return cls._claim_entries(
+            [
                 ProcessInstanceQueueModel.status == status_value,
-                ProcessInstanceQueueModel.updated_at_in_seconds <= round(time.time()) - min_age_in_seconds,
-                # At least a minute old.
-                ProcessInstanceQueueModel.locked_by == locked_by,
+                ProcessInstanceQueueModel.updated_at_in_seconds <= current_time - min_age_in_seconds,
                 ProcessInstanceQueueModel.run_at_in_seconds <= run_at_in_seconds_threshold,
+            ],
+            current_time,
+            limit,
+            trigger="poll",
+        )
+
+    @classmethod
+    def claim_process_instances(
+        cls, process_instance_ids: list[int], status_values: list[str], run_at_in_seconds_threshold: int
+    ) -> list[int]:
+        """Like claim_many but for the given process instances, whatever their age, if they have one of status_values."""
+        if len(process_instance_ids) == 0:
+            return []
+        return cls._claim_entries(
+            [
+                ProcessInstanceQueueModel.process_instance_id.in_(process_instance_ids),  # type: ignore
+                ProcessInstanceQueueModel.status.in_(status_values),  # type: ignore
+                ProcessInstanceQueueModel.run_at_in_seconds <= run_at_in_seconds_threshold,
+            ],
+            round(time.time()),
+            len(process_instance_ids),
+            trigger="wakeup",
+        )
+
+    @classmethod
+    def _claim_entries(cls, filters: list[Any], current_time: int, limit: int, trigger: str) -> list[int]:
+        locked_by = ProcessInstanceLockService.locked_by()
+        skip_locked = dialect_name() in ["mysql", "postgresql"]
+
+        candidates_query = db.session.query(
+            ProcessInstanceQueueModel.id,
+            ProcessInstanceQueueModel.process_instance_id,
+            ProcessInstanceQueueModel.priority,
+            ProcessInstanceQueueModel.status,
+            ProcessInstanceQueueModel.run_at_in_seconds,
+            ProcessInstanceQueueModel.updated_at_in_seconds,
+        ).filter(
+            *filters,
+            ProcessInstanceQueueModel.locked_by.is_(None),  # type: ignore
+        )
+        if skip_locked:
+            candidates_query = candidates_query.with_for_update(skip_locked=True)
+        candidates = cls._runnable_entries(candidates_query, current_time, limit)
+        if len(candidates) == 0:
+            db.session.commit()
+            return []
+
+        db.session.query(ProcessInstanceQueueModel).filter(
+            ProcessInstanceQueueModel.id.in_([c.id for c in candidates]),  # type: ignore
+            ProcessInstanceQueueModel.locked_by.is_(None),  # type: ignore
+        ).update(
+            {
+                "locked_by": locked_by,
+                "locked_at_in_seconds": current_time,
+            },
+            synchronize_session=False,
+        )
+        db.session.commit()
+
+        claimed_entries = candidates
+        if not skip_locked:
+            claimed_queue_entry_ids = {
+                queue_entry_id
+                for (queue_entry_id,) in db.session.query(ProcessInstanceQueueModel.id).filter(
+                    ProcessInstanceQueueModel.id.in_([c.id for c in candidates]),  # type: ignore
+                    ProcessInstanceQueueModel.locked_by == locked_by,
+                )
+            }
+            claimed_entries = [c for c in candidates if c.id in claimed_queue_entry_ids]
+
+        claimed_at = time.time()
+        for queue_entry in claimed_entries:
+            ProcessInstanceLockService.claim(queue_entry.process_instance_id, queue_entry.id)
+            # bulk updates skip the orm listener, so updated_at_in_seconds is still when the entry was enqueued
+            runnable_since = max(queue_entry.run_at_in_seconds, queue_entry.updated_at_in_seconds or 0)
+            PROCESS_INSTANCE_QUEUE_WAIT_SECONDS.labels(status=queue_entry.status, trigger=trigger).observe(
+                max(claimed_at - runnable_since, 0)
             )
-            .all()
+        return [queue_entry.process_instance_id for queue_entry in claimed_entries]
+
+    @classmethod
+    def release_claim(cls, process_instance_id: int) -> None:
+        """Unlocks a process instance from claim_many that was not run, leaving its queue entry as it was."""
+        if not ProcessInstanceLockService.take_claim(process_instance_id):
+            return
+        queue_entry_id = ProcessInstanceLockService.unlock(process_instance_id)
+        db.session.query(ProcessInstanceQueueModel).filter(
+            ProcessInstanceQueueModel.id == queue_entry_id,
+            ProcessInstanceQueueModel.locked_by == ProcessInstanceLockService.locked_by(),
+        ).update(
+            {
+                "locked_by": None,
+                "locked_at_in_seconds": None,
+            },
+            synchronize_session=False,
         )
+        db.session.commit()
 
     @classmethod
     def peek_many(
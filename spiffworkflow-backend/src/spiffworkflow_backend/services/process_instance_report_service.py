@@ -22,6 +22,7 @@ from spiffworkflow_backend.models.human_task import HumanTaskModel
 from spiffworkflow_backend.models.human_task_group import HumanTaskGroupModel
 from spiffworkflow_backend.models.human_task_user import HumanTaskUserModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance_materialized_metadata import ProcessInstanceMaterializedMetadataModel
 from spiffworkflow_backend.models.process_instance_metadata import ProcessInstanceMetadataModel
 from spiffworkflow_backend.models.process_instance_report import FilterValue
 from spiffworkflow_backend.models.process_instance_report import ProcessInstanceReportModel
@@ -30,6 +31,8 @@ from spiffworkflow_backend.models.process_instance_report import ReportMetadataC
 from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.models.user_group_assignment import UserGroupAssignmentModel
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
+from spiffworkflow_backend.utils.pagination import SortKey
+from spiffworkflow_backend.utils.pagination import paginate_query
 
 
 class ProcessInstanceReportNotFoundError(Exception):
@@ -550,18 +553,46 @@ class ProcessInstanceReportService:
         )
         return process_instance_query
 
+    @classmethod
+    def metadata_filter_condition(cls, metadata_value: Any, filter_for_column: FilterValue) -> Any:
+        field_value = filter_for_column["field_value"]
+        operator = filter_for_column.get("operator", "equals")
+        if operator == "equals":
+            return metadata_value == field_value
+        elif operator == "not_equals":
+            return metadata_value != field_value
+        elif operator == "greater_than_or_equal_to":
+            return cls.metadata_value_expression_for_filter(metadata_value, field_value) >= field_value
+        elif operator == "less_than":
+            return cls.metadata_value_expression_for_filter(metadata_value, field_value) < field_value
+        elif operator == "contains":
+            return metadata_value.like(f"%{field_value}%")
+        elif operator == "is_empty":
+            return or_(metadata_value.is_(None), metadata_value == "")
+        elif operator == "is_not_empty":
+            return or_(metadata_value.is_not(None), metadata_value != "")
+        return None
+
     @classmethod
     def add_where_clauses_for_process_instance_metadata_filters(
         cls,
         process_instance_query: Query,
         report_metadata: ReportMetadata,
-        instance_metadata_aliases: dict[str, Any],
+        instance_metadata_values: dict[str, Any],
     ) -> Query:
-        for column in report_metadata["columns"]:
-            if column["accessor"] in cls.non_metadata_columns():
-                continue
+        metadata_columns = [
+            column for column in report_metadata["columns"] if column["accessor"] not in cls.non_metadata_columns()
+        ]
+        if not metadata_columns:
+            return process_instance_query
+        if current_app.config["SPIFFWORKFLOW_BACKEND_USE_MATERIALIZED_PROCESS_INSTANCE_METADATA"]:
+            return cls.add_where_clauses_for_materialized_process_instance_metadata_filters(
+                process_instance_query, report_metadata, metadata_columns, instance_metadata_values
+            )
+
+        for column in metadata_columns:
             instance_metadata_alias = aliased(ProcessInstanceMetadataModel)
-            instance_metadata_aliases[column["accessor"]] = instance_metadata_alias
+            instance_metadata_values[column["accessor"]] = instance_metadata_alias.value
 
             filters_for_column = []
             if "filter_by" in report_metadata:
@@ -571,43 +602,54 @@ class ProcessInstanceReportService:
                 ProcessInstanceModel.id == instance_metadata_alias.process_instance_id,
                 instance_metadata_alias.key == column["accessor"],
             ]
-            if len(filters_for_column) > 0:
-                for filter_for_column in filters_for_column:
-                    isouter = False
-                    metadata_value_expression = cls.metadata_value_expression_for_filter(
-                        instance_metadata_alias.value,
-                        filter_for_column["field_value"],
-                    )
-                    if "operator" not in filter_for_column or filter_for_column["operator"] == "equals":
-                        join_conditions.append(instance_metadata_alias.value == filter_for_column["field_value"])
-                    elif filter_for_column["operator"] == "not_equals":
-                        join_conditions.append(instance_metadata_alias.value != filter_for_column["field_value"])
-                    elif filter_for_column["operator"] == "greater_than_or_equal_to":
-                        join_conditions.append(metadata_value_expression >= filter_for_column["field_value"])
-                    elif filter_for_column["operator"] == "less_than":
-                        join_conditions.append(metadata_value_expression < filter_for_column["field_value"])
-                    elif filter_for_column["operator"] == "contains":
-                        join_conditions.append(instance_metadata_alias.value.like(f"%{filter_for_column['field_value']}%"))
-                    elif filter_for_column["operator"] == "is_empty":
-                        # we still need to return results if the metadata value is null so make sure it's outer join
-                        isouter = True
-                        process_instance_query = process_instance_query.filter(
-                            or_(instance_metadata_alias.value.is_(None), instance_metadata_alias.value == "")
-                        )
-                    elif filter_for_column["operator"] == "is_not_empty":
-                        join_conditions.append(
-                            or_(instance_metadata_alias.value.is_not(None), instance_metadata_alias.value != "")
-                        )
+            for filter_for_column in filters_for_column:
+                isouter = False
+                filter_condition = cls.metadata_filter_condition(instance_metadata_alias.value, filter_for_column)
+                if filter_for_column.get("operator") == "is_empty":
+                    # we still need to return results if the metadata value is null so make sure it's outer join
+                    isouter = True
+                    process_instance_query = process_instance_query.filter(filter_condition)
+                elif filter_condition is not None:
+                    join_conditions.append(filter_condition)
             process_instance_query = process_instance_query.join(  # type: ignore
                 instance_metadata_alias, and_(*join_conditions), isouter=isouter
             ).add_columns(func.max(instance_metadata_alias.value).label(column["accessor"]))
         return process_instance_query
 
+    @classmethod
+    def add_where_clauses_for_materialized_process_instance_metadata_filters(
+        cls,
+        process_instance_query: Query,
+        report_metadata: ReportMetadata,
+        metadata_columns: list[ReportMetadataColumn],
+        instance_metadata_values: dict[str, Any],
+    ) -> Query:
+        """Reads every metadata column from the process instance's one materialized metadata row.
+
+        A value that is missing from the row is null, which filters treat the same way as the outer join in
+        add_where_clauses_for_process_instance_metadata_filters treats a missing process_instance_metadata row.
+        """
+        process_instance_query = process_instance_query.outerjoin(  # type: ignore
+            ProcessInstanceMaterializedMetadataModel,
+            ProcessInstanceMaterializedMetadataModel.process_instance_id == ProcessInstanceModel.id,
+        )
+        for column in metadata_columns:
+            metadata_value = ProcessInstanceMaterializedMetadataModel.metadata_values[column["accessor"]].as_string()
+            instance_metadata_values[column["accessor"]] = metadata_value
+            for filter_for_column in report_metadata.get("filter_by", []):
+                if filter_for_column["field_name"] != column["accessor"]:
+                    continue
+                filter_condition = cls.metadata_filter_condition(metadata_value, filter_for_column)
+                if filter_condition is not None:
+                    process_instance_query = process_instance_query.filter(filter_condition)
+            process_instance_query = process_instance_query.add_columns(func.max(metadata_value).label(column["accessor"]))
+        return process_instance_query
+
     @classmethod
     def generate_order_by_query_array(
         cls,
         report_metadata: ReportMetadata,
-        instance_metadata_aliases: dict[str, Any],
+        instance_metadata_values: dict[str, Any],
     ) -> list:
         order_by_query_array = []
         order_by_array = report_metadata["order_by"]
@@ -620,13 +662,35 @@ class ProcessInstanceReportService:
                     order_by_query_array.append(getattr(ProcessInstanceModel, attribute).desc())
                 else:
                     order_by_query_array.append(getattr(ProcessInstanceModel, attribute).asc())
-            elif attribute in instance_metadata_aliases:
+            elif attribute in instance_metadata_values:
                 if order_by_option.startswith("-"):
-                    order_by_query_array.append(func.max(instance_metadata_aliases[attribute].value).desc())
+                    order_by_query_array.append(func.max(instance_metadata_values[attribute]).desc())
                 else:
-                    order_by_query_array.append(func.max(instance_metadata_aliases[attribute].value).asc())
+                    order_by_query_array.append(func.max(instance_metadata_values[attribute]).asc())
         return order_by_query_array
 
+    @classmethod
+    def generate_sort_keys(
+        cls, report_metadata: ReportMetadata, instance_metadata_values: dict[str, Any]
+    ) -> list[SortKey] | None:
+        """Returns the sort keys for paging the report with a cursor, or None if it is ordered by metadata.
+
+        Metadata values are aggregated per process instance, so they cannot be compared in a where clause.
+        """
+        sort_keys = []
+        order_by_array = report_metadata["order_by"]
+        if len(order_by_array) < 1:
+            order_by_array = ProcessInstanceReportModel.default_order_by()
+        for order_by_option in order_by_array:
+            attribute = re.sub("^-", "", order_by_option)
+            if attribute in cls.process_instance_stock_columns():
+                sort_keys.append(SortKey(getattr(ProcessInstanceModel, attribute), descending=order_by_option.startswith("-")))
+            elif attribute in instance_metadata_values:
+                return None
+        if "id" not in [sort_key.column.key for sort_key in sort_keys]:
+            sort_keys.append(SortKey(ProcessInstanceModel.id, descending=True))  # type: ignore
+        return sort_keys
+
     @classmethod
     def get_basic_query(
         cls,
@@ -724,6 +788,8 @@ class ProcessInstanceReportService:
         user: UserModel | None = None,
         page: int = 1,
         per_page: int = 100,
+        cursor: str | None = None,
+        total_count: str | None = None,
     ) -> dict:
         restrict_human_tasks_to_user = None
         filters = report_metadata["filter_by"]
@@ -795,19 +861,25 @@ class ProcessInstanceReportService:
                 instances_with_tasks_waiting_for_me=instances_with_tasks_waiting_for_me,
             )
 
-        instance_metadata_aliases: dict[str, Any] = {}
+        instance_metadata_values: dict[str, Any] = {}
         if report_metadata["columns"] is None or len(report_metadata["columns"]) < 1:
             report_metadata["columns"] = cls.builtin_column_options()
         process_instance_query = cls.add_where_clauses_for_process_instance_metadata_filters(
-            process_instance_query, report_metadata, instance_metadata_aliases
+            process_instance_query, report_metadata, instance_metadata_values
         )
-        order_by_query_array = cls.generate_order_by_query_array(report_metadata, instance_metadata_aliases)
+        sort_keys = cls.generate_sort_keys(report_metadata, instance_metadata_values)
+        if sort_keys is None:
+            process_instance_query = process_instance_query.order_by(
+                *cls.generate_order_by_query_array(report_metadata, instance_metadata_values)
+            )
 
-        process_instances = (
-            process_instance_query.group_by(ProcessInstanceModel.id)  # type: ignore
-            .add_columns(ProcessInstanceModel.id)
-            .order_by(*order_by_query_array)
-            .paginate(page=page, per_page=per_page, error_out=False)
+        process_instances = paginate_query(
+            process_instance_query.group_by(ProcessInstanceModel.id).add_columns(ProcessInstanceModel.id),  # type: ignore
+            sort_keys,
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            total_count=total_count,
         )
         results = cls.add_metadata_columns_to_process_instance(process_instances.items, report_metadata["columns"])
 
@@ -819,10 +891,6 @@ class ProcessInstanceReportService:
         response_json = {
             "report_metadata": report_metadata,
             "results": results,
-            "pagination": {
-                "count": len(results),
-                "total": process_instances.total,
-                "pages": process_instances.pages,
-            },
+            "pagination": process_instances.pagination_json(),
         }
         return response_json
@@ -1,4 +1,3 @@
-import copy
 import json
 import logging
 import re
@@ -49,7 +48,6 @@ from spiffworkflow_backend.models.human_task_group import HumanTaskGroupModel
 from spiffworkflow_backend.models.human_task_user import HumanTaskUserAddedBy
 from spiffworkflow_backend.models.human_task_user import HumanTaskUserModel
 from spiffworkflow_backend.models.human_task_user_waiting import HumanTaskUserWaitingModel
-from spiffworkflow_backend.models.json_data import JsonDataModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceCannotBeRunError
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceStatus
@@ -59,12 +57,16 @@ from spiffworkflow_backend.models.task import TaskModel
 from spiffworkflow_backend.models.task import TaskNotFoundError
 from spiffworkflow_backend.models.user import UserModel
 from spiffworkflow_backend.services.bpmn_process_service import BpmnProcessService
+from spiffworkflow_backend.services.json_data_hash_cache_service import JsonDataHashCacheService
+from spiffworkflow_backend.services.lazy_task_data import LazyTaskDataLoader
 from spiffworkflow_backend.services.logging_service import LoggingService
 from spiffworkflow_backend.services.process_instance_event_service import ProcessInstanceEventService
 from spiffworkflow_backend.services.process_instance_persistence_service import ProcessInstancePersistenceService
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
 from spiffworkflow_backend.services.process_instance_script_engine import CustomBpmnScriptEngine
+from spiffworkflow_backend.services.process_instance_workflow_cache_service import ProcessInstanceWorkflowCacheService
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
+from spiffworkflow_backend.services.task_service import TaskPersistenceFingerprint
 from spiffworkflow_backend.services.task_service import TaskService
 from spiffworkflow_backend.services.user_service import UserService
 from spiffworkflow_backend.services.workflow_execution_service import ExecutionStrategy
@@ -152,7 +154,6 @@ class ProcessInstanceRuntime:
 
         self.process_instance_model = process_instance_model
         bpmn_process_spec = None
-        self.full_bpmn_process_dict: dict = {}
 
         # mappings of tasks and bpmn subprocesses to the model objects so we can avoid unnecessary queries in the TaskService.
         # only subprocesses should be necessary since the top-level process is on the process-instance and sqlalchemy
@@ -161,6 +162,22 @@ class ProcessInstanceRuntime:
         self.bpmn_subprocess_mapping: dict[str, BpmnProcessModel] = {}
         self.bpmn_definition_to_task_definitions_mappings: dict = {}
 
+        # set when completed task data is loaded on demand rather than during hydration. see LazyTaskDataLoader.
+        self.lazy_task_data_loader: LazyTaskDataLoader | None = None
+        if include_task_data_for_completed_tasks and current_app.config["SPIFFWORKFLOW_BACKEND_LAZY_COMPLETED_TASK_DATA"]:
+            self.lazy_task_data_loader = LazyTaskDataLoader()
+
+        # None unless incremental task persistence is enabled. see TaskModelSavingDelegate.add_object_to_db_session.
+        self.task_persistence_fingerprints: dict[str, TaskPersistenceFingerprint] | None = None
+
+        # workflows hydrated with extra data or for a specific process are not reusable by other runtimes
+        self.use_hydrated_workflow_cache = (
+            ProcessInstanceWorkflowCacheService.is_enabled()
+            and process_id_to_run is None
+            and not include_task_data_for_completed_tasks
+            and not include_completed_subprocesses
+        )
+
         subprocesses: IdToBpmnProcessSpecMapping | None = None
         if not process_instance_model.spiffworkflow_fully_initialized():
             (
@@ -176,7 +193,6 @@ class ProcessInstanceRuntime:
         try:
             (
                 self.bpmn_process_instance,
-                self.full_bpmn_process_dict,
                 self.bpmn_definition_to_task_definitions_mappings,
             ) = self.__class__.__get_bpmn_process_instance(
                 process_instance_model,
@@ -186,8 +202,17 @@ class ProcessInstanceRuntime:
                 include_completed_subprocesses=include_completed_subprocesses,
                 task_model_mapping=self.task_model_mapping,
                 bpmn_subprocess_mapping=self.bpmn_subprocess_mapping,
+                use_hydrated_workflow_cache=self.use_hydrated_workflow_cache,
+                lazy_task_data_loader=self.lazy_task_data_loader,
             )
             ProcessInstancePersistenceService.set_script_engine(self.bpmn_process_instance, self._script_engine)
+            if current_app.config["SPIFFWORKFLOW_BACKEND_INCREMENTAL_TASK_PERSISTENCE"]:
+                # tasks were just loaded from the db so their current state is what is already persisted
+                self.task_persistence_fingerprints = (
+                    TaskService.task_persistence_fingerprints_for_workflow(self.bpmn_process_instance)
+                    if process_instance_model.spiffworkflow_fully_initialized()
+                    else {}
+                )
 
         except MissingSpecError as ke:
             raise ApiError(
@@ -220,15 +245,28 @@ class ProcessInstanceRuntime:
         subprocesses: IdToBpmnProcessSpecMapping | None = None,
         include_task_data_for_completed_tasks: bool = False,
         include_completed_subprocesses: bool = False,
-    ) -> tuple[BpmnWorkflow, dict, dict]:
-        full_bpmn_process_dict = {}
+        use_hydrated_workflow_cache: bool = False,
+        lazy_task_data_loader: LazyTaskDataLoader | None = None,
+    ) -> tuple[BpmnWorkflow, dict]:
         bpmn_definition_to_task_definitions_mappings: dict = {}
-        if process_instance_model.spiffworkflow_fully_initialized():
+        cached_bpmn_process_instance = None
+        if use_hydrated_workflow_cache and process_instance_model.spiffworkflow_fully_initialized():
+            cached_bpmn_process_instance = ProcessInstancePersistenceService.get_cached_bpmn_process_instance(
+                process_instance_model,
+                bpmn_definition_to_task_definitions_mappings=bpmn_definition_to_task_definitions_mappings,
+                task_model_mapping=task_model_mapping,
+                bpmn_subprocess_mapping=bpmn_subprocess_mapping,
+            )
+
+        if cached_bpmn_process_instance is not None:
+            bpmn_process_instance = cached_bpmn_process_instance
+        elif process_instance_model.spiffworkflow_fully_initialized():
             # turn off logging to avoid duplicated spiff logs
             spiff_logger = logging.getLogger("spiff")
             original_spiff_logger_log_level = spiff_logger.level
             spiff_logger.setLevel(logging.WARNING)
 
+            lazy_task_data_hashes: dict[str, str] | None = None if lazy_task_data_loader is None else {}
             try:
                 full_bpmn_process_dict = ProcessInstancePersistenceService.get_full_bpmn_process_dict(
                     bpmn_definition_to_task_definitions_mappings=bpmn_definition_to_task_definitions_mappings,
@@ -240,10 +278,12 @@ class ProcessInstanceRuntime:
                     bpmn_process_definition=process_instance_model.bpmn_process_definition,
                     bpmn_process=process_instance_model.bpmn_process,
                     bpmn_process_definition_id=process_instance_model.bpmn_process_definition_id,
+                    lazy_task_data_hashes=lazy_task_data_hashes,
                 )
-                # FIXME: the from_dict entrypoint in spiff will one day do this copy instead
-                process_copy = copy.deepcopy(full_bpmn_process_dict)
-                bpmn_process_instance = BpmnProcessService.serializer.from_dict(process_copy)
+                # the dict shares nothing with the loaded models so the serializer can consume it without a copy
+                bpmn_process_instance = BpmnProcessService.serializer.from_dict(full_bpmn_process_dict)
+                if lazy_task_data_loader is not None and lazy_task_data_hashes is not None:
+                    lazy_task_data_loader.attach(bpmn_process_instance, lazy_task_data_hashes)
                 bpmn_process_instance.get_tasks()
             except Exception as err:
                 raise err
@@ -254,7 +294,6 @@ class ProcessInstanceRuntime:
 
         return (
             bpmn_process_instance,
-            full_bpmn_process_dict,
             bpmn_definition_to_task_definitions_mappings,
         )
 
@@ -408,6 +447,8 @@ class ProcessInstanceRuntime:
         db.session.add(self.process_instance_model)
         self._process_human_tasks(metadata)
         db.session.commit()
+        if self.use_hydrated_workflow_cache:
+            ProcessInstanceWorkflowCacheService.stage_for_check_in(self.process_instance_model.id, self.bpmn_process_instance)
         self._dispatch_pending_task_available_process_model_triggers()
 
     def _save_process_instance_state(self) -> None:
@@ -733,6 +774,7 @@ class ProcessInstanceRuntime:
             bpmn_definition_to_task_definitions_mappings=self.bpmn_definition_to_task_definitions_mappings,
             bpmn_subprocess_mapping=self.bpmn_subprocess_mapping,
             task_model_mapping=self.task_model_mapping,
+            task_persistence_fingerprints=self.task_persistence_fingerprints,
         )
         execution_strategy = SkipOneExecutionStrategy(task_model_delegate, {"spiff_task": spiff_task})
         self.do_engine_steps(save=True, execution_strategy=execution_strategy, ignore_cannot_be_run_error=True)
@@ -769,6 +811,8 @@ class ProcessInstanceRuntime:
         runtime = ProcessInstanceRuntime(
             process_instance, include_task_data_for_completed_tasks=True, include_completed_subprocesses=True
         )
+        # every task is saved again below so load the data for all of them up front
+        runtime.materialize_lazy_task_data()
         deleted_tasks = runtime.bpmn_process_instance.reset_from_task_id(UUID(to_task_guid))
         spiff_tasks = runtime.bpmn_process_instance.get_tasks()
 
@@ -923,6 +967,7 @@ class ProcessInstanceRuntime:
             bpmn_definition_to_task_definitions_mappings=self.bpmn_definition_to_task_definitions_mappings,
             bpmn_subprocess_mapping=self.bpmn_subprocess_mapping,
             task_model_mapping=self.task_model_mapping,
+            task_persistence_fingerprints=self.task_persistence_fingerprints,
         )
 
         if execution_strategy is None:
@@ -1018,7 +1063,13 @@ class ProcessInstanceRuntime:
                 message=f"Maximum task data size of {task_data_limit} exceeded.",
             )
 
+    def materialize_lazy_task_data(self) -> None:
+        """Loads any completed task data that has not been touched yet in one query."""
+        if self.lazy_task_data_loader is not None:
+            self.lazy_task_data_loader.materialize_all()
+
     def serialize(self, serialize_script_engine_state: bool = True) -> dict:
+        self.materialize_lazy_task_data()
         self.check_task_data_size()
 
         if serialize_script_engine_state:
@@ -1163,7 +1214,7 @@ class ProcessInstanceRuntime:
             task_model_mapping=self.task_model_mapping,
         )
         task_service.update_task_model(task_model, spiff_task)
-        JsonDataModel.insert_or_update_json_data_records(task_service.json_data_dicts)
+        JsonDataHashCacheService.insert_or_update_json_data_records(task_service.json_data_records_to_insert())
 
         ProcessInstanceEventService.add_event_to_process_instance(
             self.process_instance_model,
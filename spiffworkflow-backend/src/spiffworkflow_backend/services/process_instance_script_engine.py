@@ -5,16 +5,22 @@ import json
 import os
 import random
 import re
+import threading
 import time
 import uuid
+from collections import OrderedDict
 from collections.abc import Callable
+from collections.abc import Generator
+from contextlib import contextmanager
 from datetime import datetime
 from datetime import timedelta
+from types import CodeType
 from typing import Any
 
 import dateparser
 import pytz
 from flask import current_app
+from prometheus_client import Counter
 from RestrictedPython import safe_globals  # type: ignore
 from SpiffWorkflow.bpmn.exceptions import WorkflowTaskException  # type: ignore
 from SpiffWorkflow.bpmn.script_engine import BasePythonScriptEngineEnvironment  # type: ignore
@@ -36,6 +42,52 @@ def _import(name: str, glbls: dict[str, Any], *args: Any) -> Any:
     return glbls[name]
 
 
+SCRIPT_CODE_CACHE_TOTAL = Counter(
+    "spiff_script_code_cache_total",
+    "Lookups of compiled expressions and scripts in the per-worker script code cache.",
+    ["mode", "result"],
+)
+
+
+class ScriptCodeCache:
+    """Per-worker LRU of compiled expressions and scripts keyed by their source and compile mode.
+
+    Gateway conditions, script tasks and pre and post scripts are the same strings for every process instance
+    of a model. Restricted mode only changes the globals code runs with, so both environments share one cache.
+    """
+
+    _code: OrderedDict[tuple[str, str], CodeType] = OrderedDict()
+    _lock = threading.Lock()
+    # CustomBpmnScriptEngine is created at import time, so this is read from os.environ like its other settings
+    max_entries = int(os.environ.get("SPIFFWORKFLOW_BACKEND_SCRIPT_CODE_CACHE_MAX_ENTRIES", "4096"))
+
+    @classmethod
+    def compiled(cls, source: str, mode: str) -> CodeType:
+        """Compiles source the same way eval and exec do with a string, so the result can be passed to them instead."""
+        key = (source, mode)
+        with cls._lock:
+            code = cls._code.get(key)
+            if code is not None:
+                cls._code.move_to_end(key)
+        if code is not None:
+            SCRIPT_CODE_CACHE_TOTAL.labels(mode=mode, result="hit").inc()
+            return code
+
+        SCRIPT_CODE_CACHE_TOTAL.labels(mode=mode, result="miss").inc()
+        code = compile(source, "<string>", mode)
+        if cls.max_entries > 0:
+            with cls._lock:
+                cls._code[key] = code
+                while len(cls._code) > cls.max_entries:
+                    cls._code.popitem(last=False)
+        return code
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._code.clear()
+
+
 class BaseCustomScriptEngineEnvironment(BasePythonScriptEngineEnvironment):  # type: ignore
     def user_defined_state(self, external_context: dict[str, Any] | None = None) -> dict[str, Any]:
         return {}
@@ -68,13 +120,21 @@ class TaskDataBasedScriptEngineEnvironment(BaseCustomScriptEngineEnvironment, Ta
         self._non_user_defined_keys = {"__annotations__"}
         super().__init__(environment_globals)
 
+    def evaluate(
+        self,
+        expression: str,
+        context: dict[str, Any],
+        external_context: dict[str, Any] | None = None,
+    ) -> Any:
+        return super().evaluate(ScriptCodeCache.compiled(expression, "eval"), context, external_context)
+
     def execute(
         self,
         script: str,
         context: dict[str, Any],
         external_context: dict[str, Any] | None = None,
     ) -> bool:
-        super().execute(script, context, external_context)
+        super().execute(ScriptCodeCache.compiled(script, "exec"), context, external_context)
         for key in self._non_user_defined_keys:
             if key in context:
                 context.pop(key)
@@ -101,7 +161,7 @@ class NonTaskDataBasedScriptEngineEnvironment(BaseCustomScriptEngineEnvironment)
         state.update(external_context or {})
         state.update(self.state)
         state.update(context)
-        return eval(expression, state)  # noqa
+        return eval(ScriptCodeCache.compiled(expression, "eval"), state)  # noqa
 
     def execute(
         self,
@@ -113,7 +173,7 @@ class NonTaskDataBasedScriptEngineEnvironment(BaseCustomScriptEngineEnvironment)
         self.state.update(external_context or {})
         self.state.update(context)
         try:
-            exec(script, self.state)  # noqa
+            exec(ScriptCodeCache.compiled(script, "exec"), self.state)  # noqa
             return True
         finally:
             context_keys_to_drop = context.keys() - self.state.keys()
@@ -218,6 +278,8 @@ class CustomBpmnScriptEngine(PythonScriptEngine):  # type: ignore
 
         environment = CustomScriptEngineEnvironment.create(default_globals)
         super().__init__(environment=environment)
+        # engines are shared between threads, so each thread keeps the augmented methods it built last
+        self._augmented_methods = threading.local()
 
     def __get_process_instance_id(self) -> Any | None:
         tld = current_app.config.get("THREAD_LOCAL_DATA")
@@ -235,22 +297,44 @@ class CustomBpmnScriptEngine(PythonScriptEngine):  # type: ignore
                 process_model_identifier = tld.process_model_identifier
         return process_model_identifier
 
-    def __get_augment_methods(self, task: SpiffTask | None) -> dict[str, Callable]:
-        script_attributes_context = ScriptAttributesContext(
-            task=task,
-            environment_identifier=current_app.config["ENV_IDENTIFIER"],
-            process_instance_id=self.__get_process_instance_id(),
-            process_model_identifier=self.__get_process_model_identifier(),
+    @contextmanager
+    def __augment_methods(self, task: SpiffTask | None) -> Generator[dict[str, Callable]]:
+        """Yields the script functions that expressions and scripts can call, with the given task as their task.
+
+        Building them creates an instance of every script, so they are only rebuilt when the environment,
+        process instance or process model changes, and the task they see is swapped in for each call.
+        """
+        key = (
+            current_app.config["ENV_IDENTIFIER"],
+            self.__get_process_instance_id(),
+            self.__get_process_model_identifier(),
         )
-        return Script.generate_augmented_list(script_attributes_context)
+        cached = getattr(self._augmented_methods, "cached", None)
+        if cached is None or cached[0] != key:
+            script_attributes_context = ScriptAttributesContext(
+                task=None,
+                environment_identifier=key[0],
+                process_instance_id=key[1],
+                process_model_identifier=key[2],
+            )
+            cached = (key, script_attributes_context, Script.generate_augmented_list(script_attributes_context))
+            self._augmented_methods.cached = cached
+        _key, script_attributes_context, methods = cached
+
+        # put the previous task back afterward in case a script evaluates another expression while it runs
+        previous_task = script_attributes_context.task
+        script_attributes_context.task = task
+        try:
+            yield dict(methods)
+        finally:
+            script_attributes_context.task = previous_task
 
     def evaluate(self, task: SpiffTask, expression: str, external_context: dict[str, Any] | None = None) -> Any:
-        methods = self.__get_augment_methods(task)
-        if external_context:
-            methods.update(external_context)
-
         try:
-            return super().evaluate(task, expression, external_context=methods)
+            with self.__augment_methods(task) as methods:
+                if external_context:
+                    methods.update(external_context)
+                return super().evaluate(task, expression, external_context=methods)
         except Exception as exception:
             if task is None:
                 raise WorkflowException(
@@ -265,19 +349,19 @@ class CustomBpmnScriptEngine(PythonScriptEngine):  # type: ignore
 
     def execute(self, task: SpiffTask, script: str, external_context: Any = None) -> bool:
         try:
-            methods = self.__get_augment_methods(task)
-            if external_context:
-                methods.update(external_context)
-
-            task_name = task.task_spec.bpmn_name if hasattr(task.task_spec, "bpmn_name") else task.task_spec.name
-            task_id = str(task.id)
-            current_app.logger.debug(f"SCRIPT TASK EXECUTION - START: {task_name} (ID: {task_id})")
-
-            if script:
-                current_app.logger.debug(f"SCRIPT TASK EXECUTION - Running script for: {task_name} (ID: {task_id})")
-                super().execute(task, script, methods)
-                current_app.logger.debug(f"SCRIPT TASK EXECUTION - COMPLETED: {task_name} (ID: {task_id})")
-            return True
+            with self.__augment_methods(task) as methods:
+                if external_context:
+                    methods.update(external_context)
+
+                task_name = task.task_spec.bpmn_name if hasattr(task.task_spec, "bpmn_name") else task.task_spec.name
+                task_id = str(task.id)
+                current_app.logger.debug(f"SCRIPT TASK EXECUTION - START: {task_name} (ID: {task_id})")
+
+                if script:
+                    current_app.logger.debug(f"SCRIPT TASK EXECUTION - Running script for: {task_name} (ID: {task_id})")
+                    super().execute(task, script, methods)
+                    current_app.logger.debug(f"SCRIPT TASK EXECUTION - COMPLETED: {task_name} (ID: {task_id})")
+                return True
         except WorkflowException:
             raise
         except Exception as e:
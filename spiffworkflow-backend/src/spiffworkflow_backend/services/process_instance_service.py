@@ -1,11 +1,9 @@
-import base64
+import concurrent.futures
 import copy
-import hashlib
 import json
 import time
 from collections.abc import Generator
 from contextlib import nullcontext
-from contextlib import suppress
 from datetime import datetime
 from datetime import timezone
 from hashlib import sha256
@@ -13,10 +11,14 @@ from typing import Any
 from urllib.parse import unquote
 from uuid import UUID
 
+import flask.app
 import jsonschema
 import sentry_sdk
 from flask import current_app
 from flask import g
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from prometheus_client import Histogram
 from SpiffWorkflow.bpmn.specs.bpmn_process_spec import BpmnProcessSpec  # type: ignore
 from SpiffWorkflow.bpmn.specs.control import BoundaryEventSplit  # type: ignore
 from SpiffWorkflow.bpmn.specs.defaults import BoundaryEvent  # type: ignore
@@ -55,8 +57,10 @@ from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceStatus
 from spiffworkflow_backend.models.process_instance_event import ProcessInstanceEventModel
 from spiffworkflow_backend.models.process_instance_event import ProcessInstanceEventType
+from spiffworkflow_backend.models.process_instance_file_blob import ProcessInstanceFileBlobModel
 from spiffworkflow_backend.models.process_instance_file_data import ProcessInstanceFileDataModel
 from spiffworkflow_backend.models.process_instance_migration_detail import ProcessInstanceMigrationDetailModel
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueuePriority
 from spiffworkflow_backend.models.process_model import ProcessModelInfo
 from spiffworkflow_backend.models.process_model_cycle import ProcessModelCycleModel
 from spiffworkflow_backend.models.task import Task
@@ -72,6 +76,8 @@ from spiffworkflow_backend.services.jinja_service import JinjaService
 from spiffworkflow_backend.services.logging_service import LoggingService
 from spiffworkflow_backend.services.message_instrumentation_service import MessageSendInstrumentation
 from spiffworkflow_backend.services.process_instance_event_service import ProcessInstanceEventService
+from spiffworkflow_backend.services.process_instance_file_data_service import ProcessInstanceFileDataService
+from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
 from spiffworkflow_backend.services.process_instance_persistence_service import ProcessInstancePersistenceService
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceIsAlreadyLockedError
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceIsNotEnqueuedError
@@ -88,6 +94,23 @@ from spiffworkflow_backend.specs.start_event import StartConfiguration
 
 FileDataGenerator = Generator[tuple[dict | list, str | int, str], None, None]
 
+WAITING_SWEEP_PROCESS_INSTANCES_TOTAL = Counter(
+    "spiff_waiting_sweep_process_instances_total",
+    "Process instances handled by background sweeps of the process instance queue.",
+    ["status", "outcome"],
+)
+WAITING_SWEEP_DURATION_SECONDS = Histogram(
+    "spiff_waiting_sweep_duration_seconds",
+    "Time taken by a background sweep of the process instance queue that found work.",
+    ["status"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+WAITING_SWEEP_PROCESS_INSTANCES_PER_SECOND = Gauge(
+    "spiff_waiting_sweep_process_instances_per_second",
+    "Process instances handled per second by the most recent background sweep that found work.",
+    ["status"],
+)
+
 
 class ProcessInstanceService:
     FILE_DATA_DIGEST_PREFIX = "spifffiledatadigest+"
@@ -138,6 +161,7 @@ class ProcessInstanceService:
         start_configuration: StartConfiguration | None = None,
         load_bpmn_process_model: bool = True,
         instrumentation: MessageSendInstrumentation | None = None,
+        queue_priority: str | None = None,
     ) -> tuple[ProcessInstanceModel, StartConfiguration]:
         git_revision_error = None
         with instrumentation.phase("create_process_instance.get_git_revision") if instrumentation is not None else nullcontext():
@@ -192,7 +216,11 @@ class ProcessInstanceService:
             if instrumentation is not None
             else nullcontext()
         ):
-            ProcessInstanceQueueService.enqueue_new_process_instance(process_instance_model, run_at_in_seconds)
+            ProcessInstanceQueueService.enqueue_new_process_instance(
+                process_instance_model,
+                run_at_in_seconds,
+                priority=ProcessInstanceQueuePriority.queue_value_for(queue_priority or process_model.queue_priority),
+            )
         return (process_instance_model, start_configuration)
 
     @classmethod
@@ -224,9 +252,8 @@ class ProcessInstanceService:
                 task_model_mapping={},
                 bpmn_subprocess_mapping={},
             )
-            process_copy = copy.deepcopy(full_bpmn_process_dict)
-            target_bpmn_process_spec = BpmnProcessService.serializer.from_dict(process_copy["spec"])
-            target_subprocess_specs = BpmnProcessService.serializer.from_dict(process_copy["subprocess_specs"])
+            target_bpmn_process_spec = BpmnProcessService.serializer.from_dict(full_bpmn_process_dict["spec"])
+            target_subprocess_specs = BpmnProcessService.serializer.from_dict(full_bpmn_process_dict["subprocess_specs"])
 
         initial_bpmn_process_hash = process_instance.bpmn_process_definition.full_process_model_hash
         if target_bpmn_process_hash == initial_bpmn_process_hash:
@@ -419,6 +446,7 @@ class ProcessInstanceService:
         commit_db: bool = True,
         load_bpmn_process_model: bool = True,
         instrumentation: MessageSendInstrumentation | None = None,
+        queue_priority: str | None = None,
     ) -> ProcessInstanceModel:
         with instrumentation.phase("create_process_instance.get_process_model") if instrumentation is not None else nullcontext():
             process_model = ProcessModelService.get_process_model(process_model_identifier)
@@ -427,6 +455,7 @@ class ProcessInstanceService:
             user,
             load_bpmn_process_model=load_bpmn_process_model,
             instrumentation=instrumentation,
+            queue_priority=queue_priority,
         )
         with (
             instrumentation.phase("create_process_instance.register_process_model_cycles")
@@ -578,37 +607,204 @@ class ProcessInstanceService:
     # this is only used from background runtime
     @classmethod
     def do_waiting(cls, status_value: str) -> None:
-        run_at_in_seconds_threshold = round(time.time())
+        sweep_started_at = time.time()
+        run_at_in_seconds_threshold = round(sweep_started_at)
         min_age_in_seconds = 60  # to avoid conflicts with the interstitial page, we wait 60 seconds before processing
-        process_instance_ids_to_check = ProcessInstanceQueueService.peek_many(
-            status_value, run_at_in_seconds_threshold, min_age_in_seconds
-        )
-        if len(process_instance_ids_to_check) == 0:
+        execution_strategy_name = current_app.config["SPIFFWORKFLOW_BACKEND_ENGINE_STEP_DEFAULT_STRATEGY_BACKGROUND"]
+        concurrency = int(current_app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_WAITING_SWEEP_CONCURRENCY"])
+
+        if should_queue_process_instance():
+            # the celery workers lock the process instances themselves and a lock cannot be handed to
+            # another process, so only look for the ones to publish here.
+            process_instance_ids_to_check = ProcessInstanceQueueService.peek_many(
+                status_value, run_at_in_seconds_threshold, min_age_in_seconds
+            )
+            records = (
+                db.session.query(ProcessInstanceModel)
+                .filter(ProcessInstanceModel.id.in_(process_instance_ids_to_check))  # type: ignore
+                .all()
+            )
+            outcomes = [
+                cls._do_waiting_for_process_instance(process_instance, status_value, execution_strategy_name)
+                for process_instance in records
+            ]
+        elif concurrency > 1:
+            outcomes = cls._do_waiting_with_worker_pool(
+                status_value, run_at_in_seconds_threshold, min_age_in_seconds, execution_strategy_name, concurrency
+            )
+        else:
+            outcomes = cls._claim_and_run_waiting_process_instances(
+                status_value, run_at_in_seconds_threshold, min_age_in_seconds, execution_strategy_name
+            )
+        if len(outcomes) == 0:
             return
 
-        records = (
-            db.session.query(ProcessInstanceModel)
-            .filter(ProcessInstanceModel.id.in_(process_instance_ids_to_check))  # type: ignore
-            .all()
+        sweep_duration = time.time() - sweep_started_at
+        for outcome in outcomes:
+            WAITING_SWEEP_PROCESS_INSTANCES_TOTAL.labels(status=status_value, outcome=outcome).inc()
+        WAITING_SWEEP_DURATION_SECONDS.labels(status=status_value).observe(sweep_duration)
+        WAITING_SWEEP_PROCESS_INSTANCES_PER_SECOND.labels(status=status_value).set(len(outcomes) / max(sweep_duration, 0.001))
+        current_app.logger.info(
+            f"Runtime {status_value}: Swept {len(outcomes)} process instances in {sweep_duration:.3f} seconds "
+            f"with concurrency {concurrency}"
         )
-        execution_strategy_name = current_app.config["SPIFFWORKFLOW_BACKEND_ENGINE_STEP_DEFAULT_STRATEGY_BACKGROUND"]
-        for process_instance in records:
-            current_app.logger.info(f"Runtime {status_value}: Processing process_instance {process_instance.id}")
-            try:
-                if not queue_process_instance_if_appropriate(process_instance):
-                    cls.run_process_instance_with_runtime(
-                        process_instance, status_value=status_value, execution_strategy_name=execution_strategy_name
-                    )
-            except ProcessInstanceIsAlreadyLockedError:
-                # we will try again later
-                continue
-            except Exception as exception:
-                db.session.rollback()  # in case the above left the database with a bad transaction
-                new_exception = Exception(
-                    f"Error running {status_value} task for process_instance {process_instance.id}"
-                    + f"({process_instance.process_model_identifier}). {exception.__class__.__name__}: {str(exception)}"
+
+    @classmethod
+    def _claim_and_run_waiting_process_instances(
+        cls,
+        status_value: str,
+        run_at_in_seconds_threshold: int,
+        min_age_in_seconds: int,
+        execution_strategy_name: str,
+    ) -> list[str]:
+        """Claims batches of runnable process instances and runs them until there are none left to claim."""
+        claim_batch_size = int(current_app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_CLAIM_BATCH_SIZE"])
+        process_instance_ids_seen: set[int] = set()
+        outcomes = []
+        while True:
+            process_instance_ids = ProcessInstanceQueueService.claim_many(
+                status_value, run_at_in_seconds_threshold, min_age_in_seconds, limit=claim_batch_size
+            )
+            if len(process_instance_ids) == 0:
+                break
+
+            # an instance that is claimable again after we ran it has nothing left to do in this sweep
+            process_instance_ids_to_run = [pid for pid in process_instance_ids if pid not in process_instance_ids_seen]
+            process_instance_ids_seen.update(process_instance_ids)
+            records = (
+                db.session.query(ProcessInstanceModel)
+                .filter(ProcessInstanceModel.id.in_(process_instance_ids_to_run))  # type: ignore
+                .all()
+            )
+            for process_instance in records:
+                try:
+                    outcomes.append(cls._do_waiting_for_process_instance(process_instance, status_value, execution_strategy_name))
+                finally:
+                    ProcessInstanceQueueService.release_claim(process_instance.id)
+
+            for process_instance_id in process_instance_ids:
+                ProcessInstanceQueueService.release_claim(process_instance_id)
+            if len(process_instance_ids_to_run) < len(process_instance_ids):
+                break
+        return outcomes
+
+    @classmethod
+    def _do_waiting_with_worker_pool(
+        cls,
+        status_value: str,
+        run_at_in_seconds_threshold: int,
+        min_age_in_seconds: int,
+        execution_strategy_name: str,
+        concurrency: int,
+    ) -> list[str]:
+        """Claims and runs process instances on a bounded pool of threads.
+
+        Each worker gets its own app context, and with it its own db session, and its own locking context.
+        Workers claim their own batches, so the queue lock on a process instance is only ever held by the
+        worker running it and workers never wait on each other's rows.
+        """
+        app = current_app._get_current_object()  # type: ignore
+        locking_domain = ProcessInstanceLockService.get_thread_local_locking_context()["domain"]
+        outcomes = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix=f"spiff-sweep-{status_value}"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    cls._do_waiting_in_worker,
+                    app,
+                    status_value,
+                    run_at_in_seconds_threshold,
+                    min_age_in_seconds,
+                    execution_strategy_name,
+                    locking_domain,
                 )
-                current_app.logger.exception(new_exception, stack_info=True)
+                for _ in range(concurrency)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    outcomes.extend(future.result())
+                except Exception as exception:
+                    current_app.logger.exception(
+                        f"Error in {status_value} sweep worker. {exception.__class__.__name__}: {str(exception)}"
+                    )
+        return outcomes
+
+    @classmethod
+    def _do_waiting_in_worker(
+        cls,
+        app: flask.app.Flask,
+        status_value: str,
+        run_at_in_seconds_threshold: int,
+        min_age_in_seconds: int,
+        execution_strategy_name: str,
+        locking_domain: str,
+    ) -> list[str]:
+        with app.app_context():
+            ProcessInstanceLockService.set_thread_local_locking_context(locking_domain)
+            return cls._claim_and_run_waiting_process_instances(
+                status_value, run_at_in_seconds_threshold, min_age_in_seconds, execution_strategy_name
+            )
+
+    @classmethod
+    def run_woken_process_instances(cls, process_instance_ids: list[int]) -> list[str]:
+        """Runs the given process instances if they are due and nothing else has them locked.
+
+        This is how the background runtime handles wakeups. Anything it cannot claim right now is left to the
+        polling sweeps, or to whatever has it locked, which will enqueue it again when it is done.
+        """
+        execution_strategy_name = current_app.config["SPIFFWORKFLOW_BACKEND_ENGINE_STEP_DEFAULT_STRATEGY_BACKGROUND"]
+        claimed_ids = ProcessInstanceQueueService.claim_process_instances(
+            process_instance_ids,
+            [
+                ProcessInstanceStatus.not_started.value,
+                ProcessInstanceStatus.running.value,
+                ProcessInstanceStatus.user_input_required.value,
+                ProcessInstanceStatus.waiting.value,
+            ],
+            round(time.time()),
+        )
+        outcomes = []
+        try:
+            records = (
+                db.session.query(ProcessInstanceModel).filter(ProcessInstanceModel.id.in_(claimed_ids)).all()  # type: ignore
+            )
+            for process_instance in records:
+                status_value = process_instance.status
+                try:
+                    outcome = cls._do_waiting_for_process_instance(process_instance, status_value, execution_strategy_name)
+                finally:
+                    ProcessInstanceQueueService.release_claim(process_instance.id)
+                WAITING_SWEEP_PROCESS_INSTANCES_TOTAL.labels(status=status_value, outcome=outcome).inc()
+                outcomes.append(outcome)
+        finally:
+            for process_instance_id in claimed_ids:
+                ProcessInstanceQueueService.release_claim(process_instance_id)
+        return outcomes
+
+    @classmethod
+    def _do_waiting_for_process_instance(
+        cls, process_instance: ProcessInstanceModel, status_value: str, execution_strategy_name: str
+    ) -> str:
+        current_app.logger.info(f"Runtime {status_value}: Processing process_instance {process_instance.id}")
+        try:
+            if queue_process_instance_if_appropriate(process_instance):
+                return "queued"
+            cls.run_process_instance_with_runtime(
+                process_instance, status_value=status_value, execution_strategy_name=execution_strategy_name
+            )
+            return "processed"
+        except ProcessInstanceIsAlreadyLockedError:
+            # we will try again later
+            return "locked"
+        except Exception as exception:
+            db.session.rollback()  # in case the above left the database with a bad transaction
+            new_exception = Exception(
+                f"Error running {status_value} task for process_instance {process_instance.id}"
+                + f"({process_instance.process_model_identifier}). {exception.__class__.__name__}: {str(exception)}"
+            )
+            current_app.logger.exception(new_exception, stack_info=True)
+            return "failed"
 
     @classmethod
     def run_process_instance_with_runtime(
@@ -710,27 +906,38 @@ class ProcessInstanceService:
         value: str,
         process_instance_id: int,
     ) -> ProcessInstanceFileDataModel | None:
-        with suppress(Exception):
-            parts = value.split(";")
-            mimetype = parts[0][5:]
-            filename = unquote(parts[1].split("=")[1])
-            base64_value = parts[2].split(",")[1]
-            if not base64_value.startswith(cls.FILE_DATA_DIGEST_PREFIX):
-                contents = base64.b64decode(base64_value)
-                digest = hashlib.sha256(contents).hexdigest()
-                now_in_seconds = round(time.time())
-
-                return ProcessInstanceFileDataModel(
-                    process_instance_id=process_instance_id,
-                    mimetype=mimetype,
-                    filename=filename,
-                    contents=contents,
-                    digest=digest,
-                    updated_at_in_seconds=now_in_seconds,
-                    created_at_in_seconds=now_in_seconds,
-                )
-
-        return None
+        try:
+            # find the parts of the data url by index so a large file is not copied while splitting it up
+            mimetype_end = value.index(";")
+            filename_end = value.index(";", mimetype_end + 1)
+            base64_start = value.index(",", filename_end + 1) + 1
+            base64_end = min(
+                [index for index in [value.find(",", base64_start), value.find(";", base64_start)] if index != -1],
+                default=len(value),
+            )
+            mimetype = value[5:mimetype_end]
+            filename = unquote(value[mimetype_end + 1 : filename_end].split("=")[1])
+            if value.startswith(cls.FILE_DATA_DIGEST_PREFIX, base64_start, base64_end):
+                return None
+            contents, digest, decoded_filepath = ProcessInstanceFileBlobModel.decode_base64_contents(
+                value, base64_start, base64_end
+            )
+        except OSError:
+            # not being able to write the file is an error, not a sign that the value is not file data
+            raise
+        except Exception:
+            return None
+
+        ProcessInstanceFileDataService.reference_blob(digest, contents, decoded_filepath=decoded_filepath)
+        now_in_seconds = round(time.time())
+        return ProcessInstanceFileDataModel(
+            process_instance_id=process_instance_id,
+            mimetype=mimetype,
+            filename=filename,
+            digest=digest,
+            updated_at_in_seconds=now_in_seconds,
+            created_at_in_seconds=now_in_seconds,
+        )
 
     @classmethod
     def possible_file_data_values(
@@ -778,10 +985,9 @@ class ProcessInstanceService:
     ) -> None:
         models = cls.replace_file_data_with_digest_references(data, process_instance_id)
 
+        # the contents were stored in their blob while they were decoded
         for model in models:
-            if current_app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH"] is not None:
-                model.store_file_on_file_system()
-            db.session.add(model)
+            ProcessInstanceFileDataService.add_file_data(model)
         db.session.commit()
 
     @classmethod
@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from typing import Any
+
+from flask import current_app
+from prometheus_client import Counter
+from sqlalchemy import text
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.db import dialect_name
+
+PROCESS_INSTANCE_WAKEUPS_TOTAL = Counter(
+    "spiff_process_instance_wakeups_total",
+    "Process instance wakeups sent to the background scheduler after a commit, by how they were delivered.",
+    ["delivery"],
+)
+
+# postgres NOTIFY channel the background scheduler LISTENs on
+PROCESS_INSTANCE_WAKEUP_CHANNEL = "spiff_process_instance_wakeup"
+# wakeups requested in the current transaction. they are only sent once it commits.
+PENDING_WAKEUPS_SESSION_INFO_KEY = "process_instance_wakeups_pending_commit"
+# NOTIFY payloads must be shorter than 8000 bytes
+WAKEUPS_PER_NOTIFY = 250
+# how many process instances this process remembers the last requested wakeup of, so saving an instance again
+# without changing when it is due does not send the same wakeup again
+REQUESTED_WAKEUPS_TO_REMEMBER = 10000
+
+# (process_instance_id, wake_at_in_seconds)
+ProcessInstanceWakeup = tuple[int, int]
+
+
+class ProcessInstanceWakeupService:
+    """Tells the background scheduler when a process instance should be run so it does not have to wait for a sweep.
+
+    Wakeups are requested inside a transaction and sent when it commits. On postgres they are sent with
+    NOTIFY, which postgres itself only delivers on commit, so a scheduler in any backend process gets them.
+    Otherwise they are handed straight to a scheduler running in the same process, if there is one.
+    Wakeups are only hints: the polling sweeps still run and pick up anything that was missed.
+    A wakeup is only requested again for a process instance when the time it is due changes.
+    """
+
+    _local_receiver: Callable[[list[ProcessInstanceWakeup]], None] | None = None
+    _lock = threading.Lock()
+    _requested_wake_at_by_process_instance_id: dict[int, int] = {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        # with celery, process instances are already published to workers when they need to run
+        return bool(
+            current_app.config["SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_WAKEUPS_ENABLED"]
+            and not current_app.config["SPIFFWORKFLOW_BACKEND_CELERY_ENABLED"]
+        )
+
+    @classmethod
+    def uses_postgres_notify(cls) -> bool:
+        return dialect_name() == "postgresql"
+
+    @classmethod
+    def set_local_receiver(cls, receiver: Callable[[list[ProcessInstanceWakeup]], None] | None) -> None:
+        with cls._lock:
+            cls._local_receiver = receiver
+
+    @classmethod
+    def request_wakeup(cls, process_instance_id: int, wake_at_in_seconds: int) -> None:
+        if not cls.is_enabled():
+            return
+        # without NOTIFY nobody outside this process can hear about it
+        if cls._local_receiver is None and not cls.uses_postgres_notify():
+            return
+        with cls._lock:
+            if cls._requested_wake_at_by_process_instance_id.get(process_instance_id) == wake_at_in_seconds:
+                return
+            if len(cls._requested_wake_at_by_process_instance_id) >= REQUESTED_WAKEUPS_TO_REMEMBER:
+                current_time = round(time.time())
+                cls._requested_wake_at_by_process_instance_id = {
+                    requested_process_instance_id: requested_wake_at_in_seconds
+                    for requested_process_instance_id, requested_wake_at_in_seconds in (
+                        cls._requested_wake_at_by_process_instance_id.items()
+                    )
+                    if requested_wake_at_in_seconds > current_time
+                }
+                if len(cls._requested_wake_at_by_process_instance_id) >= REQUESTED_WAKEUPS_TO_REMEMBER:
+                    cls._requested_wake_at_by_process_instance_id.clear()
+            cls._requested_wake_at_by_process_instance_id[process_instance_id] = wake_at_in_seconds
+        pending_wakeups = db.session.info.setdefault(PENDING_WAKEUPS_SESSION_INFO_KEY, set())
+        pending_wakeups.add((process_instance_id, wake_at_in_seconds))
+
+    @classmethod
+    def forget_requested_wakeups(cls, wakeups: Iterable[ProcessInstanceWakeup]) -> None:
+        """Called for wakeups that were never sent so they are requested again next time."""
+        with cls._lock:
+            for process_instance_id, wake_at_in_seconds in wakeups:
+                if cls._requested_wake_at_by_process_instance_id.get(process_instance_id) == wake_at_in_seconds:
+                    del cls._requested_wake_at_by_process_instance_id[process_instance_id]
+
+    @classmethod
+    def notify_payloads(cls, wakeups: list[ProcessInstanceWakeup]) -> list[str]:
+        return [
+            json.dumps(wakeups[index : index + WAKEUPS_PER_NOTIFY], separators=(",", ":"))
+            for index in range(0, len(wakeups), WAKEUPS_PER_NOTIFY)
+        ]
+
+    @classmethod
+    def wakeups_from_notify_payload(cls, payload: str) -> list[ProcessInstanceWakeup]:
+        return [(int(process_instance_id), int(wake_at)) for process_instance_id, wake_at in json.loads(payload)]
+
+    @classmethod
+    def deliver_locally(cls, wakeups: list[ProcessInstanceWakeup]) -> None:
+        receiver = cls._local_receiver
+        if receiver is None:
+            return
+        PROCESS_INSTANCE_WAKEUPS_TOTAL.labels(delivery="local").inc(len(wakeups))
+        receiver(wakeups)
+
+
+@listens_for(Session, "before_commit")  # type: ignore
+def notify_process_instance_wakeups_before_commit(session: Any) -> None:
+    pending_wakeups = session.info.get(PENDING_WAKEUPS_SESSION_INFO_KEY)
+    if not pending_wakeups or not ProcessInstanceWakeupService.uses_postgres_notify():
+        return
+    session.info.pop(PENDING_WAKEUPS_SESSION_INFO_KEY)
+    wakeups = sorted(pending_wakeups)
+    for payload in ProcessInstanceWakeupService.notify_payloads(wakeups):
+        session.execute(
+            text("SELECT pg_notify(:channel, :payload)"), {"channel": PROCESS_INSTANCE_WAKEUP_CHANNEL, "payload": payload}
+        )
+    PROCESS_INSTANCE_WAKEUPS_TOTAL.labels(delivery="notify").inc(len(wakeups))
+
+
+@listens_for(Session, "after_commit")  # type: ignore
+def deliver_process_instance_wakeups_after_commit(session: Any) -> None:
+    pending_wakeups = session.info.pop(PENDING_WAKEUPS_SESSION_INFO_KEY, None)
+    if pending_wakeups:
+        ProcessInstanceWakeupService.deliver_locally(sorted(pending_wakeups))
+
+
+@listens_for(Session, "after_rollback")  # type: ignore
+def discard_process_instance_wakeups_after_rollback(session: Any) -> None:
+    pending_wakeups = session.info.pop(PENDING_WAKEUPS_SESSION_INFO_KEY, None)
+    if pending_wakeups:
+        ProcessInstanceWakeupService.forget_requested_wakeups(pending_wakeups)
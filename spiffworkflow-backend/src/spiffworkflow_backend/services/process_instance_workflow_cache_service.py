@@ -0,0 +1,289 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any
+
+from flask import current_app
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from SpiffWorkflow.bpmn.workflow import BpmnWorkflow  # type: ignore
+from sqlalchemy import or_
+from sqlalchemy import update
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session
+
+from spiffworkflow_backend.models.bpmn_process import BpmnProcessModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.task import TaskModel
+
+HYDRATED_WORKFLOW_CACHE_TOTAL = Counter(
+    "spiff_hydrated_workflow_cache_total",
+    "Lookups and stores against the per-worker hydrated BpmnWorkflow cache.",
+    ["result"],
+)
+HYDRATED_WORKFLOW_CACHE_ENTRIES = Gauge(
+    "spiff_hydrated_workflow_cache_entries",
+    "Number of hydrated BpmnWorkflow objects currently held by this worker.",
+)
+
+# the version stamp is read from the process instance row. its workflow_version is bumped whenever the tasks or
+# bpmn processes of the instance are written so a change made by any other worker or code path makes a cached
+# workflow stale without having to read those rows.
+WorkflowVersionStamp = tuple[Any, ...]
+
+# task count and latest task state change of the workflow in memory. used to detect a workflow that was
+# changed after its last save and so no longer matches what is in the database.
+WorkflowGeneration = tuple[int, float]
+
+
+@dataclass
+class CachedBpmnWorkflow:
+    bpmn_process_instance: BpmnWorkflow
+    version_stamp: WorkflowVersionStamp
+    task_count: int
+
+
+@dataclass
+class PendingBpmnWorkflow:
+    bpmn_process_instance: BpmnWorkflow
+    generation: WorkflowGeneration
+    # set while the workflow is unchanged since it was checked out. None once a runtime saved it.
+    checked_out_version_stamp: WorkflowVersionStamp | None = None
+
+
+class ProcessInstanceWorkflowCacheService:
+    """Per-worker LRU cache of deserialized BpmnWorkflow objects.
+
+    Entries are checked out when a runtime is built, so a BpmnWorkflow is only ever used by one runtime at a time.
+    A checked out workflow is staged right away and staged again whenever its runtime saves, and it is checked back
+    in when the process instance lock is released or, for runtimes that never took the lock, when the request ends.
+    Every check out and check in compares the version stamp with the database and drops the workflow if it changed.
+    """
+
+    _entries: OrderedDict[int, CachedBpmnWorkflow] = OrderedDict()
+    _total_task_count = 0
+    _lock = threading.Lock()
+
+    PROCESS_INSTANCE_STAMP_COLUMNS = (
+        "status",
+        "bpmn_process_definition_id",
+        "bpmn_process_id",
+        "spiff_serializer_version",
+        "updated_at_in_seconds",
+        "task_updated_at_in_seconds",
+        "workflow_version",
+    )
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return int(current_app.config["SPIFFWORKFLOW_BACKEND_HYDRATED_WORKFLOW_CACHE_MAX_ENTRIES"]) > 0
+
+    @classmethod
+    def has_entry(cls, process_instance_id: int) -> bool:
+        with cls._lock:
+            return process_instance_id in cls._entries
+
+    @classmethod
+    def check_out(cls, process_instance: ProcessInstanceModel) -> BpmnWorkflow | None:
+        """Returns the cached workflow if it still matches the database. The entry is removed either way.
+
+        A workflow that is returned is staged for check in so runtimes that only read from it hand it back.
+        """
+        with cls._lock:
+            entry = cls._entries.pop(process_instance.id, None)
+            if entry is not None:
+                cls._total_task_count -= entry.task_count
+            HYDRATED_WORKFLOW_CACHE_ENTRIES.set(len(cls._entries))
+
+        if entry is None:
+            cls.record_miss()
+            return None
+
+        version_stamp = cls.version_stamp_from_database(process_instance.id)
+        if version_stamp is None or version_stamp != entry.version_stamp:
+            HYDRATED_WORKFLOW_CACHE_TOTAL.labels(result="stale").inc()
+            return None
+
+        HYDRATED_WORKFLOW_CACHE_TOTAL.labels(result="hit").inc()
+        cls._pending_workflows()[process_instance.id] = PendingBpmnWorkflow(
+            bpmn_process_instance=entry.bpmn_process_instance,
+            generation=cls.workflow_generation(entry.bpmn_process_instance),
+            checked_out_version_stamp=version_stamp,
+        )
+        return entry.bpmn_process_instance
+
+    @classmethod
+    def record_miss(cls) -> None:
+        HYDRATED_WORKFLOW_CACHE_TOTAL.labels(result="miss").inc()
+
+    @classmethod
+    def stage_for_check_in(cls, process_instance_id: int, bpmn_process_instance: BpmnWorkflow) -> None:
+        """Called after a runtime commits its workflow. The latest staged workflow wins."""
+        cls._pending_workflows()[process_instance_id] = PendingBpmnWorkflow(
+            bpmn_process_instance=bpmn_process_instance,
+            generation=cls.workflow_generation(bpmn_process_instance),
+        )
+
+    @classmethod
+    def check_in_pending(cls, process_instance: ProcessInstanceModel) -> None:
+        pending = cls._pending_workflows().pop(process_instance.id, None)
+        if pending is not None:
+            cls._check_in(process_instance.id, pending)
+
+    @classmethod
+    def check_in_unchanged_pending(cls, *_args: Any) -> None:
+        """Hands back workflows checked out by runtimes that never took the process instance lock, like read only views.
+
+        Registered to run when a request ends. Workflows saved outside the lock are dropped since nothing guarantees
+        the database still holds what they were saved as.
+        """
+        pending_workflows = cls._pending_workflows()
+        while pending_workflows:
+            process_instance_id, pending = pending_workflows.popitem()
+            if pending.checked_out_version_stamp is not None:
+                cls._check_in(process_instance_id, pending)
+
+    @classmethod
+    def _check_in(cls, process_instance_id: int, pending: PendingBpmnWorkflow) -> None:
+        if cls.workflow_generation(pending.bpmn_process_instance) != pending.generation:
+            HYDRATED_WORKFLOW_CACHE_TOTAL.labels(result="stale").inc()
+            return
+
+        task_count = pending.generation[0]
+        if task_count > int(current_app.config["SPIFFWORKFLOW_BACKEND_HYDRATED_WORKFLOW_CACHE_MAX_TASKS"]):
+            HYDRATED_WORKFLOW_CACHE_TOTAL.labels(result="too_large").inc()
+            return
+
+        # changes that are not committed yet could still be rolled back so do not stamp the workflow with them
+        if db.session.new or db.session.dirty or db.session.deleted:
+            return
+
+        try:
+            version_stamp = cls.version_stamp_from_database(process_instance_id)
+        except Exception as exception:
+            current_app.logger.warning(f"Could not stamp workflow for process instance {process_instance_id}: {exception}")
+            return
+        if version_stamp is None:
+            return
+        if pending.checked_out_version_stamp is not None and version_stamp != pending.checked_out_version_stamp:
+            HYDRATED_WORKFLOW_CACHE_TOTAL.labels(result="stale").inc()
+            return
+
+        cls._store(
+            process_instance_id,
+            CachedBpmnWorkflow(
+                bpmn_process_instance=pending.bpmn_process_instance,
+                version_stamp=version_stamp,
+                task_count=task_count,
+            ),
+        )
+
+    @classmethod
+    def discard_pending(cls, process_instance_id: int) -> None:
+        cls._pending_workflows().pop(process_instance_id, None)
+
+    @classmethod
+    def invalidate(cls, process_instance_id: int) -> None:
+        cls.discard_pending(process_instance_id)
+        with cls._lock:
+            entry = cls._entries.pop(process_instance_id, None)
+            if entry is not None:
+                cls._total_task_count -= entry.task_count
+            HYDRATED_WORKFLOW_CACHE_ENTRIES.set(len(cls._entries))
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries.clear()
+            cls._total_task_count = 0
+            HYDRATED_WORKFLOW_CACHE_ENTRIES.set(0)
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        with cls._lock:
+            return {"entries": len(cls._entries), "task_count": cls._total_task_count}
+
+    @classmethod
+    def version_stamp_from_database(cls, process_instance_id: int) -> WorkflowVersionStamp | None:
+        process_instance_row = (
+            db.session.query(*[getattr(ProcessInstanceModel, column) for column in cls.PROCESS_INSTANCE_STAMP_COLUMNS])
+            .filter(ProcessInstanceModel.id == process_instance_id)
+            .first()
+        )
+        if process_instance_row is None or process_instance_row.bpmn_process_id is None:
+            return None
+        return tuple(process_instance_row)
+
+    @classmethod
+    def bump_workflow_versions(cls, process_instance_ids: Iterable[int] = (), bpmn_process_ids: Iterable[int] = ()) -> None:
+        """Marks the workflows of the process instances, or of the top level bpmn processes, as changed."""
+        process_instance_ids = set(process_instance_ids)
+        bpmn_process_ids = set(bpmn_process_ids)
+        conditions = []
+        if process_instance_ids:
+            conditions.append(ProcessInstanceModel.id.in_(process_instance_ids))  # type: ignore
+        if bpmn_process_ids:
+            conditions.append(ProcessInstanceModel.bpmn_process_id.in_(bpmn_process_ids))  # type: ignore
+        if not conditions:
+            return
+        db.session.execute(
+            update(ProcessInstanceModel)
+            .where(or_(*conditions))
+            .values(workflow_version=ProcessInstanceModel.workflow_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    def workflow_generation(cls, bpmn_process_instance: BpmnWorkflow) -> WorkflowGeneration:
+        task_count = 0
+        last_state_change = 0.0
+        for spiff_task in bpmn_process_instance.get_tasks():
+            task_count += 1
+            last_state_change = max(last_state_change, spiff_task.last_state_change)
+        return (task_count, last_state_change)
+
+    @classmethod
+    def _store(cls, process_instance_id: int, entry: CachedBpmnWorkflow) -> None:
+        max_entries = int(current_app.config["SPIFFWORKFLOW_BACKEND_HYDRATED_WORKFLOW_CACHE_MAX_ENTRIES"])
+        max_tasks = int(current_app.config["SPIFFWORKFLOW_BACKEND_HYDRATED_WORKFLOW_CACHE_MAX_TASKS"])
+        with cls._lock:
+            existing_entry = cls._entries.pop(process_instance_id, None)
+            if existing_entry is not None:
+                cls._total_task_count -= existing_entry.task_count
+            cls._entries[process_instance_id] = entry
+            cls._total_task_count += entry.task_count
+            while len(cls._entries) > max_entries or cls._total_task_count > max_tasks:
+                _evicted_id, evicted_entry = cls._entries.popitem(last=False)
+                cls._total_task_count -= evicted_entry.task_count
+                HYDRATED_WORKFLOW_CACHE_TOTAL.labels(result="evicted").inc()
+            HYDRATED_WORKFLOW_CACHE_ENTRIES.set(len(cls._entries))
+        HYDRATED_WORKFLOW_CACHE_TOTAL.labels(result="stored").inc()
+
+    @classmethod
+    def _pending_workflows(cls) -> dict[int, PendingBpmnWorkflow]:
+        tld = current_app.config["THREAD_LOCAL_DATA"]
+        if not hasattr(tld, "hydrated_workflow_cache_pending"):
+            tld.hydrated_workflow_cache_pending = {}
+        return tld.hydrated_workflow_cache_pending  # type: ignore
+
+
+@listens_for(Session, "after_flush")  # type: ignore
+def bump_workflow_versions_after_flush(session: Any, flush_context: Any) -> None:
+    # task and bpmn process rows written with bulk saves skip this and are bumped by TaskService.save_objects_to_database
+    process_instance_ids: set[int] = set()
+    bpmn_process_ids: set[int] = set()
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if instance in session.dirty and not session.is_modified(instance):
+            continue
+        if isinstance(instance, TaskModel) and instance.process_instance_id is not None:
+            process_instance_ids.add(instance.process_instance_id)
+        elif isinstance(instance, BpmnProcessModel):
+            top_level_process_id = instance.top_level_process_id or instance.id
+            if top_level_process_id is not None:
+                bpmn_process_ids.add(top_level_process_id)
+
+    if process_instance_ids or bpmn_process_ids:
+        ProcessInstanceWorkflowCacheService.bump_workflow_versions(process_instance_ids, bpmn_process_ids)
@@ -1,5 +1,6 @@
 import copy
 import time
+from typing import Any
 from typing import TypedDict
 from uuid import UUID
 
@@ -31,7 +32,10 @@ from spiffworkflow_backend.models.task import TaskModel
 from spiffworkflow_backend.models.task import TaskNotFoundError
 from spiffworkflow_backend.models.task_definition import TaskDefinitionModel
 from spiffworkflow_backend.models.task_draft_data import TaskDraftDataModel
+from spiffworkflow_backend.services.json_data_delta_service import JsonDataDeltaService
+from spiffworkflow_backend.services.json_data_hash_cache_service import JsonDataHashCacheService
 from spiffworkflow_backend.services.process_instance_event_service import ProcessInstanceEventService
+from spiffworkflow_backend.services.process_instance_workflow_cache_service import ProcessInstanceWorkflowCacheService
 
 
 class StartAndEndTimes(TypedDict):
@@ -39,6 +43,23 @@ class StartAndEndTimes(TypedDict):
     end_in_seconds: float | None
 
 
+# state, last_state_change, children, triggered, internal_data, data, runtime_info, python_env
+TaskPersistenceFingerprint = tuple[Any, ...]
+
+# excludes COMPLETED. the others were required to get PP1 to go to completion.
+# FUTURE tasks are included because Boundary events are not processed otherwise.
+NON_COMPLETED_TASK_STATES_TO_PERSIST = (
+    TaskState.WAITING
+    | TaskState.CANCELLED
+    | TaskState.READY
+    | TaskState.MAYBE
+    | TaskState.LIKELY
+    | TaskState.FUTURE
+    | TaskState.STARTED
+    | TaskState.ERROR
+)
+
+
 class TaskModelError(Exception):
     """Copied from SpiffWorkflow.exceptions.WorkflowTaskException.
 
@@ -134,6 +155,11 @@ class TaskService:
         self.bpmn_processes: dict[str, BpmnProcessModel] = {}
         self.task_models: dict[str, TaskModel] = {}
         self.json_data_dicts: dict[str, JsonDataDict] = {}
+        # the last json data dict computed for each task data, python env and bpmn process data so data that did not
+        # change since this service last saw it is not normalized, serialized and hashed again.
+        self._json_data_dict_memo: dict[str, JsonDataDict] = {}
+        # when delta encoding is on this maps the hash of new task data to the data of its parent task
+        self.json_data_delta_bases: dict[str, JsonDataDict] = {}
         self.process_instance_events: dict[str, ProcessInstanceEventModel] = {}
         self.dirty_bpmn_process_updates: dict[str, tuple[BpmnWorkflow, BpmnProcessModel]] = {}
         self.task_model_guids_to_delete: set[str] = set()
@@ -149,13 +175,21 @@ class TaskService:
         self.flush_dirty_bpmn_process_updates()
         db.session.bulk_save_objects(self.bpmn_processes.values())
         db.session.bulk_save_objects(self.task_models.values())
+        if self.bpmn_processes or self.task_models:
+            # bulk saves skip the session events that bump the version for tasks saved through the orm
+            ProcessInstanceWorkflowCacheService.bump_workflow_versions(process_instance_ids=[self.process_instance.id])
         if save_process_instance_events:
             db.session.bulk_save_objects(self.process_instance_events.values())
-        JsonDataModel.insert_or_update_json_data_records(self.json_data_dicts)
+        JsonDataHashCacheService.insert_or_update_json_data_records(self.json_data_records_to_insert())
         self.task_model_guids_to_delete.clear()
         self.human_task_guids_to_delete.clear()
         self.bpmn_process_guids_to_delete.clear()
 
+    def json_data_records_to_insert(self) -> dict[str, JsonDataDict]:
+        if len(self.json_data_delta_bases) > 0 and JsonDataDeltaService.is_enabled():
+            return JsonDataDeltaService.delta_encode_json_data_records(self.json_data_dicts, self.json_data_delta_bases)
+        return self.json_data_dicts
+
     def get_guid_to_db_object_mappings(self) -> tuple[dict[str, TaskModel], dict[str, BpmnProcessModel]]:
         return (self.task_model_mapping, self.bpmn_subprocess_mapping)
 
@@ -482,16 +516,17 @@ class TaskService:
         python_env_data_dict = self.__class__._get_python_env_data_dict_from_spiff_task(spiff_task, self.serializer)
         task_model.properties_json = new_properties_json
         task_model.state = TaskState.get_name(new_properties_json["state"])
-        json_data_dict = self.__class__.update_json_data_on_db_model_and_return_dict_if_updated(
-            task_model, spiff_task_data, "json_data_hash"
-        )
-        python_env_dict = self.__class__.update_json_data_on_db_model_and_return_dict_if_updated(
-            task_model, python_env_data_dict, "python_env_data_hash"
-        )
-        if json_data_dict is not None:
-            self.json_data_dicts[json_data_dict["hash"]] = json_data_dict
-        if python_env_dict is not None:
-            self.json_data_dicts[python_env_dict["hash"]] = python_env_dict
+        # the python env is shared by every task in the workflow so it is memoized under one key
+        for memo_key, data_dict, task_model_data_column in [
+            (f"task:{task_model.guid}", spiff_task_data, "json_data_hash"),
+            ("python_env", python_env_data_dict, "python_env_data_hash"),
+        ]:
+            json_data_dict = self.memoized_json_data_dict_from_dict(memo_key, data_dict)
+            if getattr(task_model, task_model_data_column) != json_data_dict["hash"]:
+                setattr(task_model, task_model_data_column, json_data_dict["hash"])
+                self.json_data_dicts[json_data_dict["hash"]] = json_data_dict
+                if task_model_data_column == "json_data_hash":
+                    self._add_json_data_delta_base(spiff_task, json_data_dict)
         task_model.runtime_info = spiff_task.task_spec.task_info(spiff_task)
 
     def find_existing_task_model(self, task_guid: str) -> TaskModel | None:
@@ -723,13 +758,32 @@ class TaskService:
             data_dict_to_use = self.serializer.to_dict(bpmn_process_instance.data)
         if data_dict_to_use is None:
             data_dict_to_use = {}
-        json_data_dict = JsonDataModel.json_data_dict_from_dict(data_dict_to_use)
+        json_data_dict = self.memoized_json_data_dict_from_dict(f"bpmn_process:{bpmn_process.guid}", data_dict_to_use)
         bpmn_process_data_hash = json_data_dict["hash"]
         if bpmn_process.json_data_hash != bpmn_process_data_hash:
             bpmn_process.json_data_hash = bpmn_process_data_hash
             self.json_data_dicts[bpmn_process_data_hash] = json_data_dict
         return json_data_dict
 
+    def _add_json_data_delta_base(self, spiff_task: SpiffTask, json_data_dict: JsonDataDict) -> None:
+        # task data usually flows from the parent task with a few keys changed. the parent's data is only used
+        # as the base if this service already has it in memory so saving never has to load data to compute a delta.
+        if spiff_task.parent is None or not JsonDataDeltaService.is_enabled():
+            return
+        parent_json_data_dict = self._json_data_dict_memo.get(f"task:{spiff_task.parent.id}")
+        if parent_json_data_dict is not None and parent_json_data_dict["hash"] != json_data_dict["hash"]:
+            self.json_data_delta_bases[json_data_dict["hash"]] = parent_json_data_dict
+
+    def memoized_json_data_dict_from_dict(self, memo_key: str, data_dict: dict) -> JsonDataDict:
+        previous_json_data_dict = self._json_data_dict_memo.get(memo_key)
+        if previous_json_data_dict is not None and JsonDataModel.json_values_identical(
+            data_dict, previous_json_data_dict["data"]
+        ):
+            return previous_json_data_dict
+        json_data_dict = JsonDataModel.json_data_dict_from_dict(data_dict)
+        self._json_data_dict_memo[memo_key] = json_data_dict
+        return json_data_dict
+
     @classmethod
     def update_json_data_on_db_model_and_return_dict_if_updated(
         cls, db_model: SpiffworkflowBaseDBModel, task_data_dict: dict, task_model_data_column: str
@@ -969,6 +1023,47 @@ class TaskService:
         )
         return task_model
 
+    @classmethod
+    def task_persistence_fingerprint(cls, spiff_task: SpiffTask, python_env_state: Any) -> TaskPersistenceFingerprint:
+        """Snapshot of everything update_task_model persists for a task.
+
+        Two equal fingerprints mean re-serializing the task would produce the same task row and json data hashes,
+        so the task can be skipped. The data dicts are deep copies because scripts can mutate nested values in place
+        without the task changing state. python_env_state should come from python_env_state_snapshot.
+        """
+        return (
+            spiff_task.state,
+            spiff_task.last_state_change,
+            tuple(child.id for child in spiff_task.children),
+            spiff_task.triggered,
+            cls.fingerprint_snapshot(spiff_task.internal_data),
+            cls.fingerprint_snapshot(spiff_task.data),
+            spiff_task.task_spec.task_info(spiff_task),
+            python_env_state,
+        )
+
+    @classmethod
+    def python_env_state_snapshot(cls, bpmn_process_instance: BpmnWorkflow) -> Any:
+        return cls.fingerprint_snapshot(dict(bpmn_process_instance.script_engine.environment.user_defined_state()))
+
+    @classmethod
+    def fingerprint_snapshot(cls, value: Any) -> Any:
+        try:
+            return copy.deepcopy(value)
+        except Exception:
+            # a value that cannot be copied never compares equal, so its task is always persisted
+            return object()
+
+    @classmethod
+    def task_persistence_fingerprints_for_workflow(
+        cls, bpmn_process_instance: BpmnWorkflow
+    ) -> dict[str, TaskPersistenceFingerprint]:
+        python_env_state = cls.python_env_state_snapshot(bpmn_process_instance)
+        return {
+            str(spiff_task.id): cls.task_persistence_fingerprint(spiff_task, python_env_state)
+            for spiff_task in bpmn_process_instance.get_tasks(state=NON_COMPLETED_TASK_STATES_TO_PERSIST)
+        }
+
     @classmethod
     def _get_python_env_data_dict_from_spiff_task(cls, spiff_task: SpiffTask, serializer: BpmnWorkflowSerializer) -> dict:
         user_defined_state = spiff_task.workflow.script_engine.environment.user_defined_state()
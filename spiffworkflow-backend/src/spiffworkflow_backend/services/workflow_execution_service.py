@@ -60,10 +60,14 @@ from spiffworkflow_backend.services.custom_service_task import CustomServiceTask
 from spiffworkflow_backend.services.custom_service_task import RetryScheduledError
 from spiffworkflow_backend.services.jinja_service import JinjaService
 from spiffworkflow_backend.services.logging_service import LoggingService
+from spiffworkflow_backend.services.message_correlation_index_service import MessageCorrelationIndexService
 from spiffworkflow_backend.services.process_instance_event_service import ProcessInstanceEventService
 from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
+from spiffworkflow_backend.services.process_instance_wakeup_service import ProcessInstanceWakeupService
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
+from spiffworkflow_backend.services.task_service import NON_COMPLETED_TASK_STATES_TO_PERSIST
 from spiffworkflow_backend.services.task_service import StartAndEndTimes
+from spiffworkflow_backend.services.task_service import TaskPersistenceFingerprint
 from spiffworkflow_backend.services.task_service import TaskService
 
 
@@ -401,6 +405,7 @@ class TaskModelSavingDelegate(EngineStepDelegate):
         secondary_engine_step_delegate: EngineStepDelegate | None = None,
         task_model_mapping: dict[str, TaskModel] | None = None,
         bpmn_subprocess_mapping: dict[str, BpmnProcessModel] | None = None,
+        task_persistence_fingerprints: dict[str, TaskPersistenceFingerprint] | None = None,
     ) -> None:
         self.secondary_engine_step_delegate = secondary_engine_step_delegate
         self.process_instance = process_instance
@@ -414,6 +419,11 @@ class TaskModelSavingDelegate(EngineStepDelegate):
         self.spiff_task_timestamps: dict[UUID, StartAndEndTimes] = {}
         self.removed_spiff_tasks: dict[UUID, SpiffTask] = {}
 
+        # when given, only non-completed tasks whose fingerprint changed since they were last saved get persisted.
+        # the dict is owned by the runtime so it survives across multiple engine step runs.
+        self.task_persistence_fingerprints = task_persistence_fingerprints
+        self.unchanged_task_persistence_skip_count = 0
+
         self.task_service = TaskService(
             process_instance=self.process_instance,
             serializer=self.serializer,
@@ -501,22 +511,25 @@ class TaskModelSavingDelegate(EngineStepDelegate):
 
     def add_object_to_db_session(self, bpmn_process_instance: BpmnWorkflow) -> None:
         # NOTE: process-all-tasks: All tests pass with this but it's less efficient and would be nice to replace
-        # excludes COMPLETED. the others were required to get PP1 to go to completion.
-        # process FUTURE tasks because Boundary events are not processed otherwise.
         #
         # ANOTHER NOTE: at one point we attempted to be smarter about what tasks we considered for persistence,
         # but it didn't quite work in all cases, so we deleted it. you can find it in commit
         # 1ead87b4b496525df8cc0e27836c3e987d593dc0 if you are curious.
-        for waiting_spiff_task in bpmn_process_instance.get_tasks(
-            state=TaskState.WAITING
-            | TaskState.CANCELLED
-            | TaskState.READY
-            | TaskState.MAYBE
-            | TaskState.LIKELY
-            | TaskState.FUTURE
-            | TaskState.STARTED
-            | TaskState.ERROR,
-        ):
+        # The incremental mode below still considers every non-completed task but skips the ones whose
+        # fingerprint shows nothing that would be persisted has changed since the last save.
+        new_task_persistence_fingerprints: dict[str, TaskPersistenceFingerprint] = {}
+        python_env_state: Any = None
+        if self.task_persistence_fingerprints is not None:
+            python_env_state = TaskService.python_env_state_snapshot(bpmn_process_instance)
+
+        for waiting_spiff_task in bpmn_process_instance.get_tasks(state=NON_COMPLETED_TASK_STATES_TO_PERSIST):
+            if self.task_persistence_fingerprints is not None:
+                task_guid = str(waiting_spiff_task.id)
+                fingerprint = TaskService.task_persistence_fingerprint(waiting_spiff_task, python_env_state)
+                new_task_persistence_fingerprints[task_guid] = fingerprint
+                if self.task_persistence_fingerprints.get(task_guid) == fingerprint:
+                    self.unchanged_task_persistence_skip_count += 1
+                    continue
             self.task_service.update_task_model_with_spiff_task(waiting_spiff_task)
 
         reported_removed_spiff_tasks = list(self.removed_spiff_tasks.values())
@@ -537,6 +550,13 @@ class TaskModelSavingDelegate(EngineStepDelegate):
 
         self.task_service.save_objects_to_database()
 
+        if self.task_persistence_fingerprints is not None:
+            # replace rather than update so completed and deleted tasks drop out of the cache
+            self.task_persistence_fingerprints.clear()
+            self.task_persistence_fingerprints.update(
+                {guid: fp for guid, fp in new_task_persistence_fingerprints.items() if guid not in deleted_task_guids}
+            )
+
         if self.secondary_engine_step_delegate:
             self.secondary_engine_step_delegate.add_object_to_db_session(bpmn_process_instance)
 
@@ -797,9 +817,11 @@ class WorkflowExecutionService:
 
     def schedule_waiting_timer_events(self) -> None:
         # TODO: update to always insert records so we can remove user_input_required and possibly waiting apscheduler jobs
-        if current_app.config["SPIFFWORKFLOW_BACKEND_CELERY_ENABLED"]:
+        celery_enabled = current_app.config["SPIFFWORKFLOW_BACKEND_CELERY_ENABLED"]
+        if celery_enabled or ProcessInstanceWakeupService.is_enabled():
             # Check for waiting tasks AND started service tasks with retry_at
             relevant_tasks = self.bpmn_process_instance.get_tasks(state=TaskState.WAITING | TaskState.STARTED)
+            next_wake_at_in_seconds: int | None = None
             for spiff_task in relevant_tasks:
                 run_at_in_seconds = None
                 if spiff_task.state == TaskState.WAITING and hasattr(spiff_task.task_spec, "event_definition"):
@@ -812,7 +834,10 @@ class WorkflowExecutionService:
                 if run_at_in_seconds is None and "spiff__retry_at" in spiff_task.internal_data:
                     run_at_in_seconds = spiff_task.internal_data["spiff__retry_at"]
 
-                if run_at_in_seconds is not None:
+                if run_at_in_seconds is not None and not celery_enabled:
+                    if next_wake_at_in_seconds is None or run_at_in_seconds < next_wake_at_in_seconds:
+                        next_wake_at_in_seconds = run_at_in_seconds
+                elif run_at_in_seconds is not None:
                     queued_to_run_at_in_seconds = None
                     if self.is_happening_soon(run_at_in_seconds):
                         if queue_future_task_if_appropriate(
@@ -825,6 +850,12 @@ class WorkflowExecutionService:
                         queued_to_run_at_in_seconds=queued_to_run_at_in_seconds,
                     )
 
+            if next_wake_at_in_seconds is not None:
+                # the background scheduler only polls for waiting instances, so ask it to run this one when its next
+                # timer fires. running it then requests the one after that. the extra second keeps us from running it
+                # just before spiff considers the timer ready.
+                ProcessInstanceWakeupService.request_wakeup(self.process_instance_model.id, next_wake_at_in_seconds + 1)
+
     def group_bpmn_events(self) -> dict[str, Any]:
         event_groups: dict[str, Any] = {}
         for bpmn_event in self.bpmn_process_instance.get_events():
@@ -887,6 +918,7 @@ class WorkflowExecutionService:
             if message_instance.name not in waiting_message_names:
                 message_instance.status = MessageStatuses.cancelled.value
                 db.session.add(message_instance)
+                MessageCorrelationIndexService.remove_receive_message(message_instance.id)
             else:
                 existing_ready_message_names.add(message_instance.name)
 
@@ -913,6 +945,7 @@ class WorkflowExecutionService:
                 )
                 db.session.add(message_correlation)
             db.session.add(message_instance)
+            MessageCorrelationIndexService.index_receive_message(message_instance)
 
             bpmn_process = self.process_instance_model.bpmn_process
 
@@ -0,0 +1,104 @@
+"""JSON serialization that uses orjson when it is installed and the standard library json module when it is not.
+
+dumps returns compact json. orjson and json produce equivalent json for the same value but not always the same
+bytes, so anything that is hashed has to use canonical_dumps instead, which always produces the same output as
+json.dumps(value, sort_keys=True) so hashes of existing rows stay valid. Values orjson cannot write the way the
+json module does, like NaN and Infinity, which orjson would write as null, are written by the json module.
+"""
+
+import json
+import math
+import re
+from collections.abc import Callable
+from typing import Any
+
+from prometheus_client import Counter
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+FAST_JSON_FALLBACKS_TOTAL = Counter(
+    "spiff_fast_json_fallbacks_total",
+    "Values orjson could not serialize or parse that were handled by the json module instead.",
+)
+
+# the json module calls default for datetimes and dataclasses, so let orjson do the same
+# rather than serializing them its own way.
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if HAS_ORJSON else 0
+)
+_COMPACT_SEPARATORS = (",", ":")
+_CANONICAL_JSON_ENCODER = json.JSONEncoder(sort_keys=True)
+# orjson parses integers over 64 bits as floats, which loses precision, so leave any document
+# with a run of digits that long to the json module.
+_LONG_DIGIT_RUN_STR = re.compile(r"\d{19}")
+_LONG_DIGIT_RUN_BYTES = re.compile(rb"\d{19}")
+
+
+class _FastJsonSettings:
+    orjson_enabled = HAS_ORJSON
+
+
+def set_orjson_enabled(enabled: bool) -> None:
+    _FastJsonSettings.orjson_enabled = enabled and HAS_ORJSON
+
+
+def orjson_enabled() -> bool:
+    return _FastJsonSettings.orjson_enabled
+
+
+def dumps_bytes(value: Any, default: Callable[[Any], Any] | None = None, sort_keys: bool = False) -> bytes:
+    if _FastJsonSettings.orjson_enabled:
+        options = _ORJSON_OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else _ORJSON_OPTIONS
+        try:
+            serialized_value = orjson.dumps(value, default=default, option=options)
+            # orjson writes NaN and Infinity as null. they can only be behind a null so only look for them then.
+            if b"null" not in serialized_value or not _has_non_finite_float(value):
+                return serialized_value
+        except orjson.JSONEncodeError:
+            # integers over 64 bits, nesting deeper than orjson allows or a default that raised.
+            # the json module either handles it or raises the real error.
+            pass
+        FAST_JSON_FALLBACKS_TOTAL.inc()
+    return json.dumps(value, default=default, sort_keys=sort_keys, separators=_COMPACT_SEPARATORS).encode("utf8")
+
+
+def dumps(value: Any, default: Callable[[Any], Any] | None = None, sort_keys: bool = False) -> str:
+    if _FastJsonSettings.orjson_enabled:
+        return dumps_bytes(value, default=default, sort_keys=sort_keys).decode("utf8")
+    return json.dumps(value, default=default, sort_keys=sort_keys, separators=_COMPACT_SEPARATORS)
+
+
+def loads(value: str | bytes) -> Any:
+    if _FastJsonSettings.orjson_enabled:
+        long_digit_run = _LONG_DIGIT_RUN_BYTES if isinstance(value, bytes) else _LONG_DIGIT_RUN_STR
+        if long_digit_run.search(value) is None:  # type: ignore
+            try:
+                return orjson.loads(value)
+            except orjson.JSONDecodeError:
+                # NaN and Infinity are not valid json but the json module writes and reads them
+                FAST_JSON_FALLBACKS_TOTAL.inc()
+    return json.loads(value)
+
+
+def _has_non_finite_float(value: Any) -> bool:
+    values_to_check = [value]
+    while values_to_check:
+        current_value = values_to_check.pop()
+        if isinstance(current_value, float):
+            if not math.isfinite(current_value):
+                return True
+        elif isinstance(current_value, dict):
+            values_to_check.extend(current_value.values())
+        elif isinstance(current_value, list | tuple):
+            values_to_check.extend(current_value)
+    return False
+
+
+def canonical_dumps(value: Any) -> str:
+    """Same output as json.dumps(value, sort_keys=True). Use this for anything that gets hashed."""
+    return _CANONICAL_JSON_ENCODER.encode(value)
@@ -0,0 +1,214 @@
+"""Offset and keyset (cursor) pagination for list endpoints."""
+
+import base64
+import binascii
+import json
+import math
+from dataclasses import dataclass
+from decimal import Decimal
+from decimal import InvalidOperation
+from typing import Any
+
+from flask import current_app
+from sqlalchemy import Numeric
+from sqlalchemy import and_
+from sqlalchemy import false
+from sqlalchemy import or_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+from spiffworkflow_backend.exceptions.api_error import ApiError
+
+# exact counts every matching row, approximate stops counting at SPIFFWORKFLOW_BACKEND_PAGINATION_APPROXIMATE_TOTAL_LIMIT
+# and none skips the count so clients can ask for it separately, if at all.
+TOTAL_COUNT_MODES = ["exact", "approximate", "none"]
+
+# what flask-sqlalchemy's paginate falls back to when per_page is not positive
+DEFAULT_PER_PAGE = 20
+
+
+@dataclass
+class SortKey:
+    """A column a list is ordered by. The last sort key of a list must be unique, like an id, so the order is total."""
+
+    column: InstrumentedAttribute
+    descending: bool = False
+
+    @property
+    def name(self) -> str:
+        return f"-{self.column.key}" if self.descending else self.column.key
+
+    @property
+    def nullable(self) -> bool:
+        return bool(self.column.property.columns[0].nullable)
+
+    def order_by(self) -> list[Any]:
+        order_by = [self.column.desc() if self.descending else self.column.asc()]
+        if self.nullable:
+            # databases disagree on where nulls go, so put them last everywhere. the keyset filter relies on it.
+            order_by.insert(0, self.column.is_(None))
+        return order_by
+
+    def value_from_row(self, row: Any) -> Any:
+        if not isinstance(row, Row):
+            return getattr(row, self.column.key)
+        if isinstance(row[0], self.column.class_):
+            return getattr(row[0], self.column.key)
+        # a column of a joined table has to be selected alongside the entity to sort by it
+        return row._mapping[self.column.key]
+
+    def after(self, value: Any) -> Any:
+        """Returns a clause matching rows that sort after the value on this key, or None if no row can."""
+        if value is None:
+            return None
+        after = self.column < value if self.descending else self.column > value
+        if self.nullable:
+            after = or_(after, self.column.is_(None))
+        return after
+
+    def equal_to(self, value: Any) -> Any:
+        if value is None:
+            return self.column.is_(None)
+        return self.column == value
+
+
+@dataclass
+class PaginatedResult:
+    items: list[Any]
+    total: int | None
+    pages: int | None
+    next_cursor: str | None
+    total_is_approximate: bool = False
+
+    def pagination_json(self) -> dict[str, Any]:
+        return {
+            "count": len(self.items),
+            "total": self.total,
+            "pages": self.pages,
+            "next_cursor": self.next_cursor,
+            "total_is_approximate": self.total_is_approximate,
+        }
+
+
+def paginate_query(
+    query: Query,
+    sort_keys: list[SortKey] | None,
+    page: int = 1,
+    per_page: int = 100,
+    cursor: str | None = None,
+    total_count: str | None = None,
+) -> PaginatedResult:
+    """Returns a page of the query's rows, ordered by the sort keys.
+
+    Without a cursor this pages with an offset and counts every matching row, like flask-sqlalchemy's paginate.
+    With a cursor from a previous page it returns the rows that sort after that page instead, which costs the same
+    however deep the page is, and does not count the rows unless total_count asks for it. next_cursor is returned
+    either way, so a client can switch to cursors from any page. It is None on the last page.
+
+    If sort_keys is None the query must already be ordered, and only offset pagination is possible.
+    """
+    page = max(page, 1)
+    if per_page < 1:
+        per_page = DEFAULT_PER_PAGE
+    if total_count is None:
+        total_count = "none" if cursor else "exact"
+    if total_count not in TOTAL_COUNT_MODES:
+        raise ApiError(
+            error_code="invalid_total_count",
+            message=f"total_count must be one of {', '.join(TOTAL_COUNT_MODES)}. It was: {total_count}",
+            status_code=400,
+        )
+
+    total, total_is_approximate = _count_rows(query, total_count)
+
+    page_query = query
+    if sort_keys is not None:
+        page_query = page_query.order_by(*[clause for sort_key in sort_keys for clause in sort_key.order_by()])
+    if cursor:
+        if sort_keys is None:
+            raise ApiError(
+                error_code="cursor_pagination_not_supported",
+                message="This list cannot be paged with a cursor in its current sort order. Use page instead.",
+                status_code=400,
+            )
+        page_query = page_query.filter(_keyset_filter(sort_keys, decode_cursor(cursor, sort_keys)))
+    else:
+        page_query = page_query.offset((page - 1) * per_page)
+
+    # fetch one extra row to find out whether there is a next page without counting
+    rows = page_query.limit(per_page + 1).all()
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page and sort_keys is not None:
+        next_cursor = encode_cursor(sort_keys, items[-1])
+
+    pages = None if total is None else math.ceil(total / per_page)
+    return PaginatedResult(
+        items=items, total=total, pages=pages, next_cursor=next_cursor, total_is_approximate=total_is_approximate
+    )
+
+
+def encode_cursor(sort_keys: list[SortKey], row: Any) -> str:
+    values = [sort_key.value_from_row(row) for sort_key in sort_keys]
+    cursor_json = json.dumps(
+        {"sort": [sort_key.name for sort_key in sort_keys], "values": values},
+        default=lambda value: str(value) if isinstance(value, Decimal) else value,
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(cursor_json.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_keys: list[SortKey]) -> list[Any]:
+    try:
+        cursor_dict = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = cursor_dict["values"]
+        if cursor_dict["sort"] != [sort_key.name for sort_key in sort_keys] or len(values) != len(sort_keys):
+            raise ValueError("cursor sort order does not match")
+        return [
+            Decimal(value) if isinstance(value, str) and isinstance(sort_key.column.type, Numeric) else value
+            for sort_key, value in zip(sort_keys, values, strict=True)
+        ]
+    except (binascii.Error, UnicodeDecodeError, InvalidOperation, ValueError, KeyError, TypeError) as exception:
+        raise ApiError(
+            error_code="invalid_pagination_cursor",
+            message="The cursor is not valid for this list. Start again from the first page.",
+            status_code=400,
+        ) from exception
+
+
+def _count_rows(query: Query, total_count: str) -> tuple[int | None, bool]:
+    if total_count == "none":
+        return None, False
+    count_query = query.order_by(None)
+    if total_count == "exact":
+        return count_query.count(), False
+    limit = int(current_app.config["SPIFFWORKFLOW_BACKEND_PAGINATION_APPROXIMATE_TOTAL_LIMIT"])
+    total = count_query.limit(limit + 1).count()
+    if total > limit:
+        return limit, True
+    return total, False
+
+
+def _keyset_filter(sort_keys: list[SortKey], values: list[Any]) -> Any:
+    # (a, b, c) sorts after (x, y, z) if a is after x, or a equals x and b is after y, and so on
+    clauses = []
+    for index, sort_key in enumerate(sort_keys):
+        after = sort_key.after(values[index])
+        if after is None:
+            continue
+        equal_to_previous = [
+            previous_key.equal_to(value) for previous_key, value in zip(sort_keys[:index], values[:index], strict=True)
+        ]
+        clauses.append(and_(*equal_to_previous, after))
+    if not clauses:
+        return false()
+
+    keyset_filter = or_(*clauses)
+    first_key = sort_keys[0]
+    if not first_key.nullable and values[0] is not None:
+        # redundant, but a plain range on the first key lets every database seek its index instead of scanning
+        keyset_filter = and_(
+            first_key.column <= values[0] if first_key.descending else first_key.column >= values[0], keyset_filter
+        )
+    return keyset_filter
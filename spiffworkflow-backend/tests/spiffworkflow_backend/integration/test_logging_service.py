@@ -211,6 +211,46 @@ class TestLoggingService(BaseTest):
             if log["task_definition_identifier"] == "Activity_SimpleForm":
                 assert log["username"] == initiator_user.username
 
+    def test_logs_can_be_paged_with_a_cursor(
+        self,
+        app: Flask,
+        client: TestClient,
+        with_db_and_bpmn_file_cleanup: None,
+        with_super_admin_user: UserModel,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="misc/category_number_one/simple_form",
+            process_model_source_directory="simple_form",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        ProcessInstanceRuntime(process_instance).do_engine_steps(save=True)
+
+        headers = self.logged_in_headers(with_super_admin_user)
+        log_url = (
+            f"/v1.0/logs/{self.modify_process_identifier_for_path_param(process_model.id)}/{process_instance.id}?events=true"
+        )
+        response = client.get(log_url, headers=headers)
+        assert response.status_code == 200
+        all_log_ids = [log["id"] for log in response.json()["results"]]
+        assert len(all_log_ids) > 1
+        assert response.json()["pagination"]["total"] == len(all_log_ids)
+
+        response = client.get(f"{log_url}&per_page=1", headers=headers)
+        log_ids = [log["id"] for log in response.json()["results"]]
+        next_cursor = response.json()["pagination"]["next_cursor"]
+        while next_cursor is not None:
+            response = client.get(f"{log_url}&per_page=1&cursor={next_cursor}", headers=headers)
+            assert response.status_code == 200
+            log_ids.extend(log["id"] for log in response.json()["results"])
+            # the total is only counted when asked for once paging with a cursor
+            assert response.json()["pagination"]["total"] is None
+            next_cursor = response.json()["pagination"]["next_cursor"]
+        assert log_ids == all_log_ids
+
+        response = client.get(f"{log_url}&cursor=bogus", headers=headers)
+        assert response.status_code == 400
+        assert response.json()["error_code"] == "invalid_pagination_cursor"
+
     def test_logging_service_simple_logs(
         self,
         app: Flask,
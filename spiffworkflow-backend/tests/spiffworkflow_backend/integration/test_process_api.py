@@ -22,7 +22,7 @@ from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceStatus
 from spiffworkflow_backend.models.process_instance_event import ProcessInstanceEventModel
 from spiffworkflow_backend.models.process_instance_event import ProcessInstanceEventType
-from spiffworkflow_backend.models.process_instance_file_data import ProcessInstanceFileDataModel
+from spiffworkflow_backend.models.process_instance_file_blob import ProcessInstanceFileBlobModel
 from spiffworkflow_backend.models.process_instance_metadata import ProcessInstanceMetadataModel
 from spiffworkflow_backend.models.process_instance_report import ProcessInstanceReportModel
 from spiffworkflow_backend.models.process_instance_report import ReportMetadata
@@ -1645,6 +1645,22 @@ class TestProcessApi(BaseTest):
             )
             assert response.status_code == 200
             assert response.content == expected_content
+            assert response.headers["Accept-Ranges"] == "bytes"
+
+            response = client.get(
+                f"/v1.0/process-data-file-download/{self.modify_process_identifier_for_path_param(process_model.id)}/{process_instance_id}/{digest}",
+                headers={**self.logged_in_headers(with_super_admin_user), "Range": "bytes=2-5"},
+            )
+            assert response.status_code == 206
+            assert response.content == expected_content[2:6]
+            assert response.headers["Content-Range"] == f"bytes 2-5/{len(expected_content)}"
+
+            response = client.get(
+                f"/v1.0/process-data-file-download/{self.modify_process_identifier_for_path_param(process_model.id)}/{process_instance_id}/{digest}",
+                headers={**self.logged_in_headers(with_super_admin_user), "Range": "bytes=100-"},
+            )
+            assert response.status_code == 416
+            assert response.headers["Content-Range"] == f"bytes */{len(expected_content)}"
 
     def test_can_download_uploaded_file_from_file_system(
         self,
@@ -1724,7 +1740,14 @@ class TestProcessApi(BaseTest):
                 assert response.status_code == 200
                 assert response.content == expected_content
 
-                dir_parts = ProcessInstanceFileDataModel.get_hashed_directory_structure(digest)
+                response = client.get(
+                    f"/v1.0/process-data-file-download/{self.modify_process_identifier_for_path_param(process_model.id)}/{process_instance_id}/{digest}",
+                    headers={**self.logged_in_headers(with_super_admin_user), "Range": "bytes=-3"},
+                )
+                assert response.status_code == 206
+                assert response.content == expected_content[-3:]
+
+                dir_parts = ProcessInstanceFileBlobModel.get_hashed_directory_structure(digest)
                 filepath = os.path.join(
                     app.config["SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH"], *dir_parts, digest
                 )
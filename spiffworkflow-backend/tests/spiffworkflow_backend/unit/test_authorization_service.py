@@ -1,5 +1,8 @@
 import pytest
 from flask import Flask
+from flask import g
+from flask.wrappers import Response
+from pytest_mock.plugin import MockerFixture
 from starlette.testclient import TestClient
 
 from spiffworkflow_backend.exceptions.error import InvalidPermissionError
@@ -11,6 +14,7 @@ from spiffworkflow_backend.models.user_group_assignment import UserGroupAssignme
 from spiffworkflow_backend.models.user_group_assignment_waiting import UserGroupAssignmentWaitingModel
 from spiffworkflow_backend.services.authorization_service import AuthorizationService
 from spiffworkflow_backend.services.authorization_service import GroupPermissionsDict
+from spiffworkflow_backend.services.permission_index_service import PermissionIndexService
 from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
 from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
 from spiffworkflow_backend.services.user_service import UserService
@@ -990,6 +994,75 @@ class TestAuthorizationService(BaseTest):
         AuthorizationService.add_permission_from_uri_or_macro(user_group.identifier, "read", "PG:hey:yo")
         self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey:yo", expected_result=True)
 
+    def test_can_deny_access_with_permission_index(
+        self,
+        app: Flask,
+        client: TestClient,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        PermissionIndexService.clear()
+        user = self.find_or_create_user(username="user_one")
+        user_group = UserService.find_or_create_group("group_one")
+        UserService.add_user_to_group(user, user_group)
+        AuthorizationService.add_permission_from_uri_or_macro(user_group.identifier, "read", "PG:hey")
+        AuthorizationService.add_permission_from_uri_or_macro(user_group.identifier, "DENY:read", "/process-groups/hey:new")
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PERMISSION_INDEX_CACHE_MAX_ENTRIES", 10):
+            expected_results = {
+                "/process-groups/hey": True,
+                "/process-groups/hey:yo": True,
+                "/process-groups/hey:new": False,
+                "/process-groups/hey:new:group": True,
+                "/process-groups/heyo": False,
+                "/process-models/hey:yo": True,
+                "/process-models/other:yo": False,
+            }
+            permission_assignments = AuthorizationService.all_permission_assignments_for_user(user)
+            for uri, expected_result in expected_results.items():
+                self.assert_user_has_permission(user, "read", f"/v1.0{uri}", expected_result=expected_result)
+                # answers the same as checking the permission assignments one by one
+                assert AuthorizationService.permission_assignments_include(permission_assignments, "read", uri) is expected_result
+            self.assert_user_has_permission(user, "update", "/v1.0/process-groups/hey", expected_result=False)
+            assert PermissionIndexService.stats() == {"entries": 1}
+
+            # committing a permission change rebuilds the index
+            AuthorizationService.add_permission_from_uri_or_macro(user_group.identifier, "DENY:read", "PG:hey:yo")
+            assert PermissionIndexService.stats() == {"entries": 0}
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey:yo", expected_result=False)
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey:yo:me", expected_result=False)
+
+    def test_resolves_principals_and_permission_assignments_once_per_request(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        user = self.find_or_create_user(username="user_one")
+        user_group = UserService.find_or_create_group("group_one")
+        UserService.add_user_to_group(user, user_group)
+        AuthorizationService.add_permission_from_uri_or_macro(user_group.identifier, "read", "PG:hey")
+        all_principals_for_user_spy = mocker.spy(UserService, "all_principals_for_user")
+
+        with app.test_request_context("/v1.0/process-groups"):
+            AuthorizationService.start_request_authorization_context()
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey")
+            self.assert_user_has_permission(user, "read", "/v1.0/process-groups/hey:yo")
+            self.assert_user_has_permission(user, "update", "/v1.0/process-groups/hey", expected_result=False)
+            permission_assignments = AuthorizationService.all_permission_assignments_for_user(user)
+            assert AuthorizationService.all_permission_assignments_for_user(user) is permission_assignments
+            assert all_principals_for_user_spy.call_count == 1
+            # one lookup for the principals, one per permission check and one for the permission assignments
+            assert g.authorization_query_count == 5
+
+            # committed permission and group changes are picked up within the same request
+            other_group = UserService.find_or_create_group("group_two")
+            AuthorizationService.add_permission_from_uri_or_macro(other_group.identifier, "update", "PG:hey")
+            UserService.add_user_to_group(user, other_group)
+            self.assert_user_has_permission(user, "update", "/v1.0/process-groups/hey")
+            assert all_principals_for_user_spy.call_count == 2
+            AuthorizationService.finish_request_authorization_context(Response())
+            assert "authorization_context" not in g
+
     def test_adds_and_removes_user_from_human_task_assignments_when_group_updates(
         self,
         app: Flask,
@@ -1,3 +1,4 @@
+import threading
 import time
 from typing import Any
 from typing import Protocol
@@ -125,6 +126,50 @@ class TestBackgroundProcessingService(BaseTest):
         ProcessInstanceService.do_waiting(ProcessInstanceStatus.waiting.value)
         assert process_instance.status == ProcessInstanceStatus.waiting.value
 
+    @pytest.mark.requires_committed_database
+    def test_do_waiting_with_a_worker_pool_runs_each_instance_once(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/model_with_lanes",
+            bpmn_file_name="lanes.bpmn",
+            process_model_source_directory="model_with_lanes",
+        )
+        process_instance_ids = [self.create_process_instance_from_process_model(process_model=process_model).id for _ in range(6)]
+        # sweeps only pick up queue entries that have not changed for a minute
+        ProcessInstanceQueueModel.query.filter(
+            ProcessInstanceQueueModel.process_instance_id.in_(process_instance_ids)  # type: ignore
+        ).update({"updated_at_in_seconds": round(time.time()) - 120})
+        db.session.commit()
+        do_engine_steps_spy = mocker.spy(ProcessInstanceRuntime, "do_engine_steps")
+
+        # two overlapping sweeps, like two schedulers polling the same queue, each with its own worker pool
+        with (
+            self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_WAITING_SWEEP_CONCURRENCY", 3),
+            self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_BACKGROUND_SCHEDULER_CLAIM_BATCH_SIZE", 1),
+        ):
+            sweeps = [
+                threading.Thread(target=BackgroundProcessingService(app).process_not_started_process_instances) for _ in range(2)
+            ]
+            for sweep in sweeps:
+                sweep.start()
+            for sweep in sweeps:
+                sweep.join()
+
+        process_instance_ids_run = [call.args[0].process_instance_model.id for call in do_engine_steps_spy.call_args_list]
+        assert sorted(process_instance_ids_run) == sorted(process_instance_ids)
+        db.session.expire_all()
+        for process_instance_id in process_instance_ids:
+            process_instance = ProcessInstanceModel.query.filter_by(id=process_instance_id).first()
+            assert process_instance is not None
+            assert process_instance.status == ProcessInstanceStatus.user_input_required.value
+            queue_entry = ProcessInstanceQueueModel.query.filter_by(process_instance_id=process_instance_id).first()
+            assert queue_entry is not None
+            assert queue_entry.locked_by is None
+
     def test_does_not_queue_future_tasks_if_requested(
         self,
         app: Flask,
@@ -0,0 +1,78 @@
+import json
+import math
+from hashlib import sha256
+
+from flask.app import Flask
+
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.utils import fast_json
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+
+SAMPLE_DATA = {
+    "name": "Ünïcode ✓",
+    "count": 3,
+    "ratio": 0.1,
+    "big": 10**30,
+    "nested": {"b": [1, 2.5, None, True], "a": "x, y: z"},
+    "empty": {},
+}
+
+
+class TestFastJson(BaseTest):
+    def test_hashes_do_not_depend_on_the_json_library(self) -> None:
+        original_orjson_enabled = fast_json.orjson_enabled()
+        try:
+            for orjson_enabled in [True, False]:
+                fast_json.set_orjson_enabled(orjson_enabled)
+                assert fast_json.canonical_dumps(SAMPLE_DATA) == json.dumps(SAMPLE_DATA, sort_keys=True)
+                # computed with json.dumps(SAMPLE_DATA, sort_keys=True) before orjson was used anywhere
+                assert (
+                    JsonDataModel.json_data_dict_from_dict(SAMPLE_DATA)["hash"]
+                    == "0d7802f80b98458196a4e631c8382e700d50ebdbd4ea11688802dbfb52e3e5f0"
+                )
+                assert sha256(fast_json.canonical_dumps(SAMPLE_DATA).encode("utf8")).hexdigest() == (
+                    "0d7802f80b98458196a4e631c8382e700d50ebdbd4ea11688802dbfb52e3e5f0"
+                )
+        finally:
+            fast_json.set_orjson_enabled(original_orjson_enabled)
+
+    def test_dumps_and_loads_round_trip(self) -> None:
+        original_orjson_enabled = fast_json.orjson_enabled()
+        try:
+            for orjson_enabled in [True, False]:
+                fast_json.set_orjson_enabled(orjson_enabled)
+                serialized_data = fast_json.dumps(SAMPLE_DATA)
+                assert fast_json.loads(serialized_data) == SAMPLE_DATA
+                assert fast_json.loads(serialized_data)["big"] == 10**30
+                assert fast_json.loads(fast_json.dumps_bytes(SAMPLE_DATA)) == SAMPLE_DATA
+                assert json.loads(fast_json.dumps(SAMPLE_DATA, sort_keys=True)) == SAMPLE_DATA
+                assert fast_json.dumps({1: "a", None: "b"}) == json.dumps({1: "a", None: "b"}, separators=(",", ":"))
+                assert math.isnan(fast_json.loads('{"value": NaN}')["value"])
+        finally:
+            fast_json.set_orjson_enabled(original_orjson_enabled)
+
+    def test_dumps_writes_non_finite_floats_like_the_json_module(self) -> None:
+        original_orjson_enabled = fast_json.orjson_enabled()
+        try:
+            for orjson_enabled in [True, False]:
+                fast_json.set_orjson_enabled(orjson_enabled)
+                for value in [
+                    {"value": math.nan, "other": None},
+                    {"nested": [{"value": math.inf}], "other": None},
+                    [None, -math.inf],
+                ]:
+                    assert fast_json.dumps(value) == json.dumps(value, separators=(",", ":"))
+                    assert fast_json.dumps_bytes(value) == json.dumps(value, separators=(",", ":")).encode("utf8")
+                assert fast_json.dumps({"value": None, "ratio": 0.5}) == '{"value":null,"ratio":0.5}'
+        finally:
+            fast_json.set_orjson_enabled(original_orjson_enabled)
+
+    def test_flask_json_provider_uses_the_default_for_unknown_types(self, app: Flask) -> None:
+        class Serializable:
+            def serialized(self) -> dict:
+                return {"id": 1}
+
+        data = {"b": Serializable(), "a": SAMPLE_DATA}
+        assert json.loads(app.json.dumps(data)) == {"a": SAMPLE_DATA, "b": {"id": 1}}
+        assert json.loads(app.json.dumps(data, separators=(",", ":"))) == {"a": SAMPLE_DATA, "b": {"id": 1}}
+        assert json.loads(app.json.dumps(data, indent=2)) == {"a": SAMPLE_DATA, "b": {"id": 1}}
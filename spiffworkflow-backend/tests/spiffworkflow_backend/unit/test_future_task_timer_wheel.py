@@ -0,0 +1,89 @@
+import time
+
+from flask import Flask
+from pytest_mock.plugin import MockerFixture
+
+from spiffworkflow_backend.background_processing.future_task_timer_wheel import FutureTaskTimerWheel
+from spiffworkflow_backend.background_processing.future_task_timer_wheel import TimerWheel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.future_task import FutureTaskModel
+from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestFutureTaskTimerWheel(BaseTest):
+    def test_timer_wheel_fires_keys_once_when_they_come_due_at_every_level(
+        self,
+        app: Flask,
+    ) -> None:
+        wheel = TimerWheel(1000, slots_per_level=(4, 4))
+        wheel.add("past", 990)
+        wheel.add("level_zero", 1002)
+        wheel.add("level_one", 1009.5)
+        wheel.add("overflow", 1040)
+        wheel.add("moved", 1003)
+        wheel.add("moved", 1020)
+        wheel.add("removed", 1005)
+        wheel.remove("removed")
+        assert len(wheel) == 5
+
+        assert wheel.advance(1000) == ["past"]
+        assert wheel.advance(1002) == ["level_zero"]
+        assert wheel.advance(1009) == []
+        assert wheel.advance(1010) == ["level_one"]
+        assert wheel.advance(1019) == []
+        assert wheel.advance(1020) == ["moved"]
+        assert wheel.advance(1039) == []
+        assert "overflow" in wheel
+        assert wheel.advance(1040) == ["overflow"]
+        assert len(wheel) == 0
+
+        # jumping further than a whole turn of the wheel still fires everything that came due
+        wheel.add("later", 1050)
+        wheel.add("much_later", 2000)
+        assert wheel.advance(1500) == ["later"]
+        assert wheel.advance(2000) == ["much_later"]
+
+    def test_queues_due_future_tasks_once_and_records_that_they_were_queued(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_CELERY_ENABLED", True):
+            mock = mocker.patch("celery.current_app.send_task")
+            process_model = load_test_spec(
+                process_model_id="test_group/user-task-with-timer",
+                process_model_source_directory="user-task-with-timer",
+                bpmn_file_name="user_task_with_timer.bpmn",
+            )
+            process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+            ProcessInstanceRuntime(process_instance).do_engine_steps(save=True)
+            assert mock.call_count == 0
+
+            current_time = round(time.time())
+            future_task = FutureTaskModel.query.one()
+            future_task.run_at_in_seconds = current_time + 5
+            db.session.add(future_task)
+            db.session.commit()
+
+            timer_wheel = FutureTaskTimerWheel(app)
+            assert timer_wheel.load(current_time) == 1
+            assert timer_wheel.fire_due(current_time) == []
+            assert mock.call_count == 0
+
+            # rows that changed since the last load are picked up again
+            future_task.run_at_in_seconds = current_time - 1
+            db.session.add(future_task)
+            db.session.commit()
+            assert timer_wheel.load(current_time) >= 1
+            assert timer_wheel.fire_due(current_time) == [future_task.guid]
+            assert mock.call_count == 1
+
+            future_task = FutureTaskModel.query.one()
+            assert future_task.queued_to_run_at_in_seconds == future_task.run_at_in_seconds
+            assert future_task.archived_for_process_instance_status is False
+            assert timer_wheel.load(current_time + 1) == 0
+            assert timer_wheel.fire_due(current_time + 10) == []
+            assert mock.call_count == 1
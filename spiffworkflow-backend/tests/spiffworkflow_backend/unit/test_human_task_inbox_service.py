@@ -0,0 +1,139 @@
+from typing import Any
+
+import pytest
+from flask.app import Flask
+from starlette.testclient import TestClient
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.group import GroupModel
+from spiffworkflow_backend.models.human_task_inbox import HumanTaskInboxModel
+from spiffworkflow_backend.models.human_task_user import HumanTaskUserModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceStatus
+from spiffworkflow_backend.services.authorization_service import AuthorizationService
+from spiffworkflow_backend.services.human_task_inbox_service import HumanTaskInboxService
+from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
+from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestHumanTaskInboxService(BaseTest):
+    def _inbox_rows(self) -> list[dict[str, Any]]:
+        return [
+            {column.name: getattr(row, column.name) for column in HumanTaskInboxModel.__table__.columns if column.name != "id"}
+            for row in HumanTaskInboxModel.query.order_by(HumanTaskInboxModel.human_task_id, HumanTaskInboxModel.user_id).all()
+        ]
+
+    def _create_lanes_process_instance(self, monkeypatch: pytest.MonkeyPatch) -> ProcessInstanceModel:
+        self.create_process_group("test_group", "test_group")
+        initiator_user = self.find_or_create_user("initiator_user")
+        self.find_or_create_user("testuser2")
+        monkeypatch.setattr(
+            AuthorizationService,
+            "load_permissions_yaml",
+            lambda: {
+                "groups": {"Finance Team": {"users": ["testuser2"]}},
+                "permissions": {},
+            },
+        )
+        AuthorizationService.import_permissions_from_yaml_file()
+        process_model = load_test_spec(
+            process_model_id="test_group/model_with_lanes",
+            bpmn_file_name="lanes.bpmn",
+            process_model_source_directory="model_with_lanes",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model, user=initiator_user)
+        ProcessInstanceRuntime(process_instance).do_engine_steps(save=True)
+        return process_instance
+
+    def test_inbox_follows_human_tasks_and_assignments(
+        self,
+        app: Flask,
+        client: TestClient,
+        with_db_and_bpmn_file_cleanup: None,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        process_instance = self._create_lanes_process_instance(monkeypatch)
+        initiator_user = self.find_or_create_user("initiator_user")
+        finance_user = self.find_or_create_user("testuser2")
+        finance_group = GroupModel.query.filter_by(identifier="Finance Team").first()
+        assert finance_group is not None
+
+        human_task = process_instance.active_human_tasks[0]
+        inbox_rows = self._inbox_rows()
+        assert inbox_rows == [
+            {
+                "human_task_id": human_task.id,
+                "user_id": initiator_user.id,
+                "process_instance_id": process_instance.id,
+                "process_initiator_id": initiator_user.id,
+                "has_group_assignment": False,
+                "process_model_identifier": process_instance.process_model_identifier,
+                "process_instance_status": ProcessInstanceStatus.user_input_required.value,
+                "process_instance_summary": None,
+                "last_milestone_bpmn_name": process_instance.last_milestone_bpmn_name,
+                "process_initiator_username": "initiator_user",
+                "assigned_user_group_identifier": None,
+                "potential_owner_usernames": "initiator_user",
+            }
+        ]
+
+        # assignments made outside of the runtime show up too
+        db.session.add(HumanTaskUserModel(human_task_id=human_task.id, user_id=finance_user.id))
+        db.session.commit()
+        inbox_rows = self._inbox_rows()
+        assert [row["user_id"] for row in inbox_rows] == sorted([initiator_user.id, finance_user.id])
+        assert {row["potential_owner_usernames"] for row in inbox_rows} == {"initiator_user,testuser2"}
+        HumanTaskUserModel.query.filter_by(human_task_id=human_task.id, user_id=finance_user.id).delete()
+        db.session.commit()
+        assert [row["user_id"] for row in self._inbox_rows()] == [initiator_user.id]
+
+        process_instance.summary = "Expense report"
+        db.session.commit()
+        assert self._inbox_rows()[0]["process_instance_summary"] == "Expense report"
+
+        # completing the task replaces its row with the row of the finance team's task
+        runtime = ProcessInstanceRuntime(process_instance)
+        spiff_task = runtime.__class__.get_task_by_bpmn_identifier(human_task.task_name, runtime.bpmn_process_instance)
+        ProcessInstanceService.complete_form_task(runtime, spiff_task, {}, initiator_user, human_task)
+        finance_human_task = process_instance.active_human_tasks[0]
+        inbox_rows = self._inbox_rows()
+        assert len(inbox_rows) == 1
+        assert inbox_rows[0]["human_task_id"] == finance_human_task.id
+        assert inbox_rows[0]["user_id"] == finance_user.id
+        assert inbox_rows[0]["has_group_assignment"] is True
+        assert inbox_rows[0]["assigned_user_group_identifier"] == finance_group.identifier
+        assert inbox_rows[0]["process_instance_summary"] == "Expense report"
+        assert HumanTaskInboxService.rebuild() == 1
+        assert self._inbox_rows() == inbox_rows
+
+        runtime = ProcessInstanceRuntime(process_instance)
+        spiff_task = runtime.__class__.get_task_by_bpmn_identifier(finance_human_task.task_name, runtime.bpmn_process_instance)
+        ProcessInstanceService.complete_form_task(runtime, spiff_task, {}, finance_user, finance_human_task)
+        last_human_task = process_instance.active_human_tasks[0]
+        assert [(row["human_task_id"], row["user_id"]) for row in self._inbox_rows()] == [(last_human_task.id, initiator_user.id)]
+
+        runtime = ProcessInstanceRuntime(process_instance)
+        spiff_task = runtime.__class__.get_task_by_bpmn_identifier(last_human_task.task_name, runtime.bpmn_process_instance)
+        ProcessInstanceService.complete_form_task(runtime, spiff_task, {}, initiator_user, last_human_task)
+        assert process_instance.status == ProcessInstanceStatus.complete.value
+        assert self._inbox_rows() == []
+
+    def test_deleting_a_process_instance_removes_its_inbox_rows(
+        self,
+        app: Flask,
+        client: TestClient,
+        with_db_and_bpmn_file_cleanup: None,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        process_instance = self._create_lanes_process_instance(monkeypatch)
+        assert len(self._inbox_rows()) == 1
+
+        process_instance.status = ProcessInstanceStatus.suspended.value
+        db.session.commit()
+        assert self._inbox_rows()[0]["process_instance_status"] == ProcessInstanceStatus.suspended.value
+
+        db.session.delete(process_instance)
+        db.session.commit()
+        assert self._inbox_rows() == []
@@ -0,0 +1,83 @@
+from flask.app import Flask
+from sqlalchemy import type_coerce
+
+from spiffworkflow_backend.data_migrations.json_column_compression_migrator import JsonColumnCompressionMigrator
+from spiffworkflow_backend.models.compressed_json import COMPRESSED_JSON_FORMAT_KEY
+from spiffworkflow_backend.models.compressed_json import COMPRESSED_JSON_FORMAT_ZLIB
+from spiffworkflow_backend.models.compressed_json import COMPRESSED_JSON_PAYLOAD_KEY
+from spiffworkflow_backend.models.compressed_json import compress_json_value
+from spiffworkflow_backend.models.compressed_json import decompress_json_value
+from spiffworkflow_backend.models.compressed_json import is_compressed_json
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestJsonColumnCompressionMigrator(BaseTest):
+    def _run_script_task_chain(self) -> ProcessInstanceModel:
+        process_model = load_test_spec(
+            "test_group/script_task_chain_with_large_data",
+            process_model_source_directory="script_task_chain_with_large_data",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model)
+        ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+        return process_instance
+
+    def _compressed_json_data_row_count(self) -> int:
+        stored_values = db.session.query(type_coerce(JsonDataModel.data, db.JSON)).all()
+        return len([stored_value for (stored_value,) in stored_values if is_compressed_json(stored_value)])
+
+    def _assert_payload_loads(self, process_instance: ProcessInstanceModel) -> None:
+        db.session.expire_all()
+        runtime = ProcessInstanceRuntime(process_instance, include_task_data_for_completed_tasks=True)
+        manual_task = runtime.get_ready_user_tasks()[0]
+        assert manual_task.data["counter"] == 5
+        assert manual_task.data["payload"][499] == "payload-item-499"
+
+    def test_compressed_values_round_trip(self) -> None:
+        value = {"payload": ["payload-item"] * 100}
+        assert compress_json_value(value, 0) is value
+        assert compress_json_value(value, 1000000) is value
+        compressed_value = compress_json_value(value, 100)
+        assert is_compressed_json(compressed_value)
+        assert decompress_json_value(compressed_value) == value
+
+    def test_values_shaped_like_an_envelope_round_trip(self) -> None:
+        value = {COMPRESSED_JSON_FORMAT_KEY: COMPRESSED_JSON_FORMAT_ZLIB, COMPRESSED_JSON_PAYLOAD_KEY: "not base64"}
+        for min_bytes in [0, 1000000]:
+            stored_value = compress_json_value(value, min_bytes)
+            assert not is_compressed_json(stored_value)
+            assert decompress_json_value(stored_value) == value
+        assert decompress_json_value(compress_json_value(value, 10)) == value
+
+    def test_can_compress_and_decompress_existing_rows(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instance = self._run_script_task_chain()
+        assert self._compressed_json_data_row_count() == 0
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES", 1024):
+            rows_rewritten_by_table = JsonColumnCompressionMigrator.migrate()
+            assert rows_rewritten_by_table["json_data"] > 0
+            assert self._compressed_json_data_row_count() == rows_rewritten_by_table["json_data"]
+            assert JsonColumnCompressionMigrator.migrate()["json_data"] == 0
+            self._assert_payload_loads(process_instance)
+
+        assert JsonColumnCompressionMigrator.migrate()["json_data"] > 0
+        assert self._compressed_json_data_row_count() == 0
+        self._assert_payload_loads(process_instance)
+
+    def test_writes_large_values_compressed_when_enabled(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_COMPRESSED_JSON_MIN_BYTES", 1024):
+            process_instance = self._run_script_task_chain()
+            assert self._compressed_json_data_row_count() > 0
+        self._assert_payload_loads(process_instance)
@@ -49,3 +49,21 @@ def test_json_data_hash_treats_integer_keys_like_json_object_keys() -> None:
 def test_json_data_dict_from_dict_rejects_normalized_key_collisions() -> None:
     with pytest.raises(ValueError, match="JSON object key collision after normalization"):
         JsonDataModel.json_data_dict_from_dict({1: "integer", "1": "string"})
+
+
+def test_json_values_identical_only_matches_values_with_the_same_json() -> None:
+    assert JsonDataModel.json_values_identical({"a": [1, {"b": "c"}]}, {"a": [1, {"b": "c"}]})
+    assert not JsonDataModel.json_values_identical({"a": 1}, {"a": True})
+    assert not JsonDataModel.json_values_identical({"a": 1}, {"a": 1.0})
+    assert not JsonDataModel.json_values_identical({"a": [1]}, {"a": [1, 2]})
+    assert not JsonDataModel.json_values_identical({1: "a"}, {1: "a"})
+
+
+def test_apply_delta_rebuilds_data_from_delta_against_base() -> None:
+    base = {"hey": {"hey2": 2, "hey3": 3}, "hey30": 3, "hey40": 4}
+    data = {"hey": {"hey2": 4, "hey5": 3}, "hey20": 2, "hey30": 3}
+
+    delta = JsonDataModel.delta_from_dicts(base, data)
+
+    assert delta == {"added": {"hey20": 2}, "removed": ["hey40"], "changed": {"hey": {"hey2": 4, "hey5": 3}}}
+    assert JsonDataModel.apply_delta(base, delta) == data
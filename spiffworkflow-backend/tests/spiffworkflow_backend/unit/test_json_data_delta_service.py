@@ -0,0 +1,72 @@
+from flask.app import Flask
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.task import TaskModel
+from spiffworkflow_backend.models.task_definition import TaskDefinitionModel
+from spiffworkflow_backend.services.json_data_delta_service import JsonDataDeltaService
+from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestJsonDataDeltaService(BaseTest):
+    def _run_script_task_chain(self) -> ProcessInstanceModel:
+        process_model = load_test_spec(
+            "test_group/script_task_chain_with_large_data",
+            process_model_source_directory="script_task_chain_with_large_data",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model)
+        ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+        return process_instance
+
+    def _assert_script_task_data_is_rebuilt(self, process_instance: ProcessInstanceModel) -> None:
+        for counter in range(1, 6):
+            task_model = (
+                TaskModel.query.join(TaskDefinitionModel)
+                .filter(
+                    TaskModel.process_instance_id == process_instance.id,
+                    TaskDefinitionModel.bpmn_identifier == f"increment_counter_{counter}",
+                )
+                .first()
+            )
+            assert task_model is not None
+            task_data = JsonDataModel.find_data_dict_by_hash(task_model.json_data_hash)
+            assert task_data["counter"] == counter
+            assert len(task_data["payload"]) == 500
+
+        runtime = ProcessInstanceRuntime(process_instance, include_task_data_for_completed_tasks=True)
+        manual_task = runtime.get_ready_user_tasks()[0]
+        assert manual_task.data["counter"] == 5
+        assert manual_task.data["payload"][499] == "payload-item-499"
+
+    def test_stores_task_data_as_deltas_with_a_bounded_chain_depth(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_ENCODING", True):
+            with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_JSON_DATA_DELTA_MAX_CHAIN_DEPTH", 2):
+                process_instance = self._run_script_task_chain()
+
+        delta_depths = [r.delta_depth for r in JsonDataModel.query.filter(JsonDataModel.delta_base_hash.isnot(None)).all()]  # type: ignore
+        assert len(delta_depths) > 0
+        assert max(delta_depths) <= 2
+        self._assert_script_task_data_is_rebuilt(process_instance)
+
+    def test_backfill_converts_full_rows_to_deltas(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instance = self._run_script_task_chain()
+        assert JsonDataModel.query.filter(JsonDataModel.delta_base_hash.isnot(None)).count() == 0  # type: ignore
+
+        stats = JsonDataDeltaService.backfill_process_instance(process_instance.id)
+        db.session.commit()
+
+        assert stats["rows_converted"] > 0
+        assert stats["bytes_after"] < stats["bytes_before"]
+        assert JsonDataDeltaService.backfill_process_instance(process_instance.id)["rows_converted"] == 0
+        self._assert_script_task_data_is_rebuilt(process_instance)
@@ -0,0 +1,38 @@
+from flask.app import Flask
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.json_data import JsonDataModel
+from spiffworkflow_backend.models.task import TaskModel
+from spiffworkflow_backend.services.json_data_hash_cache_service import JsonDataHashCacheService
+from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestJsonDataHashCacheService(BaseTest):
+    def test_only_remembers_hashes_that_were_committed(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        JsonDataHashCacheService.clear()
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_JSON_DATA_HASH_CACHE_MAX_ENTRIES", 1000):
+            process_model = load_test_spec(
+                "test_group/manual_task",
+                process_model_source_directory="manual_task",
+            )
+            process_instance = self.create_process_instance_from_process_model(process_model)
+            ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+
+            task_models = TaskModel.query.filter_by(process_instance_id=process_instance.id).all()
+            assert len(task_models) > 0
+            for task_model in task_models:
+                assert JsonDataHashCacheService.has_hash(task_model.json_data_hash)
+
+            rolled_back_json_data_dict = JsonDataModel.json_data_dict_from_dict({"rolled_back": True})
+            JsonDataHashCacheService.insert_or_update_json_data_records(
+                {rolled_back_json_data_dict["hash"]: rolled_back_json_data_dict}
+            )
+            db.session.rollback()
+            assert not JsonDataHashCacheService.has_hash(rolled_back_json_data_dict["hash"])
+        JsonDataHashCacheService.clear()
@@ -0,0 +1,99 @@
+from flask import Flask
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.message_instance import MessageInstanceModel
+from spiffworkflow_backend.models.message_instance import MessageStatuses
+from spiffworkflow_backend.models.message_instance import MessageTypes
+from spiffworkflow_backend.models.message_instance_correlation import MessageInstanceCorrelationRuleModel
+from spiffworkflow_backend.models.message_instance_correlation_key import MessageInstanceCorrelationKeyModel
+from spiffworkflow_backend.services.message_correlation_index_service import MessageCorrelationIndexService
+from spiffworkflow_backend.services.message_service import MessageService
+from spiffworkflow_backend.services.process_instance_script_engine import CustomBpmnScriptEngine
+from spiffworkflow_backend.utils import fast_json
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+
+
+class TestMessageCorrelationIndexService(BaseTest):
+    def _create_receive_message(self, correlation_keys: dict, index: bool = True) -> MessageInstanceModel:
+        message_instance = MessageInstanceModel(
+            message_type=MessageTypes.receive.value,
+            name="invoice_paid",
+            correlation_keys=correlation_keys,
+            status=MessageStatuses.ready.value,
+        )
+        for name in ["po_number", "customer_id"]:
+            db.session.add(
+                MessageInstanceCorrelationRuleModel(
+                    message_instance=message_instance,
+                    name=name,
+                    retrieval_expression=name,
+                    correlation_key_names=["invoice"],
+                )
+            )
+        db.session.add(message_instance)
+        if index:
+            MessageCorrelationIndexService.index_receive_message(message_instance)
+        db.session.commit()
+        return message_instance
+
+    def test_finds_correlating_receive_messages_with_the_index(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        matching = self._create_receive_message({"invoice": {"po_number": 1001.0, "customer_id": "Sartography"}})
+        self._create_receive_message({"invoice": {"po_number": 1002, "customer_id": "Sartography"}})
+        accepts_anything = self._create_receive_message({})
+        only_customer = self._create_receive_message({"invoice": {"po_number": None, "customer_id": "Sartography"}})
+        queued_before_the_index = self._create_receive_message({"invoice": {"po_number": 1001}}, index=False)
+        self._create_receive_message({"invoice": {"po_number": 1002}}, index=False)
+
+        message_instance_send = MessageInstanceModel(
+            message_type=MessageTypes.send.value,
+            name="invoice_paid",
+            payload={"po_number": 1001, "customer_id": "Sartography"},
+            correlation_keys={},
+            status=MessageStatuses.ready.value,
+        )
+        db.session.add(message_instance_send)
+        db.session.commit()
+
+        def correlating_receive_message_ids() -> list[int]:
+            return [
+                message_instance.id
+                for message_instance in MessageCorrelationIndexService.correlating_receive_messages(
+                    message_instance_send, CustomBpmnScriptEngine()
+                )
+            ]
+
+        expected_ids = [matching.id, accepts_anything.id, only_customer.id, queued_before_the_index.id]
+        assert correlating_receive_message_ids() == expected_ids
+
+        # claimed receive messages can no longer be correlated with so their rows are removed
+        assert MessageService._claim_ready_message_instance(matching) is True
+        assert MessageInstanceCorrelationKeyModel.query.filter_by(message_instance_id=matching.id).count() == 0
+        assert correlating_receive_message_ids() == expected_ids[1:]
+
+    def test_correlation_value_hashes_agree_with_python_equality(
+        self,
+        app: Flask,
+    ) -> None:
+        def correlation_value_hash(value: object) -> str:
+            return MessageCorrelationIndexService._correlation_value_hash({"po_number": "po_number"}, {"po_number": value})
+
+        assert correlation_value_hash(1) == correlation_value_hash(1.0) == correlation_value_hash(True)
+        assert correlation_value_hash({1: "a", "b": [0]}) == correlation_value_hash({"b": [False], 1.0: "a"})
+        assert correlation_value_hash(1) != correlation_value_hash("1")
+        assert correlation_value_hash({1: "a"}) != correlation_value_hash({"1": "a"})
+        assert correlation_value_hash({"a": 1}) != correlation_value_hash([["a", 1]])
+
+        # the hash is the same whether or not orjson is installed
+        original_orjson_enabled = fast_json.orjson_enabled()
+        try:
+            hashes = set()
+            for orjson_enabled in [True, False]:
+                fast_json.set_orjson_enabled(orjson_enabled)
+                hashes.add(correlation_value_hash({"b": [1.5, None], "a": "Sartography"}))
+            assert len(hashes) == 1
+        finally:
+            fast_json.set_orjson_enabled(original_orjson_enabled)
@@ -349,6 +349,49 @@ class TestMessageService(BaseTest):
         assert len(message_instances) == 1
         assert message_instances[0].correlation_keys == {"MainCorrelationKey": {"uid": 1}}
 
+    def test_correlate_all_message_instances_delivers_ready_send_messages_in_one_pass(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            "test_group/test_message_process",
+            process_model_source_directory="message",
+            bpmn_file_name="message-receive.bpmn",
+        )
+        process_instances = []
+        for _ in range(2):
+            process_instance = self.create_process_instance_from_process_model(process_model)
+            ProcessInstanceRuntime(process_instance).do_engine_steps(save=True)
+            process_instances.append(process_instance)
+        message_instances_send = []
+        for _ in range(3):
+            message_instance_send = MessageInstanceModel(
+                message_type=MessageTypes.send.value,
+                name="B",
+                payload={"uid": 1},
+                correlation_keys={},
+                status=MessageStatuses.ready.value,
+            )
+            db.session.add(message_instance_send)
+            message_instances_send.append(message_instance_send)
+        db.session.commit()
+
+        with patch.object(MessageService, "correlate_send_message", wraps=MessageService.correlate_send_message) as mock:
+            MessageService.correlate_all_message_instances()
+        # only the send message left over after both receivers took one goes through the one at a time path
+        assert mock.call_count == 1
+        assert mock.call_args.args[0].id == message_instances_send[2].id
+        assert mock.call_args.kwargs["try_existing_receivers"] is False
+
+        receive_messages = MessageInstanceModel.query.filter_by(message_type=MessageTypes.receive.value).all()
+        assert {message_instance.status for message_instance in receive_messages} == {MessageStatuses.completed.value}
+        assert sorted(message_instance.counterpart_id for message_instance in receive_messages) == [
+            message_instances_send[0].id,
+            message_instances_send[1].id,
+        ]
+        assert MessageInstanceModel.query.filter_by(id=message_instances_send[2].id).one().status == MessageStatuses.ready.value
+
     def test_receive_message_is_canceled_if_process_is_no_longer_waiting(
         self,
         app: Flask,
@@ -0,0 +1,120 @@
+import pytest
+from flask.app import Flask
+
+from spiffworkflow_backend.exceptions.api_error import ApiError
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.utils.pagination import SortKey
+from spiffworkflow_backend.utils.pagination import encode_cursor
+from spiffworkflow_backend.utils.pagination import paginate_query
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+SORT_KEYS = [
+    SortKey(ProcessInstanceModel.start_in_seconds, descending=True),  # type: ignore
+    SortKey(ProcessInstanceModel.id, descending=True),  # type: ignore
+]
+
+
+class TestPagination(BaseTest):
+    def _create_process_instances(self, start_times: list[int | None]) -> list[ProcessInstanceModel]:
+        process_model = load_test_spec(
+            process_model_id="test_group/random_fact",
+            bpmn_file_name="random_fact_set.bpmn",
+            process_model_source_directory="random_fact",
+        )
+        process_instances = []
+        for start_in_seconds in start_times:
+            process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+            process_instance.start_in_seconds = start_in_seconds
+            process_instances.append(process_instance)
+        db.session.commit()
+        return process_instances
+
+    def test_cursor_pages_match_offset_pages(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instances = self._create_process_instances([100, None, 300, 100, None, 200, 100])
+        # ties on start_in_seconds are broken by id and nulls come last
+        expected_ids = [
+            process_instance.id
+            for process_instance in sorted(
+                process_instances,
+                key=lambda pi: (pi.start_in_seconds is None, -(pi.start_in_seconds or 0), -pi.id),
+            )
+        ]
+
+        offset_ids = []
+        for page in range(1, 5):
+            result = paginate_query(ProcessInstanceModel.query, SORT_KEYS, page=page, per_page=2)
+            assert result.total == 7
+            assert result.pages == 4
+            offset_ids.extend(process_instance.id for process_instance in result.items)
+            assert (result.next_cursor is None) == (page == 4)
+        assert offset_ids == expected_ids
+
+        cursor_ids = []
+        cursor = None
+        for _ in range(4):
+            result = paginate_query(ProcessInstanceModel.query, SORT_KEYS, per_page=2, cursor=cursor)
+            cursor_ids.extend(process_instance.id for process_instance in result.items)
+            cursor = result.next_cursor
+            if cursor is None:
+                break
+        assert cursor_ids == expected_ids
+        # cursors skip the count unless it is asked for
+        assert result.total is None
+        assert result.pages is None
+
+        # a cursor taken from an offset page continues after it
+        offset_page = paginate_query(ProcessInstanceModel.query, SORT_KEYS, page=2, per_page=2)
+        assert offset_page.next_cursor == encode_cursor(SORT_KEYS, offset_page.items[-1])
+        result = paginate_query(ProcessInstanceModel.query, SORT_KEYS, per_page=3, cursor=offset_page.next_cursor)
+        assert [process_instance.id for process_instance in result.items] == expected_ids[4:]
+
+    def test_approximate_total_stops_counting_at_the_limit(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        self._create_process_instances([100, 200, 300, 400, 500])
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PAGINATION_APPROXIMATE_TOTAL_LIMIT", 3):
+            result = paginate_query(ProcessInstanceModel.query, SORT_KEYS, per_page=2, total_count="approximate")
+            assert result.total == 3
+            assert result.pages == 2
+            assert result.total_is_approximate is True
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PAGINATION_APPROXIMATE_TOTAL_LIMIT", 10):
+            result = paginate_query(ProcessInstanceModel.query, SORT_KEYS, per_page=2, total_count="approximate")
+            assert result.total == 5
+            assert result.total_is_approximate is False
+
+        result = paginate_query(ProcessInstanceModel.query, SORT_KEYS, per_page=2, total_count="none")
+        assert result.total is None
+        assert result.next_cursor is not None
+
+    def test_rejects_invalid_cursors(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        self._create_process_instances([100, 200, 300])
+        cursor = paginate_query(ProcessInstanceModel.query, SORT_KEYS, per_page=1).next_cursor
+        assert cursor is not None
+
+        for invalid_cursor in ["not-a-cursor", cursor[:-4]]:
+            with pytest.raises(ApiError) as exception:
+                paginate_query(ProcessInstanceModel.query, SORT_KEYS, cursor=invalid_cursor)
+            assert exception.value.error_code == "invalid_pagination_cursor"
+
+        # a cursor only works with the sort order it was made for
+        with pytest.raises(ApiError) as exception:
+            paginate_query(ProcessInstanceModel.query, [SortKey(ProcessInstanceModel.id)], cursor=cursor)  # type: ignore
+        assert exception.value.error_code == "invalid_pagination_cursor"
+
+        with pytest.raises(ApiError) as exception:
+            paginate_query(ProcessInstanceModel.query.order_by(ProcessInstanceModel.id), None, cursor=cursor)
+        assert exception.value.error_code == "cursor_pagination_not_supported"
@@ -7,7 +7,8 @@ from starlette.testclient import TestClient
 from spiffworkflow_backend.data_migrations.process_instance_file_data_migrator import ProcessInstanceFileDataMigrator
 from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.process_instance import ProcessInstanceStatus
-from spiffworkflow_backend.models.process_instance_file_data import PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM
+from spiffworkflow_backend.models.process_instance_file_blob import PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM
+from spiffworkflow_backend.models.process_instance_file_blob import ProcessInstanceFileBlobModel
 from spiffworkflow_backend.models.process_instance_file_data import ProcessInstanceFileDataModel
 from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
 from spiffworkflow_backend.services.process_model_service import ProcessModelService
@@ -43,11 +44,13 @@ class TestProcessInstanceFileDataMigrator(BaseTest):
             }
         ]
         for pi_file in pi_files:
+            db.session.add(
+                ProcessInstanceFileBlobModel(digest=pi_file["digest"], contents=pi_file["contents"].encode(), reference_count=1)
+            )
             pi_model = ProcessInstanceFileDataModel(
                 process_instance_id=process_instance.id,
                 mimetype=pi_file["mimetype"],
                 filename=pi_file["filename"],
-                contents=pi_file["contents"].encode(),
                 digest=pi_file["digest"],
             )
             db.session.add(pi_model)
@@ -60,7 +63,7 @@ class TestProcessInstanceFileDataMigrator(BaseTest):
 
             test_file_one_model = ProcessInstanceFileDataModel.query.filter_by(filename="test_file_one.json").first()
             assert test_file_one_model is not None
-            assert test_file_one_model.contents == PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM.encode()
+            assert test_file_one_model.blob.contents == PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM.encode()
             assert test_file_one_model.get_contents() == test_file_one_contents.encode()
 
     def test_can_migrate_binary_file_from_db_to_fs(
@@ -91,11 +94,17 @@ class TestProcessInstanceFileDataMigrator(BaseTest):
             }
         ]
         for pi_file in pi_files:
+            db.session.add(
+                ProcessInstanceFileBlobModel(
+                    digest=str(pi_file["digest"]),
+                    contents=pi_file["contents"],
+                    reference_count=1,
+                )
+            )
             pi_model = ProcessInstanceFileDataModel(
                 process_instance_id=process_instance.id,
                 mimetype=str(pi_file["mimetype"]),
                 filename=str(pi_file["filename"]),
-                contents=pi_file["contents"],  # type: ignore
                 digest=str(pi_file["digest"]),
             )
             db.session.add(pi_model)
@@ -108,5 +117,5 @@ class TestProcessInstanceFileDataMigrator(BaseTest):
 
             test_file_one_model = ProcessInstanceFileDataModel.query.filter_by(filename="test_file_one.json").first()
             assert test_file_one_model is not None
-            assert test_file_one_model.contents == PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM.encode()
+            assert test_file_one_model.blob.contents == PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM.encode()
             assert test_file_one_model.get_contents() == test_file_one_contents
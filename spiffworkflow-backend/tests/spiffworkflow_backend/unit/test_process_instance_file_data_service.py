@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import os
+
+import pytest
+from flask.app import Flask
+from pytest_mock.plugin import MockerFixture
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance_file_blob import ProcessInstanceFileBlobModel
+from spiffworkflow_backend.models.process_instance_file_data import ProcessInstanceFileDataModel
+from spiffworkflow_backend.services.process_instance_file_data_service import ProcessInstanceFileDataService
+from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
+from spiffworkflow_backend.services.process_model_service import ProcessModelService
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+FILE_CONTENTS = b"the same attachment everywhere\n"
+FILE_DIGEST = hashlib.sha256(FILE_CONTENTS).hexdigest()
+
+
+def _file_data(filename: str) -> str:
+    return f"data:text/plain;name={filename};base64,{base64.b64encode(FILE_CONTENTS).decode()}"
+
+
+class TestProcessInstanceFileDataService(BaseTest):
+    @pytest.mark.parametrize("on_file_system", [False, True])
+    def test_stores_identical_files_once_and_deletes_them_with_the_last_reference(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+        with_db_and_bpmn_file_cleanup: None,
+        on_file_system: bool,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/random_fact",
+            bpmn_file_name="random_fact_set.bpmn",
+            process_model_source_directory="random_fact",
+        )
+        process_instances = [self.create_process_instance_from_process_model(process_model=process_model) for _ in range(2)]
+        file_data_dir = ProcessModelService.root_path() if on_file_system else None
+        replace_spy = mocker.spy(os, "replace")
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH", file_data_dir):
+            for process_instance in process_instances:
+                data = {"attachment": _file_data("one.txt"), "copies": [_file_data("two.txt"), _file_data("one.txt")]}
+                ProcessInstanceService.save_file_data_and_replace_with_digest_references(data, process_instance.id)
+                ProcessInstanceService.save_file_data_and_replace_with_digest_references(
+                    {"attachment": _file_data("three.txt")}, process_instance.id
+                )
+
+            file_blob = ProcessInstanceFileBlobModel.query.one()
+            assert file_blob.digest == FILE_DIGEST
+            assert file_blob.reference_count == 2
+            assert file_blob.get_contents() == FILE_CONTENTS
+            for process_instance in process_instances:
+                file_data = ProcessInstanceFileDataModel.query.filter_by(process_instance_id=process_instance.id).one()
+                assert file_data.filename == "one.txt"
+                assert file_data.get_contents() == FILE_CONTENTS
+            if on_file_system:
+                assert os.path.isfile(file_blob.get_full_filepath())
+                # each upload moves its file into place once it has referenced the blob and leaves no temporary file behind
+                assert replace_spy.call_count == 8
+                assert not [filename for filename in os.listdir(file_data_dir) if filename.startswith(".upload-")]
+
+            db.session.delete(process_instances[0])
+            db.session.commit()
+            db.session.expire_all()
+            assert ProcessInstanceFileBlobModel.query.one().reference_count == 1
+            if on_file_system:
+                assert os.path.isfile(ProcessInstanceFileBlobModel.full_filepath_for_digest(FILE_DIGEST))
+
+            db.session.delete(process_instances[1])
+            db.session.commit()
+            assert ProcessInstanceFileBlobModel.query.count() == 0
+            assert ProcessInstanceFileDataModel.query.count() == 0
+            if on_file_system:
+                assert not os.path.exists(ProcessInstanceFileBlobModel.full_filepath_for_digest(FILE_DIGEST))
+
+    def test_keeps_blob_files_when_deleting_is_rolled_back(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/random_fact",
+            bpmn_file_name="random_fact_set.bpmn",
+            process_model_source_directory="random_fact",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+
+        with self.app_config_mock(
+            app, "SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH", ProcessModelService.root_path()
+        ):
+            ProcessInstanceService.save_file_data_and_replace_with_digest_references(
+                {"attachment": _file_data("one.txt")}, process_instance.id
+            )
+            filepath = ProcessInstanceFileBlobModel.full_filepath_for_digest(FILE_DIGEST)
+
+            db.session.delete(process_instance)
+            db.session.flush()
+            assert ProcessInstanceFileBlobModel.query.count() == 0
+            db.session.rollback()
+
+            assert ProcessInstanceFileBlobModel.query.one().reference_count == 1
+            assert os.path.isfile(filepath)
+
+    def test_keeps_blob_files_that_are_referenced_again_while_they_are_released(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/random_fact",
+            bpmn_file_name="random_fact_set.bpmn",
+            process_model_source_directory="random_fact",
+        )
+        process_instances = [self.create_process_instance_from_process_model(process_model=process_model) for _ in range(2)]
+
+        with self.app_config_mock(
+            app, "SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH", ProcessModelService.root_path()
+        ):
+            ProcessInstanceService.save_file_data_and_replace_with_digest_references(
+                {"attachment": _file_data("one.txt")}, process_instances[0].id
+            )
+            filepath = ProcessInstanceFileBlobModel.full_filepath_for_digest(FILE_DIGEST)
+
+            # another transaction released the last reference and removed the file before this upload referenced the blob
+            os.remove(filepath)
+            ProcessInstanceService.save_file_data_and_replace_with_digest_references(
+                {"attachment": _file_data("one.txt")}, process_instances[1].id
+            )
+            assert os.path.isfile(filepath)
+
+            # or it removes the file after this upload stored the blob again
+            ProcessInstanceFileDataService.remove_blob_files({FILE_DIGEST})
+            assert os.path.isfile(filepath)
+            assert ProcessInstanceFileBlobModel.query.one().get_contents() == FILE_CONTENTS
@@ -0,0 +1,109 @@
+from flask.app import Flask
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance_materialized_metadata import ProcessInstanceMaterializedMetadataModel
+from spiffworkflow_backend.models.process_instance_metadata import ProcessInstanceMetadataModel
+from spiffworkflow_backend.models.process_instance_report import FilterValue
+from spiffworkflow_backend.models.process_instance_report import ReportMetadata
+from spiffworkflow_backend.services.metadata_backfill_service import MetadataBackfillService
+from spiffworkflow_backend.services.process_instance_materialized_metadata_service import (
+    ProcessInstanceMaterializedMetadataService,
+)
+from spiffworkflow_backend.services.process_instance_report_service import ProcessInstanceReportService
+from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestProcessInstanceMaterializedMetadataService(BaseTest):
+    def _create_process_instances(self, count: int) -> list[ProcessInstanceModel]:
+        process_model = load_test_spec(
+            process_model_id="test_group/random_fact",
+            bpmn_file_name="random_fact_set.bpmn",
+            process_model_source_directory="random_fact",
+        )
+        return [self.create_process_instance_from_process_model(process_model=process_model) for _ in range(count)]
+
+    def _materialized_metadata(self) -> dict[int, dict]:
+        return {row.process_instance_id: row.metadata_values for row in ProcessInstanceMaterializedMetadataModel.query.all()}
+
+    def test_materialized_metadata_follows_process_instance_metadata(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instance_one, process_instance_two = self._create_process_instances(2)
+
+        runtime = ProcessInstanceRuntime(process_instance_one)
+        runtime.store_metadata({"invoice": "INV-1", "amount": 100, "skipped": None})
+        db.session.commit()
+        assert self._materialized_metadata() == {process_instance_one.id: {"invoice": "INV-1", "amount": "100"}}
+
+        runtime.store_metadata({"amount": 250})
+        MetadataBackfillService.add_metadata_to_instance(process_instance_two.id, {"invoice": "INV-2"})
+        db.session.commit()
+        assert self._materialized_metadata() == {
+            process_instance_one.id: {"invoice": "INV-1", "amount": "250"},
+            process_instance_two.id: {"invoice": "INV-2"},
+        }
+
+        db.session.delete(
+            ProcessInstanceMetadataModel.query.filter_by(process_instance_id=process_instance_one.id, key="invoice").one()
+        )
+        db.session.commit()
+        assert self._materialized_metadata()[process_instance_one.id] == {"amount": "250"}
+        expected_metadata = self._materialized_metadata()
+        assert ProcessInstanceMaterializedMetadataService.rebuild() == 2
+        assert self._materialized_metadata() == expected_metadata
+
+        db.session.delete(process_instance_two)
+        db.session.commit()
+        assert self._materialized_metadata() == {process_instance_one.id: {"amount": "250"}}
+
+    def test_report_reads_the_same_metadata_with_and_without_materialized_metadata(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instances = self._create_process_instances(4)
+        for process_instance, metadata in zip(
+            process_instances,
+            [{"key1": "value1", "key2": "5"}, {"key1": "value3"}, {"key2": "20"}, {"key1": "", "key2": "7"}],
+            strict=True,
+        ):
+            ProcessInstanceRuntime(process_instance).store_metadata(metadata)
+        db.session.commit()
+
+        filters_to_check: list[list[FilterValue]] = [
+            [],
+            [{"field_name": "key1", "field_value": "value1", "operator": "equals"}],
+            [{"field_name": "key1", "field_value": "value1", "operator": "not_equals"}],
+            [{"field_name": "key1", "field_value": "alu", "operator": "contains"}],
+            [{"field_name": "key1", "field_value": "", "operator": "is_empty"}],
+            [{"field_name": "key1", "field_value": "", "operator": "is_not_empty"}],
+            [{"field_name": "key2", "field_value": 7, "operator": "greater_than_or_equal_to"}],
+            [
+                {"field_name": "key1", "field_value": "value", "operator": "contains"},
+                {"field_name": "key2", "field_value": 10, "operator": "less_than"},
+            ],
+        ]
+        for filters in filters_to_check:
+            for order_by in [["-id"], ["key1", "-id"]]:
+                report_results = []
+                for use_materialized_metadata in [False, True]:
+                    report_metadata: ReportMetadata = {
+                        "columns": [
+                            {"Header": "ID", "accessor": "id", "filterable": False},
+                            {"Header": "Key one", "accessor": "key1", "filterable": True},
+                            {"Header": "Key two", "accessor": "key2", "filterable": True},
+                        ],
+                        "order_by": order_by,
+                        "filter_by": list(filters),
+                    }
+                    with self.app_config_mock(
+                        app, "SPIFFWORKFLOW_BACKEND_USE_MATERIALIZED_PROCESS_INSTANCE_METADATA", use_materialized_metadata
+                    ):
+                        response_json = ProcessInstanceReportService.run_process_instance_report(report_metadata)
+                    report_results.append([(result["id"], result["key1"], result["key2"]) for result in response_json["results"]])
+                assert report_results[0] == report_results[1], f"filters: {filters}, order_by: {order_by}"
@@ -0,0 +1,53 @@
+from typing import Any
+
+from flask.app import Flask
+from sqlalchemy import event
+
+from spiffworkflow_backend.models.bpmn_process import BpmnProcessModel
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.services.process_instance_persistence_service import ProcessInstancePersistenceService
+from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestProcessInstancePersistenceService(BaseTest):
+    def test_get_full_bpmn_process_dict_loads_subprocesses_with_a_fixed_number_of_queries(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            "test_group/multiinstance_subprocess_with_manual_task",
+            process_model_source_directory="multiinstance_subprocess_with_manual_task",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model)
+        ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+        subprocess_count = BpmnProcessModel.query.filter_by(top_level_process_id=process_instance.bpmn_process_id).count()
+        assert subprocess_count == 200
+
+        bpmn_process_definition = process_instance.bpmn_process_definition
+        bpmn_process = process_instance.bpmn_process
+        statements: list[str] = []
+
+        def count_statement(*args: Any) -> None:
+            statements.append(args[2])
+
+        event.listen(db.engine, "before_cursor_execute", count_statement)
+        try:
+            full_bpmn_process_dict = ProcessInstancePersistenceService.get_full_bpmn_process_dict(
+                bpmn_definition_to_task_definitions_mappings={},
+                bpmn_subprocess_mapping={},
+                task_model_mapping={},
+                spiff_serializer_version=process_instance.spiff_serializer_version,
+                bpmn_process_definition=bpmn_process_definition,
+                bpmn_process=bpmn_process,
+                bpmn_process_definition_id=process_instance.bpmn_process_definition_id,
+            )
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count_statement)
+
+        assert len(full_bpmn_process_dict["subprocesses"]) == subprocess_count
+        # definitions, the top level process, its tasks and their data, then the subprocesses, their data,
+        # their tasks and the task data. none of this should grow with the number of subprocesses.
+        assert len(statements) <= 12, "\n".join(statements)
@@ -5,10 +5,15 @@ import pytest
 from flask.app import Flask
 from pytest_mock.plugin import MockerFixture
 
+from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueueModel
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueuePriority
 from spiffworkflow_backend.services.process_instance_lock_service import ProcessInstanceLockService
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceIsAlreadyLockedError
 from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
+from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
+from spiffworkflow_backend.services.process_model_service import ProcessModelService
 from tests.spiffworkflow_backend.helpers.base_test import BaseTest
 from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
 
@@ -147,3 +152,118 @@ class TestProcessInstanceQueueService(BaseTest):
             with ProcessInstanceQueueService.dequeued(process_instance):
                 pass
         assert dequeue_mocker.call_count == 6
+
+    def test_claim_many_locks_each_entry_for_one_claimer_until_it_is_run_or_released(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_instances = [self._create_process_instance() for _ in range(3)]
+        run_at_in_seconds_threshold = round(time.time()) + 5
+
+        claimed_ids = ProcessInstanceQueueService.claim_many(
+            "not_started", run_at_in_seconds_threshold, min_age_in_seconds=-5, limit=2
+        )
+        assert len(claimed_ids) == 2
+        assert all(ProcessInstanceLockService.has_lock(claimed_id) for claimed_id in claimed_ids)
+        remaining_ids = ProcessInstanceQueueService.claim_many(
+            "not_started", run_at_in_seconds_threshold, min_age_in_seconds=-5, limit=2
+        )
+        assert len(remaining_ids) == 1
+        assert set(claimed_ids + remaining_ids) == {process_instance.id for process_instance in process_instances}
+        assert ProcessInstanceQueueService.claim_many("not_started", run_at_in_seconds_threshold, min_age_in_seconds=-5) == []
+
+        # running a claimed instance takes over the claim and unlocks it when done
+        claimed_process_instance = next(pi for pi in process_instances if pi.id == claimed_ids[0])
+        with ProcessInstanceQueueService.dequeued(claimed_process_instance):
+            assert ProcessInstanceLockService.has_lock(claimed_process_instance.id)
+        assert not ProcessInstanceLockService.has_lock(claimed_process_instance.id)
+
+        for process_instance_id in claimed_ids[1:] + remaining_ids:
+            ProcessInstanceQueueService.release_claim(process_instance_id)
+            assert not ProcessInstanceLockService.has_lock(process_instance_id)
+        assert set(ProcessInstanceQueueService.peek_many("not_started", run_at_in_seconds_threshold, min_age_in_seconds=-5)) == {
+            process_instance.id for process_instance in process_instances
+        }
+
+    def test_claim_many_runs_higher_priority_entries_first_and_ages_waiting_entries(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        current_time = round(time.time())
+        priorities = [ProcessInstanceQueuePriority.low, ProcessInstanceQueuePriority.high, ProcessInstanceQueuePriority.normal]
+        process_instance_ids_by_priority = {}
+        for priority in priorities:
+            process_instance = self._create_process_instance()
+            queue_entry = ProcessInstanceQueueModel.query.filter_by(process_instance_id=process_instance.id).first()
+            queue_entry.priority = priority.queue_value()
+            queue_entry.run_at_in_seconds = current_time
+            process_instance_ids_by_priority[priority] = process_instance.id
+        db.session.commit()
+        low_id = process_instance_ids_by_priority[ProcessInstanceQueuePriority.low]
+        high_id = process_instance_ids_by_priority[ProcessInstanceQueuePriority.high]
+        normal_id = process_instance_ids_by_priority[ProcessInstanceQueuePriority.normal]
+        run_at_in_seconds_threshold = current_time + 5
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_QUEUE_PRIORITY_AGING_IN_SECONDS", 0):
+            assert ProcessInstanceQueueService.peek_many("not_started", run_at_in_seconds_threshold, min_age_in_seconds=-5) == [
+                high_id,
+                normal_id,
+                low_id,
+            ]
+            claimed_ids = ProcessInstanceQueueService.claim_many(
+                "not_started", run_at_in_seconds_threshold, min_age_in_seconds=-5, limit=1
+            )
+            assert claimed_ids == [high_id]
+            ProcessInstanceQueueService.release_claim(high_id)
+
+        # the low priority entry has been due long enough to move up two levels to high and has waited the longest
+        ProcessInstanceQueueModel.query.filter_by(process_instance_id=low_id).update({"run_at_in_seconds": current_time - 250})
+        db.session.commit()
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_QUEUE_PRIORITY_AGING_IN_SECONDS", 100):
+            claimed_ids = ProcessInstanceQueueService.claim_many(
+                "not_started", run_at_in_seconds_threshold, min_age_in_seconds=-5, limit=1
+            )
+            assert claimed_ids == [low_id]
+            ProcessInstanceQueueService.release_claim(low_id)
+
+    def test_new_process_instances_get_the_queue_priority_of_the_process_model_unless_one_is_given(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/model_with_lanes",
+            bpmn_file_name="lanes.bpmn",
+            process_model_source_directory="model_with_lanes",
+        )
+        user = self.find_or_create_user("initiator_user")
+
+        def queue_priority_of_new_process_instance(queue_priority: str | None = None) -> int:
+            process_instance = ProcessInstanceService.create_process_instance_from_process_model_identifier(
+                process_model.id, user, queue_priority=queue_priority
+            )
+            queue_entry = ProcessInstanceQueueModel.query.filter_by(process_instance_id=process_instance.id).first()
+            return queue_entry.priority
+
+        assert queue_priority_of_new_process_instance() == ProcessInstanceQueuePriority.normal.queue_value()
+        ProcessModelService.update_process_model(process_model, {"queue_priority": ProcessInstanceQueuePriority.low.value})
+        assert queue_priority_of_new_process_instance() == ProcessInstanceQueuePriority.low.queue_value()
+        assert queue_priority_of_new_process_instance("high") == ProcessInstanceQueuePriority.high.queue_value()
+
+        # running and re-enqueueing an instance keeps its priority
+        process_instance = ProcessInstanceModel.query.order_by(ProcessInstanceModel.id.desc()).first()  # type: ignore
+        with ProcessInstanceQueueService.dequeued(process_instance):
+            pass
+        queue_entry = ProcessInstanceQueueModel.query.filter_by(process_instance_id=process_instance.id).first()
+        assert queue_entry.priority == ProcessInstanceQueuePriority.high.queue_value()
+
+    def test_unknown_queue_priorities_run_at_normal_priority(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        assert ProcessInstanceQueuePriority.queue_value_for("urgent") == ProcessInstanceQueuePriority.normal.queue_value()
+        assert ProcessInstanceQueuePriority.queue_value_for(None) == ProcessInstanceQueuePriority.normal.queue_value()
+        assert ProcessInstanceQueuePriority.queue_value_for("low") == ProcessInstanceQueuePriority.low.queue_value()
@@ -1687,6 +1687,59 @@ class TestProcessInstanceRuntime(BaseTest):
 
         assert bpmn_process_dict["tasks"][child_task.guid]["data"] == {}
 
+    def test_hydration_does_not_hand_task_model_properties_to_the_serializer(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            "test_group/multiinstance_manual_task",
+            process_model_source_directory="multiinstance_manual_task",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model)
+        ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+
+        runtime = ProcessInstanceRuntime(process_instance)
+        assert len(runtime.task_model_mapping) > 0
+        for task_model in runtime.task_model_mapping.values():
+            assert "data" not in task_model.properties_json
+
+        while len(runtime.get_ready_user_tasks()) > 0:
+            self.complete_next_manual_task(runtime)
+        assert process_instance.status == "complete"
+
+    def test_lazy_completed_task_data_is_loaded_when_touched(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        process_model = load_test_spec(
+            "test_group/multiinstance_manual_task",
+            process_model_source_directory="multiinstance_manual_task",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model)
+        runtime = ProcessInstanceRuntime(process_instance)
+        runtime.do_engine_steps(save=True, execution_strategy_name="greedy")
+        self.complete_next_manual_task(runtime)
+
+        eager_runtime = ProcessInstanceRuntime(process_instance, include_task_data_for_completed_tasks=True)
+        assert eager_runtime.lazy_task_data_loader is None
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_LAZY_COMPLETED_TASK_DATA", True):
+            lazy_runtime = ProcessInstanceRuntime(process_instance, include_task_data_for_completed_tasks=True)
+        loader = lazy_runtime.lazy_task_data_loader
+        assert loader is not None
+        assert loader.materialized_count == 0
+
+        # the start event has no data loaded while hydrating since it and its only child are completed
+        lazy_task = ProcessInstanceRuntime.get_task_by_bpmn_identifier("StartEvent_1", lazy_runtime.bpmn_process_instance)
+        eager_task = ProcessInstanceRuntime.get_task_by_bpmn_identifier("StartEvent_1", eager_runtime.bpmn_process_instance)
+        assert lazy_task is not None and eager_task is not None
+        assert lazy_task.data == eager_task.data
+        assert loader.materialized_count == 1
+
+        assert lazy_runtime.serialize() == eager_runtime.serialize()
+        assert loader.unmaterialized == []
+
     def test_returns_error_if_spiff_task_and_human_task_are_different(
         self,
         app: Flask,
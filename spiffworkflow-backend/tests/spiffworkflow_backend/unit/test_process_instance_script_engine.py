@@ -0,0 +1,74 @@
+from typing import Any
+
+from flask.app import Flask
+from prometheus_client import REGISTRY
+from pytest_mock.plugin import MockerFixture
+
+from spiffworkflow_backend.scripts.script import Script
+from spiffworkflow_backend.services.process_instance_script_engine import CustomBpmnScriptEngine
+from spiffworkflow_backend.services.process_instance_script_engine import ScriptCodeCache
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+
+
+def script_code_cache_lookups(mode: str, result: str) -> float:
+    return REGISTRY.get_sample_value("spiff_script_code_cache_total", {"mode": mode, "result": result}) or 0
+
+
+class TestProcessInstanceScriptEngine(BaseTest):
+    def test_reuses_augmented_methods_and_compiled_expressions_for_the_same_process_instance(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+    ) -> None:
+        generate_augmented_list_spy = mocker.spy(Script, "generate_augmented_list")
+        ScriptCodeCache.clear()
+        misses_before = script_code_cache_lookups("eval", "miss")
+        hits_before = script_code_cache_lookups("eval", "hit")
+        tld = app.config["THREAD_LOCAL_DATA"]
+        tld.process_instance_id = 1
+        tld.process_model_identifier = "test_group/script_engine"
+
+        def task_seen_by_scripts() -> Any:
+            return generate_augmented_list_spy.call_args.args[0].task
+
+        script_engine = CustomBpmnScriptEngine()
+        first_task = mocker.Mock(data={"amount": 1})
+        second_task = mocker.Mock(data={"amount": 2})
+        try:
+            for task in [first_task, second_task, first_task]:
+                assert script_engine.evaluate(task, "amount > 1") is (task is second_task)
+                assert (
+                    script_engine.evaluate(task, "task_seen_by_scripts()", {"task_seen_by_scripts": task_seen_by_scripts}) is task
+                )
+            assert generate_augmented_list_spy.call_count == 1
+            assert script_code_cache_lookups("eval", "miss") - misses_before == 2
+            assert script_code_cache_lookups("eval", "hit") - hits_before == 4
+
+            tld.process_instance_id = 2
+            assert script_engine.evaluate(first_task, "amount") == 1
+            assert generate_augmented_list_spy.call_count == 2
+        finally:
+            del tld.process_instance_id
+            del tld.process_model_identifier
+
+    def test_compiles_each_script_once(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+    ) -> None:
+        ScriptCodeCache.clear()
+        misses_before = script_code_cache_lookups("exec", "miss")
+        hits_before = script_code_cache_lookups("exec", "hit")
+        script = "total = sum(item['price'] for item in items)\nis_large = total > 10"
+
+        script_engine = CustomBpmnScriptEngine()
+        small_order = mocker.Mock(data={"items": [{"price": 5}]})
+        large_order = mocker.Mock(data={"items": [{"price": 5}, {"price": 6}]})
+        for task in [small_order, large_order]:
+            assert script_engine.execute(task, script) is True
+
+        assert small_order.data["is_large"] is False
+        assert large_order.data["total"] == 11
+        assert large_order.data["is_large"] is True
+        assert script_code_cache_lookups("exec", "miss") - misses_before == 1
+        assert script_code_cache_lookups("exec", "hit") - hits_before == 1
@@ -11,14 +11,19 @@ from SpiffWorkflow.bpmn.util import PendingBpmnEvent  # type: ignore
 from SpiffWorkflow.util.task import TaskState  # type: ignore
 
 from spiffworkflow_backend.exceptions.error import ProcessInstanceMigrationNotSafeError
+from spiffworkflow_backend.models.db import db
 from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
 from spiffworkflow_backend.models.process_instance import ProcessInstanceStatus
 from spiffworkflow_backend.models.process_instance_event import ProcessInstanceEventModel
 from spiffworkflow_backend.models.process_instance_event import ProcessInstanceEventType
+from spiffworkflow_backend.models.process_instance_file_blob import PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM
+from spiffworkflow_backend.models.process_instance_file_blob import ProcessInstanceFileBlobModel
+from spiffworkflow_backend.models.process_instance_file_data import ProcessInstanceFileDataModel
 from spiffworkflow_backend.models.task import TaskModel
 from spiffworkflow_backend.services.git_service import GitService
 from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
 from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
+from spiffworkflow_backend.services.process_model_service import ProcessModelService
 from spiffworkflow_backend.services.spec_file_service import SpecFileService
 from tests.spiffworkflow_backend.helpers.base_test import BaseTest
 from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
@@ -110,9 +115,56 @@ class TestProcessInstanceService(BaseTest):
             assert model.process_instance_id == process_instance_id
             assert model.mimetype == "some/mimetype"
             assert model.filename == f"testing{i}.txt"
-            assert model.contents == _file_content(i)
+            assert ProcessInstanceFileBlobModel.query.filter_by(digest=model.digest).one().get_contents() == _file_content(i)
             assert model.digest == _digest(i)
 
+    @pytest.mark.parametrize("on_file_system", [False, True])
+    def test_decodes_file_data_in_chunks_and_reads_it_back_in_chunks(
+        self,
+        app: Flask,
+        mocker: MockerFixture,
+        with_db_and_bpmn_file_cleanup: None,
+        on_file_system: bool,
+    ) -> None:
+        process_model = load_test_spec(
+            process_model_id="test_group/random_fact",
+            bpmn_file_name="random_fact_set.bpmn",
+            process_model_source_directory="random_fact",
+        )
+        process_instance = self.create_process_instance_from_process_model(process_model=process_model)
+        mocker.patch("spiffworkflow_backend.models.process_instance_file_blob.PROCESS_INSTANCE_DATA_FILE_BASE64_CHUNK_SIZE", 8)
+        mocker.patch("spiffworkflow_backend.models.process_instance_file_blob.PROCESS_INSTANCE_DATA_FILE_CHUNK_SIZE_IN_BYTES", 4)
+        contents = b"".join(_file_content(i) for i in range(10))
+        file_data_dir = ProcessModelService.root_path() if on_file_system else None
+
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_PROCESS_INSTANCE_FILE_DATA_FILESYSTEM_PATH", file_data_dir):
+            value = f"data:some/mimetype;name=testing.txt;base64,{base64.b64encode(contents).decode()}"
+            model = ProcessInstanceService.file_data_model_for_value(value, process_instance.id)
+            assert model is not None
+            assert model.digest == hashlib.sha256(contents).hexdigest()
+            file_blob = ProcessInstanceFileBlobModel.query.filter_by(digest=model.digest).one()
+            if on_file_system:
+                assert file_blob.contents == PROCESS_INSTANCE_DATA_FILE_ON_FILE_SYSTEM.encode()
+                assert os.path.isfile(file_blob.get_full_filepath())
+            else:
+                assert file_blob.contents == contents
+            db.session.add(model)
+            db.session.commit()
+            db.session.expire_all()
+
+            model = ProcessInstanceFileDataModel.query.filter_by(digest=model.digest).one()
+            assert model.get_contents_size() == len(contents)
+            chunks = list(model.iter_contents())
+            assert max(len(chunk) for chunk in chunks) == 4
+            assert b"".join(chunks) == contents
+            assert b"".join(model.iter_contents(3, 21)) == contents[3:21]
+
+            # base64 with line breaks cannot be decoded in chunks so it falls back to decoding it all at once
+            value = f"data:some/mimetype;name=testing.txt;base64,{base64.encodebytes(contents).decode()}"
+            model = ProcessInstanceService.file_data_model_for_value(value, process_instance.id)
+            assert model is not None
+            assert model.digest == hashlib.sha256(contents).hexdigest()
+
     def test_does_not_skip_events_it_does_not_know_about(self) -> None:
         name = None
         event_type = "Unknown"
@@ -0,0 +1,118 @@
+import time
+
+from flask.app import Flask
+from pytest_mock.plugin import MockerFixture
+
+from spiffworkflow_backend.background_processing.process_instance_wakeup_dispatcher import ProcessInstanceWakeupDispatcher
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance_queue import ProcessInstanceQueueModel
+from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
+from spiffworkflow_backend.services.process_instance_service import ProcessInstanceService
+from spiffworkflow_backend.services.process_instance_wakeup_service import ProcessInstanceWakeup
+from spiffworkflow_backend.services.process_instance_wakeup_service import ProcessInstanceWakeupService
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestProcessInstanceWakeupService(BaseTest):
+    def _create_process_instance(self) -> ProcessInstanceModel:
+        process_model = load_test_spec(
+            process_model_id="test_group/model_with_lanes",
+            bpmn_file_name="lanes.bpmn",
+            process_model_source_directory="model_with_lanes",
+        )
+        return self.create_process_instance_from_process_model(process_model=process_model)
+
+    def test_wakeups_are_delivered_when_the_transaction_commits(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch.object(ProcessInstanceWakeupService, "uses_postgres_notify", return_value=False)
+        ProcessInstanceWakeupService.forget_requested_wakeups([(1, 100), (2, 100)])
+        delivered: list[ProcessInstanceWakeup] = []
+        ProcessInstanceWakeupService.set_local_receiver(delivered.extend)
+        try:
+            ProcessInstanceWakeupService.request_wakeup(1, 100)
+            ProcessInstanceWakeupService.request_wakeup(1, 100)
+            assert delivered == []
+            db.session.commit()
+            assert delivered == [(1, 100)]
+
+            ProcessInstanceWakeupService.request_wakeup(2, 100)
+            db.session.rollback()
+            db.session.commit()
+            assert delivered == [(1, 100)]
+
+            # saving again without changing when the instance is due does not send it again
+            ProcessInstanceWakeupService.request_wakeup(1, 100)
+            ProcessInstanceWakeupService.request_wakeup(2, 100)
+            db.session.commit()
+            assert delivered == [(1, 100), (2, 100)]
+            ProcessInstanceWakeupService.request_wakeup(1, 110)
+            db.session.commit()
+            assert delivered == [(1, 100), (2, 100), (1, 110)]
+
+            # an instance enqueued to start later gets a wakeup for when it is due
+            process_instance = self._create_process_instance()
+            queue_entry = ProcessInstanceQueueModel.query.filter_by(process_instance_id=process_instance.id).first()
+            queue_entry.run_at_in_seconds = round(time.time()) + 60
+            ProcessInstanceQueueService._configure_and_save_queue_entry(process_instance, queue_entry)
+            db.session.commit()
+            assert delivered[-1] == (process_instance.id, queue_entry.run_at_in_seconds)
+        finally:
+            ProcessInstanceWakeupService.set_local_receiver(None)
+
+    def test_dispatcher_hands_out_each_due_process_instance_once_in_order(
+        self,
+        app: Flask,
+    ) -> None:
+        dispatcher = ProcessInstanceWakeupDispatcher(app)
+        dispatcher.add_wakeups([(3, 30), (1, 10), (2, 20), (1, 10), (4, 40)])
+        assert dispatcher.pop_due_process_instance_ids(5) == []
+        assert dispatcher.pop_due_process_instance_ids(20) == [1, 2]
+        assert dispatcher.pop_due_process_instance_ids(40) == [3, 4]
+        assert dispatcher.pop_due_process_instance_ids(100) == []
+
+    def test_dispatcher_keeps_one_pending_wakeup_per_process_instance(
+        self,
+        app: Flask,
+    ) -> None:
+        dispatcher = ProcessInstanceWakeupDispatcher(app)
+        for _ in range(100):
+            dispatcher.add_wakeups([(1, 50), (2, 60)])
+        assert dispatcher.pending_wakeup_count() == 2
+        assert len(dispatcher._due) == 2
+
+        # an earlier wakeup replaces the pending one and a later one waits until it has come due
+        dispatcher.add_wakeups([(1, 20), (2, 70)])
+        assert dispatcher.pending_wakeup_count() == 2
+        assert dispatcher.pop_due_process_instance_ids(50) == [1]
+        dispatcher.add_wakeups([(2, 70)])
+        assert dispatcher.pop_due_process_instance_ids(65) == [2]
+        assert dispatcher.pop_due_process_instance_ids(100) == []
+        assert dispatcher.pending_wakeup_count() == 0
+        assert dispatcher._due == []
+
+    def test_run_woken_process_instances_only_runs_due_instances_that_are_not_locked(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+        mocker: MockerFixture,
+    ) -> None:
+        run_mock = mocker.patch.object(ProcessInstanceService, "run_process_instance_with_runtime")
+        due, not_due, locked = [self._create_process_instance() for _ in range(3)]
+        ProcessInstanceQueueModel.query.filter_by(process_instance_id=not_due.id).update(
+            {"run_at_in_seconds": round(time.time()) + 60}
+        )
+        ProcessInstanceQueueModel.query.filter_by(process_instance_id=locked.id).update({"locked_by": "someone-else"})
+        db.session.commit()
+
+        outcomes = ProcessInstanceService.run_woken_process_instances([due.id, not_due.id, locked.id])
+        assert outcomes == ["processed"]
+        assert run_mock.call_count == 1
+        assert run_mock.call_args.args[0].id == due.id
+        queue_entry = ProcessInstanceQueueModel.query.filter_by(process_instance_id=due.id).first()
+        assert queue_entry.locked_by is None
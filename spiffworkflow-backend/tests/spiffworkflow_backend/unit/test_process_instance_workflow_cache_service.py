@@ -0,0 +1,115 @@
+from flask.app import Flask
+
+from spiffworkflow_backend.models.db import db
+from spiffworkflow_backend.models.process_instance import ProcessInstanceModel
+from spiffworkflow_backend.models.process_instance import ProcessInstanceStatus
+from spiffworkflow_backend.models.task import TaskModel
+from spiffworkflow_backend.services.process_instance_queue_service import ProcessInstanceQueueService
+from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
+from spiffworkflow_backend.services.process_instance_workflow_cache_service import ProcessInstanceWorkflowCacheService
+from tests.spiffworkflow_backend.helpers.base_test import BaseTest
+from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
+
+
+class TestProcessInstanceWorkflowCacheService(BaseTest):
+    def _create_process_instance(self) -> ProcessInstanceModel:
+        process_model = load_test_spec(
+            "test_group/multiinstance_manual_task",
+            process_model_source_directory="multiinstance_manual_task",
+        )
+        return self.create_process_instance_from_process_model(process_model)
+
+    def test_reuses_workflow_saved_while_the_process_instance_was_locked(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        ProcessInstanceWorkflowCacheService.clear()
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_HYDRATED_WORKFLOW_CACHE_MAX_ENTRIES", 5):
+            process_instance = self._create_process_instance()
+            with ProcessInstanceQueueService.dequeued(process_instance):
+                runtime = ProcessInstanceRuntime(process_instance)
+                runtime.do_engine_steps(save=True, execution_strategy_name="greedy")
+            assert ProcessInstanceWorkflowCacheService.stats()["entries"] == 1
+
+            with ProcessInstanceQueueService.dequeued(process_instance):
+                cached_runtime = ProcessInstanceRuntime(process_instance)
+                assert cached_runtime.bpmn_process_instance is runtime.bpmn_process_instance
+                assert ProcessInstanceWorkflowCacheService.stats()["entries"] == 0
+                self.complete_next_manual_task(cached_runtime)
+            assert len(cached_runtime.get_ready_user_tasks()) == 2
+
+            # a runtime created without the lock hands the workflow back when the request ends if it did not change it
+            readonly_runtime = ProcessInstanceRuntime(process_instance)
+            assert readonly_runtime.bpmn_process_instance is runtime.bpmn_process_instance
+            assert ProcessInstanceWorkflowCacheService.stats()["entries"] == 0
+            ProcessInstanceWorkflowCacheService.check_in_unchanged_pending()
+            assert ProcessInstanceWorkflowCacheService.stats()["entries"] == 1
+
+            with ProcessInstanceQueueService.dequeued(process_instance):
+                runtime = ProcessInstanceRuntime(process_instance)
+                assert runtime.bpmn_process_instance is readonly_runtime.bpmn_process_instance
+                while len(runtime.get_ready_user_tasks()) > 0:
+                    self.complete_next_manual_task(runtime)
+
+        assert process_instance.status == ProcessInstanceStatus.complete.value
+
+    def test_does_not_reuse_workflow_when_the_process_instance_changed_elsewhere(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        ProcessInstanceWorkflowCacheService.clear()
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_HYDRATED_WORKFLOW_CACHE_MAX_ENTRIES", 5):
+            process_instance = self._create_process_instance()
+            with ProcessInstanceQueueService.dequeued(process_instance):
+                runtime = ProcessInstanceRuntime(process_instance)
+                runtime.do_engine_steps(save=True, execution_strategy_name="greedy")
+            assert ProcessInstanceWorkflowCacheService.stats()["entries"] == 1
+
+            # a task written through the orm bumps the workflow version of its process instance
+            workflow_version = process_instance.workflow_version
+            task_model = TaskModel.query.filter_by(process_instance_id=process_instance.id).first()
+            task_model.start_in_seconds = 1
+            db.session.commit()
+            db.session.refresh(process_instance)
+            assert process_instance.workflow_version == workflow_version + 1
+
+            fresh_runtime = ProcessInstanceRuntime(process_instance)
+            assert fresh_runtime.bpmn_process_instance is not runtime.bpmn_process_instance
+            assert len(fresh_runtime.get_ready_user_tasks()) == 3
+
+    def test_does_not_hand_back_a_read_only_workflow_when_the_process_instance_changed_elsewhere(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        ProcessInstanceWorkflowCacheService.clear()
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_HYDRATED_WORKFLOW_CACHE_MAX_ENTRIES", 5):
+            process_instance = self._create_process_instance()
+            with ProcessInstanceQueueService.dequeued(process_instance):
+                ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+            assert ProcessInstanceWorkflowCacheService.stats()["entries"] == 1
+
+            readonly_runtime = ProcessInstanceRuntime(process_instance)
+            process_instance.status = ProcessInstanceStatus.suspended.value
+            db.session.commit()
+            ProcessInstanceWorkflowCacheService.check_in_unchanged_pending()
+            assert ProcessInstanceWorkflowCacheService.stats()["entries"] == 0
+            assert readonly_runtime.bpmn_process_instance is not None
+
+    def test_evicts_least_recently_stored_workflows(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+    ) -> None:
+        ProcessInstanceWorkflowCacheService.clear()
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_HYDRATED_WORKFLOW_CACHE_MAX_ENTRIES", 1):
+            process_instances = [self._create_process_instance(), self._create_process_instance()]
+            for process_instance in process_instances:
+                with ProcessInstanceQueueService.dequeued(process_instance):
+                    ProcessInstanceRuntime(process_instance).do_engine_steps(save=True, execution_strategy_name="greedy")
+
+            assert ProcessInstanceWorkflowCacheService.stats()["entries"] == 1
+            assert not ProcessInstanceWorkflowCacheService.has_entry(process_instances[0].id)
+            assert ProcessInstanceWorkflowCacheService.has_entry(process_instances[1].id)
@@ -8,7 +8,9 @@ from flask import Flask
 from SpiffWorkflow.util.task import TaskState  # type: ignore
 
 from spiffworkflow_backend.models.future_task import FutureTaskModel
+from spiffworkflow_backend.models.task import TaskModel
 from spiffworkflow_backend.services.process_instance_runtime import ProcessInstanceRuntime
+from spiffworkflow_backend.services.task_service import TaskService
 from spiffworkflow_backend.services.workflow_execution_service import WorkflowExecutionService
 from tests.spiffworkflow_backend.helpers.base_test import BaseTest
 from tests.spiffworkflow_backend.helpers.test_data import load_test_spec
@@ -117,3 +119,83 @@ class TestWorkflowExecutionService(BaseTest):
         runtime.do_engine_steps(save=True, execution_strategy_name="greedy")
         assert process_instance.status == "complete"
         assert runtime.bpmn_process_instance.data == {"testOk": True}
+
+    def test_incremental_task_persistence_only_saves_changed_tasks(
+        self,
+        app: Flask,
+        with_db_and_bpmn_file_cleanup: None,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        process_model = load_test_spec(
+            "test_group/multiinstance_manual_task",
+            process_model_source_directory="multiinstance_manual_task",
+        )
+        with self.app_config_mock(app, "SPIFFWORKFLOW_BACKEND_INCREMENTAL_TASK_PERSISTENCE", True):
+            process_instance = self.create_process_instance_from_process_model(process_model)
+            runtime = ProcessInstanceRuntime(process_instance)
+            runtime.do_engine_steps(save=True, execution_strategy_name="greedy")
+            ready_task_guids = {str(t.id) for t in runtime.get_ready_user_tasks()}
+            assert len(ready_task_guids) == 3
+            assert runtime.task_persistence_fingerprints is not None
+            assert ready_task_guids.issubset(runtime.task_persistence_fingerprints.keys())
+
+            serialized_task_guids: list[str] = []
+            original_update_task_model = TaskService.update_task_model
+
+            def update_task_model(service: TaskService, task_model: TaskModel, spiff_task: Any) -> None:
+                serialized_task_guids.append(str(spiff_task.id))
+                original_update_task_model(service, task_model, spiff_task)
+
+            monkeypatch.setattr(TaskService, "update_task_model", update_task_model)
+
+            # a freshly hydrated runtime with nothing to run should not reserialize any tasks
+            runtime = ProcessInstanceRuntime(process_instance)
+            runtime.do_engine_steps(save=True, execution_strategy_name="greedy")
+            assert serialized_task_guids == []
+
+            self.complete_next_manual_task(runtime)
+            remaining_ready_task_guids = {str(t.id) for t in runtime.get_ready_user_tasks()}
+            assert len(remaining_ready_task_guids) == 2
+
+            serialized_task_guids.clear()
+            runtime.do_engine_steps(save=True, execution_strategy_name="greedy")
+            assert remaining_ready_task_guids.isdisjoint(serialized_task_guids)
+
+            while len(runtime.get_ready_user_tasks()) > 0:
+                self.complete_next_manual_task(runtime)
+
+        assert process_instance.status == "complete"
+        assert TaskModel.query.filter_by(process_instance_id=process_instance.id, state="READY").count() == 0
+
+    def test_task_persistence_fingerprint_sees_nested_data_mutated_in_place(
+        self,
+        app: Flask,
+    ) -> None:
+        spiff_task = SimpleNamespace(
+            state=TaskState.READY,
+            last_state_change=1.0,
+            children=[],
+            triggered=False,
+            internal_data={"loop": {"counters": [1]}},
+            data={"order": {"items": ["apple"]}},
+            task_spec=SimpleNamespace(task_info=lambda _spiff_task: {}),
+        )
+        python_env_state = {"totals": {"apple": 1}}
+        fingerprint = TaskService.task_persistence_fingerprint(
+            cast(Any, spiff_task), TaskService.fingerprint_snapshot(python_env_state)
+        )
+
+        spiff_task.data["order"]["items"].append("pear")
+        assert TaskService.task_persistence_fingerprint(cast(Any, spiff_task), python_env_state) != fingerprint
+        spiff_task.data["order"]["items"].pop()
+        assert TaskService.task_persistence_fingerprint(cast(Any, spiff_task), python_env_state) == fingerprint
+
+        spiff_task.internal_data["loop"]["counters"][0] = 2
+        assert TaskService.task_persistence_fingerprint(cast(Any, spiff_task), python_env_state) != fingerprint
+        spiff_task.internal_data["loop"]["counters"][0] = 1
+
+        python_env_state["totals"]["apple"] = 2
+        assert (
+            TaskService.task_persistence_fingerprint(cast(Any, spiff_task), TaskService.fingerprint_snapshot(python_env_state))
+            != fingerprint
+        )